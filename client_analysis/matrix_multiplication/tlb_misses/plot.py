@@ -1,6 +1,11 @@
 import os
+import sys
 import matplotlib.pyplot as plt
 
+# Parser condiviso (scripts/data_processing/perf_parser.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'scripts', 'data_processing'))
+from perf_parser import PERF_SUFFIXES, load_perf_stat, tlb_levels
+
 # Directory con i risultati
 input_dir = "./perf_results_matrix_tlb_misses"
 
@@ -11,32 +16,15 @@ l2_misses = []    # Miss L2
 
 # Lettura dei file
 for file_name in sorted(os.listdir(input_dir)):
-    if file_name.startswith("misses_") and file_name.endswith(".txt"):
+    if file_name.startswith("misses_") and file_name.endswith(PERF_SUFFIXES):
         try:
             # Estrai la dimensione della tabella dal nome del file
             matrix_size = int(file_name.split("_")[-1].split(".")[0])
 
             # Leggi i valori dal file
             file_path = os.path.join(input_dir, file_name)
-            with open(file_path, 'r') as file:
-                dtlb_load_stlb_hit = 0
-                dtlb_store_stlb_hit = 0
-                dtlb_load_walk = 0
-                dtlb_store_walk = 0
-
-                for line in file:
-                    if "dTLB_load_misses.stlb_hit" in line:
-                        dtlb_load_stlb_hit = float(line.split()[0].replace('.', '').replace(',', '.'))
-                    elif "dTLB_store_misses.stlb_hit" in line:
-                        dtlb_store_stlb_hit = float(line.split()[0].replace('.', '').replace(',', '.'))
-                    elif "dTLB_load_misses.miss_causes_a_walk" in line:
-                        dtlb_load_walk = float(line.split()[0].replace('.', '').replace(',', '.'))
-                    elif "dTLB_store_misses.miss_causes_a_walk" in line:
-                        dtlb_store_walk = float(line.split()[0].replace('.', '').replace(',', '.'))
-
             # Calcola le miss L1 e L2
-            l2_miss = dtlb_load_walk + dtlb_store_walk
-            l1_miss = dtlb_load_stlb_hit + dtlb_store_stlb_hit + l2_miss
+            l1_miss, l2_miss = tlb_levels(load_perf_stat(file_path))
 
             # Aggiungi i dati alle liste
             matrix_sizes.append(matrix_size)
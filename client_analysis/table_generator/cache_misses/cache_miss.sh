@@ -8,11 +8,21 @@ PORT=81
 OUTPUT_DIR="./perf_results_table_cache_misses"
 ITERATIONS=50                 # Numero di iterazioni per il comando perf
 CPU_LIST=0                    # Core da stressare
+FORMAT=${FORMAT:-text}        # Formato output perf: text | csv (perf stat -x,) | json (perf stat -j)
+INTERVAL_MS=${INTERVAL_MS:-}  # Se impostato registra anche la serie temporale (perf stat -I <ms>)
 INTERVAL_NS=10              #Richiesta fissa                
 
 # Crea la directory di output se non esiste
 mkdir -p $OUTPUT_DIR
 
+# Opzioni perf ed estensione dei file in base al formato scelto.
+# Nei formati macchina si forza LC_ALL=C, così i numeri non dipendono dal locale.
+case $FORMAT in
+    csv)  PERF_FORMAT="-x,"; PERF_ENV="LC_ALL=C"; EXT="csv"  ;;
+    json) PERF_FORMAT="-j";  PERF_ENV="LC_ALL=C"; EXT="json" ;;
+    *)    PERF_FORMAT="";    PERF_ENV="";         EXT="txt"  ;;
+esac
+
 echo "Starting cache miss analysis on port $PORT with table size $TABLE_SIZE..."
 
 # Ciclo per analizzare componente tabella crescente
@@ -29,11 +39,19 @@ do
     REQUEST_PID=$!
 
     # Analisi miss
-    L_OUTPUT="$OUTPUT_DIR/misses_${TABLE_SIZE}.txt"
+    L_OUTPUT="$OUTPUT_DIR/misses_${TABLE_SIZE}.${EXT}"
     #perf stat -a -r $ITERATIONS -e mem_load_retired.l1_miss,mem_load_retired.l2_miss,mem_load_retired.l3_miss,mem_load_retired.l1_hit,mem_load_retired.l2_hit,mem_load_retired.l3_hit,context-switches -- sleep 2 > "$L_OUTPUT" 2>&1
-    perf stat -C $CPU_LIST -r $ITERATIONS -e mem_load_retired.l1_miss,mem_load_retired.l2_miss,mem_load_retired.l3_miss,mem_load_retired.l1_hit,mem_load_retired.l2_hit,mem_load_retired.l3_hit,context-switches -- sleep 2 > "$L_OUTPUT" 2>&1
+    env $PERF_ENV perf stat $PERF_FORMAT --output "$L_OUTPUT" -C $CPU_LIST -r $ITERATIONS -e mem_load_retired.l1_miss,mem_load_retired.l2_miss,mem_load_retired.l3_miss,mem_load_retired.l1_hit,mem_load_retired.l2_hit,mem_load_retired.l3_hit,instructions,context-switches -- sleep 2
     echo "Misses saved to $L_OUTPUT"
 
+    # Serie temporale a intervalli (opzionale): stessi eventi, senza -r, per la durata
+    # complessiva delle $ITERATIONS ripetizioni. Sempre in CSV, letto da perf_interval.py.
+    if [ -n "$INTERVAL_MS" ]; then
+        I_OUTPUT="$OUTPUT_DIR/interval_misses_${TABLE_SIZE}.csv"
+        LC_ALL=C perf stat -x, -I $INTERVAL_MS --output "$I_OUTPUT" -C $CPU_LIST -e mem_load_retired.l1_miss,mem_load_retired.l2_miss,mem_load_retired.l3_miss,mem_load_retired.l1_hit,mem_load_retired.l2_hit,mem_load_retired.l3_hit,instructions,context-switches -- sleep $((2 * ITERATIONS))
+        echo "Interval series saved to $I_OUTPUT"
+    fi
+
     # Ferma il generatore di richieste
     kill -9 $REQUEST_PID
     wait $REQUEST_PID 2>/dev/null
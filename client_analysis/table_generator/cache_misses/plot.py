@@ -1,6 +1,11 @@
 import os
+import sys
 import matplotlib.pyplot as plt
 
+# Parser condiviso (scripts/data_processing/perf_parser.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'scripts', 'data_processing'))
+from perf_parser import load_perf_stat
+
 # Directory dei risultati
 input_dir = "./perf_results_table_cache_misses"
 
@@ -12,21 +17,15 @@ l3_misses = []
 
 # Lettura dei file
 for file_name in sorted(os.listdir(input_dir)):
-    if "misses_" in file_name:
+    if file_name.startswith("misses_"):
         try:
             # Estrai la dimensione della tabella dal nome del file
             table_size = int(file_name.split("_")[-1].split(".")[0])
             
             # Leggi i valori di miss
             file_path = os.path.join(input_dir, file_name)
-            with open(file_path, 'r') as file:
-                for line in file:
-                    if "mem_load_retired.l1_miss" in line:
-                        l1_value = float(line.split()[0].replace('.', '').replace(',','.'))
-                    elif "mem_load_retired.l2_miss" in line:
-                        l2_value = float(line.split()[0].replace('.', '').replace(',','.'))
-                    elif "mem_load_retired.l3_miss" in line:
-                        l3_value = float(line.split()[0].replace('.', '').replace(',','.'))
+            stat = load_perf_stat(file_path)
+            l1_value, l2_value, l3_value = stat.l1_miss, stat.l2_miss, stat.l3_miss
 
             # Aggiungi i dati alle liste
             table_sizes.append(table_size)
@@ -1,13 +1,20 @@
 import os
+import sys
 import matplotlib.pyplot as plt
 import numpy as np
 
+# Log per richiesta del client, anche compressi (scripts/data_processing/request_log.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'scripts', 'data_processing'))
+from request_log import LATENCY_PERCENTILES, cdf_latenza, load_request_log, percentili_latenza
+
 # Directory con i file di testo
 input_dir = "./perf_table_results_time"
 
 # Liste per le dimensioni delle tabelle e i tempi medi di esecuzione
 table_sizes = []
 average_execution_times = []
+percentiles = []  # p50, p90, p99, p99.9, max per dimensione
+samples = []      # latenze di ogni richiesta, per la CDF
 
 # Lettura dei file di testo
 for file_name in sorted(os.listdir(input_dir)):
@@ -17,25 +24,25 @@ for file_name in sorted(os.listdir(input_dir)):
             table_size = int(file_name.split("_")[-1].split(".")[0])  # Conversione in intero
             table_sizes.append(table_size)
             
-            # Leggi i valori di tempo dal file
+            # Leggi tutte le latenze per richiesta dal file (NaN per le richieste fallite)
             file_path = os.path.join(input_dir, file_name)
-            with open(file_path, 'r') as file:
-                times = []
-                for line in file:
-                    if "Execution time:" in line:
-                        time = float(line.split(":")[2].strip().split()[0])  # Conversione in float
-                        times.append(time)
-            
-            # Calcola il tempo medio per il file corrente
-            if times:
-                average_execution_times.append(np.mean(times))
-        
+            latency = load_request_log(file_path).latency_us
+
+            # Media, percentili e campioni per il file corrente
+            if np.isfinite(latency).any():
+                average_execution_times.append(np.nanmean(latency))
+                percentiles.append(percentili_latenza(latency))
+                samples.append(latency)
+            else:
+                table_sizes.pop()
+
         except Exception as e:
             print(f"Errore nel file {file_name}: {e}")
 
 # Ordina i dati in base alla dimensione della tabella per sicurezza
-sorted_data = sorted(zip(table_sizes, average_execution_times), key=lambda x: x[0])
-table_sizes, average_execution_times = zip(*sorted_data)
+sorted_data = sorted(zip(table_sizes, average_execution_times, percentiles, samples), key=lambda x: x[0])
+table_sizes, average_execution_times, percentiles, samples = zip(*sorted_data)
+percentiles = np.array(percentiles)
 
 # Calcolo dei valori minimi, massimi e medi
 min_time = np.min(average_execution_times)
@@ -46,6 +53,11 @@ avg_time = np.mean(average_execution_times)
 plt.figure(figsize=(10, 6))
 plt.plot(table_sizes, average_execution_times, marker='o', linestyle='-', label="Average Execution Time")
 
+# Percentili accanto alla media: la coda è dove si vede l'interferenza
+for i, q in enumerate(LATENCY_PERCENTILES):
+    plt.plot(table_sizes, percentiles[:, i], marker='.', linestyle=':', label=f"p{q:g}")
+plt.plot(table_sizes, percentiles[:, -1], marker='x', linestyle=':', label="Max")
+
 # Linee tratteggiate per min, max e average
 plt.axhline(min_time, color='red', linestyle='--', label=f"Min Time: {min_time:.2f} µs")
 plt.axhline(max_time, color='green', linestyle='--', label=f"Max Time: {max_time:.2f} µs")
@@ -54,11 +66,27 @@ plt.axhline(avg_time, color='purple', linestyle='--', label=f"Average Time: {avg
 # Personalizzazione degli assi
 plt.xlabel("Table Size")
 plt.ylabel("Execution Time (microseconds)")
-plt.title("Average Execution Time per Table Size (1 Server Active Table Generator)")
+plt.title("Execution Time (mean and percentiles) per Table Size (1 Server Active Table Generator)")
 plt.legend()
 plt.grid(True)
 
 # Salvataggio e visualizzazione del grafico
 plt.tight_layout()
 plt.savefig("execution_time_per_table_size.png")
-plt.show()
\ No newline at end of file
+plt.show()
+
+# CDF delle latenze per richiesta, una curva per dimensione
+plt.figure(figsize=(10, 6))
+for size, latency in zip(table_sizes, samples):
+    lat_us, frac = cdf_latenza(latency)
+    plt.step(lat_us, frac, where='post', label=f"Table Size {size}")
+plt.axhline(0.99, color='gray', linestyle=':', linewidth=0.8)
+plt.xscale('log')
+plt.xlabel("Execution Time (microseconds, log scale)")
+plt.ylabel("Fraction of requests")
+plt.title("Execution Time CDF per Table Size")
+plt.legend(fontsize=8)
+plt.grid(True, which='both', linestyle='--', alpha=0.5)
+plt.tight_layout()
+plt.savefig("execution_time_cdf_per_table_size.png")
+plt.show()
@@ -2,9 +2,27 @@
 #include <curl/curl.h>  // Libreria libcurl per le richieste HTTP
 #include <chrono>
 #include <thread>       // Per std::this_thread::sleep_for
+#include <cmath>        // Per std::log2 (bucket dell'istogramma)
+#include <algorithm>    // Per std::min
+#include <cstdint>
+#include <vector>
 
 const int NUM_ITERATIONS = 1'000;
 
+// Istogramma delle latenze a bucket logaritmici, stesso layout di latency_sketch.py:
+// il bucket i contiene le latenze (us) in [2^(i/SUB_BUCKETS), 2^((i+1)/SUB_BUCKETS)).
+// Memoria fissa, qualunque sia il numero di richieste
+const int SUB_BUCKETS = 128;
+const int MAX_OCTAVES = 40;
+const int N_BUCKETS = SUB_BUCKETS * MAX_OCTAVES;
+
+int bucketIndex(double latency_us) {
+    if (latency_us < 1.0) {
+        return 0;
+    }
+    return std::min(static_cast<int>(std::floor(std::log2(latency_us) * SUB_BUCKETS)), N_BUCKETS - 1);
+}
+
 // Funzione di callback: gestisce la risposta del server e la salva in una stringa
 size_t WriteCallback(void* contents, size_t size, size_t nmemb, std::string* out) {
     size_t totalSize = size * nmemb;  // Calcola la dimensione effettiva dei dati ricevuti
@@ -73,13 +91,27 @@ int main(int argc, char* argv[]) {
     std::string serverUrl = "http://localhost:" + port + "/table-generator/generate?rows=" + table_size;
 
     float total_time = 0;  // Variabile per sommare tutti i tempi
+    std::vector<uint64_t> histogram(N_BUCKETS, 0);  // Conteggi per bucket delle latenze
+
+    // Istante di inizio del run: start / end di ogni richiesta sono in microsecondi da qui,
+    // così il throughput si calcola sul tempo reale (pause e richieste fallite comprese)
+    auto run_start = std::chrono::steady_clock::now();
 
     // Iterazioni per calcolare il tempo di esecuzione
     for (int i = 0; i < NUM_ITERATIONS; i++) {
+        auto request_start = std::chrono::steady_clock::now();
         auto time = sendHttpRequest(serverUrl);
+        auto request_end = std::chrono::steady_clock::now();
+        long long start_us = std::chrono::duration_cast<std::chrono::microseconds>(request_start - run_start).count();
+        long long end_us = std::chrono::duration_cast<std::chrono::microseconds>(request_end - run_start).count();
+
         if (time > 0) {
             total_time += time;  // Aggiunge il tempo di ogni richiesta al totale
-            std::cout << "Iter " << i + 1 << ": Execution time: " << time << " microseconds" << std::endl;
+            histogram[bucketIndex(time)]++;
+            std::cout << "Iter " << i + 1 << ": Execution time: " << time << " microseconds"
+                      << " (start " << start_us << " us, end " << end_us << " us)" << std::endl;
+        } else {
+            std::cout << "Failed " << i + 1 << ": (start " << start_us << " us, end " << end_us << " us)" << std::endl;
         }
 
         // // Pausa tra le richieste
@@ -91,6 +123,18 @@ int main(int argc, char* argv[]) {
 
     std::cout << "\nAverage Execution Time: " << average_time << " microseconds\n";
 
+    // Istogramma delle latenze: solo i bucket non vuoti, come indice:conteggio
+    std::cout << "Latency histogram (sub_buckets " << SUB_BUCKETS << "): ";
+    bool first = true;
+    for (int b = 0; b < N_BUCKETS; b++) {
+        if (histogram[b] == 0) {
+            continue;
+        }
+        std::cout << (first ? "" : ",") << b << ":" << histogram[b];
+        first = false;
+    }
+    std::cout << std::endl;
+
     return 0;
 }
 
@@ -1,26 +1,22 @@
 import os
-import re
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.ticker import FuncFormatter
+
+# Moduli condivisi (scripts/data_processing/): parser, cache su disco, caricamento campagne
+# (le directory dei risultati possono essere anche dentro un archivio .tar / .zip)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'scripts', 'data_processing'))
+from campaign_store import open_store_from_env
+from scenario_grid import carica_griglia, carica_sketch_latenze, grid_from_env, grid_scenario_labels, make_grid, scenario_legend
+from metrics import MetricGraph
+from bootstrap import barre_errore, intervalli_campagna
+from figure_batch import FigureTask, batch_from_env, impagina, render_figures, salva_figura
+from grouped_bars import BarTemplate, figura_barre, legenda
 
 # --------------------------------------------------------------------------------
-# 1) FUNZIONI DI PARSING E FORMATTAZIONE
+# 1) FUNZIONI DI FORMATTAZIONE
 # --------------------------------------------------------------------------------
 
-def parse_number_from_line(line):
-    """
-    Estrae il primo numero (float) da una riga, rimuovendo i separatori di migliaia e
-    convertendo le virgole in punti decimali.
-    """
-    import re
-    line_clean = re.sub(r'(?<=\d)\.(?=\d)', '', line.strip())  # rimuove i punti "migliaia"
-    line_clean = line_clean.replace(',', '.')
-    match = re.search(r'(\d+(\.\d+)?)', line_clean)
-    if match:
-        return float(match.group(1))
-    return 0
-
 def short_number_formatter(x, pos):
     """
     Formatta i grandi numeri: es. 1500 -> 1.5K, 2.5 milioni -> 2.5M, ecc.
@@ -34,292 +30,13 @@ def short_number_formatter(x, pos):
     else:
         return str(round(x,2))
 
-def parse_cache_misses_and_hits(file_path):
-    """
-    Parsa un file di testo di perf che contiene:
-      - mem_load_retired.l1_miss
-      - mem_load_retired.l2_miss
-      - mem_load_retired.l3_miss
-      - mem_load_retired.l1_hit
-      - mem_load_retired.l2_hit
-      - mem_load_retired.l3_hit
-    Restituisce la tupla:
-      (l1_miss, l1_hit, l2_miss, l2_hit, l3_miss, l3_hit)
-    Se il file non esiste, ritorna tutti 0.
-    """
-    if not os.path.exists(file_path):
-        return (0, 0, 0, 0, 0, 0)
-
-    l1_miss, l1_hit = 0, 0
-    l2_miss, l2_hit = 0, 0
-    l3_miss, l3_hit = 0, 0
-
-    with open(file_path, 'r') as f:
-        for line in f:
-            if 'mem_load_retired.l1_miss' in line:
-                l1_miss = parse_number_from_line(line)
-            elif 'mem_load_retired.l2_miss' in line:
-                l2_miss = parse_number_from_line(line)
-            elif 'mem_load_retired.l3_miss' in line:
-                l3_miss = parse_number_from_line(line)
-            elif 'mem_load_retired.l1_hit' in line:
-                l1_hit = parse_number_from_line(line)
-            elif 'mem_load_retired.l2_hit' in line:
-                l2_hit = parse_number_from_line(line)
-            elif 'mem_load_retired.l3_hit' in line:
-                l3_hit = parse_number_from_line(line)
-
-    return (l1_miss, l1_hit, l2_miss, l2_hit, l3_miss, l3_hit)
-
-def parse_execution_time(file_path):
-    """Parsa i file che contengono il tempo medio di esecuzione (in microsecondi)."""
-    if not os.path.exists(file_path):
-        return 0
-    avg_time = 0
-    with open(file_path, 'r') as f:
-        for line in f:
-            if 'Average Execution Time:' in line:
-                avg_time = float(line.split()[3])
-    return avg_time
-
-def parse_execution_requests(file_path):
-    """Parsa i file che calcola il throughput."""
-    if not os.path.exists(file_path):
-        return 0
-    avg_time = 0
-    count=0
-    with open(file_path, 'r') as f:
-        for line in f:
-            if 'Iter ' in line:
-                count = count + 1
-    return count
-
-def parse_tlb_misses(file_path):
-    """Parsa i file con TLB misses di livello L1 e L2 (dTLB)."""
-    if not os.path.exists(file_path):
-        return (0, 0)
-    dtlb_load_stlb_hit = 0
-    dtlb_store_stlb_hit = 0
-    dtlb_load_walk = 0
-    dtlb_store_walk = 0
-
-    with open(file_path, 'r') as f:
-        for line in f:
-            if 'dTLB_load_misses.stlb_hit' in line:
-                dtlb_load_stlb_hit = parse_number_from_line(line)
-            elif 'dTLB_load_misses.miss_causes_a_walk' in line:
-                dtlb_load_walk = parse_number_from_line(line)
-            elif 'dTLB_store_misses.stlb_hit' in line:
-                dtlb_store_stlb_hit = parse_number_from_line(line)
-            elif 'dTLB_store_misses.miss_causes_a_walk' in line:
-                dtlb_store_walk = parse_number_from_line(line)
-
-    l2_miss = dtlb_load_walk + dtlb_store_walk
-    l1_miss = dtlb_load_stlb_hit + dtlb_store_stlb_hit + l2_miss
-    return (l1_miss, l2_miss)
-
-# --------------------------------------------------------------------------------
-# 2) FUNZIONI DI CARICAMENTO DATI
-# --------------------------------------------------------------------------------
-
-def carica_dati_cache_miss(base_path_1_server, base_path_2_server, base_path_3_server, matrix_sizes, freqs):
-    """
-    Carica i dati (miss) per i 3 scenari (1S, 2S, 3S).
-    Ritorna un dict:
-      data_miss[scenario][matrix_size] = (l1_miss, l2_miss, l3_miss)
-    e parallelamente un dict per hits:
-      data_hit[scenario][matrix_size] = (l1_hit, l2_hit, l3_hit)
-    """
-    data_miss = {}
-    data_hit = {}
-
-    def split_miss_hit(tup):
-        l1_m, l1_h, l2_m, l2_h, l3_m, l3_h = tup
-        return (l1_m, l2_m, l3_m), (l1_h, l2_h, l3_h)
-
-    # 1) CASO 1 SERVER
-    label_1s = '1S'
-    data_miss[label_1s] = {}
-    data_hit[label_1s] = {}
-    for sz in matrix_sizes:
-        file_name = f"misses_{sz}.txt"
-        path_file = os.path.join(base_path_1_server, file_name)
-        mmh = parse_cache_misses_and_hits(path_file)
-        m, h = split_miss_hit(mmh)
-        data_miss[label_1s][sz] = m
-        data_hit[label_1s][sz] = h
-
-    # 2) CASO 2 SERVER
-    for freq in freqs:
-        label_2s = f"2S_{freq.upper()}"
-        data_miss[label_2s] = {}
-        data_hit[label_2s] = {}
-        for sz in matrix_sizes:
-            file_name = f"misses_{sz}_{freq.upper()}Hz.txt"
-            path_file = os.path.join(base_path_2_server, file_name)
-            mmh = parse_cache_misses_and_hits(path_file)
-            m, h = split_miss_hit(mmh)
-            data_miss[label_2s][sz] = m
-            data_hit[label_2s][sz] = h
-
-    # 3) CASO 3 SERVER
-    for freq in freqs:
-        label_3s = f"3S_{freq.upper()}"
-        data_miss[label_3s] = {}
-        data_hit[label_3s] = {}
-        for sz in matrix_sizes:
-            file_name = f"misses_{sz}_{freq.upper()}Hz.txt"
-            path_file = os.path.join(base_path_3_server, file_name)
-            mmh = parse_cache_misses_and_hits(path_file)
-            m, h = split_miss_hit(mmh)
-            data_miss[label_3s][sz] = m
-            data_hit[label_3s][sz] = h
-
-    return data_miss, data_hit
-
-def carica_dati_tempo(base_path_1_server, base_path_2_server, base_path_3_server, matrix_sizes, freqs):
-    """
-    Carica i dati dei tempi di esecuzione (medio) in microsecondi per i 3 scenari (1S, 2S, 3S).
-    Ritorna un dict: data[scenario][matrix_size] = avg_time_us.
-    """
-    data = {}
-    label_1s = '1S'
-    data[label_1s] = {}
-    for sz in matrix_sizes:
-        file_name = f"execution_time_matrix_{sz}.txt"
-        path_file = os.path.join(base_path_1_server, file_name)
-        data[label_1s][sz] = parse_execution_time(path_file)
-
-    for freq in freqs:
-        label_2s = f"2S_{freq.upper()}"
-        data[label_2s] = {}
-        for sz in matrix_sizes:
-            file_name = f"execution_time_matrix_{sz}_{freq.upper()}Hz.txt"
-            path_file = os.path.join(base_path_2_server, file_name)
-            data[label_2s][sz] = parse_execution_time(path_file)
-
-    for freq in freqs:
-        label_3s = f"3S_{freq.upper()}"
-        data[label_3s] = {}
-        for sz in matrix_sizes:
-            file_name = f"execution_time_matrix_{sz}_{freq.upper()}Hz.txt"
-            path_file = os.path.join(base_path_3_server, file_name)
-            data[label_3s][sz] = parse_execution_time(path_file)
-
-    return data
-
-def carica_dati_richieste(base_path_1_server, base_path_2_server, base_path_3_server, matrix_sizes, freqs):
-    """
-    Carica i dati dei tempi di esecuzione (medio) in microsecondi per i 3 scenari (1S, 2S, 3S).
-    Ritorna un dict: data[scenario][matrix_size] = avg_time_us.
-    """
-    data = {}
-    label_1s = '1S'
-    data[label_1s] = {}
-    for sz in matrix_sizes:
-        file_name = f"execution_time_matrix_{sz}.txt"
-        path_file = os.path.join(base_path_1_server, file_name)
-        data[label_1s][sz] = parse_execution_requests(path_file)
-
-    for freq in freqs:
-        label_2s = f"2S_{freq.upper()}"
-        data[label_2s] = {}
-        for sz in matrix_sizes:
-            file_name = f"execution_time_matrix_{sz}_{freq.upper()}Hz.txt"
-            path_file = os.path.join(base_path_2_server, file_name)
-            data[label_2s][sz] = parse_execution_requests(path_file)
-
-    for freq in freqs:
-        label_3s = f"3S_{freq.upper()}"
-        data[label_3s] = {}
-        for sz in matrix_sizes:
-            file_name = f"execution_time_matrix_{sz}_{freq.upper()}Hz.txt"
-            path_file = os.path.join(base_path_3_server, file_name)
-            data[label_3s][sz] = parse_execution_requests(path_file)
-
-    return data
-
-def carica_dati_tlb(base_path_1_server, base_path_2_server, base_path_3_server, matrix_sizes, freqs):
-    """
-    Carica i dati TLB misses per i 3 scenari (1S, 2S, 3S).
-    Ritorna un dict: data[scenario][matrix_size] = (l1_miss, l2_miss).
-    """
-    data = {}
-    label_1s = '1S'
-    data[label_1s] = {}
-    for sz in matrix_sizes:
-        file_name = f"misses_{sz}.txt"
-        path_file = os.path.join(base_path_1_server, file_name)
-        data[label_1s][sz] = parse_tlb_misses(path_file)
-
-    for freq in freqs:
-        label_2s = f"2S_{freq.upper()}"
-        data[label_2s] = {}
-        for sz in matrix_sizes:
-            file_name = f"tlb_misses_{sz}_{freq.upper()}Hz.txt"
-            path_file = os.path.join(base_path_2_server, file_name)
-            data[label_2s][sz] = parse_tlb_misses(path_file)
-
-    for freq in freqs:
-        label_3s = f"3S_{freq.upper()}"
-        data[label_3s] = {}
-        for sz in matrix_sizes:
-            file_name = f"tlb_misses_{sz}_{freq.upper()}Hz.txt"
-            path_file = os.path.join(base_path_3_server, file_name)
-            data[label_3s][sz] = parse_tlb_misses(path_file)
-
-    return data
-
-# --------------------------------------------------------------------------------
-# 2B) NORMALIZZAZIONE RISPETTO A '1S'
-# --------------------------------------------------------------------------------
-
-def normalizza_cache_miss(data_cache_miss, matrix_sizes, scenario_labels):
-    """
-    Ritorna un dict normalizzato rispetto al caso '1S':
-    data_cache_norm[scenario][sz] = (l1_ratio, l2_ratio, l3_ratio).
-    """
-    data_norm = {}
-    for scenario in scenario_labels:
-        data_norm[scenario] = {}
-        for sz in matrix_sizes:
-            l1, l2, l3 = data_cache_miss[scenario][sz]
-            l1_1s, l2_1s, l3_1s = data_cache_miss['1S'][sz]
-            norm_l1 = (l1 / l1_1s) if l1_1s else 0
-            norm_l2 = (l2 / l2_1s) if l2_1s else 0
-            norm_l3 = (l3 / l3_1s) if l3_1s else 0
-            data_norm[scenario][sz] = (norm_l1, norm_l2, norm_l3)
-    return data_norm
-
-def normalizza_tempo(data_time, matrix_sizes, scenario_labels):
-    """
-    Ritorna un dict normalizzato rispetto a '1S' (tempo medio):
-    data_time_norm[scenario][sz] = time_scenario / time_1S.
-    """
-    data_norm = {}
-    for scenario in scenario_labels:
-        data_norm[scenario] = {}
-        for sz in matrix_sizes:
-            t = data_time[scenario][sz]
-            t_1s = data_time['1S'][sz]
-            data_norm[scenario][sz] = (t / t_1s) if t_1s else 0
-    return data_norm
-
-def normalizza_tlb_miss(data_tlb, matrix_sizes, scenario_labels):
-    """
-    Ritorna un dict normalizzato rispetto a '1S':
-    data_tlb_norm[scenario][sz] = (l1_ratio, l2_ratio).
-    """
-    data_norm = {}
-    for scenario in scenario_labels:
-        data_norm[scenario] = {}
-        for sz in matrix_sizes:
-            l1, l2 = data_tlb[scenario][sz]
-            l1_1s, l2_1s = data_tlb['1S'][sz]
-            norm_l1 = (l1 / l1_1s) if l1_1s else 0
-            norm_l2 = (l2 / l2_1s) if l2_1s else 0
-            data_norm[scenario][sz] = (norm_l1, norm_l2)
-    return data_norm
+# Forma comune delle figure a barre (grouped_bars.py): dimensioni matrice su asse X in
+# scala log2; titoli ed etichette sono aggiunti da ogni funzione di plot
+_SUFFIX = "\n(Multi-core moltiplicazione matrici)"
+_LEVELS = ("L1", "L2", "L3")
+_BARRE = BarTemplate(titles=(), ylabels=(), xlabel="Dimensione matrice (NxN, scala log2)", figsize=(10, 6), scala='log2')
+_CACHE = _BARRE._replace(figsize=(10, 14))
+_TLB = _BARRE._replace(figsize=(10, 10))
 
 # --------------------------------------------------------------------------------
 # 3) FUNZIONI PER PLOT DELLE CACHE
@@ -351,164 +68,54 @@ def plot_cache_misses(data_cache_miss, matrix_sizes, scenario_labels, scenario_l
     Plot in verticale (3 subplots) di L1, L2, L3 su scala log2 (asse X),
     per la multi-core matrix multiplication.
     """
-    fig, axes = plt.subplots(3, 1, figsize=(10, 14), sharex=True)
-    levels = ["L1", "L2", "L3"]
-
-    for i, level in enumerate(levels):
-        ax = axes[i]
-        for s_idx, scenario in enumerate(scenario_labels):
-            vals = []
-            for sz in matrix_sizes:
-                (l1, l2, l3) = data_cache_miss[scenario][sz]
-                if level == "L1":
-                    vals.append(l1)
-                elif level == "L2":
-                    vals.append(l2)
-                else:
-                    vals.append(l3)
-            x = np.array(matrix_sizes, dtype=float)
-            bar_offset = 0.07
-            bar_width  = 0.06
-            x_positions = x * (1 + bar_offset * (s_idx - (len(scenario_labels) - 1)/2))
-            ax.bar(x_positions, vals, width=bar_width * x, 
-                   label=scenario_legend_map[scenario] if i == 0 else "")
-
-        ax.set_title(f"Cache {level} Misses\n(Multi-core moltiplicazione matrici)")
-        ax.set_ylabel(f"{level} Misses")
-        ax.set_xscale('log', base=2)
-        ax.grid(True, which='both', axis='both', linestyle='--', alpha=0.7)
-        ax.yaxis.set_major_formatter(FuncFormatter(short_number_formatter))
-
+    template = _CACHE._replace(titles=tuple(f"Cache {level} Misses{_SUFFIX}" for level in _LEVELS),
+                               ylabels=tuple(f"{level} Misses" for level in _LEVELS),
+                               formatter=short_number_formatter)
+    fig, axes, _, handles = figura_barre(template, data_cache_miss, matrix_sizes, scenario_labels, scenario_legend_map)
+    for ax in axes:
         add_fixed_cache_capacity_lines(ax)
+    legenda(axes[0], handles)
 
-        if i == 0:
-            ax.legend()
-
-    axes[-1].set_xticks(matrix_sizes)
-    axes[-1].set_xticklabels([str(s) for s in matrix_sizes], rotation=45)
-    axes[-1].set_xlabel("Dimensione matrice (NxN, scala log2)")
-
-    plt.tight_layout()
+    impagina()
     out_file = os.path.join(output_dir, "cache_misses_subplots.png")
-    plt.savefig(out_file, dpi=300)
-    plt.show()
+    salva_figura(out_file)
 
-def plot_cache_misses_normalized(data_cache_miss_norm, matrix_sizes, scenario_labels, scenario_legend_map, output_dir):
+def plot_cache_misses_normalized(data_cache_miss_norm, data_cache_miss_err, matrix_sizes, scenario_labels, scenario_legend_map, output_dir):
     """
     Plot in verticale (3 subplots) di L1, L2, L3 normalizzati a 1S,
     per la multi-core matrix multiplication.
     """
-    fig, axes = plt.subplots(3, 1, figsize=(10, 14), sharex=True)
-    levels = ["L1", "L2", "L3"]
-
-    for i, level in enumerate(levels):
-        ax = axes[i]
-        for s_idx, scenario in enumerate(scenario_labels):
-            vals = []
-            for sz in matrix_sizes:
-                (l1, l2, l3) = data_cache_miss_norm[scenario][sz]
-                if level == "L1":
-                    vals.append(l1)
-                elif level == "L2":
-                    vals.append(l2)
-                else:
-                    vals.append(l3)
-            x = np.array(matrix_sizes, dtype=float)
-            bar_offset = 0.07
-            bar_width  = 0.06
-            x_positions = x * (1 + bar_offset * (s_idx - (len(scenario_labels) - 1)/2))
-            ax.bar(x_positions, vals, width=bar_width * x, 
-                   label=scenario_legend_map[scenario] if i == 0 else "")
-
-        ax.set_title(f"Cache {level} Misses (Normalizzato ad 1 server)\n(Multi-core moltiplicazione matrici)")
-        ax.set_ylabel(f"{level} Normalizzato")
-        ax.set_xscale('log', base=2)
-        ax.grid(True, which='both', axis='both', linestyle='--', alpha=0.7)
-
+    template = _CACHE._replace(titles=tuple(f"Cache {level} Misses (Normalizzato ad 1 server){_SUFFIX}" for level in _LEVELS),
+                               ylabels=tuple(f"{level} Normalizzato" for level in _LEVELS))
+    fig, axes, _, handles = figura_barre(template, data_cache_miss_norm, matrix_sizes, scenario_labels,
+                                         scenario_legend_map, err=data_cache_miss_err)
+    for ax in axes:
         add_fixed_cache_capacity_lines(ax)
+    legenda(axes[0], handles)
 
-        if i == 0:
-            ax.legend()
-
-    axes[-1].set_xticks(matrix_sizes)
-    axes[-1].set_xticklabels([str(s) for s in matrix_sizes], rotation=45)
-    axes[-1].set_xlabel("Dimensione matrice (NxN, scala log2)")
-
-    plt.tight_layout()
+    impagina()
     out_file = os.path.join(output_dir, "cache_misses_subplots_normalized.png")
-    plt.savefig(out_file, dpi=300)
-    plt.show()
+    salva_figura(out_file)
 
 # --------------------------------------------------------------------------------
 # 3B) FUNZIONI DI PLOT PER IL MISS RATE (in percentuale)
 # --------------------------------------------------------------------------------
 
-def calcola_missrate(data_miss, data_hit, matrix_sizes, scenario_labels):
-    """
-    Calcola il miss rate (in %) per L1, L2, L3:
-       miss_rate = 100.0 * (misses / (misses + hits))
-    Ritorna data_mr[scenario][size] = (mr_l1, mr_l2, mr_l3).
-    """
-    data_mr = {}
-    for scenario in scenario_labels:
-        data_mr[scenario] = {}
-        for sz in matrix_sizes:
-            (l1_m, l2_m, l3_m) = data_miss[scenario][sz]
-            (l1_h, l2_h, l3_h) = data_hit[scenario][sz]
-
-            mr_l1 = 100.0 * l1_m / (l1_m + l1_h) if (l1_m + l1_h) != 0 else 0
-            mr_l2 = 100.0 * l2_m / (l2_m + l2_h) if (l2_m + l2_h) != 0 else 0
-            mr_l3 = 100.0 * l3_m / (l3_m + l3_h) if (l3_m + l3_h) != 0 else 0
-
-            data_mr[scenario][sz] = (mr_l1, mr_l2, mr_l3)
-    return data_mr
-
 def plot_cache_missrate(data_missrate, matrix_sizes, scenario_labels, scenario_legend_map, output_dir):
     """
     Plot del miss rate in verticale (3 subplots) di L1, L2, L3 (in %)
     per la multi-core matrix multiplication, con scala X in log2.
     """
-    fig, axes = plt.subplots(3, 1, figsize=(10, 14), sharex=True)
-    levels = ["L1", "L2", "L3"]
-
-    for i, level in enumerate(levels):
-        ax = axes[i]
-        for s_idx, scenario in enumerate(scenario_labels):
-            vals = []
-            for sz in matrix_sizes:
-                (mr_l1, mr_l2, mr_l3) = data_missrate[scenario][sz]
-                if level == "L1":
-                    vals.append(mr_l1)
-                elif level == "L2":
-                    vals.append(mr_l2)
-                else:
-                    vals.append(mr_l3)
-
-            x = np.array(matrix_sizes, dtype=float)
-            bar_offset = 0.07
-            bar_width  = 0.06
-            x_positions = x * (1 + bar_offset * (s_idx - (len(scenario_labels) - 1)/2))
-            ax.bar(x_positions, vals, width=bar_width * x, 
-                   label=scenario_legend_map[scenario] if i == 0 else "")
-
-        ax.set_title(f"Cache {level} Miss Rate\n(Multi-core)")
-        ax.set_ylabel(f"{level} Miss Rate (%)")
-        ax.set_xscale('log', base=2)
-        ax.grid(True, which='both', axis='both', linestyle='--', alpha=0.7)
-
+    template = _CACHE._replace(titles=tuple(f"Cache {level} Miss Rate\n(Multi-core)" for level in _LEVELS),
+                               ylabels=tuple(f"{level} Miss Rate (%)" for level in _LEVELS))
+    fig, axes, _, handles = figura_barre(template, data_missrate, matrix_sizes, scenario_labels, scenario_legend_map)
+    for ax in axes:
         add_fixed_cache_capacity_lines(ax)
+    legenda(axes[0], handles)
 
-        if i == 0:
-            ax.legend()
-
-    axes[-1].set_xticks(matrix_sizes)
-    axes[-1].set_xticklabels([str(s) for s in matrix_sizes], rotation=45)
-    axes[-1].set_xlabel("Dimensione matrice (NxN, scala log2)")
-
-    plt.tight_layout()
+    impagina()
     out_file = os.path.join(output_dir, "cache_missrate_subplots.png")
-    plt.savefig(out_file, dpi=300)
-    plt.show()
+    salva_figura(out_file)
 
 # --------------------------------------------------------------------------------
 # 4) FUNZIONI DI PLOT TLB E TEMPO (Multi-core)
@@ -519,299 +126,207 @@ def plot_execution_time(data_time, matrix_sizes, scenario_labels, scenario_legen
     Plot a barre con i tempi (in secondi) su asse Y, scala X log2,
     per la multi-core matrix multiplication.
     """
-    fig, ax = plt.subplots(figsize=(10, 6))
-    x = np.array(matrix_sizes, dtype=float)
-    bar_offset = 0.07
-    bar_width  = 0.06
-
-    for s_idx, scenario in enumerate(scenario_labels):
-        times_sec = []
-        for sz in matrix_sizes:
-            us = data_time[scenario][sz]  # microsecondi
-            times_sec.append(us / 1e6)    # converto in secondi
-        x_positions = x * (1 + bar_offset * (s_idx - (len(scenario_labels) - 1)/2))
-        ax.bar(x_positions, times_sec, width=bar_width * x, 
-               label=scenario_legend_map[scenario])
-
-    ax.set_title("Tempo di Elaborazione Richieste (secondi)\n(Multi-core moltiplicazione matrici)")
-    ax.set_ylabel("Tempo elaborazione (s)\n(scala log)")
-    ax.set_xscale('log', base=2)
-    ax.set_yscale('log')
-    ax.set_xlabel("Dimensione matrice (NxN, scala log2)")
-    ax.grid(True, which='both', axis='both', linestyle='--', alpha=0.7)
-    ax.legend()
-
-    ax.set_xticks(matrix_sizes)
-    ax.set_xticklabels([str(s) for s in matrix_sizes], rotation=45)
-
-    plt.tight_layout()
+    template = _BARRE._replace(titles=(f"Tempo di Elaborazione Richieste (secondi){_SUFFIX}",),
+                               ylabels=("Tempo elaborazione (s)\n(scala log)",), ylog=True)
+    # microsecondi -> secondi
+    fig, axes, _, handles = figura_barre(template, data_time / 1e6, matrix_sizes, scenario_labels, scenario_legend_map)
+    legenda(axes[0], handles)
+
+    impagina()
     out_file = os.path.join(output_dir, "execution_time_barplot.png")
-    plt.savefig(out_file, dpi=300)
-    plt.show()
+    salva_figura(out_file)
 
-def plot_execution_time_normalized(data_time_norm, matrix_sizes, scenario_labels, scenario_legend_map, output_dir):
+def plot_execution_time_normalized(data_time_norm, data_time_err, matrix_sizes, scenario_labels, scenario_legend_map, output_dir):
     """
     Plot a barre con i tempi normalizzati a '1S',
     per la multi-core matrix multiplication.
     """
-    fig, ax = plt.subplots(figsize=(10, 6))
-    x = np.array(matrix_sizes, dtype=float)
-    bar_offset = 0.07
-    bar_width  = 0.06
-
-    for s_idx, scenario in enumerate(scenario_labels):
-        ratios = []
-        for sz in matrix_sizes:
-            ratios.append(data_time_norm[scenario][sz])
-        x_positions = x * (1 + bar_offset * (s_idx - (len(scenario_labels) - 1)/2))
-        ax.bar(x_positions, ratios, width=bar_width * x, label=scenario_legend_map[scenario])
-
-    ax.set_title("Tempo Elaborazione Richieste (Normalizzato ad 1 Server)\n(Multi-core moltiplicazione matrici)")
-    ax.set_ylabel("Tempo Normalizzato")
-    ax.set_xscale('log', base=2)
-    ax.set_xlabel("Dimensione matrice (NxN, scala log2)")
-    ax.grid(True, which='both', axis='both', linestyle='--', alpha=0.7)
-    ax.legend()
-
-    ax.set_xticks(matrix_sizes)
-    ax.set_xticklabels([str(s) for s in matrix_sizes], rotation=45)
-
-    plt.tight_layout()
-    out_file = os.path.join(output_dir, "execution_time_barplot_normalized.png")
-    plt.savefig(out_file, dpi=300)
-    plt.show()
+    template = _BARRE._replace(titles=(f"Tempo Elaborazione Richieste (Normalizzato ad 1 Server){_SUFFIX}",),
+                               ylabels=("Tempo Normalizzato",))
+    fig, axes, _, handles = figura_barre(template, data_time_norm, matrix_sizes, scenario_labels,
+                                         scenario_legend_map, err=data_time_err)
+    legenda(axes[0], handles)
 
-def plot_throughput(data_time, data_requests, matrix_sizes, scenario_labels, scenario_legend_map, output_dir):
+    impagina()
+    out_file = os.path.join(output_dir, "execution_time_barplot_normalized.png")
+    salva_figura(out_file)
+
+def plot_latency_percentiles(data_time, data_percentiles, matrix_sizes, scenario_labels, scenario_legend_map, output_dir):
+    """
+    Latenza per richiesta: media accanto a p50, p90, p99, p99.9 e massimo (un subplot
+    ciascuno), asse X log2, Multi-core.
+    """
+    stats = ["Media", "p50", "p90", "p99", "p99.9", "Max"]
+    # (scenario x size x statistica), da microsecondi a millisecondi
+    data_ms = np.concatenate([data_time[:, :, np.newaxis], data_percentiles], axis=2) / 1e3
+
+    template = _BARRE._replace(titles=tuple(f"Latenza per richiesta - {stat}{_SUFFIX}" for stat in stats),
+                               ylabels=("Latenza (ms)\n(scala log)",) * len(stats),
+                               figsize=(10, 3 * len(stats)), ylog=True)
+    fig, axes, _, handles = figura_barre(template, data_ms, matrix_sizes, scenario_labels, scenario_legend_map)
+    legenda(axes[0], handles, fontsize=8)
+
+    impagina()
+    out_file = os.path.join(output_dir, "latency_percentiles_subplots.png")
+    salva_figura(out_file)
+
+def plot_latency_cdf(latencies, matrix_sizes, scenario_labels, scenario_legend_map, output_dir):
+    """
+    CDF empirica delle latenze per richiesta: un subplot per dimensione, una curva per
+    scenario. latencies: {(scenario, size): sketch delle latenze in us} (carica_sketch_latenze).
+    """
+    n_cols = 4
+    n_rows = (len(matrix_sizes) + n_cols - 1) // n_cols
+    fig, axes = plt.subplots(n_rows, n_cols, figsize=(4 * n_cols, 3 * n_rows), squeeze=False)
+
+    for z_idx, sz in enumerate(matrix_sizes):
+        ax = axes[z_idx // n_cols][z_idx % n_cols]
+        for scenario in scenario_labels:
+            sketch = latencies.get((scenario, sz))
+            if sketch is None:
+                continue
+            lat_us, frac = sketch.cdf()
+            if len(lat_us):
+                ax.step(lat_us / 1e3, frac, where='post', label=scenario_legend_map[scenario])
+        ax.axhline(0.99, color='gray', linestyle=':', linewidth=0.8)
+        ax.set_title(f"Matrice NxN, N = {sz}", fontsize=10)
+        ax.set_xscale('log')
+        ax.set_ylim(0, 1.02)
+        ax.grid(True, which='both', linestyle='--', alpha=0.5)
+        if z_idx % n_cols == 0:
+            ax.set_ylabel("Frazione richieste")
+        ax.set_xlabel("Latenza (ms, scala log)")
+
+    for z_idx in range(len(matrix_sizes), n_rows * n_cols):
+        axes[z_idx // n_cols][z_idx % n_cols].axis('off')
+
+    handles, labels = axes[0][0].get_legend_handles_labels()
+    fig.legend(handles, labels, loc='lower center', ncol=min(len(labels), 4) or 1, fontsize=8)
+    fig.suptitle("CDF della latenza per richiesta (Multi-core moltiplicazione matrici)")
+
+    impagina(rect=(0, 0.06, 1, 0.96))
+    out_file = os.path.join(output_dir, "latency_cdf.png")
+    salva_figura(out_file)
+
+def plot_throughput(data_throughput, data_throughput_min, matrix_sizes, scenario_labels, scenario_legend_map, output_dir):
     """
     Plot a barre con il throughput su asse Y, scala X log2,
     per la multi-core matrix multiplication.
     """
-    fig, ax = plt.subplots(figsize=(10, 6))
-    x = np.array(matrix_sizes, dtype=float)
-    bar_offset = 0.07
-    bar_width  = 0.06
-
-    for s_idx, scenario in enumerate(scenario_labels):
-        throughput = []
-        for sz in matrix_sizes:
-            us = data_time[scenario][sz]  # microsecondi
-            seconds = us / 1e6
-            requests = data_requests[scenario][sz]
-            throughput.append(requests / seconds)    # converto in secondi
-        x_positions = x * (1 + bar_offset * (s_idx - (len(scenario_labels) - 1)/2))
-        ax.bar(x_positions, throughput, width=bar_width * x, 
-               label=scenario_legend_map[scenario])
-
-    ax.set_title("Throughput (richieste/secondo)\n(Multi-core moltiplicazione matrici)")
-    ax.set_ylabel("Throughput\n(scala log)")
-    ax.set_xscale('log', base=2)
-    ax.set_yscale('log')
-    ax.set_xlabel("Dimensione matrice (NxN, scala log2)")
-    ax.grid(True, which='both', axis='both', linestyle='--', alpha=0.7)
-    ax.legend()
-
-    ax.set_xticks(matrix_sizes)
-    ax.set_xticklabels([str(s) for s in matrix_sizes], rotation=45)
-
-    plt.tight_layout()
+    template = _BARRE._replace(titles=(f"Throughput (richieste/secondo){_SUFFIX}",),
+                               ylabels=("Throughput\n(scala log)",), ylog=True)
+    fig, axes, geom, handles = figura_barre(template, data_throughput, matrix_sizes, scenario_labels, scenario_legend_map)
+
+    # data_throughput: richieste riuscite / secondo di tempo reale, array (scenario x size);
+    # data_throughput_min: finestra scorrevole peggiore (request_log.py), NaN se mancano i timestamp
+    axes[0].scatter(geom.positions.ravel(), np.asarray(data_throughput_min).ravel(), marker='_',
+                    color='black', zorder=3, label="Finestra peggiore")
+    legenda(axes[0], handles)
+
+    impagina()
     out_file = os.path.join(output_dir, "throughput_barplot.png")
-    plt.savefig(out_file, dpi=300)
-    plt.show()
+    salva_figura(out_file)
 
 def plot_tlb_misses(data_tlb, matrix_sizes, scenario_labels, scenario_legend_map, output_dir):
     """
     Plot in verticale (2 subplots): TLB L1 e TLB L2 su scala log2 (asse X),
     per la multi-core matrix multiplication.
     """
-    fig, axes = plt.subplots(2, 1, figsize=(10, 10), sharex=True)
     levels = ["TLB L1 Misses", "TLB L2 Misses"]
+    template = _TLB._replace(titles=tuple(level + _SUFFIX for level in levels), ylabels=tuple(levels),
+                             formatter=short_number_formatter)
+    fig, axes, _, handles = figura_barre(template, data_tlb, matrix_sizes, scenario_labels, scenario_legend_map)
+    legenda(axes[0], handles)
 
-    for i, level_name in enumerate(levels):
-        ax = axes[i]
-        for s_idx, scenario in enumerate(scenario_labels):
-            vals = []
-            for sz in matrix_sizes:
-                (l1_miss, l2_miss) = data_tlb[scenario][sz]
-                if i == 0:
-                    vals.append(l1_miss)
-                else:
-                    vals.append(l2_miss)
-
-            x = np.array(matrix_sizes, dtype=float)
-            bar_offset = 0.07
-            bar_width  = 0.06
-            x_positions = x * (1 + bar_offset * (s_idx - (len(scenario_labels) - 1)/2))
-            ax.bar(x_positions, vals, width=bar_width * x,
-                   label=scenario_legend_map[scenario] if i == 0 else "")
-
-        ax.set_title(level_name + "\n(Multi-core moltiplicazione matrici)")
-        ax.set_ylabel(level_name)
-        ax.set_xscale('log', base=2)
-        ax.grid(True, which='both', axis='both', linestyle='--', alpha=0.7)
-        ax.yaxis.set_major_formatter(FuncFormatter(short_number_formatter))
-
-        if i == 0:
-            ax.legend()
-
-    axes[-1].set_xticks(matrix_sizes)
-    axes[-1].set_xticklabels([str(s) for s in matrix_sizes], rotation=45)
-    axes[-1].set_xlabel("Dimensione matrice (NxN, scala log2)")
-
-    plt.tight_layout()
+    impagina()
     out_file = os.path.join(output_dir, "tlb_misses_subplots.png")
-    plt.savefig(out_file, dpi=300)
-    plt.show()
+    salva_figura(out_file)
 
-def plot_tlb_misses_normalized(data_tlb_norm, matrix_sizes, scenario_labels, scenario_legend_map, output_dir):
+def plot_tlb_misses_normalized(data_tlb_norm, data_tlb_err, matrix_sizes, scenario_labels, scenario_legend_map, output_dir):
     """
     Plot in verticale (2 subplots) con valori normalizzati a '1S': TLB L1, TLB L2,
     per la multi-core matrix multiplication.
     """
-    fig, axes = plt.subplots(2, 1, figsize=(10, 10), sharex=True)
-    levels = [
-        "TLB L1 Misses (Normalizzato)\n(Multi-core moltiplicazione matrici)",
-        "TLB L2 Misses (Normalizzato)\n(Multi-core moltiplicazione matrici)"
-    ]
+    template = _TLB._replace(titles=(f"TLB L1 Misses (Normalizzato){_SUFFIX}", f"TLB L2 Misses (Normalizzato){_SUFFIX}"),
+                             ylabels=("Normalizzato", "Normalizzato"))
+    fig, axes, _, handles = figura_barre(template, data_tlb_norm, matrix_sizes, scenario_labels,
+                                         scenario_legend_map, err=data_tlb_err)
+    legenda(axes[0], handles)
 
-    for i, level_name in enumerate(levels):
-        ax = axes[i]
-        for s_idx, scenario in enumerate(scenario_labels):
-            vals = []
-            for sz in matrix_sizes:
-                (l1_ratio, l2_ratio) = data_tlb_norm[scenario][sz]
-                if i == 0:
-                    vals.append(l1_ratio)
-                else:
-                    vals.append(l2_ratio)
-
-            x = np.array(matrix_sizes, dtype=float)
-            bar_offset = 0.07
-            bar_width  = 0.06
-            x_positions = x * (1 + bar_offset * (s_idx - (len(scenario_labels) - 1)/2))
-            ax.bar(x_positions, vals, width=bar_width * x,
-                   label=scenario_legend_map[scenario] if i == 0 else "")
-
-        ax.set_title(level_name)
-        ax.set_ylabel("Normalizzato")
-        ax.set_xscale('log', base=2)
-        ax.grid(True, which='both', axis='both', linestyle='--', alpha=0.7)
-
-        if i == 0:
-            ax.legend()
-
-    axes[-1].set_xticks(matrix_sizes)
-    axes[-1].set_xticklabels([str(s) for s in matrix_sizes], rotation=45)
-    axes[-1].set_xlabel("Dimensione matrice (NxN, scala log2)")
-
-    plt.tight_layout()
+    impagina()
     out_file = os.path.join(output_dir, "tlb_misses_subplots_normalized.png")
-    plt.savefig(out_file, dpi=300)
-    plt.show()
+    salva_figura(out_file)
 
 # --------------------------------------------------------------------------------
 # 5) MAIN
 # --------------------------------------------------------------------------------
 
-def main():
+def figure_tasks():
     # Output directory dove salvare i plot
     output_dir = "/Users/lorenzofaraoni/Desktop/Tesi/Laboratorio/Analysis Matrix Multiplication/Multi Core/Plots"
 
-    # Base path per i 3 scenari (1 server, 2 server, 3 server) - Cache Miss
-    base_path_1_server_cache = "/Users/lorenzofaraoni/Desktop/Tesi/Laboratorio/Analysis Matrix Multiplication/Multi Core/1 Active Server/perf_results_matrix_cache_misses"
-    base_path_2_server_cache = "/Users/lorenzofaraoni/Desktop/Tesi/Laboratorio/Analysis Matrix Multiplication/Multi Core/2 Active Server/perf_results_matrix_cache_misses"
-    base_path_3_server_cache = "/Users/lorenzofaraoni/Desktop/Tesi/Laboratorio/Analysis Matrix Multiplication/Multi Core/3 Active Server/perf_results_matrix_cache_misses"
-
-    # Base path per i 3 scenari - Execution Time
-    base_path_1_server_time = "/Users/lorenzofaraoni/Desktop/Tesi/Laboratorio/Analysis Matrix Multiplication/Multi Core/1 Active Server/perf_matrix_results_time"
-    base_path_2_server_time = "/Users/lorenzofaraoni/Desktop/Tesi/Laboratorio/Analysis Matrix Multiplication/Multi Core/2 Active Server/perf_matrix_results_time"
-    base_path_3_server_time = "/Users/lorenzofaraoni/Desktop/Tesi/Laboratorio/Analysis Matrix Multiplication/Multi Core/3 Active Server/perf_matrix_results_time"
-
-    # Base path per i 3 scenari - TLB Miss
-    base_path_1_server_tlb = "/Users/lorenzofaraoni/Desktop/Tesi/Laboratorio/Analysis Matrix Multiplication/Multi Core/1 Active Server/perf_results_matrix_tlb_misses"
-    base_path_2_server_tlb = "/Users/lorenzofaraoni/Desktop/Tesi/Laboratorio/Analysis Matrix Multiplication/Multi Core/2 Active Server/perf_results_matrix_tlb_misses"
-    base_path_3_server_tlb = "/Users/lorenzofaraoni/Desktop/Tesi/Laboratorio/Analysis Matrix Multiplication/Multi Core/3 Active Server/perf_results_matrix_tlb_misses"
+    # Radice delle campagne (layout standard, vedi campaign_store.py:
+    # <root>/Analysis .../<Single|Multi> Core/<n> Active Server/perf_...)
+    root = "/Users/lorenzofaraoni/Desktop/Tesi/Laboratorio"
 
     # Dimensioni matrici (potenze di 2, da 1 a 4096)
     matrix_sizes = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096]
 
-    # Frequenze di “disturbo”
-    freqs = ["LOW", "MEDIUM", "HIGH"]
-
-    # Carichiamo i dati di cache (miss + hit)
-    data_cache_miss, data_cache_hit = carica_dati_cache_miss(
-        base_path_1_server_cache,
-        base_path_2_server_cache,
-        base_path_3_server_cache,
-        matrix_sizes,
-        freqs
-    )
-    # Carichiamo i tempi
-    data_time = carica_dati_tempo(
-        base_path_1_server_time,
-        base_path_2_server_time,
-        base_path_3_server_time,
-        matrix_sizes,
-        freqs
-    )
-
-    # Carica i dati per il throuhput
-    data_request = carica_dati_richieste(
-        base_path_1_server_time,
-        base_path_2_server_time,
-        base_path_3_server_time,
-        matrix_sizes,
-        freqs
-    )
-
-    # Carichiamo i TLB
-    data_tlb = carica_dati_tlb(
-        base_path_1_server_tlb,
-        base_path_2_server_tlb,
-        base_path_3_server_tlb,
-        matrix_sizes,
-        freqs
-    )
-
-    # Scenari e legend
-    scenario_labels = [
-        "1S",
-        "2S_LOW", "2S_MEDIUM", "2S_HIGH",
-        "3S_LOW", "3S_MEDIUM", "3S_HIGH"
-    ]
-    scenario_legend_map = {
-        "1S":       "1 Server (no disturbo)",
-        "2S_LOW":   "2 Servers (basso disturbo)",
-        "2S_MEDIUM":"2 Servers (medio disturbo)",
-        "2S_HIGH":  "2 Servers (alto disturbo)",
-        "3S_LOW":   "3 Servers (basso disturbo)",
-        "3S_MEDIUM":"3 Servers (medio disturbo)",
-        "3S_HIGH":  "3 Servers (alto disturbo)",
-    }
+    # Griglia degli scenari: numeri di server attivi (1 = senza disturbo) e frequenze di
+    # disturbo; SCENARIO_SERVERS / SCENARIO_FREQS / SCENARIO_SIZES la modificano (scenario_grid.py)
+    grid = grid_from_env(make_grid('matrix', 'multi', matrix_sizes,
+                                   n_servers=(1, 2, 3), freqs=("LOW", "MEDIUM", "HIGH")))
+    matrix_sizes = list(grid.sizes)
 
-    # -------------------------------
-    # 1) PLOT VALORI ASSOLUTI (Cache, Tempo, TLB)
-    # -------------------------------
-    plot_cache_misses(data_cache_miss, matrix_sizes, scenario_labels, scenario_legend_map, output_dir)
-    plot_execution_time(data_time, matrix_sizes, scenario_labels, scenario_legend_map, output_dir)
-    plot_tlb_misses(data_tlb, matrix_sizes, scenario_labels, scenario_legend_map, output_dir)
-    plot_throughput(data_time, data_request, matrix_sizes, scenario_labels, scenario_legend_map, output_dir)
+    # Scenari (ordine con cui plottare) e legende
+    scenario_labels = grid_scenario_labels(grid)
+    scenario_legend_map = scenario_legend(scenario_labels)
 
-    # -------------------------------
-    # 2) PLOT VALORI NORMALIZZATI (Cache, Tempo, TLB)
-    # -------------------------------
-    data_cache_miss_norm = normalizza_cache_miss(data_cache_miss, matrix_sizes, scenario_labels)
-    data_time_norm = normalizza_tempo(data_time, matrix_sizes, scenario_labels)
-    data_tlb_norm = normalizza_tlb_miss(data_tlb, matrix_sizes, scenario_labels)
+    # Con CAMPAIGN_STORE=<archivio> (vedi campaign_store.py) i dati si leggono da un solo file
+    store = open_store_from_env()
+
+    # Carichiamo cache (miss + hit), tempi, richieste (Iter) e TLB in un unico cubo
+    cube = carica_griglia(grid, root, store=store)
 
-    plot_cache_misses_normalized(data_cache_miss_norm, matrix_sizes, scenario_labels, scenario_legend_map, output_dir)
-    plot_execution_time_normalized(data_time_norm, matrix_sizes, scenario_labels, scenario_legend_map, output_dir)
-    plot_tlb_misses_normalized(data_tlb_norm, matrix_sizes, scenario_labels, scenario_legend_map, output_dir)
+    # Metriche derivate (metrics.py), scenario x size [x livello] nell'ordine di scenario_labels
+    # e matrix_sizes: ognuna è calcolata alla prima richiesta, i rapporti sono rispetto al primo scenario
+    metrics = MetricGraph(cube.sel(scenario=scenario_labels, stat='value'), baseline=scenario_labels[0])
+
+    # Intervalli di confidenza bootstrap dei rapporti normalizzati (bootstrap.py), come barre d'errore
+    latency_sketches = carica_sketch_latenze(grid, root)
+    intervals = intervalli_campagna(cube, latency_sketches, scenario_labels, matrix_sizes, baseline=scenario_labels[0])
+    errors = {name: barre_errore(metrics[name], interval) for name, interval in intervals.items()}
 
     # -------------------------------
-    # 3) PLOT MISS RATE (Cache) - IN PERCENTUALE
+    # 1) PLOT VALORI ASSOLUTI (Cache, Tempo, TLB)
     # -------------------------------
-    data_missrate = calcola_missrate(data_cache_miss, data_cache_hit, matrix_sizes, scenario_labels)
-    plot_cache_missrate(data_missrate, matrix_sizes, scenario_labels, scenario_legend_map, output_dir)
+    tasks = [
+        FigureTask('cache_misses', plot_cache_misses, (metrics['misses'], matrix_sizes, scenario_labels, scenario_legend_map, output_dir)),
+        FigureTask('execution_time', plot_execution_time, (metrics['time_us'], matrix_sizes, scenario_labels, scenario_legend_map, output_dir)),
+        FigureTask('tlb_misses', plot_tlb_misses, (metrics['tlb_misses'], matrix_sizes, scenario_labels, scenario_legend_map, output_dir)),
+        FigureTask('throughput', plot_throughput, (metrics['throughput'], metrics['throughput_min'], matrix_sizes, scenario_labels, scenario_legend_map, output_dir)),
+        # Distribuzione delle latenze per richiesta: percentili accanto alla media e CDF
+        FigureTask('latency_percentiles', plot_latency_percentiles, (metrics['time_us'], metrics['latency_percentiles'], matrix_sizes, scenario_labels, scenario_legend_map, output_dir)),
+        FigureTask('latency_cdf', plot_latency_cdf, (latency_sketches, matrix_sizes, scenario_labels, scenario_legend_map, output_dir)),
+
+        # -------------------------------
+        # 2) PLOT VALORI NORMALIZZATI (Cache, Tempo, TLB)
+        # -------------------------------
+        FigureTask('cache_misses_normalized', plot_cache_misses_normalized, (metrics['norm_misses'], errors['norm_misses'], matrix_sizes, scenario_labels, scenario_legend_map, output_dir)),
+        FigureTask('execution_time_normalized', plot_execution_time_normalized, (metrics['norm_time_us'], errors['norm_time_us'], matrix_sizes, scenario_labels, scenario_legend_map, output_dir)),
+        FigureTask('tlb_misses_normalized', plot_tlb_misses_normalized, (metrics['norm_tlb_misses'], errors['norm_tlb_misses'], matrix_sizes, scenario_labels, scenario_legend_map, output_dir)),
+
+        # -------------------------------
+        # 3) PLOT MISS RATE (Cache) - IN PERCENTUALE
+        # -------------------------------
+        FigureTask('cache_missrate', plot_cache_missrate, (metrics['miss_rate'], matrix_sizes, scenario_labels, scenario_legend_map, output_dir)),
+    ]
+    return tasks
+
+
+def main():
+    # Con --batch (o PLOT_BATCH=1) backend Agg, nessuna finestra e figure in parallelo (figure_batch.py)
+    render_figures(figure_tasks(), batch=batch_from_env())
 
 
 if __name__ == "__main__":
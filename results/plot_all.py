@@ -0,0 +1,38 @@
+"""
+Rigenera in batch le figure di tutti gli insiemi di risultati (generatore tabella e
+moltiplicazione matrici, single e multi core) con un solo pool di processi.
+
+Ogni results/<server>/<core>/plot.py descrive le sue figure in figure_tasks(); qui i task
+di tutti gli script sono raccolti e distribuiti insieme, quindi il tempo totale scala con
+il numero di core (PLOT_WORKERS per limitarlo) e non con il numero di script.
+
+Uso:
+    python results/plot_all.py                                   # tutti gli script
+    python results/plot_all.py results/table_generator/*/plot.py # solo alcuni
+    python results/plot_all.py --preview                         # anteprima veloce
+
+Le opzioni (--preview / --final, --force) sono quelle di figure_batch.py.
+"""
+
+import glob
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'scripts', 'data_processing'))
+from figure_batch import carica_script, render_figures
+
+SCRIPTS = sorted(glob.glob(os.path.join(HERE, '*', '*', 'plot.py')))
+
+
+def main():
+    paths = [arg for arg in sys.argv[1:] if not arg.startswith('--')] or SCRIPTS
+    tasks = []
+    for path in paths:
+        module = carica_script(path)
+        tasks.extend(module.figure_tasks())
+    render_figures(tasks, batch=True)
+
+
+if __name__ == "__main__":
+    main()
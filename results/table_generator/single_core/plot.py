@@ -1,93 +1,22 @@
 import os
-import re
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.ticker import FuncFormatter
+
+# Moduli condivisi (scripts/data_processing/): parser, cache su disco, caricamento campagne
+# (le directory dei risultati possono essere anche dentro un archivio .tar / .zip)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'scripts', 'data_processing'))
+from campaign_store import open_store_from_env
+from scenario_grid import carica_griglia, carica_sketch_latenze, grid_from_env, grid_scenario_labels, make_grid, scenario_legend
+from metrics import MetricGraph
+from bootstrap import barre_errore, intervalli_campagna
+from figure_batch import FigureTask, batch_from_env, impagina, render_figures, salva_figura
+from grouped_bars import BarTemplate, figura_barre, legenda
 
 # --------------------------------------------------------------------------------
-# 1) FUNZIONI DI PARSING E FORMATTAZIONE
+# 1) FUNZIONI DI FORMATTAZIONE
 # --------------------------------------------------------------------------------
 
-def parse_cache_stats(file_path):
-    """
-    Parsing di:
-    - L1, L2, L3 miss
-    - L1, L2, L3 hit
-
-    Ritorna una tupla di 6 valori:
-      (l1_miss, l2_miss, l3_miss, l1_hit, l2_hit, l3_hit)
-
-    Se il file non esiste, restituisce tutti zeri.
-    """
-    l1_miss, l2_miss, l3_miss = 0, 0, 0
-    l1_hit,  l2_hit,  l3_hit  = 0, 0, 0
-
-    if not os.path.exists(file_path):
-        return (0, 0, 0, 0, 0, 0)
-
-    with open(file_path, 'r') as f:
-        for line in f:
-            if 'mem_load_retired.l1_miss' in line:
-                l1_miss = parse_number_from_line(line)
-            elif 'mem_load_retired.l2_miss' in line:
-                l2_miss = parse_number_from_line(line)
-            elif 'mem_load_retired.l3_miss' in line:
-                l3_miss = parse_number_from_line(line)
-            elif 'mem_load_retired.l1_hit' in line:
-                l1_hit = parse_number_from_line(line)
-            elif 'mem_load_retired.l2_hit' in line:
-                l2_hit = parse_number_from_line(line)
-            elif 'mem_load_retired.l3_hit' in line:
-                l3_hit = parse_number_from_line(line)
-
-    return (l1_miss, l2_miss, l3_miss, l1_hit, l2_hit, l3_hit)
-
-def parse_execution_time(file_path):
-    """Parsa i file che contengono il tempo medio di esecuzione (in microsecondi)."""
-    avg_time = 0
-    if not os.path.exists(file_path):
-        return 0
-    with open(file_path, 'r') as f:
-        for line in f:
-            if 'Average Execution Time:' in line:
-                avg_time = float(line.split()[3])
-    return avg_time
-
-def parse_tlb_misses(file_path):
-    """
-    Restituisce (l1_miss, l2_miss). Nessuna modifica strutturale.
-    """
-    if not os.path.exists(file_path):
-        return (0, 0)
-    dtlb_load_stlb_hit = 0
-    dtlb_store_stlb_hit = 0
-    dtlb_load_walk = 0
-    dtlb_store_walk = 0
-
-    with open(file_path, 'r') as f:
-        for line in f:
-            if 'dTLB_load_misses.stlb_hit' in line:
-                dtlb_load_stlb_hit = parse_number_from_line(line)
-            elif 'dTLB_load_misses.miss_causes_a_walk' in line:
-                dtlb_load_walk = parse_number_from_line(line)
-            elif 'dTLB_store_misses.stlb_hit' in line:
-                dtlb_store_stlb_hit = parse_number_from_line(line)
-            elif 'dTLB_store_misses.miss_causes_a_walk' in line:
-                dtlb_store_walk = parse_number_from_line(line)
-
-    l2_miss = dtlb_load_walk + dtlb_store_walk
-    l1_miss = dtlb_load_stlb_hit + dtlb_store_stlb_hit + l2_miss
-    return (l1_miss, l2_miss)
-
-def parse_number_from_line(line):
-    # Rimuove i separatori di migliaia e converte eventuali virgole in punti
-    line_clean = re.sub(r'(?<=\d)\.(?=\d)', '', line.strip())
-    line_clean = line_clean.replace(',', '.')
-    match = re.search(r'(\d+(\.\d+)?)', line_clean)
-    if match:
-        return float(match.group(1))
-    return 0
-
 def short_number_formatter(x, pos):
     """Formatta l'asse y in k, M, G per valori grandi."""
     if x >= 1e9:
@@ -99,237 +28,35 @@ def short_number_formatter(x, pos):
     else:
         return str(round(x, 2))
 
+# Forma comune delle figure a barre (grouped_bars.py): dimensioni tabella su asse X, una
+# posizione per size; titoli ed etichette sono aggiunti da ogni funzione di plot
+_SUFFIX = "\n(Single-core generatore tabella)"
+_CACHE_SIZES = {"L1": "32 KB", "L2": "256 KB", "L3": "16 MB"}
+_BARRE = BarTemplate(titles=(), ylabels=(), xlabel="Dimensione tabella (# righe)", figsize=(10, 6))
+_CACHE = _BARRE._replace(figsize=(10, 12))
+_TLB = _BARRE._replace(figsize=(10, 8))
+
 # --------------------------------------------------------------------------------
 # (A) NUOVE FUNZIONI PER IL THROUGHPUT (in scala lineare)
 # --------------------------------------------------------------------------------
 
-def parse_execution_requests(file_path):
-    """
-    Conta quante volte compare la stringa 'Iter ' nel file => numero di richieste.
-    """
-    if not os.path.exists(file_path):
-        return 0
-    count = 0
-    with open(file_path, 'r') as f:
-        for line in f:
-            if 'Iter ' in line:
-                count += 1
-    return count
-
-def carica_dati_richieste(base_path_1_server_time, base_path_2_server_time, base_path_3_server_time,
-                          table_sizes, freqs):
-    """
-    Carica il numero di richieste (Iter) per i vari scenari (1S, 2S, 3S).
-    """
-    data_requests = {}
-    # 1) CASO 1 SERVER
-    label_1s = '1S'
-    data_requests[label_1s] = {}
-    for sz in table_sizes:
-        file_name = f"execution_time_table_{sz}.txt"
-        path_file = os.path.join(base_path_1_server_time, file_name)
-        data_requests[label_1s][sz] = parse_execution_requests(path_file)
-
-    # 2) CASO 2 SERVER
-    for freq in freqs:
-        label_2s = f"2S_{freq.upper()}"
-        data_requests[label_2s] = {}
-        for sz in table_sizes:
-            file_name = f"execution_time_table_{sz}_{freq.upper()}Hz.txt"
-            path_file = os.path.join(base_path_2_server_time, file_name)
-            data_requests[label_2s][sz] = parse_execution_requests(path_file)
-
-    # 3) CASO 3 SERVER
-    for freq in freqs:
-        label_3s = f"3S_{freq.upper()}"
-        data_requests[label_3s] = {}
-        for sz in table_sizes:
-            file_name = f"execution_time_table_{sz}_{freq.upper()}Hz.txt"
-            path_file = os.path.join(base_path_3_server_time, file_name)
-            data_requests[label_3s][sz] = parse_execution_requests(path_file)
-
-    return data_requests
-
-def plot_throughput(data_time, data_requests, table_sizes, scenario_labels, scenario_legend_map, output_dir):
+def plot_throughput(data_throughput, data_throughput_min, table_sizes, scenario_labels, scenario_legend_map, output_dir):
     """
     Plot a barre del Throughput (requests/second) in scala **lineare** su Y.
     (Ora "Single-core table generator")
     """
-    fig, ax = plt.subplots(figsize=(10, 6))
-    x = np.arange(len(table_sizes))
-    bar_width = 0.1
-
-    for s_idx, scenario in enumerate(scenario_labels):
-        throughput_vals = []
-        for size in table_sizes:
-            us = data_time[scenario][size]       # tempo in microsecondi
-            seconds = us / 1e6
-            num_requests = data_requests[scenario][size]
-            thr = num_requests / seconds if seconds != 0 else 0
-            throughput_vals.append(thr)
-
-        x_positions = x + (s_idx - len(scenario_labels)/2)*bar_width + bar_width/2
-        ax.bar(x_positions, throughput_vals, bar_width, label=scenario_legend_map[scenario])
-
-    ax.set_title("Throughput (richieste/secondo)\n(Single-core generatore tabella)")
-    ax.set_xticks(x)
-    ax.set_xticklabels([str(s) for s in table_sizes], rotation=45)
-    ax.set_ylabel("Throughput (req/s)")
-    ax.set_yscale('linear')  # Scala Y lineare
-    ax.set_xlabel("Dimensione tabella (# righe)")
-    ax.grid(True, which='major', axis='both', linestyle='--', alpha=0.7)
-    ax.legend()
-
-    plt.tight_layout()
-    out_file = os.path.join(output_dir, "throughput_barplot.png")
-    plt.savefig(out_file, dpi=300)
-    plt.show()
+    template = _BARRE._replace(titles=(f"Throughput (richieste/secondo){_SUFFIX}",), ylabels=("Throughput (req/s)",))
+    fig, axes, geom, handles = figura_barre(template, data_throughput, table_sizes, scenario_labels, scenario_legend_map)
 
-# --------------------------------------------------------------------------------
-# 2) FUNZIONI DI CARICAMENTO DATI
-# --------------------------------------------------------------------------------
+    # data_throughput: richieste riuscite / secondo di tempo reale, array (scenario x size);
+    # data_throughput_min: finestra scorrevole peggiore (request_log.py), NaN se mancano i timestamp
+    axes[0].scatter(geom.positions.ravel(), np.asarray(data_throughput_min).ravel(), marker='_',
+                    color='black', zorder=3, label="Finestra peggiore")
+    legenda(axes[0], handles)
 
-def carica_dati_cache_miss(base_path_1_server, base_path_2_server, base_path_3_server, table_sizes, freqs):
-    """
-    Carica i 6 valori (miss e hit) per L1, L2, L3.
-    """
-    data = {}
-    label_1s = '1S'
-    data[label_1s] = {}
-    for sz in table_sizes:
-        file_name = f"misses_{sz}.txt"
-        path_file = os.path.join(base_path_1_server, file_name)
-        data[label_1s][sz] = parse_cache_stats(path_file)
-
-    for freq in freqs:
-        label_2s = f"2S_{freq.upper()}"
-        data[label_2s] = {}
-        for sz in table_sizes:
-            file_name = f"misses_{sz}_{freq.upper()}Hz.txt"
-            path_file = os.path.join(base_path_2_server, file_name)
-            data[label_2s][sz] = parse_cache_stats(path_file)
-
-    for freq in freqs:
-        label_3s = f"3S_{freq.upper()}"
-        data[label_3s] = {}
-        for sz in table_sizes:
-            file_name = f"misses_{sz}_{freq.upper()}Hz.txt"
-            path_file = os.path.join(base_path_3_server, file_name)
-            data[label_3s][sz] = parse_cache_stats(path_file)
-
-    return data
-
-def carica_dati_tempo(base_path_1_server, base_path_2_server, base_path_3_server, table_sizes, freqs):
-    """
-    Carica i tempi di esecuzione (in microsecondi).
-    """
-    data = {}
-    label_1s = '1S'
-    data[label_1s] = {}
-    for sz in table_sizes:
-        file_name = f"execution_time_table_{sz}.txt"
-        path_file = os.path.join(base_path_1_server, file_name)
-        data[label_1s][sz] = parse_execution_time(path_file)
-
-    for freq in freqs:
-        label_2s = f"2S_{freq.upper()}"
-        data[label_2s] = {}
-        for sz in table_sizes:
-            file_name = f"execution_time_table_{sz}_{freq.upper()}Hz.txt"
-            path_file = os.path.join(base_path_2_server, file_name)
-            data[label_2s][sz] = parse_execution_time(path_file)
-
-    for freq in freqs:
-        label_3s = f"3S_{freq.upper()}"
-        data[label_3s] = {}
-        for sz in table_sizes:
-            file_name = f"execution_time_table_{sz}_{freq.upper()}Hz.txt"
-            path_file = os.path.join(base_path_3_server, file_name)
-            data[label_3s][sz] = parse_execution_time(path_file)
-
-    return data
-
-def carica_dati_tlb(base_path_1_server, base_path_2_server, base_path_3_server, table_sizes, freqs):
-    """
-    Carica i TLB misses.
-    """
-    data = {}
-    label_1s = '1S'
-    data[label_1s] = {}
-    for sz in table_sizes:
-        file_name = f"misses_{sz}.txt"
-        path_file = os.path.join(base_path_1_server, file_name)
-        data[label_1s][sz] = parse_tlb_misses(path_file)
-
-    for freq in freqs:
-        label_2s = f"2S_{freq.upper()}"
-        data[label_2s] = {}
-        for sz in table_sizes:
-            file_name = f"tlb_misses_{sz}_{freq.upper()}Hz.txt"
-            path_file = os.path.join(base_path_2_server, file_name)
-            data[label_2s][sz] = parse_tlb_misses(path_file)
-
-    for freq in freqs:
-        label_3s = f"3S_{freq.upper()}"
-        data[label_3s] = {}
-        for sz in table_sizes:
-            file_name = f"tlb_misses_{sz}_{freq.upper()}Hz.txt"
-            path_file = os.path.join(base_path_3_server, file_name)
-            data[label_3s][sz] = parse_tlb_misses(path_file)
-
-    return data
-
-# --------------------------------------------------------------------------------
-# 2B) NORMALIZZAZIONE RISPETTO A '1S'
-# --------------------------------------------------------------------------------
-
-def normalizza_cache_miss(data_cache, table_sizes, scenario_labels):
-    """
-    Consideriamo solo i miss (l1_miss, l2_miss, l3_miss) e li normalizziamo
-    rispetto ai corrispondenti miss di 1S.
-    """
-    data_norm = {}
-    for scenario in scenario_labels:
-        data_norm[scenario] = {}
-        for sz in table_sizes:
-            l1_miss, l2_miss, l3_miss, _, _, _ = data_cache[scenario][sz]
-            l1_miss_1s, l2_miss_1s, l3_miss_1s, _, _, _ = data_cache["1S"][sz]
-            norm_l1 = (l1_miss / l1_miss_1s) if l1_miss_1s != 0 else 0
-            norm_l2 = (l2_miss / l2_miss_1s) if l2_miss_1s != 0 else 0
-            norm_l3 = (l3_miss / l3_miss_1s) if l3_miss_1s != 0 else 0
-            data_norm[scenario][sz] = (norm_l1, norm_l2, norm_l3)
-    return data_norm
-
-def normalizza_tempo(data_time, table_sizes, scenario_labels):
-    """
-    Normalizzazione dei tempi rispetto al tempo di 1S.
-    """
-    data_norm = {}
-    for scenario in scenario_labels:
-        data_norm[scenario] = {}
-        for sz in table_sizes:
-            t = data_time[scenario][sz]
-            t_1s = data_time["1S"][sz]
-            if t_1s != 0:
-                data_norm[scenario][sz] = t / t_1s
-            else:
-                data_norm[scenario][sz] = 0
-    return data_norm
-
-def normalizza_tlb_miss(data_tlb, table_sizes, scenario_labels):
-    """
-    Normalizzazione TLB (l1_miss, l2_miss) rispetto a 1S.
-    """
-    data_norm = {}
-    for scenario in scenario_labels:
-        data_norm[scenario] = {}
-        for sz in table_sizes:
-            l1, l2 = data_tlb[scenario][sz]
-            l1_1s, l2_1s = data_tlb["1S"][sz]
-            norm_l1 = (l1 / l1_1s) if l1_1s != 0 else 0
-            norm_l2 = (l2 / l2_1s) if l2_1s != 0 else 0
-            data_norm[scenario][sz] = (norm_l1, norm_l2)
-    return data_norm
+    impagina()
+    out_file = os.path.join(output_dir, "throughput_barplot.png")
+    salva_figura(out_file)
 
 # --------------------------------------------------------------------------------
 # 3) FUNZIONI DI PLOT
@@ -388,319 +115,182 @@ def plot_cache_misses(data_cache, table_sizes, scenario_labels, scenario_legend_
     """
     Plot con valori assoluti di L1, L2, L3 Miss (3 subplots), ed etichette Single-core.
     """
-    fig, axes = plt.subplots(3, 1, figsize=(10, 12), sharex=True)
-    x = np.arange(len(table_sizes))
-    bar_width = 0.1
-
-    cache_sizes = {"L1": "32 KB", "L2": "256 KB", "L3": "16 MB"}
-
-    for i, level in enumerate(["L1", "L2", "L3"]):
-        ax = axes[i]
-        for s_idx, scenario in enumerate(scenario_labels):
-            values = []
-            for size in table_sizes:
-                (l1_miss, l2_miss, l3_miss, _, _, _) = data_cache[scenario][size]
-                if level == "L1":
-                    values.append(l1_miss)
-                elif level == "L2":
-                    values.append(l2_miss)
-                else:
-                    values.append(l3_miss)
-
-            x_positions = x + (s_idx - len(scenario_labels)/2)*bar_width + bar_width/2
-            ax.bar(x_positions, values, bar_width, label=scenario_legend_map[scenario])
-
-        ax.set_title(f"{level} Miss\n(Single-core generatore tabella)")
-        ax.plot([], [], ' ', label=f"Dimensione cache: {cache_sizes[level]}")
+    template = _CACHE._replace(titles=tuple(f"{level} Miss{_SUFFIX}" for level in _CACHE_SIZES),
+                               ylabels=tuple(f"{level} Miss" for level in _CACHE_SIZES),
+                               formatter=short_number_formatter)
+    fig, axes, _, handles = figura_barre(template, data_cache, table_sizes, scenario_labels, scenario_legend_map)
+    for ax, cache_size in zip(axes, _CACHE_SIZES.values()):
+        ax.plot([], [], ' ', label=f"Dimensione cache: {cache_size}")
         _add_cache_vertical_lines(ax, table_sizes)
+        legenda(ax, handles)
 
-        ax.set_ylabel(f"{level} Miss")
-        ax.grid(True, which='major', axis='both', linestyle='--', alpha=0.7)
-        ax.yaxis.set_major_formatter(FuncFormatter(short_number_formatter))
-        ax.legend()
-
-    axes[-1].set_xticks(x)
-    axes[-1].set_xticklabels([str(s) for s in table_sizes], rotation=45)
-    axes[-1].set_xlabel("Dimensione tabella (# righe)")
-
-    plt.tight_layout()
+    impagina()
     out_file = os.path.join(output_dir, "cache_misses_subplots.png")
-    plt.savefig(out_file, dpi=300)
-    plt.show()
+    salva_figura(out_file)
 
-def plot_cache_miss_rate(data_cache, table_sizes, scenario_labels, scenario_legend_map, output_dir):
+def plot_cache_miss_rate(data_missrate, table_sizes, scenario_labels, scenario_legend_map, output_dir):
     """
     Plot con i Miss Rate (100 * miss / (miss + hit)) di L1, L2, L3 (3 subplots).
     (Single-core)
     """
-    fig, axes = plt.subplots(3, 1, figsize=(10, 12), sharex=True)
-    x = np.arange(len(table_sizes))
-    bar_width = 0.1
-
-    cache_sizes = {"L1": "32 KB", "L2": "256 KB", "L3": "16 MB"}
-
-    for i, level in enumerate(["L1", "L2", "L3"]):
-        ax = axes[i]
-        for s_idx, scenario in enumerate(scenario_labels):
-            rates = []
-            for size in table_sizes:
-                (l1_miss, l2_miss, l3_miss, l1_hit, l2_hit, l3_hit) = data_cache[scenario][size]
-                if level == "L1":
-                    total = l1_miss + l1_hit
-                    miss = l1_miss
-                elif level == "L2":
-                    total = l2_miss + l2_hit
-                    miss = l2_miss
-                else:
-                    total = l3_miss + l3_hit
-                    miss = l3_miss
-
-                rate = (miss / total * 100) if total != 0 else 0
-                rates.append(rate)
-
-            x_positions = x + (s_idx - len(scenario_labels)/2)*bar_width + bar_width/2
-            ax.bar(x_positions, rates, bar_width, label=scenario_legend_map[scenario])
-
-        ax.set_title(f"{level} Miss Rate\n(Single-core generatore tabella)")
-        ax.plot([], [], ' ', label=f"Dimensione cache: {cache_sizes[level]}")
+    # data_missrate: miss rate (%) per scenario x size x livello
+    template = _CACHE._replace(titles=tuple(f"{level} Miss Rate{_SUFFIX}" for level in _CACHE_SIZES),
+                               ylabels=("Miss Rate (%)",) * len(_CACHE_SIZES))
+    fig, axes, _, handles = figura_barre(template, data_missrate, table_sizes, scenario_labels, scenario_legend_map)
+    for ax, cache_size in zip(axes, _CACHE_SIZES.values()):
+        ax.plot([], [], ' ', label=f"Dimensione cache: {cache_size}")
         _add_cache_vertical_lines(ax, table_sizes)
+        legenda(ax, handles)
 
-        ax.set_ylabel("Miss Rate (%)")
-        ax.grid(True, which='major', axis='both', linestyle='--', alpha=0.7)
-        ax.legend()
-
-    axes[-1].set_xticks(x)
-    axes[-1].set_xticklabels([str(s) for s in table_sizes], rotation=45)
-    axes[-1].set_xlabel("Dimensione tabella (# righe)")
-
-    plt.tight_layout()
+    impagina()
     out_file = os.path.join(output_dir, "cache_miss_rate_subplots.png")
-    plt.savefig(out_file, dpi=300)
-    plt.show()
+    salva_figura(out_file)
 
-def plot_cache_misses_normalized(data_cache_norm, table_sizes, scenario_labels, scenario_legend_map, output_dir):
+def plot_cache_misses_normalized(data_cache_norm, data_cache_err, table_sizes, scenario_labels, scenario_legend_map, output_dir):
     """
     Plot dei miss normalizzati (ratio rispetto a 1S) per L1, L2, L3 (3 subplots),
     con Single-core come titolo.
     """
-    fig, axes = plt.subplots(3, 1, figsize=(10, 12), sharex=True)
-    x = np.arange(len(table_sizes))
-    bar_width = 0.1
-
-    cache_sizes = {"L1": "32 KB", "L2": "256 KB", "L3": "16 MB"}
-
-    for i, level in enumerate(["L1", "L2", "L3"]):
-        ax = axes[i]
-        for s_idx, scenario in enumerate(scenario_labels):
-            values = []
-            for size in table_sizes:
-                (l1, l2, l3) = data_cache_norm[scenario][size]
-                if level == "L1":
-                    values.append(l1)
-                elif level == "L2":
-                    values.append(l2)
-                else:
-                    values.append(l3)
-
-            x_positions = x + (s_idx - len(scenario_labels)/2)*bar_width + bar_width/2
-            ax.bar(x_positions, values, bar_width, label=scenario_legend_map[scenario])
-
-        ax.set_title(f"{level} Miss (Normalizzato ad 1 Server)\n(Single-core generatore tabella)")
-        ax.plot([], [], ' ', label=f"Dimensione cache: {cache_sizes[level]}")
+    template = _CACHE._replace(titles=tuple(f"{level} Miss (Normalizzato ad 1 Server){_SUFFIX}" for level in _CACHE_SIZES),
+                               ylabels=tuple(f"{level} Normalizzato" for level in _CACHE_SIZES))
+    fig, axes, _, handles = figura_barre(template, data_cache_norm, table_sizes, scenario_labels,
+                                         scenario_legend_map, err=data_cache_err)
+    for ax, cache_size in zip(axes, _CACHE_SIZES.values()):
+        ax.plot([], [], ' ', label=f"Dimensione cache: {cache_size}")
         _add_cache_vertical_lines(ax, table_sizes)
-        ax.set_ylabel(f"{level} Normalizzato")
-        ax.grid(True, which='major', axis='both', linestyle='--', alpha=0.7)
-        ax.legend()
-
-    axes[-1].set_xticks(x)
-    axes[-1].set_xticklabels([str(s) for s in table_sizes], rotation=45)
-    axes[-1].set_xlabel("DImensione tabella (# righe)")
+        legenda(ax, handles)
 
-    plt.tight_layout()
+    impagina()
     out_file = os.path.join(output_dir, "cache_misses_subplots_normalized.png")
-    plt.savefig(out_file, dpi=300)
-    plt.show()
+    salva_figura(out_file)
 
 def plot_execution_time(data_time, table_sizes, scenario_labels, scenario_legend_map, output_dir):
     """
     Plot dei tempi di esecuzione (valori assoluti), Single-core.
     """
-    fig, ax = plt.subplots(figsize=(10, 6))
-    x = np.arange(len(table_sizes))
-    bar_width = 0.1
-
-    for s_idx, scenario in enumerate(scenario_labels):
-        times_sec = []
-        for size in table_sizes:
-            avg_t_us = data_time[scenario][size]
-            avg_t_s = avg_t_us / 1e6
-            times_sec.append(avg_t_s)
-
-        x_positions = x + (s_idx - len(scenario_labels)/2)*bar_width + bar_width/2
-        ax.bar(x_positions, times_sec, bar_width, label=scenario_legend_map[scenario])
-
-    ax.set_title("Tempo di Elaborazione Richieste (secondi)\n(Single-core generatore tabella)")
-    ax.set_xticks(x)
-    ax.set_xticklabels([str(s) for s in table_sizes], rotation=45)
-    ax.set_ylabel("Tempo di elaborazione (s)")
-    ax.set_xlabel("Dimensione tabella (# righe)")
-    ax.grid(True, which='major', axis='both', linestyle='--', alpha=0.7)
-    ax.legend()
-
-    plt.tight_layout()
+    template = _BARRE._replace(titles=(f"Tempo di Elaborazione Richieste (secondi){_SUFFIX}",),
+                               ylabels=("Tempo di elaborazione (s)",))
+    fig, axes, _, handles = figura_barre(template, data_time / 1e6, table_sizes, scenario_labels, scenario_legend_map)
+    legenda(axes[0], handles)
+
+    impagina()
     out_file = os.path.join(output_dir, "execution_time_barplot.png")
-    plt.savefig(out_file, dpi=300)
-    plt.show()
+    salva_figura(out_file)
 
-def plot_execution_time_normalized(data_time_norm, table_sizes, scenario_labels, scenario_legend_map, output_dir):
+def plot_execution_time_normalized(data_time_norm, data_time_err, table_sizes, scenario_labels, scenario_legend_map, output_dir):
     """
     Plot dei tempi di esecuzione (valori normalizzati a 1S), Single-core.
     """
-    fig, ax = plt.subplots(figsize=(10, 6))
-    x = np.arange(len(table_sizes))
-    bar_width = 0.1
-
-    for s_idx, scenario in enumerate(scenario_labels):
-        ratios = []
-        for size in table_sizes:
-            ratio = data_time_norm[scenario][size]
-            ratios.append(ratio)
-
-        x_positions = x + (s_idx - len(scenario_labels)/2)*bar_width + bar_width/2
-        ax.bar(x_positions, ratios, bar_width, label=scenario_legend_map[scenario])
-
-    ax.set_title("Tempo di Elaborazione Richieste (Normalizzato ad 1 Server)\n(Single-core generatore tabella)")
-    ax.set_xticks(x)
-    ax.set_xticklabels([str(s) for s in table_sizes], rotation=45)
-    ax.set_ylabel("Tempo Normalizzato")
-    ax.set_xlabel("Dimensione tabella (# righe)")
-    ax.grid(True, which='major', axis='both', linestyle='--', alpha=0.7)
-    ax.legend()
-
-    plt.tight_layout()
+    template = _BARRE._replace(titles=(f"Tempo di Elaborazione Richieste (Normalizzato ad 1 Server){_SUFFIX}",),
+                               ylabels=("Tempo Normalizzato",))
+    fig, axes, _, handles = figura_barre(template, data_time_norm, table_sizes, scenario_labels,
+                                         scenario_legend_map, err=data_time_err)
+    legenda(axes[0], handles)
+
+    impagina()
     out_file = os.path.join(output_dir, "execution_time_barplot_normalized.png")
-    plt.savefig(out_file, dpi=300)
-    plt.show()
+    salva_figura(out_file)
+
+def plot_latency_percentiles(data_time, data_percentiles, table_sizes, scenario_labels, scenario_legend_map, output_dir):
+    """
+    Latenza per richiesta: media accanto a p50, p90, p99, p99.9 e massimo (un subplot
+    ciascuno), Single-core.
+    """
+    stats = ["Media", "p50", "p90", "p99", "p99.9", "Max"]
+    # (scenario x size x statistica), da microsecondi a millisecondi
+    data_ms = np.concatenate([data_time[:, :, np.newaxis], data_percentiles], axis=2) / 1e3
+
+    template = _BARRE._replace(titles=tuple(f"Latenza per richiesta - {stat}{_SUFFIX}" for stat in stats),
+                               ylabels=("Latenza (ms)",) * len(stats), figsize=(10, 3 * len(stats)))
+    fig, axes, _, handles = figura_barre(template, data_ms, table_sizes, scenario_labels, scenario_legend_map)
+    legenda(axes[0], handles, fontsize=8)
+
+    impagina()
+    out_file = os.path.join(output_dir, "latency_percentiles_subplots.png")
+    salva_figura(out_file)
+
+def plot_latency_cdf(latencies, table_sizes, scenario_labels, scenario_legend_map, output_dir):
+    """
+    CDF empirica delle latenze per richiesta: un subplot per dimensione, una curva per
+    scenario. latencies: {(scenario, size): sketch delle latenze in us} (carica_sketch_latenze).
+    """
+    n_cols = 4
+    n_rows = (len(table_sizes) + n_cols - 1) // n_cols
+    fig, axes = plt.subplots(n_rows, n_cols, figsize=(4 * n_cols, 3 * n_rows), squeeze=False)
+
+    for z_idx, sz in enumerate(table_sizes):
+        ax = axes[z_idx // n_cols][z_idx % n_cols]
+        for scenario in scenario_labels:
+            sketch = latencies.get((scenario, sz))
+            if sketch is None:
+                continue
+            lat_us, frac = sketch.cdf()
+            if len(lat_us):
+                ax.step(lat_us / 1e3, frac, where='post', label=scenario_legend_map[scenario])
+        ax.axhline(0.99, color='gray', linestyle=':', linewidth=0.8)
+        ax.set_title(f"Righe: {sz}", fontsize=10)
+        ax.set_xscale('log')
+        ax.set_ylim(0, 1.02)
+        ax.grid(True, which='both', linestyle='--', alpha=0.5)
+        if z_idx % n_cols == 0:
+            ax.set_ylabel("Frazione richieste")
+        ax.set_xlabel("Latenza (ms, scala log)")
+
+    for z_idx in range(len(table_sizes), n_rows * n_cols):
+        axes[z_idx // n_cols][z_idx % n_cols].axis('off')
+
+    handles, labels = axes[0][0].get_legend_handles_labels()
+    fig.legend(handles, labels, loc='lower center', ncol=min(len(labels), 4) or 1, fontsize=8)
+    fig.suptitle("CDF della latenza per richiesta (Single-core generatore tabella)")
+
+    impagina(rect=(0, 0.06, 1, 0.96))
+    out_file = os.path.join(output_dir, "latency_cdf.png")
+    salva_figura(out_file)
 
 def plot_tlb_misses(data_tlb, table_sizes, scenario_labels, scenario_legend_map, output_dir):
     """
     Plot con valori assoluti di TLB L1 e L2, Single-core.
     """
-    fig, axes = plt.subplots(2, 1, figsize=(10, 8), sharex=True)
-    x = np.arange(len(table_sizes))
-    bar_width = 0.1
-
-    # TLB L1
-    for s_idx, scenario in enumerate(scenario_labels):
-        l1_vals = []
-        for size in table_sizes:
-            (tlb_l1, _) = data_tlb[scenario][size]
-            l1_vals.append(tlb_l1)
-
-        x_positions = x + (s_idx - len(scenario_labels)/2)*bar_width + bar_width/2
-        axes[0].bar(x_positions, l1_vals, bar_width, label=scenario_legend_map[scenario])
-
-    axes[0].set_title("TLB L1 Miss\n(Single-core generatore tabella)")
-    axes[0].set_ylabel("TLB L1 Miss")
-    axes[0].grid(True, which='major', axis='both', linestyle='--', alpha=0.7)
-    axes[0].yaxis.set_major_formatter(FuncFormatter(short_number_formatter))
-    axes[0].legend()
-
-    # TLB L2
-    for s_idx, scenario in enumerate(scenario_labels):
-        l2_vals = []
-        for size in table_sizes:
-            (_, tlb_l2) = data_tlb[scenario][size]
-            l2_vals.append(tlb_l2)
-
-        x_positions = x + (s_idx - len(scenario_labels)/2)*bar_width + bar_width/2
-        axes[1].bar(x_positions, l2_vals, bar_width, label=scenario_legend_map[scenario])
-
-    axes[1].set_title("TLB L2 Miss\n(Single-core generatore tabella)")
-    axes[1].set_ylabel("TLB L2 Miss")
-    axes[1].grid(True, which='major', axis='both', linestyle='--', alpha=0.7)
-    axes[1].yaxis.set_major_formatter(FuncFormatter(short_number_formatter))
-
-    axes[1].set_xticks(x)
-    axes[1].set_xticklabels([str(s) for s in table_sizes], rotation=45)
-    axes[1].set_xlabel("Dimensione tabella (# righe)")
-    axes[1].legend()
-
-    plt.tight_layout()
+    template = _TLB._replace(titles=(f"TLB L1 Miss{_SUFFIX}", f"TLB L2 Miss{_SUFFIX}"),
+                             ylabels=("TLB L1 Miss", "TLB L2 Miss"), formatter=short_number_formatter)
+    fig, axes, _, handles = figura_barre(template, data_tlb, table_sizes, scenario_labels, scenario_legend_map)
+    for ax in axes:
+        legenda(ax, handles)
+
+    impagina()
     out_file = os.path.join(output_dir, "tlb_misses_subplots.png")
-    plt.savefig(out_file, dpi=300)
-    plt.show()
+    salva_figura(out_file)
 
-def plot_tlb_misses_normalized(data_tlb_norm, table_sizes, scenario_labels, scenario_legend_map, output_dir):
+def plot_tlb_misses_normalized(data_tlb_norm, data_tlb_err, table_sizes, scenario_labels, scenario_legend_map, output_dir):
     """
     Plot con valori NORMALIZZATI di TLB L1 e L2, Single-core.
     """
-    fig, axes = plt.subplots(2, 1, figsize=(10, 8), sharex=True)
-    x = np.arange(len(table_sizes))
-    bar_width = 0.1
-
-    # TLB L1
-    for s_idx, scenario in enumerate(scenario_labels):
-        l1_vals = []
-        for size in table_sizes:
-            (tlb_l1, _) = data_tlb_norm[scenario][size]
-            l1_vals.append(tlb_l1)
-
-        x_positions = x + (s_idx - len(scenario_labels)/2)*bar_width + bar_width/2
-        axes[0].bar(x_positions, l1_vals, bar_width, label=scenario_legend_map[scenario])
-
-    axes[0].set_title("TLB L1 Miss (Normalizzado ad 1 Server)\n(Single-core generatore tabella)")
-    axes[0].set_ylabel("TLB L1 Normalizzato")
-    axes[0].grid(True, which='major', axis='both', linestyle='--', alpha=0.7)
-    axes[0].legend()
-
-    # TLB L2
-    for s_idx, scenario in enumerate(scenario_labels):
-        l2_vals = []
-        for size in table_sizes:
-            (_, tlb_l2) = data_tlb_norm[scenario][size]
-            l2_vals.append(tlb_l2)
-
-        x_positions = x + (s_idx - len(scenario_labels)/2)*bar_width + bar_width/2
-        axes[1].bar(x_positions, l2_vals, bar_width, label=scenario_legend_map[scenario])
-
-    axes[1].set_title("TLB L2 Miss (Normalizzado ad 1 Server)\n(Single-core generatore tabella)")
-    axes[1].set_ylabel("TLB L2 Normalizzato")
-    axes[1].grid(True, which='major', axis='both', linestyle='--', alpha=0.7)
-
-    axes[1].set_xticks(x)
-    axes[1].set_xticklabels([str(s) for s in table_sizes], rotation=45)
-    axes[1].set_xlabel("Dimensione tabella (# righe)")
-    axes[1].legend()
-
-    plt.tight_layout()
+    template = _TLB._replace(titles=(f"TLB L1 Miss (Normalizzado ad 1 Server){_SUFFIX}",
+                                     f"TLB L2 Miss (Normalizzado ad 1 Server){_SUFFIX}"),
+                             ylabels=("TLB L1 Normalizzato", "TLB L2 Normalizzato"))
+    fig, axes, _, handles = figura_barre(template, data_tlb_norm, table_sizes, scenario_labels,
+                                         scenario_legend_map, err=data_tlb_err)
+    for ax in axes:
+        legenda(ax, handles)
+
+    impagina()
     out_file = os.path.join(output_dir, "tlb_misses_subplots_normalized.png")
-    plt.savefig(out_file, dpi=300)
-    plt.show()
+    salva_figura(out_file)
 
 # --------------------------------------------------------------------------------
 # 4) MAIN (CASO SINGLE-CORE) - con THROUGHPUT aggiunto in scala lineare
 # --------------------------------------------------------------------------------
 
-def main():
+def figure_tasks():
     """
-    Questo main è per il caso SINGLE-CORE, con AGGIUNTA DEL THROUGHPUT (lineare).
+    Figure del caso SINGLE-CORE, con AGGIUNTA DEL THROUGHPUT (lineare).
     """
     # Percorso dove salvare le figure (Single Core)
     output_dir = "/Users/lorenzofaraoni/Desktop/Tesi/Laboratorio/Analysis Table Generator/Single Core/Plots"
 
-    # Definisci i percorsi base (Single Core)
-    base_path_1_server_cache = "/Users/lorenzofaraoni/Desktop/Tesi/Laboratorio/Analysis Table Generator/Single Core/1 Active Server/perf_results_table_cache_misses"
-    base_path_2_server_cache = "/Users/lorenzofaraoni/Desktop/Tesi/Laboratorio/Analysis Table Generator/Single Core/2 Active Server/perf_results_table_cache_misses"
-    base_path_3_server_cache = "/Users/lorenzofaraoni/Desktop/Tesi/Laboratorio/Analysis Table Generator/Single Core/3 Active Server/perf_results_table_cache_misses"
-
-    base_path_1_server_time = "/Users/lorenzofaraoni/Desktop/Tesi/Laboratorio/Analysis Table Generator/Single Core/1 Active Server/perf_table_results_time"
-    base_path_2_server_time = "/Users/lorenzofaraoni/Desktop/Tesi/Laboratorio/Analysis Table Generator/Single Core/2 Active Server/perf_table_results_time"
-    base_path_3_server_time = "/Users/lorenzofaraoni/Desktop/Tesi/Laboratorio/Analysis Table Generator/Single Core/3 Active Server/perf_table_results_time"
-
-    base_path_1_server_tlb = "/Users/lorenzofaraoni/Desktop/Tesi/Laboratorio/Analysis Table Generator/Single Core/1 Active Server/perf_results_table_tlb_misses"
-    base_path_2_server_tlb = "/Users/lorenzofaraoni/Desktop/Tesi/Laboratorio/Analysis Table Generator/Single Core/2 Active Server/perf_results_table_tlb_misses"
-    base_path_3_server_tlb = "/Users/lorenzofaraoni/Desktop/Tesi/Laboratorio/Analysis Table Generator/Single Core/3 Active Server/perf_results_table_tlb_misses"
+    # Radice delle campagne (layout standard, vedi campaign_store.py:
+    # <root>/Analysis .../<Single|Multi> Core/<n> Active Server/perf_...)
+    root = "/Users/lorenzofaraoni/Desktop/Tesi/Laboratorio"
 
     # Dimensioni di tabella (numero di righe)
     table_sizes = [
@@ -708,79 +298,58 @@ def main():
         500000, 600000, 700000, 800000, 900000, 1000000
     ]
 
-    # Frequenze di disturbo (LOW, MEDIUM, HIGH)
-    freqs = ["LOW", "MEDIUM", "HIGH"]
-
-    # Carichiamo i dati di Cache, Tempo, TLB
-    data_cache = carica_dati_cache_miss(
-        base_path_1_server_cache,
-        base_path_2_server_cache,
-        base_path_3_server_cache,
-        table_sizes,
-        freqs
-    )
-    data_time = carica_dati_tempo(
-        base_path_1_server_time,
-        base_path_2_server_time,
-        base_path_3_server_time,
-        table_sizes,
-        freqs
-    )
-    data_tlb = carica_dati_tlb(
-        base_path_1_server_tlb,
-        base_path_2_server_tlb,
-        base_path_3_server_tlb,
-        table_sizes,
-        freqs
-    )
-
-    # Carichiamo i dati delle richieste (Iter)
-    data_requests = carica_dati_richieste(
-        base_path_1_server_time,
-        base_path_2_server_time,
-        base_path_3_server_time,
-        table_sizes,
-        freqs
-    )
-
-    # I 7 scenari (ordine con cui plottare)
-    scenario_labels = [
-        "1S",
-        "2S_LOW", "2S_MEDIUM", "2S_HIGH",
-        "3S_LOW", "3S_MEDIUM", "3S_HIGH"
-    ]
+    # Griglia degli scenari: numeri di server attivi (1 = senza disturbo) e frequenze di
+    # disturbo; SCENARIO_SERVERS / SCENARIO_FREQS / SCENARIO_SIZES la modificano (scenario_grid.py)
+    grid = grid_from_env(make_grid('table', 'single', table_sizes,
+                                   n_servers=(1, 2, 3), freqs=("LOW", "MEDIUM", "HIGH")))
+    table_sizes = list(grid.sizes)
+
+    # Scenari (ordine con cui plottare) e legende
+    scenario_labels = grid_scenario_labels(grid)
+    scenario_legend_map = scenario_legend(scenario_labels)
+
+    # Con CAMPAIGN_STORE=<archivio> (vedi campaign_store.py) i dati si leggono da un solo file
+    store = open_store_from_env()
 
-    # Mappa per le legende
-    scenario_legend_map = {
-        "1S":       "1 Server (no disturbo)",
-        "2S_LOW":   "2 Servers (basso disturbo)",
-        "2S_MEDIUM":"2 Servers (medio disturbo)",
-        "2S_HIGH":  "2 Servers (alto disturbo)",
-        "3S_LOW":   "3 Servers (basso disturbo)",
-        "3S_MEDIUM":"3 Servers (medio disturbo)",
-        "3S_HIGH":  "3 Servers (alto disturbo)",
-    }
+    # Carichiamo Cache, Tempo / Richieste (Iter) e TLB in un unico cubo
+    cube = carica_griglia(grid, root, store=store)
+
+    # Metriche derivate (metrics.py), scenario x size [x livello] nell'ordine di scenario_labels
+    # e table_sizes: ognuna è calcolata alla prima richiesta, i rapporti sono rispetto al primo scenario
+    metrics = MetricGraph(cube.sel(scenario=scenario_labels, stat='value'), baseline=scenario_labels[0])
+
+    # Intervalli di confidenza bootstrap dei rapporti normalizzati (bootstrap.py), come barre d'errore
+    latency_sketches = carica_sketch_latenze(grid, root)
+    intervals = intervalli_campagna(cube, latency_sketches, scenario_labels, table_sizes, baseline=scenario_labels[0])
+    errors = {name: barre_errore(metrics[name], interval) for name, interval in intervals.items()}
 
     # -------------------------------
     # 1) PLOT VALORI ASSOLUTI
     # -------------------------------
-    plot_cache_misses(data_cache, table_sizes, scenario_labels, scenario_legend_map, output_dir)
-    plot_cache_miss_rate(data_cache, table_sizes, scenario_labels, scenario_legend_map, output_dir)
-    plot_execution_time(data_time, table_sizes, scenario_labels, scenario_legend_map, output_dir)
-    plot_tlb_misses(data_tlb, table_sizes, scenario_labels, scenario_legend_map, output_dir)
-    # Throughput (NUOVO, in scala lineare)
-    plot_throughput(data_time, data_requests, table_sizes, scenario_labels, scenario_legend_map, output_dir)
+    tasks = [
+        FigureTask('cache_misses', plot_cache_misses, (metrics['misses'], table_sizes, scenario_labels, scenario_legend_map, output_dir)),
+        FigureTask('cache_miss_rate', plot_cache_miss_rate, (metrics['miss_rate'], table_sizes, scenario_labels, scenario_legend_map, output_dir)),
+        FigureTask('execution_time', plot_execution_time, (metrics['time_us'], table_sizes, scenario_labels, scenario_legend_map, output_dir)),
+        FigureTask('tlb_misses', plot_tlb_misses, (metrics['tlb_misses'], table_sizes, scenario_labels, scenario_legend_map, output_dir)),
+        # Throughput (NUOVO, in scala lineare)
+        FigureTask('throughput', plot_throughput, (metrics['throughput'], metrics['throughput_min'], table_sizes, scenario_labels, scenario_legend_map, output_dir)),
+        # Distribuzione delle latenze per richiesta: percentili accanto alla media e CDF
+        FigureTask('latency_percentiles', plot_latency_percentiles, (metrics['time_us'], metrics['latency_percentiles'], table_sizes, scenario_labels, scenario_legend_map, output_dir)),
+        FigureTask('latency_cdf', plot_latency_cdf, (latency_sketches, table_sizes, scenario_labels, scenario_legend_map, output_dir)),
+
+        # -------------------------------
+        # 2) PLOT VALORI NORMALIZZATI (rispetto a 1S)
+        # -------------------------------
+        FigureTask('cache_misses_normalized', plot_cache_misses_normalized, (metrics['norm_misses'], errors['norm_misses'], table_sizes, scenario_labels, scenario_legend_map, output_dir)),
+        FigureTask('execution_time_normalized', plot_execution_time_normalized, (metrics['norm_time_us'], errors['norm_time_us'], table_sizes, scenario_labels, scenario_legend_map, output_dir)),
+        FigureTask('tlb_misses_normalized', plot_tlb_misses_normalized, (metrics['norm_tlb_misses'], errors['norm_tlb_misses'], table_sizes, scenario_labels, scenario_legend_map, output_dir)),
+    ]
+    return tasks
 
-    # -------------------------------
-    # 2) PLOT VALORI NORMALIZZATI (rispetto a 1S)
-    # -------------------------------
-    data_cache_norm = normalizza_cache_miss(data_cache, table_sizes, scenario_labels)
-    data_time_norm  = normalizza_tempo(data_time, table_sizes, scenario_labels)
-    data_tlb_norm   = normalizza_tlb_miss(data_tlb, table_sizes, scenario_labels)
 
-    plot_cache_misses_normalized(data_cache_norm, table_sizes, scenario_labels, scenario_legend_map, output_dir)
-    plot_execution_time_normalized(data_time_norm, table_sizes, scenario_labels, scenario_legend_map, output_dir)
-    plot_tlb_misses_normalized(data_tlb_norm, table_sizes, scenario_labels, scenario_legend_map, output_dir)
+def main():
+    # Con --batch (o PLOT_BATCH=1) backend Agg, nessuna finestra e figure in parallelo (figure_batch.py)
+    render_figures(figure_tasks(), batch=batch_from_env())
 
 
 if __name__ == "__main__":
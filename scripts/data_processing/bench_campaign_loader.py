@@ -0,0 +1,108 @@
+"""
+Benchmark di campaign_loader.map_paths e di campaign_store.ingest_dirs su un albero
+sintetico con il layout standard delle campagne (1 / 2 / 3 server, LOW / MEDIUM / HIGH,
+misses_*.txt). Confronta il caricamento seriale, il pool di thread e il pool di processi,
+con la cache su disco disattivata.
+
+Con latency_ms > 0 ogni apertura di file di map_paths attende latency_ms millisecondi in
+più, per simulare la latenza di uno share NFS su un disco locale; ingest_dirs legge i file
+senza latenza aggiunta.
+
+Uso:
+    python3 bench_campaign_loader.py [n_files] [latency_ms] [workers]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from functools import partial
+
+import numpy as np
+
+import parse_cache
+from bench_perf_parser import CACHE_TEMPLATE, _it
+from campaign_loader import default_workers, map_paths
+from campaign_store import campaign_dirs, ingest_dirs
+from perf_parser import load_perf_stat
+
+FREQS = ["LOW", "MEDIUM", "HIGH"]
+N_SCENARIOS = 1 + 2 * len(FREQS)
+
+# --------------------------------------------------------------------------------
+# 1) ALBERO SINTETICO
+# --------------------------------------------------------------------------------
+
+def genera_campagna(root, n_files):
+    """
+    Scrive circa n_files file di cache miss nel layout standard (server matrix, single core);
+    ritorna (directory come [(server, core_mode, n_servers, sorgente, directory)], path dei file).
+    """
+    sizes = list(range(1, n_files // N_SCENARIOS + 1))
+    dirs = [d for d in campaign_dirs(root) if d[:2] == ('matrix', 'single') and d[3] == 'cache']
+    paths = []
+    for _, _, n_servers, _, base in dirs:
+        os.makedirs(base)
+        names = [f"misses_{sz}.txt" for sz in sizes] if n_servers == 1 else \
+                [f"misses_{sz}_{freq}Hz.txt" for freq in FREQS for sz in sizes]
+        for i, name in enumerate(names):
+            vals = {k: _it(1000003 * (i + 1) + j * 7919) for j, k in enumerate("abcdefg")}
+            path = os.path.join(base, name)
+            with open(path, 'w') as f:
+                f.write(CACHE_TEMPLATE.format(**vals))
+            paths.append(path)
+    return dirs, paths
+
+
+def parse_l1(latency_s, path):
+    """Parser del benchmark (di modulo, così è utilizzabile anche dal pool di processi)."""
+    if latency_s:
+        time.sleep(latency_s)
+    return load_perf_stat(path).l1_miss
+
+
+def _stesse_colonne(a, b):
+    return a.keys() == b.keys() and all(
+        np.array_equal(a[name], b[name], equal_nan=a[name].dtype.kind == 'f') for name in a)
+
+# --------------------------------------------------------------------------------
+# 2) MAIN
+# --------------------------------------------------------------------------------
+
+def main():
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else default_workers()
+
+    # Si misura il caricamento, non la cache
+    parse_cache.configure('off')
+    parse = partial(parse_l1, latency_ms / 1000.0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dirs, paths = genera_campagna(tmp, n_files)
+
+        def run(label, func, **kwargs):
+            start = time.perf_counter()
+            result = func(**kwargs)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<24}: {elapsed:8.3f} s  {len(paths) / elapsed:10.0f} file/s")
+            return elapsed, result
+
+        print(f"File: {len(paths)}, latenza simulata: {latency_ms} ms, worker: {workers}")
+        for name, func, same in (
+                ("map_paths", partial(map_paths, parse, paths), lambda a, b: a == b),
+                ("ingest_dirs", partial(ingest_dirs, dirs, 'bench'), _stesse_colonne)):
+            print(f"-- {name}")
+            run("(riscaldamento)", func, workers=1)
+            t_serial, ref = run("Seriale", func, workers=1)
+            t_threads, out_threads = run("Thread", func, workers=workers, processes=False)
+            t_procs, out_procs = run("Processi", func, workers=workers, processes=True)
+
+            if not same(out_threads, ref) or not same(out_procs, ref):
+                print("ATTENZIONE: risultati o ordine diversi dal caricamento seriale")
+            print(f"Speedup thread   : {t_serial / t_threads:8.2f}x")
+            print(f"Speedup processi : {t_serial / t_procs:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Micro-benchmark del parser condiviso (perf_parser) contro le funzioni di parsing
+copiate negli script di plot (parse_number_from_line + parse_cache_misses_and_hits
++ parse_tlb_misses). Genera N file sintetici di `perf stat` e stampa i file/sec,
+sia per il testo "umano" sia per lo stesso contenuto in formato `perf stat -x,`, e
+il tempo della sola lettura dei file, che limita lo speedup raggiungibile.
+
+Uso:
+    python3 bench_perf_parser.py [n_files]
+"""
+
+import math
+import os
+import sys
+import tempfile
+import time
+
+from perf_parser import parse_perf_csv, parse_perf_stat, tlb_levels
+from result_io import read_result_bytes
+
+# --------------------------------------------------------------------------------
+# 1) FUNZIONI ORIGINALI (copiate da results/*/plot.py, come riferimento)
+# --------------------------------------------------------------------------------
+
+def legacy_parse_number_from_line(line):
+    import re
+    line_clean = re.sub(r'(?<=\d)\.(?=\d)', '', line.strip())
+    line_clean = line_clean.replace(',', '.')
+    match = re.search(r'(\d+(\.\d+)?)', line_clean)
+    if match:
+        return float(match.group(1))
+    return 0
+
+def legacy_parse_cache_misses_and_hits(file_path):
+    if not os.path.exists(file_path):
+        return (0, 0, 0, 0, 0, 0)
+    l1_miss, l1_hit = 0, 0
+    l2_miss, l2_hit = 0, 0
+    l3_miss, l3_hit = 0, 0
+    with open(file_path, 'r') as f:
+        for line in f:
+            if 'mem_load_retired.l1_miss' in line:
+                l1_miss = legacy_parse_number_from_line(line)
+            elif 'mem_load_retired.l2_miss' in line:
+                l2_miss = legacy_parse_number_from_line(line)
+            elif 'mem_load_retired.l3_miss' in line:
+                l3_miss = legacy_parse_number_from_line(line)
+            elif 'mem_load_retired.l1_hit' in line:
+                l1_hit = legacy_parse_number_from_line(line)
+            elif 'mem_load_retired.l2_hit' in line:
+                l2_hit = legacy_parse_number_from_line(line)
+            elif 'mem_load_retired.l3_hit' in line:
+                l3_hit = legacy_parse_number_from_line(line)
+    return (l1_miss, l1_hit, l2_miss, l2_hit, l3_miss, l3_hit)
+
+def legacy_parse_tlb_misses(file_path):
+    if not os.path.exists(file_path):
+        return (0, 0)
+    dtlb_load_stlb_hit = dtlb_store_stlb_hit = dtlb_load_walk = dtlb_store_walk = 0
+    with open(file_path, 'r') as f:
+        for line in f:
+            if 'dTLB_load_misses.stlb_hit' in line:
+                dtlb_load_stlb_hit = legacy_parse_number_from_line(line)
+            elif 'dTLB_load_misses.miss_causes_a_walk' in line:
+                dtlb_load_walk = legacy_parse_number_from_line(line)
+            elif 'dTLB_store_misses.stlb_hit' in line:
+                dtlb_store_stlb_hit = legacy_parse_number_from_line(line)
+            elif 'dTLB_store_misses.miss_causes_a_walk' in line:
+                dtlb_store_walk = legacy_parse_number_from_line(line)
+    l2_miss = dtlb_load_walk + dtlb_store_walk
+    l1_miss = dtlb_load_stlb_hit + dtlb_store_stlb_hit + l2_miss
+    return (l1_miss, l2_miss)
+
+# --------------------------------------------------------------------------------
+# 2) FILE SINTETICI
+# --------------------------------------------------------------------------------
+
+CACHE_TEMPLATE = """
+ Performance counter stats for 'CPU(s) 0' (50 runs):
+
+       {a}      mem_load_retired.l1_miss                                      ( +-  1,23% )
+       {b}      mem_load_retired.l2_miss                                      ( +-  2,10% )
+       {c}      mem_load_retired.l3_miss                                      ( +-  4,02% )
+       {d}      mem_load_retired.l1_hit                                       ( +-  0,12% )
+       {e}      mem_load_retired.l2_hit                                       ( +-  0,98% )
+       {f}      mem_load_retired.l3_hit                                       ( +-  1,50% )
+       {g}      context-switches                                              ( +-  3,00% )
+
+           2,00123 +- 0,00012 seconds time elapsed  ( +-  0,01% )
+
+"""
+
+TLB_TEMPLATE = """
+ Performance counter stats for 'CPU(s) 0' (50 runs):
+
+       {a}      dTLB_load_misses.stlb_hit                                     ( +-  1,23% )
+       {b}      dTLB_load_misses.miss_causes_a_walk                           ( +-  2,10% )
+       {c}      dTLB_store_misses.stlb_hit                                    ( +-  4,02% )
+       {d}      dTLB_store_misses.miss_causes_a_walk                          ( +-  0,12% )
+       {g}      context-switches                                              ( +-  3,00% )
+
+           2,00123 +- 0,00012 seconds time elapsed  ( +-  0,01% )
+
+"""
+
+CSV_EVENTS_CACHE = [
+    'mem_load_retired.l1_miss', 'mem_load_retired.l2_miss', 'mem_load_retired.l3_miss',
+    'mem_load_retired.l1_hit', 'mem_load_retired.l2_hit', 'mem_load_retired.l3_hit',
+    'context-switches',
+]
+CSV_EVENTS_TLB = [
+    'dTLB_load_misses.stlb_hit', 'dTLB_load_misses.miss_causes_a_walk',
+    'dTLB_store_misses.stlb_hit', 'dTLB_store_misses.miss_causes_a_walk',
+    'context-switches',
+]
+
+def _it(n):
+    return f"{n:,}".replace(',', '.')
+
+def _csv(events, numbers):
+    rows = [f"{n},,{e},1.23%,2000123456,100.00,," for e, n in zip(events, numbers)]
+    return "# started on Mon Jan  1 00:00:00 2024\n\n" + "\n".join(rows) + "\n"
+
+def genera_file(directory, n_files, fmt='txt'):
+    """
+    Scrive n_files file (metà cache, metà TLB): con fmt='txt' in testo perf con numeri
+    in formato italiano, con fmt='csv' nel formato di `perf stat -x,`.
+    """
+    paths_cache, paths_tlb = [], []
+    for i in range(n_files):
+        numbers = [1000003 * (i + 1) + j * 7919 for j in range(7)]
+        vals = {k: _it(n) for k, n in zip("abcdefg", numbers)}
+        if i % 2 == 0:
+            path = os.path.join(directory, f"misses_{i}.{fmt}")
+            if fmt == 'csv':
+                text = _csv(CSV_EVENTS_CACHE, numbers)
+            else:
+                text = CACHE_TEMPLATE.format(**vals)
+            paths_cache.append(path)
+        else:
+            path = os.path.join(directory, f"tlb_misses_{i}.{fmt}")
+            if fmt == 'csv':
+                text = _csv(CSV_EVENTS_TLB, numbers[:4] + [numbers[6]])
+            else:
+                text = TLB_TEMPLATE.format(**vals)
+            paths_tlb.append(path)
+        with open(path, 'w') as f:
+            f.write(text)
+    return paths_cache, paths_tlb
+
+# --------------------------------------------------------------------------------
+# 3) MAIN
+# --------------------------------------------------------------------------------
+
+def _cronometra(func, paths, repeat=5):
+    """Miglior tempo su repeat giri (il rumore di sistema allunga solo i tempi), con i risultati."""
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = [func(p) for p in paths]
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+def main():
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths_cache, paths_tlb = genera_file(tmp, n_files)
+        paths = paths_cache + paths_tlb
+        csv_cache, csv_tlb = genera_file(tmp, n_files, fmt='csv')
+        paths_csv = csv_cache + csv_tlb
+
+        def legacy(path):
+            if os.path.basename(path).startswith('tlb_'):
+                return legacy_parse_tlb_misses(path)
+            return legacy_parse_cache_misses_and_hits(path)
+
+        def nuovo(path):
+            stat = parse_perf_stat(path)
+            if os.path.basename(path).startswith('tlb_'):
+                return tlb_levels(stat)
+            return (stat.l1_miss, stat.l1_hit, stat.l2_miss, stat.l2_hit, stat.l3_miss, stat.l3_hit)
+
+        def nuovo_csv(path):
+            stat = parse_perf_csv(path)
+            if os.path.basename(path).startswith('tlb_'):
+                return tlb_levels(stat)
+            return (stat.l1_miss, stat.l1_hit, stat.l2_miss, stat.l2_hit, stat.l3_miss, stat.l3_hit)
+
+        # Un giro a vuoto per scaldare la page cache
+        _cronometra(nuovo, paths)
+
+        t_legacy, out_legacy = _cronometra(legacy, paths)
+        t_nuovo, out_nuovo = _cronometra(nuovo, paths)
+        t_csv, out_csv = _cronometra(nuovo_csv, paths_csv)
+        # Solo open + read: il limite di qualunque parser su file così piccoli
+        t_io, _ = _cronometra(read_result_bytes, paths_csv)
+
+        if out_legacy != out_nuovo or out_nuovo != out_csv:
+            print("ATTENZIONE: i parser danno risultati diversi")
+
+        print(f"File analizzati: {len(paths)}")
+        print(f"Parser originale : {len(paths) / t_legacy:10.0f} file/s")
+        print(f"perf_parser      : {len(paths) / t_nuovo:10.0f} file/s")
+        print(f"perf_parser CSV  : {len(paths_csv) / t_csv:10.0f} file/s")
+        print(f"Speedup testo    : {t_legacy / t_nuovo:10.2f}x")
+        print(f"Speedup CSV      : {t_legacy / t_csv:10.2f}x")
+        print(f"Sola lettura     : {len(paths_csv) / t_io:10.0f} file/s "
+              f"(speedup massimo {t_legacy / t_io:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark delle qualità di resa di figure_batch (preview / final) sulle sei figure di
+webserver_analysis/matrix_server/plot_all.py, con metriche sintetiche della forma di una
+campagna matrix_server completa: 1 / 2 / 3 server x LOW / MEDIUM / HIGH (7 scenari),
+13 dimensioni (1..4096), L1 / L2 / L3, con barre d'errore.
+
+Le figure sono generate in serie (un processo), tutte, senza manifest: si misura il
+tempo di resa per figura e il totale per qualità, più la dimensione dei file scritti.
+
+Uso:
+    python3 bench_render.py [ripetizioni]
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from figure_batch import QUALITY_TIERS, FigureTask, carica_script, render_figures
+from scenario_grid import grid_scenario_labels, make_grid, scenario_legend
+
+MATRIX_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..',
+                             'webserver_analysis', 'matrix_server', 'plot_all.py')
+MATRIX_SIZES = [2 ** i for i in range(13)]
+
+# --------------------------------------------------------------------------------
+# 1) CAMPAGNA SINTETICA
+# --------------------------------------------------------------------------------
+
+def genera_task(module, output_dir, seed=0):
+    """FigureTask delle sei figure di matrix_server su metriche casuali della campagna completa."""
+    rng = np.random.default_rng(seed)
+    grid = make_grid('matrix', 'single', MATRIX_SIZES, n_servers=(1, 2, 3), freqs=("LOW", "MEDIUM", "HIGH"))
+    labels = grid_scenario_labels(grid)
+    legend = scenario_legend(labels, lingua='en')
+    n_scen, n_sizes = len(labels), len(MATRIX_SIZES)
+
+    misses = rng.uniform(1e3, 1e9, (n_scen, n_sizes, 3))
+    tlb = rng.uniform(1e2, 1e7, (n_scen, n_sizes, 3))
+    time_us = rng.uniform(10, 1e6, (n_scen, n_sizes))
+    norm = [arr / arr[:1] for arr in (misses, time_us, tlb)]
+    err = [np.abs(rng.normal(0, 0.05, (2,) + arr.shape)) for arr in norm]
+
+    common = (MATRIX_SIZES, labels, legend, output_dir)
+    return [
+        FigureTask('cache_misses', module.plot_cache_misses, (misses,) + common),
+        FigureTask('execution_time', module.plot_execution_time, (time_us,) + common),
+        FigureTask('tlb_misses', module.plot_tlb_misses, (tlb,) + common),
+        FigureTask('cache_misses_normalized', module.plot_cache_misses_normalized, (norm[0], err[0]) + common),
+        FigureTask('execution_time_normalized', module.plot_execution_time_normalized, (norm[1], err[1]) + common),
+        FigureTask('tlb_misses_normalized', module.plot_tlb_misses_normalized, (norm[2], err[2]) + common),
+    ]
+
+
+def dimensione_directory(path):
+    """(numero di file, byte totali) di una directory."""
+    files = [os.path.join(path, name) for name in os.listdir(path)]
+    return len(files), sum(os.path.getsize(f) for f in files)
+
+# --------------------------------------------------------------------------------
+# 2) MAIN
+# --------------------------------------------------------------------------------
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    module = carica_script(MATRIX_SERVER)
+
+    times = {}
+    sizes = {}
+    for quality in QUALITY_TIERS:
+        with tempfile.TemporaryDirectory() as out:
+            tasks = genera_task(module, out)
+            render_figures(tasks[:1], batch=True, workers=1, force=True, manifest_path='', quality=quality)
+            runs = [render_figures(tasks, batch=True, workers=1, force=True, manifest_path='', quality=quality)
+                    for _ in range(repeats)]
+            times[quality] = {name: min(run[i][1] for run in runs) for i, (name, _) in enumerate(runs[0])}
+            sizes[quality] = dimensione_directory(out)
+
+    names = list(times[QUALITY_TIERS[0]])
+    print(f"\nMigliore di {repeats} ripetizioni, secondi per figura (1 processo)")
+    print(f"{'figura':<28}" + ''.join(f"{q:>10}" for q in QUALITY_TIERS) + f"{'rapporto':>10}")
+    for name in names:
+        row = [times[q][name] for q in QUALITY_TIERS]
+        print(f"{name:<28}" + ''.join(f"{t:10.3f}" for t in row) + f"{row[1] / row[0]:9.1f}x")
+    totals = [sum(times[q].values()) for q in QUALITY_TIERS]
+    print(f"{'totale':<28}" + ''.join(f"{t:10.3f}" for t in totals) + f"{totals[1] / totals[0]:9.1f}x")
+    for quality in QUALITY_TIERS:
+        n_files, n_bytes = sizes[quality]
+        print(f"{quality:<8}: {n_files} file, {n_bytes / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
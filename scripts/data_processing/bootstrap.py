@@ -0,0 +1,164 @@
+"""
+Intervalli di confidenza bootstrap dei rapporti normalizzati (es. L1 miss 2S / 1S).
+
+I fattori di degrado sono rapporti tra due medie: qui si ricampionano le medie di tutte
+le celle (scenario x size [x evento]) in un colpo solo, come array (B, celle), e si
+prendono i percentili dei rapporti con lo scenario baseline lungo l'asse B.
+
+Da dove vengono i ricampionamenti:
+    contatori perf   `perf stat -r N` non salva le singole ripetizioni ma la media e la
+                     sua deviazione standard ('+- x%', colonna variance del cubo). Il
+                     bootstrap è parametrico: media* ~ Normale(media, media * x / 100).
+    latenze          bootstrap non parametrico sulle richieste, dallo sketch della cella
+                     (latency_sketch.py): nella variante di Poisson ogni richiesta entra
+                     Poisson(1) volte, quindi ogni bucket con c richieste Poisson(c) volte.
+                     Per n grande equivale al ricampionamento con reinserimento e si
+                     estrae per tutte le celle con una sola chiamata.
+
+Le celle senza varianza o senza latenze danno NaN (nessuna barra d'errore).
+
+    ci = intervalli_campagna(cube, sketches, scenario_labels, sizes, baseline='1S')
+    lo, hi = ci['norm_misses']                           # scenario x size x livello
+    yerr = barre_errore(metrics['norm_misses'], ci['norm_misses'])
+
+Variabili d'ambiente:
+    BOOTSTRAP_RESAMPLES   numero di ricampionamenti B (default 1000)
+"""
+
+import os
+
+import numpy as np
+
+from metrics import MISS_EVENTS, TLB_EVENTS, normalizza_baseline
+
+DEFAULT_RESAMPLES = 1000
+DEFAULT_CONFIDENCE = 0.95
+
+# Seme fisso: stessi dati, stesse barre d'errore (e nessuna figura da rigenerare)
+DEFAULT_SEED = 0
+
+# Bucket per ottava su cui si ricampionano le latenze (~9% di ampiezza: la varianza dentro
+# un bucket è trascurabile rispetto a quella tra le richieste) ed elementi
+# (B x celle x bucket) estratti per blocco
+_OCTAVE_BINS = 8
+_BLOCK_ITEMS = 4_000_000
+
+# --------------------------------------------------------------------------------
+# 1) RICAMPIONAMENTI
+# --------------------------------------------------------------------------------
+
+def resamples_from_env():
+    """Numero di ricampionamenti da BOOTSTRAP_RESAMPLES, default DEFAULT_RESAMPLES."""
+    value = os.environ.get('BOOTSTRAP_RESAMPLES', '').strip()
+    return max(1, int(value)) if value else DEFAULT_RESAMPLES
+
+
+def bootstrap_perf(values, variance_pct, resamples=DEFAULT_RESAMPLES, rng=None):
+    """
+    Medie ricampionate dei contatori perf: array (B,) + values.shape da media e deviazione
+    standard della media in % (variance del cubo). Negativi portati a 0, NaN senza varianza.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    values = np.asarray(values, dtype=np.float64)
+    sigma = values * np.asarray(variance_pct, dtype=np.float64) / 100.0
+    noise = rng.standard_normal((resamples,) + values.shape)
+    return np.maximum(values + sigma * noise, 0.0)
+
+
+def _supporto_grosso(sketch):
+    """
+    (valori, probabilità) dello sketch su bucket di 1/_OCTAVE_BINS di ottava: ogni bucket
+    vale la media pesata dei suoi valori, quindi la media del campione non cambia.
+    """
+    values, frac = sketch.cdf()
+    probs = np.diff(frac, prepend=0.0)
+    idx = np.floor(np.log2(np.maximum(values, 1.0)) * _OCTAVE_BINS).astype(np.int64)
+    _, inverse = np.unique(idx, return_inverse=True)
+    coarse = np.bincount(inverse, probs)
+    return np.bincount(inverse, probs * values) / coarse, coarse
+
+
+def bootstrap_sketch(sketches, resamples=DEFAULT_RESAMPLES, rng=None):
+    """
+    Medie delle latenze ricampionate, array (B, celle), da una sequenza di sketch (None o
+    vuoti danno NaN). Bootstrap di Poisson: ogni bucket riceve Poisson(n * p) richieste,
+    n = richieste della cella; tutte le celle insieme, a blocchi di B.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    out = np.full((resamples, len(sketches)), np.nan)
+    cells = [i for i, sketch in enumerate(sketches) if sketch is not None and sketch.count]
+    if not cells:
+        return out
+
+    supports = [_supporto_grosso(sketches[i]) for i in cells]
+    width = max(len(support) for support, _ in supports)
+    values = np.zeros((len(cells), width))
+    expected = np.zeros((len(cells), width))
+    for row, ((support, probs), i) in enumerate(zip(supports, cells)):
+        values[row, :len(support)] = support
+        expected[row, :len(support)] = probs * sketches[i].count
+
+    block = max(1, _BLOCK_ITEMS // (len(cells) * width))
+    for start in range(0, resamples, block):
+        stop = min(start + block, resamples)
+        draws = rng.poisson(expected, size=(stop - start, len(cells), width))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[start:stop, cells] = np.einsum('bck,ck->bc', draws, values) / draws.sum(axis=2)
+    return out
+
+# --------------------------------------------------------------------------------
+# 2) INTERVALLI
+# --------------------------------------------------------------------------------
+
+def intervallo_rapporti(boot, scenario_labels, baseline='1S', confidence=DEFAULT_CONFIDENCE):
+    """
+    (lo, hi) dei rapporti con il baseline: boot ha forma (B, scenario, ...), come le
+    metriche norm_* con l'asse B davanti. Intervallo dei percentili; NaN per le celle
+    con ricampionamenti NaN.
+    """
+    ratios = normalizza_baseline(boot, scenario_labels, baseline, axis=1)
+    alpha = (1.0 - confidence) / 2.0
+    valid = ~np.isnan(ratios).any(axis=0)
+    lo = np.full(ratios.shape[1:], np.nan)
+    hi = np.full(ratios.shape[1:], np.nan)
+    if valid.any():
+        q = np.quantile(ratios[:, valid], [alpha, 1.0 - alpha], axis=0)
+        lo[valid], hi[valid] = q
+    return lo, hi
+
+
+def barre_errore(point, interval):
+    """
+    yerr per matplotlib (2, ...) da valore puntuale e (lo, hi): distanze non negative,
+    0 dove l'intervallo manca.
+    """
+    lo, hi = interval
+    err = np.stack([point - lo, hi - point])
+    return np.nan_to_num(np.maximum(err, 0.0), nan=0.0)
+
+# --------------------------------------------------------------------------------
+# 3) CAMPAGNA
+# --------------------------------------------------------------------------------
+
+def intervalli_campagna(cube, sketches, scenario_labels, sizes, baseline='1S', resamples=None,
+                        confidence=DEFAULT_CONFIDENCE, seed=DEFAULT_SEED):
+    """
+    Intervalli (lo, hi) delle metriche normalizzate dei grafici: norm_misses e
+    norm_tlb_misses (scenario x size x livello) dai contatori del cubo, norm_time_us
+    (scenario x size) dagli sketch {(scenario, size): sketch} di carica_sketch_latenze.
+    """
+    resamples = resamples if resamples is not None else resamples_from_env()
+    rng = np.random.default_rng(seed)
+    cube = cube.sel(scenario=scenario_labels)
+
+    intervals = {}
+    for name, events in (('norm_misses', MISS_EVENTS), ('norm_tlb_misses', TLB_EVENTS)):
+        sub = cube.reindex(event=list(events))
+        boot = bootstrap_perf(sub.sel(stat='value').values, sub.sel(stat='variance').values, resamples, rng)
+        intervals[name] = intervallo_rapporti(boot, scenario_labels, baseline, confidence)
+
+    cells = [(scenario, size) for scenario in scenario_labels for size in sizes]
+    boot = bootstrap_sketch([sketches.get(cell) for cell in cells], resamples, rng)
+    intervals['norm_time_us'] = intervallo_rapporti(boot.reshape(resamples, len(scenario_labels), len(sizes)),
+                                                    scenario_labels, baseline, confidence)
+    return intervals
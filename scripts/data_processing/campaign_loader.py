@@ -0,0 +1,66 @@
+"""
+Lettura (anche concorrente) dei file di una campagna di misure: map_paths è il ciclo
+comune a scenario_grid, campaign_store, perf_record e dashboard.
+
+Su share NFS la latenza di open/stat domina, quindi i file vengono letti da un pool di
+thread; con processes=True il parsing viene invece distribuito su un pool di processi.
+In entrambi i casi il risultato ha sempre lo stesso ordine dei path in input.
+
+Variabili d'ambiente:
+    CAMPAIGN_WORKERS     numero di worker (default: min(32, CPU + 4); 1 = seriale)
+    CAMPAIGN_PROCESSES   1 per usare il pool di processi invece dei thread
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# --------------------------------------------------------------------------------
+# 1) WORKER
+# --------------------------------------------------------------------------------
+
+def default_workers():
+    """Numero di worker da CAMPAIGN_WORKERS, altrimenti lo stesso default di ThreadPoolExecutor."""
+    env = os.environ.get('CAMPAIGN_WORKERS')
+    if env:
+        return max(1, int(env))
+    return min(32, (os.cpu_count() or 1) + 4)
+
+# --------------------------------------------------------------------------------
+# 2) ESECUZIONE
+# --------------------------------------------------------------------------------
+
+def _parse_chunk(parse, paths):
+    """Eseguita nei processi figli: un blocco di file per task, poi flush della cache."""
+    out = [parse(p) for p in paths]
+    parse_cache = sys.modules.get('parse_cache')
+    if parse_cache is not None:
+        # I figli del pool non eseguono atexit: le nuove voci vanno scritte qui
+        parse_cache.flush()
+    return out
+
+
+def map_paths(parse, paths, workers=None, processes=None):
+    """
+    Applica parse a ogni path mantenendo l'ordine. workers=1 esegue in serie;
+    con processes=True parse deve essere una funzione di modulo (picklable).
+    """
+    if workers is None:
+        workers = default_workers()
+    if processes is None:
+        processes = os.environ.get('CAMPAIGN_PROCESSES') == '1'
+    paths = list(paths)
+    if workers <= 1 or len(paths) <= 1:
+        return [parse(p) for p in paths]
+
+    if not processes:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(parse, paths))
+
+    # Blocchi abbastanza grandi da ammortizzare il pickling, abbastanza piccoli da bilanciare
+    chunk = max(1, len(paths) // (workers * 4))
+    chunks = [paths[i:i + chunk] for i in range(0, len(paths), chunk)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(_parse_chunk, [parse] * len(chunks), chunks)
+        return [value for block in results for value in block]
+
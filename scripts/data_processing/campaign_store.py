@@ -0,0 +1,331 @@
+"""
+Archivio colonnare di una o più campagne in un solo file.
+
+Invece di ri-scandire ogni volta l'albero
+    <root>/Analysis Matrix Multiplication/Single Core/2 Active Server/perf_results_matrix_cache_misses/...
+il convertitore legge una volta tutte le celle (entrambi i server, single/multi core,
+1S/2S/3S o i numeri di server dati con --servers, ogni frequenza di disturbo, ogni
+dimensione, ogni evento) e le salva in formato "lungo",
+una riga per (campagna, server, core, scenario, size, sorgente, evento):
+
+    campaign  server  core_mode  n_servers  freq  scenario  size  source  event  value  variance
+
+`variance` è la deviazione standard tra le ripetizioni (`perf stat -r`) in % della media,
+NaN dove non c'è. I metadati (radici, data, versione del parser) sono un dict JSON.
+
+Con pyarrow installato si può scrivere un file .parquet, altrimenti (o con estensione
+.npz) un .npz con le colonne di testo codificate a dizionario. Caricare un archivio
+richiede pochi millisecondi; archivi di campagne diverse si uniscono con merge_stores
+e si confrontano filtrando sulla colonna `campaign`.
+
+Uso:
+    python3 campaign_store.py build <out.npz|out.parquet> <root> [<root> ...] [--name NOME ...] [--servers 1,2,3]
+    python3 campaign_store.py info <archivio>
+
+Gli script di plot leggono dall'archivio indicato in CAMPAIGN_STORE invece che dalle directory.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+from campaign_loader import map_paths
+from parse_cache import load_perf_record_cached, parse_execution_log_cached, request_stats_cached
+from perf_parser import PARSER_VERSION, tlb_levels, tlb_levels_variance
+from request_log import REQUEST_EVENTS, window_from_env
+from result_index import get_index
+from result_io import open_result
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+STORE_VERSION = 1
+
+# Layout standard delle campagne di laboratorio
+SERVERS = {'matrix': 'Analysis Matrix Multiplication', 'table': 'Analysis Table Generator'}
+CORE_MODES = {'single': 'Single Core', 'multi': 'Multi Core'}
+SOURCE_DIRS = {
+    'cache': 'perf_results_{server}_cache_misses',
+    'tlb':   'perf_results_{server}_tlb_misses',
+    'time':  'perf_{server}_results_time',
+}
+N_SERVERS = (1, 2, 3)
+
+# Eventi salvati per ogni sorgente (campi di PerfStat, più i livelli dTLB derivati)
+SOURCE_EVENTS = {
+    'cache': ('l1_miss', 'l2_miss', 'l3_miss', 'l1_hit', 'l2_hit', 'l3_hit',
+              'instructions', 'context_switches', 'elapsed'),
+    'tlb':   ('dtlb_load_stlb_hit', 'dtlb_load_walk', 'dtlb_store_stlb_hit', 'dtlb_store_walk',
+              'tlb_l1_miss', 'tlb_l2_miss', 'context_switches', 'elapsed'),
+    'time':  ('avg_time_us', 'n_requests') + REQUEST_EVENTS,
+}
+
+# Tipi di file (result_index) letti per ogni sorgente, in ordine di preferenza: se una cella
+# TLB ha sia tlb_misses_* sia misses_* si legge solo tlb_misses_*. Gli interval_misses restano fuori
+_SOURCE_KINDS = {'cache': ('misses',), 'tlb': ('tlb_misses', 'misses'), 'time': None}
+
+TEXT_COLUMNS = ('campaign', 'server', 'core_mode', 'freq', 'scenario', 'source', 'event')
+COLUMNS = ('campaign', 'server', 'core_mode', 'n_servers', 'freq', 'scenario', 'size',
+           'source', 'event', 'value', 'variance')
+_DTYPES = {'n_servers': np.int8, 'size': np.int64, 'value': np.float64, 'variance': np.float64}
+
+CampaignStore = namedtuple('CampaignStore', ['columns', 'metadata'])
+CampaignStore.__doc__ = "Colonne (dict nome -> ndarray, tutte della stessa lunghezza) e metadati."
+
+# --------------------------------------------------------------------------------
+# 1) LETTURA DELLE CELLE
+# --------------------------------------------------------------------------------
+
+def campaign_dirs(root, n_servers=N_SERVERS):
+    """
+    Directory del layout standard sotto root per i numeri di server indicati:
+    lista di (server, core_mode, n_servers, sorgente, directory).
+    """
+    dirs = []
+    for server, server_dir in SERVERS.items():
+        for core_mode, core_dir in CORE_MODES.items():
+            for n in n_servers:
+                for source, source_dir in SOURCE_DIRS.items():
+                    path = os.path.join(root, server_dir, core_dir, f"{n} Active Server",
+                                        source_dir.format(server=server))
+                    dirs.append((server, core_mode, n, source, path))
+    return dirs
+
+
+def _cell_records(task):
+    """Eseguita (anche in un pool): ritorna [(evento, valore, varianza)] di una cella."""
+    source, path = task
+    if source == 'time':
+        avg_time, n_requests = parse_execution_log_cached(path)
+        stats = request_stats_cached(path, window_from_env())
+        return ([('avg_time_us', avg_time, np.nan), ('n_requests', float(n_requests), np.nan)]
+                + [(event, value, np.nan) for event, value in zip(REQUEST_EVENTS, stats)])
+
+    # Contatori e varianze con una sola lettura del file
+    record = load_perf_record_cached(path)
+    counters, variances = record.counters(), record.variances()
+    values, var = counters._asdict(), variances._asdict()
+    if source == 'tlb':
+        values['tlb_l1_miss'], values['tlb_l2_miss'] = tlb_levels(counters)
+        var['tlb_l1_miss'], var['tlb_l2_miss'] = tlb_levels_variance(counters, variances)
+    return [(event, values[event], var.get(event, np.nan)) for event in SOURCE_EVENTS[source]]
+
+
+def ingest_dirs(dirs, campaign, workers=None, processes=None):
+    """
+    Legge tutte le celle presenti nelle directory indicate come
+    [(server, core_mode, n_servers, sorgente, directory)] e ritorna le colonne.
+    """
+    cells = []
+    for server, core_mode, n_servers, source, dir_path in dirs:
+        kinds = _SOURCE_KINDS[source]
+        # Un solo file per (size, freq): il tipo preferito in _SOURCE_KINDS
+        chosen = {}
+        for (kind, size, freq), path in get_index(dir_path).items():
+            if kind == 'interval_misses':
+                continue
+            if kinds is not None and kind not in kinds:
+                continue
+            if kinds is None and not kind.startswith('execution_time_'):
+                continue
+            if (n_servers == 1) != (freq is None):
+                continue
+            rank = kinds.index(kind) if kinds is not None else 0
+            if (size, freq) not in chosen or rank < chosen[size, freq][0]:
+                chosen[size, freq] = (rank, path)
+        for (size, freq), (_, path) in sorted(chosen.items(), key=lambda kv: (kv[0][0], kv[0][1] or '')):
+            cells.append((server, core_mode, n_servers, freq or '', source, size, path))
+
+    records = map_paths(_cell_records, [(c[4], c[6]) for c in cells], workers, processes)
+
+    rows = {name: [] for name in COLUMNS}
+    for (server, core_mode, n_servers, freq, source, size, _), cell in zip(cells, records):
+        scenario = '1S' if n_servers == 1 else f"{n_servers}S_{freq}"
+        for event, value, variance in cell:
+            for name, v in (('campaign', campaign), ('server', server), ('core_mode', core_mode),
+                            ('n_servers', n_servers), ('freq', freq), ('scenario', scenario),
+                            ('size', size), ('source', source), ('event', event),
+                            ('value', value), ('variance', variance)):
+                rows[name].append(v)
+    return _as_columns(rows)
+
+
+def ingest_campaign(root, campaign=None, workers=None, processes=None, n_servers=N_SERVERS):
+    """Legge una campagna col layout standard (root può essere anche un archivio .tar / .zip)."""
+    if campaign is None:
+        campaign = os.path.basename(os.path.normpath(root))
+    return ingest_dirs(campaign_dirs(root, n_servers), campaign, workers, processes)
+
+
+def build_store(roots, names=None, workers=None, processes=None, n_servers=N_SERVERS):
+    """Un CampaignStore con le campagne sotto le radici indicate."""
+    names = list(names) if names else [os.path.basename(os.path.normpath(root)) for root in roots]
+    parts = [ingest_campaign(root, name, workers, processes, n_servers) for root, name in zip(roots, names)]
+    metadata = {
+        'store_version': STORE_VERSION,
+        'parser_version': PARSER_VERSION,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'campaigns': {name: {'root': os.path.abspath(root)} for name, root in zip(names, roots)},
+        'events': {source: list(events) for source, events in SOURCE_EVENTS.items()},
+    }
+    return CampaignStore(_concat(parts), metadata)
+
+# --------------------------------------------------------------------------------
+# 2) COLONNE
+# --------------------------------------------------------------------------------
+
+def _as_columns(rows):
+    columns = {}
+    for name in COLUMNS:
+        if name in TEXT_COLUMNS:
+            columns[name] = np.array(rows[name], dtype=str)
+        else:
+            columns[name] = np.array(rows[name], dtype=_DTYPES[name])
+    return columns
+
+
+def _concat(parts):
+    if not parts:
+        return _as_columns({name: [] for name in COLUMNS})
+    return {name: np.concatenate([part[name] for part in parts]) for name in COLUMNS}
+
+
+def merge_stores(*stores):
+    """Unisce più archivi (es. campagne diverse) in uno solo."""
+    metadata = dict(stores[0].metadata)
+    metadata['campaigns'] = {}
+    for store in stores:
+        metadata['campaigns'].update(store.metadata.get('campaigns', {}))
+    return CampaignStore(_concat([store.columns for store in stores]), metadata)
+
+# --------------------------------------------------------------------------------
+# 3) SALVATAGGIO E CARICAMENTO (.parquet con pyarrow, altrimenti .npz)
+# --------------------------------------------------------------------------------
+
+def save_store(file_path, store):
+    """Salva l'archivio: .parquet (richiede pyarrow) oppure .npz."""
+    meta = json.dumps(store.metadata)
+    if file_path.endswith('.parquet'):
+        if pyarrow is None:
+            raise ImportError("per scrivere un archivio .parquet serve il pacchetto 'pyarrow'")
+        table = pyarrow.table({name: store.columns[name] for name in COLUMNS})
+        table = table.replace_schema_metadata({b'campaign_store': meta.encode('utf-8')})
+        pyarrow.parquet.write_table(table, file_path, use_dictionary=list(TEXT_COLUMNS),
+                                    compression='zstd')
+        return
+
+    # Le colonne di testo si ripetono moltissimo: codici int32 + etichette
+    arrays = {'metadata': np.array(meta)}
+    for name in COLUMNS:
+        col = store.columns[name]
+        if name in TEXT_COLUMNS:
+            labels, codes = np.unique(col, return_inverse=True)
+            arrays[name + '.labels'] = labels
+            arrays[name + '.codes'] = codes.astype(np.int32)
+        else:
+            arrays[name] = col
+    np.savez_compressed(file_path, **arrays)
+
+
+def load_store(file_path):
+    """Carica un archivio scritto da save_store."""
+    if file_path.endswith('.parquet'):
+        if pyarrow is None:
+            raise ImportError("per leggere un archivio .parquet serve il pacchetto 'pyarrow'")
+        table = pyarrow.parquet.read_table(file_path)
+        meta = (table.schema.metadata or {}).get(b'campaign_store', b'{}')
+        columns = {}
+        for name in COLUMNS:
+            col = table.column(name).to_numpy()
+            columns[name] = col.astype(str) if name in TEXT_COLUMNS else col.astype(_DTYPES[name])
+        return CampaignStore(columns, json.loads(meta))
+
+    with open_result(file_path, 'rb') as f, np.load(f) as npz:
+        columns = {}
+        for name in COLUMNS:
+            if name in TEXT_COLUMNS:
+                columns[name] = npz[name + '.labels'][npz[name + '.codes']]
+            else:
+                columns[name] = npz[name]
+        return CampaignStore(columns, json.loads(str(npz['metadata'])))
+
+
+def open_store_from_env():
+    """
+    Archivio indicato da CAMPAIGN_STORE, oppure None (gli script leggono le directory).
+    Se l'archivio contiene più campagne, CAMPAIGN_NAME sceglie quella da usare.
+    """
+    file_path = os.environ.get('CAMPAIGN_STORE')
+    if not file_path:
+        return None
+    store = load_store(file_path)
+    name = os.environ.get('CAMPAIGN_NAME')
+    if name:
+        store = CampaignStore(select(store, campaign=name), store.metadata)
+    return store
+
+# --------------------------------------------------------------------------------
+# 4) INTERROGAZIONE
+# --------------------------------------------------------------------------------
+
+def select(store, **filters):
+    """
+    Righe che soddisfano tutti i filtri (colonna=valore oppure colonna=[valori]).
+    Ritorna un dict di colonne, es. select(store, server='matrix', event='l3_miss').
+    """
+    mask = np.ones(len(store.columns['value']), dtype=bool)
+    for name, wanted in filters.items():
+        col = store.columns[name]
+        if isinstance(wanted, (list, tuple, set, np.ndarray)):
+            mask &= np.isin(col, list(wanted))
+        else:
+            mask &= col == wanted
+    return {name: col[mask] for name, col in store.columns.items()}
+
+# --------------------------------------------------------------------------------
+# 5) MAIN
+# --------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Archivio colonnare delle campagne di misura.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_build = sub.add_parser('build', help="converte una o più campagne in un archivio")
+    p_build.add_argument('output', help="file .npz oppure .parquet (richiede pyarrow)")
+    p_build.add_argument('roots', nargs='+', help="radici delle campagne (directory o archivi .tar / .zip)")
+    p_build.add_argument('--name', action='append', help="nome della campagna (uno per radice)")
+    p_build.add_argument('--servers', default=",".join(map(str, N_SERVERS)),
+                         help="numeri di server attivi da leggere, es. 1,2,3,4 (default %(default)s)")
+    p_info = sub.add_parser('info', help="riassunto di un archivio")
+    p_info.add_argument('store')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        if args.name and len(args.name) != len(args.roots):
+            print("Serve un --name per ogni radice.")
+            sys.exit(1)
+        store = build_store(args.roots, args.name, n_servers=[int(n) for n in args.servers.split(',')])
+        save_store(args.output, store)
+        print(f"{len(store.columns['value'])} righe salvate in {args.output}")
+        return
+
+    store = load_store(args.store)
+    cols = store.columns
+    print(f"{len(cols['value'])} righe, creato {store.metadata.get('created', '?')}")
+    for campaign in np.unique(cols['campaign']):
+        rows = select(store, campaign=campaign)
+        cells = {(s, c, sc, sz, src) for s, c, sc, sz, src in zip(rows['server'], rows['core_mode'],
+                 rows['scenario'], rows['size'], rows['source'])}
+        print(f"  {campaign}: {len(cells)} celle, server {', '.join(np.unique(rows['server']))}, "
+              f"core {', '.join(np.unique(rows['core_mode']))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Compatta sul posto una campagna conclusa: ogni file di risultato riconosciuto da
+result_index viene compresso (.gz di default, oppure .xz / .zst) e l'originale rimosso
+solo dopo aver verificato che la copia compressa si rilegge identica.
+
+Con --binary i risultati `perf stat` diventano file .pstat (un float64 per contatore,
+per la sua varianza e per il suo multiplexing)
+e le serie a intervalli diventano .npz; i log di send_request vengono solo compressi.
+I loader (perf_parser, perf_interval, result_index) leggono tutti questi formati.
+
+Uso:
+    python3 compact_campaign.py <directory> [--codec gz|xz|zst] [--binary] [--dry-run]
+"""
+
+import argparse
+import math
+import os
+import shutil
+import sys
+
+from perf_interval import load_interval_series, load_interval_npz, save_interval_npz
+from perf_parser import parse_perf_binary_stats, write_perf_binary
+from perf_record import load_perf_record
+from result_index import parse_result_name
+from result_io import COMPRESSED_EXTENSIONS, compress_file, read_result_bytes
+
+TEXT_EXTENSIONS = ('.txt', '.csv', '.json')
+
+# --------------------------------------------------------------------------------
+# 1) CONVERSIONI (scrivono su un file temporaneo, verificano, poi rinominano)
+# --------------------------------------------------------------------------------
+
+def _same_values(a, b):
+    return len(a) == len(b) and all(x == y or (math.isnan(x) and math.isnan(y)) for x, y in zip(a, b))
+
+
+def _finalize(src, tmp, dst):
+    shutil.copystat(src, tmp)
+    os.replace(tmp, dst)
+    os.remove(src)
+
+
+def compatta_perf_binary(path, stem):
+    dst = stem + '.pstat'
+    tmp = dst + '.tmp'
+    record = load_perf_record(path)
+    stats = (record.counters(), record.variances(), record.multiplex())
+    write_perf_binary(tmp, *stats)
+    if not all(_same_values(a, b) for a, b in zip(parse_perf_binary_stats(tmp), stats)):
+        os.remove(tmp)
+        raise ValueError(f"{path}: verifica .pstat fallita")
+    _finalize(path, tmp, dst)
+    return dst
+
+
+def compatta_interval_binary(path, stem):
+    dst = stem + '.npz'
+    tmp = dst + '.tmp'
+    series = load_interval_series(path)
+    with open(tmp, 'wb') as f:
+        save_interval_npz(f, series)
+    check = load_interval_npz(tmp)
+    if check.events != series.events or not (
+            (check.timestamps == series.timestamps).all() and
+            ((check.values == series.values) | (check.values != check.values)).all()):
+        os.remove(tmp)
+        raise ValueError(f"{path}: verifica .npz fallita")
+    _finalize(path, tmp, dst)
+    return dst
+
+
+def compatta_compresso(path, codec):
+    dst = f"{path}.{codec}"
+    tmp = dst + '.tmp'
+    compress_file(path, tmp, codec)
+    with open(path, 'rb') as f:
+        original = f.read()
+    # read_result_bytes sceglie il decompressore dall'estensione: si verifica col nome finale
+    os.replace(tmp, dst)
+    if read_result_bytes(dst) != original:
+        os.remove(dst)
+        raise ValueError(f"{path}: verifica {codec} fallita")
+    shutil.copystat(path, dst)
+    os.remove(path)
+    return dst
+
+# --------------------------------------------------------------------------------
+# 2) CAMPAGNA
+# --------------------------------------------------------------------------------
+
+def azione(file_name, binary):
+    """Cosa fare di un file: 'pstat', 'npz', 'compress' oppure None (già compatto / non risultato)."""
+    parsed = parse_result_name(file_name)
+    if parsed is None:
+        return None
+    (kind, _, _), ext = parsed
+    if ext not in TEXT_EXTENSIONS:
+        return None
+    if binary and kind in ('misses', 'tlb_misses'):
+        return 'pstat'
+    if binary and kind == 'interval_misses' and ext == '.csv':
+        return 'npz'
+    return 'compress'
+
+
+def compatta_campagna(root, codec='gz', binary=False, dry_run=False):
+    """Compatta ricorsivamente root. Ritorna (file convertiti, byte prima, byte dopo)."""
+    n_files = before = after = 0
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in sorted(file_names):
+            action = azione(file_name, binary)
+            if action is None:
+                continue
+            path = os.path.join(dir_path, file_name)
+            size = os.path.getsize(path)
+            if dry_run:
+                print(f"{action:8s} {path}")
+                n_files += 1
+                before += size
+                continue
+            stem = os.path.splitext(path)[0]
+            if action == 'pstat':
+                dst = compatta_perf_binary(path, stem)
+            elif action == 'npz':
+                dst = compatta_interval_binary(path, stem)
+            else:
+                dst = compatta_compresso(path, codec)
+            n_files += 1
+            before += size
+            after += os.path.getsize(dst)
+    return n_files, before, after
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compatta sul posto una campagna di risultati.")
+    parser.add_argument('directory')
+    parser.add_argument('--codec', choices=[c.lstrip('.') for c in COMPRESSED_EXTENSIONS], default='gz')
+    parser.add_argument('--binary', action='store_true',
+                        help="converte i risultati perf stat in .pstat e le serie a intervalli in .npz")
+    parser.add_argument('--dry-run', action='store_true', help="elenca soltanto i file da compattare")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        print(f"Directory non trovata: {args.directory}")
+        sys.exit(1)
+
+    n_files, before, after = compatta_campagna(args.directory, args.codec, args.binary, args.dry_run)
+    if args.dry_run:
+        print(f"{n_files} file da compattare ({before / 1e6:.2f} MB)")
+    elif n_files:
+        print(f"{n_files} file compattati: {before / 1e6:.2f} MB -> {after / 1e6:.2f} MB "
+              f"({before / max(after, 1):.1f}x)")
+    else:
+        print("Niente da compattare.")
+
+
+if __name__ == "__main__":
+    main()
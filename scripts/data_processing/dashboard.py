@@ -0,0 +1,344 @@
+"""
+Dashboard HTML offline di una campagna: le metriche dei grafici a barre (MetricGraph) e le
+serie temporali `perf stat -I` (perf_interval.py) in una sola pagina, senza server e
+senza librerie esterne.
+
+Le serie a intervalli possono avere milioni di campioni: nella pagina entra soltanto una
+panoramica di al più `punti` campioni per evento, ridotta qui con min-max (minimo e
+massimo di ogni bucket, nessun picco transitorio va perso) oppure LTTB (Largest Triangle
+Three Buckets, conserva la forma della curva). Per lo zoom la serie è divisa in una
+piramide di tile: il livello k ha fanout**k tile, ognuno ridotto allo stesso budget di
+punti, finché un tile non contiene meno punti del budget (da lì i dati sono quelli
+grezzi). I tile sono file .js accanto alla pagina (<nome>_tiles/), caricati con un tag
+<script> quando lo zoom li richiede, così la pagina funziona anche aperta da file://.
+
+La riduzione è vettoriale su tutti i tile di un livello e su tutti gli eventi insieme:
+il ciclo Python è sui bucket del budget, non sui tile né sui campioni.
+
+Uso:
+    python3 dashboard.py "<root>" matrix_single.html --server matrix --core single
+    python3 dashboard.py "<root>" table_multi.html --server table --core multi --metodo lttb --punti 2000
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+from functools import partial
+
+import numpy as np
+
+from campaign_loader import map_paths
+from campaign_store import CORE_MODES, N_SERVERS, SERVERS, open_store_from_env
+from metrics import MetricGraph
+from perf_interval import load_interval_series
+from result_index import get_index
+from scenario_grid import (FREQS, carica_griglia, celle_intervalli, grid_dirs, grid_from_env,
+                           grid_scenario_labels, make_grid, scenario_legend, standard_layout)
+
+METODI = ('minmax', 'lttb')
+DEFAULT_METODO = 'minmax'
+
+# Punti per evento della panoramica e di ogni tile: circa uno per pixel del grafico
+DEFAULT_POINTS = 1000
+
+# Tile per livello rispetto al precedente e livelli di zoom oltre la panoramica
+DEFAULT_FANOUT = 4
+DEFAULT_LEVELS = 4
+
+# Campioni (bucket x larghezza x eventi) elaborati per blocco dal min-max
+_BLOCK_ITEMS = 4_000_000
+
+_TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dashboard_template.html')
+
+# Viste a barre: metrica di MetricGraph, titolo, nomi dei livelli (None per scenario x size)
+_VISTE = (
+    ('misses', "Cache miss", ('L1', 'L2', 'L3')),
+    ('norm_misses', "Cache miss (rapporto con {baseline})", ('L1', 'L2', 'L3')),
+    ('miss_rate', "Miss rate (%)", ('L1', 'L2', 'L3')),
+    ('tlb_misses', "TLB miss", ('L1', 'L2')),
+    ('norm_tlb_misses', "TLB miss (rapporto con {baseline})", ('L1', 'L2')),
+    ('time_us', "Tempo medio per richiesta (us)", None),
+    ('norm_time_us', "Tempo medio (rapporto con {baseline})", None),
+    ('throughput', "Throughput (richieste/s)", None),
+)
+
+# --------------------------------------------------------------------------------
+# 1) RIDUZIONE DEI PUNTI
+# --------------------------------------------------------------------------------
+
+def segmenti(n, n_tiles):
+    """(starts, stops) di n_tiles segmenti contigui di n campioni, lunghi al più 1 di differenza."""
+    bounds = np.arange(n_tiles + 1, dtype=np.int64) * n // n_tiles
+    return bounds[:-1], bounds[1:]
+
+
+def _bucket(starts, stops, n_buckets):
+    """Confini (segmenti, n_buckets + 1) di n_buckets bucket per segmento, tutti non vuoti."""
+    frac = np.arange(n_buckets + 1, dtype=np.int64)
+    return starts[:, None] + frac * (stops - starts)[:, None] // n_buckets
+
+
+def _finestre(edges):
+    """Indici (bucket, larghezza massima) dei campioni di ogni bucket e maschera di validità."""
+    lo, hi = edges[:, :-1].ravel(), edges[:, 1:].ravel()
+    width = int((hi - lo).max())
+    idx = lo[:, None] + np.arange(width)
+    valid = idx < hi[:, None]
+    return np.where(valid, idx, lo[:, None]), valid
+
+
+def indici_minmax(y, starts, stops, n_out):
+    """
+    Min-max: per ogni segmento n_out // 2 bucket, di ognuno l'indice del minimo e del
+    massimo in ordine di tempo. y: (campioni, eventi); ritorna (segmenti, punti, eventi).
+    I NaN sono ignorati (un bucket tutto NaN dà il suo primo campione).
+    """
+    n_buckets = max(1, n_out // 2)
+    edges = _bucket(starts, stops, n_buckets)
+    lo, hi = edges[:, :-1].ravel(), edges[:, 1:].ravel()
+    n_events = y.shape[1]
+    out = np.empty((len(lo), 2, n_events), dtype=np.int64)
+
+    width = int((hi - lo).max())
+    block = max(1, _BLOCK_ITEMS // (width * n_events))
+    for start in range(0, len(lo), block):
+        idx, valid = _finestre(np.stack([lo[start:start + block], hi[start:start + block]], axis=1))
+        values = y[idx]
+        missing = ~valid[..., None] | np.isnan(values)
+        k_min = np.where(missing, np.inf, values).argmin(axis=1)
+        k_max = np.where(missing, -np.inf, values).argmax(axis=1)
+        i_min = np.take_along_axis(idx, k_min, axis=1)
+        i_max = np.take_along_axis(idx, k_max, axis=1)
+        out[start:start + block, 0] = np.minimum(i_min, i_max)
+        out[start:start + block, 1] = np.maximum(i_min, i_max)
+    return out.reshape(len(starts), 2 * n_buckets, n_events)
+
+
+def _medie_bucket(x, y, edges):
+    """Medie di x (segmenti, bucket) e di y (segmenti, bucket, eventi) per bucket, senza i NaN."""
+    lo, hi = edges[:, :-1], edges[:, 1:]
+    cx = np.concatenate([[0.0], np.cumsum(x)])
+    finite = ~np.isnan(y)
+    cy = np.concatenate([np.zeros((1, y.shape[1])), np.cumsum(np.where(finite, y, 0.0), axis=0)])
+    cn = np.concatenate([np.zeros((1, y.shape[1])), np.cumsum(finite, axis=0)])
+    mean_x = (cx[hi] - cx[lo]) / (hi - lo)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_y = (cy[hi] - cy[lo]) / (cn[hi] - cn[lo])
+    return mean_x, mean_y
+
+
+def indici_lttb(x, y, starts, stops, n_out):
+    """
+    LTTB su tutti i segmenti ed eventi insieme: primo e ultimo campione di ogni segmento
+    più, per ognuno degli n_out - 2 bucket interni, il campione che forma il triangolo
+    più grande con il punto scelto prima e la media del bucket dopo. y: (campioni,
+    eventi); ritorna (segmenti, n_out, eventi). Ogni segmento deve avere almeno n_out campioni.
+    """
+    n_events = y.shape[1]
+    n_buckets = n_out - 2
+    edges = _bucket(starts + 1, stops - 1, n_buckets)
+    mean_x, mean_y = _medie_bucket(x, y, edges)
+    last = stops - 1
+    # Il "bucket dopo" dell'ultimo bucket interno è l'ultimo campione del segmento
+    next_x = np.concatenate([mean_x[:, 1:], x[last][:, None]], axis=1)
+    next_y = np.concatenate([mean_y[:, 1:], y[last][:, None, :]], axis=1)
+
+    out = np.empty((len(starts), n_out, n_events), dtype=np.int64)
+    out[:, 0] = starts[:, None]
+    out[:, -1] = last[:, None]
+    prev = out[:, 0]
+    for b in range(n_buckets):
+        idx, valid = _finestre(edges[:, b:b + 2])
+        ax, ay = x[prev][:, None, :], y[prev, np.arange(n_events)][:, None, :]
+        px, py = x[idx][:, :, None], y[idx]
+        cx, cy = next_x[:, b, None, None], next_y[:, b, None, :]
+        area = np.abs((ax - cx) * (py - ay) - (ax - px) * (cy - ay))
+        area = np.where(valid[..., None] & ~np.isnan(area), area, -1.0)
+        prev = np.take_along_axis(idx, area.argmax(axis=1), axis=1)
+        out[:, b + 1] = prev
+    return out
+
+
+def riduci(x, y, starts, stops, n_out, metodo=DEFAULT_METODO):
+    """
+    Indici (segmenti, punti, eventi) dei campioni da tenere di ogni segmento, oppure None
+    se tutti i segmenti stanno già nel budget (si usano i campioni grezzi).
+    """
+    if metodo not in METODI:
+        raise ValueError(f"metodo sconosciuto: {metodo!r} (attesi {METODI})")
+    if int((stops - starts).max()) <= n_out:
+        return None
+    if metodo == 'lttb':
+        return indici_lttb(x, y, starts, stops, max(3, n_out))
+    return indici_minmax(y, starts, stops, n_out)
+
+# --------------------------------------------------------------------------------
+# 2) PIRAMIDE DI TILE
+# --------------------------------------------------------------------------------
+
+def _payload(x, y, start, stop, idx):
+    """
+    Tile per la pagina: {'t': [tempi per evento], 'y': [valori per evento]}; con i
+    campioni grezzi i tempi sono gli stessi per tutti gli eventi e sono scritti una volta
+    sola, come {'tc': tempi, 'y': [...]}.
+    """
+    if idx is None:
+        return {'tc': np.round(x[start:stop], 6).tolist(),
+                'y': [y[start:stop, e].tolist() for e in range(y.shape[1])]}
+    return {'t': [np.round(x[idx[:, e]], 6).tolist() for e in range(y.shape[1])],
+            'y': [y[idx[:, e], e].tolist() for e in range(y.shape[1])]}
+
+
+def js_literal(value):
+    """value come letterale JavaScript (NaN e Infinity ammessi), sicuro dentro <script>."""
+    return json.dumps(value, separators=(',', ':')).replace('</', '<\\/')
+
+
+def piramide(series, series_id, tile_dir, punti=DEFAULT_POINTS, metodo=DEFAULT_METODO,
+             fanout=DEFAULT_FANOUT, livelli=DEFAULT_LEVELS):
+    """
+    Riduce un IntervalSeries e scrive i tile dei livelli di zoom in tile_dir come
+    <series_id>_<livello>_<tile>.js. Ritorna i metadati per la pagina: eventi, numero di
+    campioni, confini in secondi dei tile di ogni livello e la panoramica (livello 0).
+    """
+    x, y = series.timestamps, series.values
+    n = len(x)
+    meta = {'eventi': list(series.events), 'n': n, 'confini': [], 'panoramica': None}
+    if n == 0:
+        return meta
+
+    for k in range(livelli + 1):
+        starts, stops = segmenti(n, min(fanout ** k, n))
+        idx = riduci(x, y, starts, stops, punti, metodo)
+        meta['confini'].append(np.round(np.append(x[starts], x[-1]), 6).tolist())
+        for i, (start, stop) in enumerate(zip(starts, stops)):
+            payload = _payload(x, y, start, stop, None if idx is None else idx[i])
+            if k == 0:
+                meta['panoramica'] = payload
+                continue
+            with open(os.path.join(tile_dir, f"{series_id}_{k}_{i}.js"), 'w', encoding='utf-8') as f:
+                f.write(f"caricaTile({js_literal(series_id)},{k},{i},{js_literal(payload)});\n")
+        if idx is None:
+            break
+    return meta
+
+
+def _elabora_serie(task, punti, metodo, fanout, livelli):
+    """Eseguita (anche in un pool): legge una serie a intervalli e ne scrive la piramide."""
+    series_id, path, tile_dir = task
+    return piramide(load_interval_series(path), series_id, tile_dir, punti, metodo, fanout, livelli)
+
+
+def id_serie(source, scenario, size):
+    """Identificatore di una serie usabile come nome di file e chiave JavaScript."""
+    return re.sub(r'[^A-Za-z0-9]+', '_', f"{source}_{scenario}_{size}")
+
+# --------------------------------------------------------------------------------
+# 3) PAGINA
+# --------------------------------------------------------------------------------
+
+def viste_barre(metrics, baseline):
+    """Viste a barre della pagina: metrica, titolo, livelli e valori (scenario x size [x livello])."""
+    return [{'metrica': name, 'titolo': title.format(baseline=baseline), 'livelli': levels,
+             'valori': np.asarray(metrics[name], dtype=np.float64).tolist()}
+            for name, title, levels in _VISTE]
+
+
+def scrivi_dashboard(output, title, bars, scenario_labels, legend_map, sizes, series, fanout=DEFAULT_FANOUT):
+    """
+    Scrive la pagina HTML: bars da viste_barre, series {id: metadati di piramide con
+    'sorgente', 'scenario', 'size'}. I tile sono in <output senza estensione>_tiles/.
+    """
+    with open(_TEMPLATE, encoding='utf-8') as f:
+        page = f.read()
+    data = {'titolo': title, 'scenari': list(scenario_labels), 'legenda': legend_map,
+            'sizes': [int(sz) for sz in sizes], 'barre': bars, 'serie': series, 'fanout': fanout}
+    tile_dir = os.path.basename(os.path.splitext(output)[0]) + '_tiles'
+    page = (page.replace('__TITOLO__', title.replace('&', '&amp;').replace('<', '&lt;'))
+                .replace('__TILE_DIR__', js_literal(tile_dir))
+                .replace('__DATI__', js_literal(data)))
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write(page)
+
+
+def esporta_campagna(grid, root, output, punti=DEFAULT_POINTS, metodo=DEFAULT_METODO, fanout=DEFAULT_FANOUT,
+                     livelli=DEFAULT_LEVELS, lingua='it', workers=None, processes=None):
+    """
+    Dashboard di una griglia (scenario_grid.py) sotto root: cubo e metriche come negli
+    script di plot (CAMPAIGN_STORE compreso), serie a intervalli dalle directory della
+    campagna. Ritorna il numero di serie esportate.
+    """
+    scenario_labels = grid_scenario_labels(grid)
+    cube = carica_griglia(grid, root, store=open_store_from_env(), workers=workers, processes=processes)
+    metrics = MetricGraph(cube.sel(scenario=scenario_labels, stat='value'), baseline=scenario_labels[0])
+    bars = viste_barre(metrics, scenario_labels[0])
+
+    tile_dir = os.path.splitext(output)[0] + '_tiles'
+    if os.path.isdir(tile_dir):
+        shutil.rmtree(tile_dir)
+    os.makedirs(tile_dir)
+
+    cells = celle_intervalli(grid, root)
+    tasks = [(id_serie(*key), path, tile_dir) for key, path in cells]
+    metas = map_paths(partial(_elabora_serie, punti=punti, metodo=metodo, fanout=fanout, livelli=livelli),
+                      tasks, workers, processes)
+    series = {}
+    for ((source, scenario, size), _), (series_id, _, _), meta in zip(cells, tasks, metas):
+        meta.update(sorgente=source, scenario=scenario, size=size)
+        series[series_id] = meta
+
+    title = f"{SERVERS[grid.server]} - {CORE_MODES[grid.core_mode]}"
+    scrivi_dashboard(output, title, bars, scenario_labels, scenario_legend(scenario_labels, lingua),
+                     grid.sizes, series, fanout)
+    return len(series)
+
+# --------------------------------------------------------------------------------
+# 4) MAIN
+# --------------------------------------------------------------------------------
+
+def size_campagna(grid, root):
+    """Size presenti nelle directory della griglia sotto root (quando non sono indicate)."""
+    dirs = grid_dirs(grid, standard_layout(root, grid))
+    return sorted({size for paths in dirs.values() for path in paths for (_, size, _) in get_index(path)})
+
+
+def _lista(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard HTML offline di una campagna.")
+    parser.add_argument('root', help="radice delle campagne (layout standard, anche archivio .tar / .zip)")
+    parser.add_argument('output', help="pagina .html da scrivere (i tile vanno in <nome>_tiles/)")
+    parser.add_argument('--server', choices=sorted(SERVERS), required=True)
+    parser.add_argument('--core', choices=sorted(CORE_MODES), required=True)
+    parser.add_argument('--sizes', help="size separate da virgole (default: quelle trovate)")
+    parser.add_argument('--servers', default=",".join(map(str, N_SERVERS)),
+                        help="numeri di server attivi, es. 1,2,3,4 (default %(default)s)")
+    parser.add_argument('--freqs', default=",".join(FREQS), help="frequenze di disturbo (default %(default)s)")
+    parser.add_argument('--punti', type=int, default=DEFAULT_POINTS,
+                        help="punti per evento della panoramica e di ogni tile (default %(default)s)")
+    parser.add_argument('--metodo', choices=METODI, default=DEFAULT_METODO,
+                        help="riduzione delle serie (default %(default)s)")
+    parser.add_argument('--livelli', type=int, default=DEFAULT_LEVELS,
+                        help="livelli di zoom oltre la panoramica (default %(default)s)")
+    parser.add_argument('--lingua', choices=('it', 'en'), default='it', help="lingua delle legende")
+    args = parser.parse_args()
+
+    grid = make_grid(args.server, args.core, (), _lista(args.servers), _lista(args.freqs))
+    sizes = _lista(args.sizes) if args.sizes else size_campagna(grid, args.root)
+    grid = grid_from_env(grid._replace(sizes=tuple(int(sz) for sz in sizes)))
+    if not grid.sizes:
+        print(f"Nessun risultato trovato sotto {args.root}")
+        sys.exit(1)
+
+    n_series = esporta_campagna(grid, args.root, args.output, args.punti, args.metodo, DEFAULT_FANOUT,
+                                args.livelli, args.lingua)
+    print(f"Dashboard scritta in {args.output} ({len(grid.sizes)} size, {n_series} serie a intervalli)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Cubo N-dimensionale etichettato dei risultati di una o più campagne.
+
+Sostituisce i dict annidati data[scenario][size] = (l1, l2, l3): tutti i valori stanno in
+un unico ndarray float64 con assi
+
+    server x core_mode x scenario x size x event x stat
+
+dove stat è 'value' oppure 'variance' (deviazione standard tra le ripetizioni, in %).
+Le celle mancanti valgono NaN. La selezione per etichetta restituisce un nuovo cubo con
+un array contiguo, così normalizzazione, miss rate, throughput e plot lavorano su slice
+intere senza iterare le celle in Python:
+
+    cube = carica_cubo('matrix', 'single', dirs, matrix_sizes, freqs)
+    misses = cube.sel(scenario=scenario_labels, event=MISS_EVENTS, stat='value').values
+    # misses.shape == (n_scenari, n_size, 3)
+
+Un'etichetta scalare elimina l'asse, una lista lo conserva nell'ordine richiesto.
+
+I contatori context_switches ed elapsed esistono sia nei file di cache sia in quelli TLB:
+nel cubo quelli TLB si chiamano tlb_context_switches e tlb_elapsed.
+"""
+
+import numpy as np
+
+from campaign_store import SOURCE_EVENTS, ingest_dirs, select
+
+AXES = ('server', 'core_mode', 'scenario', 'size', 'event', 'stat')
+STATS = ('value', 'variance')
+
+# Eventi che identificano la presenza di una cella per ogni sorgente
+_SOURCE_KEY_EVENT = {'cache': 'l1_miss', 'tlb': 'tlb_l1_miss', 'time': 'avg_time_us'}
+
+# Eventi presenti in più sorgenti: nel cubo quelli TLB prendono il prefisso tlb_
+_SHARED_EVENTS = ('context_switches', 'elapsed')
+
+# --------------------------------------------------------------------------------
+# 1) CUBO
+# --------------------------------------------------------------------------------
+
+class DataCube:
+    """
+    ndarray float64 con un'etichetta per ogni posizione di ogni asse.
+    values: array con ndim == len(axes); coords: {asse: ndarray delle etichette}.
+    """
+
+    __slots__ = ('values', 'axes', 'coords', '_positions')
+
+    def __init__(self, values, axes, coords):
+        # np.asarray e non np.ascontiguousarray, che porterebbe a 1-D la selezione di una sola cella
+        self.values = np.asarray(values, dtype=np.float64, order='C')
+        self.axes = tuple(axes)
+        self.coords = {axis: np.asarray(coords[axis]) for axis in self.axes}
+        self._positions = {}
+        if self.values.shape != tuple(len(self.coords[axis]) for axis in self.axes):
+            raise ValueError(f"forma {self.values.shape} incompatibile con le etichette degli assi {self.axes}")
+
+    def __repr__(self):
+        dims = ", ".join(f"{axis}={len(self.coords[axis])}" for axis in self.axes)
+        return f"DataCube({dims})"
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def labels(self, axis):
+        """Etichette di un asse come lista Python."""
+        return self.coords[axis].tolist()
+
+    def _lookup(self, axis):
+        positions = self._positions.get(axis)
+        if positions is None:
+            positions = self._positions[axis] = {label: i for i, label in enumerate(self.coords[axis].tolist())}
+        return positions
+
+    def index(self, axis, labels):
+        """Posizioni (array int) delle etichette lungo un asse; ValueError se una manca."""
+        positions = self._lookup(axis)
+        try:
+            return np.array([positions[label] for label in labels], dtype=np.intp)
+        except KeyError as exc:
+            raise ValueError(f"etichetta {exc.args[0]!r} assente dall'asse {axis!r}") from None
+
+    def sel(self, **selection):
+        """
+        Selezione per etichetta: asse=etichetta elimina l'asse, asse=[etichette] lo
+        conserva nell'ordine dato. Ritorna un nuovo DataCube (array contiguo).
+        """
+        unknown = set(selection) - set(self.axes)
+        if unknown:
+            raise ValueError(f"assi sconosciuti: {sorted(unknown)}")
+
+        # Prima gli scalari (indicizzazione di base, elimina gli assi), poi le liste con np.ix_
+        basic = []
+        kept = []
+        for axis in self.axes:
+            wanted = selection.get(axis)
+            if wanted is not None and np.ndim(wanted) == 0:
+                basic.append(int(self.index(axis, [wanted])[0]))
+            else:
+                basic.append(slice(None))
+                kept.append(axis)
+        values = self.values[tuple(basic)]
+
+        fancy = []
+        coords = {}
+        for axis in kept:
+            wanted = selection.get(axis)
+            if wanted is None:
+                fancy.append(np.arange(len(self.coords[axis])))
+                coords[axis] = self.coords[axis]
+            else:
+                fancy.append(self.index(axis, list(wanted)))
+                coords[axis] = np.asarray(list(wanted))
+        if fancy:
+            values = values[np.ix_(*fancy)]
+        return DataCube(values, kept, coords)
+
+    def reindex(self, **axes):
+        """
+        Come sel con liste, ma le etichette assenti diventano posizioni piene di NaN
+        (es. per imporre la griglia scenario x size attesa dagli script).
+        """
+        values = self.values
+        coords = dict(self.coords)
+        for axis, wanted in axes.items():
+            dim = self.axes.index(axis)
+            positions = self._lookup(axis)
+            wanted = list(wanted)
+            idx = np.array([positions.get(label, -1) for label in wanted], dtype=np.intp)
+            taken = np.take(values, np.where(idx >= 0, idx, 0), axis=dim)
+            if (idx < 0).any():
+                shape = [1] * values.ndim
+                shape[dim] = len(idx)
+                taken = np.where((idx < 0).reshape(shape), np.nan, taken)
+            values = taken
+            coords[axis] = np.asarray(wanted)
+        return DataCube(values, self.axes, coords)
+
+# --------------------------------------------------------------------------------
+# 2) COSTRUZIONE
+# --------------------------------------------------------------------------------
+
+def cube_event_names(source, events):
+    """Nomi nel cubo degli eventi di una sorgente (vedi _SHARED_EVENTS)."""
+    events = np.asarray(events, dtype=str)
+    if source == 'tlb':
+        return np.where(np.isin(events, _SHARED_EVENTS), np.char.add('tlb_', events), events)
+    return events
+
+
+def cube_from_columns(columns):
+    """
+    Cubo dalle colonne di campaign_store (una sola campagna), con un'unica
+    assegnazione vettoriale.
+    """
+    if len(np.unique(columns['campaign'])) > 1:
+        raise ValueError("le colonne contengono più campagne: selezionarne una")
+
+    events = columns['event']
+    renamed = (columns['source'] == 'tlb') & np.isin(events, _SHARED_EVENTS)
+    if renamed.any():
+        events = np.where(renamed, np.char.add('tlb_', events), events)
+
+    keys = (columns['server'], columns['core_mode'], columns['scenario'], columns['size'], events)
+    coords = {}
+    codes = []
+    for axis, col in zip(AXES[:-1], keys):
+        labels, inverse = np.unique(col, return_inverse=True)
+        coords[axis] = labels
+        codes.append(inverse)
+    coords['stat'] = np.array(STATS)
+
+    values = np.full([len(coords[axis]) for axis in AXES], np.nan)
+    values[tuple(codes) + (0,)] = columns['value']
+    values[tuple(codes) + (1,)] = columns['variance']
+    return DataCube(values, AXES, coords)
+
+
+def scenario_labels_for(freqs, n_servers=(1, 2, 3)):
+    """Etichette degli scenari nell'ordine dei grafici: 1S, 2S_<FREQ>..., 3S_<FREQ>..."""
+    labels = []
+    for n in n_servers:
+        if n == 1:
+            labels.append('1S')
+        else:
+            labels.extend(f"{n}S_{freq.upper()}" for freq in freqs)
+    return labels
+
+
+def celle_mancanti_cubo(cube, sources):
+    """Celle (sorgente, scenario, size) senza dati in un cubo con assi scenario x size x event."""
+    missing = []
+    for source in sources:
+        key = cube.sel(event=_SOURCE_KEY_EVENT[source], stat='value')
+        for s, z in zip(*np.nonzero(np.isnan(key.values))):
+            missing.append((source, key.coords['scenario'][s], int(key.coords['size'][z])))
+    return missing
+
+
+def carica_cubo(server, core_mode, dirs, sizes, freqs, n_servers=None, store=None, campaign=None,
+                workers=None, processes=None, report=True):
+    """
+    Carica in un cubo le sorgenti di una campagna per un server e una modalità core.
+    dirs: {sorgente: (dir per ogni numero di server)} con sorgente in 'cache' / 'tlb' / 'time';
+    n_servers dà il numero di server di ciascuna directory (default 1, 2, 3, ...).
+    Con store (campaign_store) le directory non vengono lette.
+    Ritorna un cubo con assi scenario x size x event x stat sulla griglia richiesta;
+    le celle mancanti valgono NaN e, con report=True, vengono elencate in un avviso.
+    """
+    if store is not None:
+        filters = {'server': server, 'core_mode': core_mode, 'source': list(dirs)}
+        if campaign is not None:
+            filters['campaign'] = campaign
+        columns = select(store, **filters)
+    else:
+        entries = [(server, core_mode, n, source, path)
+                   for source, paths in dirs.items()
+                   for n, path in zip(n_servers or range(1, len(paths) + 1), paths)]
+        columns = ingest_dirs(entries, campaign or '', workers, processes)
+
+    if n_servers is None:
+        n_servers = range(1, max(len(paths) for paths in dirs.values()) + 1)
+    events = [name for source in dirs for name in cube_event_names(source, SOURCE_EVENTS[source]).tolist()]
+    scenarios = scenario_labels_for(freqs, n_servers)
+    if len(columns['value']):
+        cube = cube_from_columns(columns).sel(server=server, core_mode=core_mode)
+        cube = cube.reindex(scenario=scenarios, size=sizes, event=events)
+    else:
+        shape = (len(scenarios), len(sizes), len(events), len(STATS))
+        cube = DataCube(np.full(shape, np.nan), AXES[2:],
+                        {'scenario': scenarios, 'size': sizes, 'event': events, 'stat': STATS})
+
+    if report:
+        missing = celle_mancanti_cubo(cube, dirs)
+        if missing:
+            print(f"ATTENZIONE: {len(missing)} celle senza file di risultato (NaN nei grafici)")
+            for source in dirs:
+                cells = [f"{label}/{sz}" for src, label, sz in missing if src == source]
+                if cells:
+                    more = f" ... (+{len(cells) - 20})" if len(cells) > 20 else ""
+                    print(f"  {source}: {', '.join(cells[:20])}{more}")
+    return cube
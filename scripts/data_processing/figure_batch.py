@@ -0,0 +1,432 @@
+"""
+Generazione delle figure in modalità batch: backend Agg, nessuna finestra e figure
+indipendenti distribuite su un pool di processi.
+
+Ogni script di plot descrive le sue figure in figure_tasks() come FigureTask (nome,
+funzione di plot, argomenti) e le passa a render_figures:
+
+    render_figures(figure_tasks(), batch=batch_from_env())
+
+    interattivo (default)   le figure sono generate in serie e mostrate con plt.show()
+    batch                   --batch sulla riga di comando oppure PLOT_BATCH=1: backend Agg,
+                            plt.show() mai chiamato, ogni figura chiusa dopo il salvataggio
+                            e le figure distribuite su PLOT_WORKERS processi (default: tutti
+                            i core)
+
+Le funzioni di plot impaginano con impagina e salvano con salva_figura, che in batch chiude
+la figura invece di mostrarla. results/plot_all.py raccoglie le figure di più script in un
+solo pool.
+
+In batch la ricostruzione è incrementale, come make: per ogni figura un manifest registra
+l'impronta (SHA-256) dei dati in ingresso (gli array delle celle passati alla funzione di
+plot) e della versione del codice (sorgente della funzione e delle funzioni del suo modulo
+che chiama, valori dei template namedtuple che usa, contenuto dei moduli condivisi di
+scripts/data_processing che raggiunge, anche indirettamente, come grouped_bars.py e
+questo file, FIGURE_CODE_VERSION, versione di matplotlib), più i file salvati. Una figura
+è rigenerata solo se l'impronta è cambiata o un suo file manca; le altre sono elencate
+come saltate.
+
+Qualità di resa, scelta a ogni invocazione (anche in modalità interattiva):
+
+    final (default)   PNG a 300 dpi più le versioni vettoriali PDF e SVG accanto, per
+                      tesi e articoli; layout ricalcolato con tight_layout
+    preview           solo PNG a 72 dpi (raster, nessun formato vettoriale) e nessun
+                      ricalcolo di tight_layout per le figure a un solo asse, per
+                      iterare sulle analisi
+
+La qualità fa parte dell'impronta: passando da preview a final le figure si rigenerano.
+
+Variabili d'ambiente:
+    PLOT_BATCH      1 = modalità batch (come --batch)
+    PLOT_QUALITY    preview | final (come --preview / --final)
+    PLOT_WORKERS    processi del pool (default: numero di core)
+    PLOT_FORCE      1 = rigenera tutte le figure (come --force)
+    PLOT_MANIFEST   percorso del manifest JSON ('off' per disabilitarlo)
+"""
+
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+FigureTask = namedtuple('FigureTask', ['name', 'func', 'args'])
+FigureTask.__doc__ = "Una figura: nome, funzione di plot (di modulo, picklable) e i suoi argomenti."
+
+# Da incrementare quando cambia qualcosa che influisce su tutte le figure e che non sta nel
+# codice Python raggiunto dalle funzioni di plot (es. uno stile matplotlib esterno)
+FIGURE_CODE_VERSION = 2
+
+# Directory dei moduli condivisi: il loro contenuto entra nell'impronta del codice
+_SHARED_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Qualità di resa: dpi del PNG e formati vettoriali salvati accanto
+QUALITY_TIERS = ('preview', 'final')
+DEFAULT_QUALITY = 'final'
+PREVIEW_DPI = 72
+FINAL_DPI = 300
+FINAL_VECTOR_FORMATS = ('pdf', 'svg')
+
+DEFAULT_MANIFEST_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'transient_analysis',
+                                     'figure_manifest.json')
+
+_HEADLESS = False
+_QUALITY = DEFAULT_QUALITY
+
+# File salvati da salva_figura dall'inizio della figura in corso
+_SAVED = []
+
+# {nome del modulo: path} degli script caricati con carica_script
+_SCRIPTS = {}
+
+# Impronte dei file dei moduli condivisi: (path, mtime, dimensione) -> sha256
+_FILE_HASHES = {}
+
+# --------------------------------------------------------------------------------
+# 1) MODALITÀ
+# --------------------------------------------------------------------------------
+
+def batch_from_env(argv=None):
+    """True con --batch tra gli argomenti (default sys.argv) oppure con PLOT_BATCH=1."""
+    argv = sys.argv[1:] if argv is None else argv
+    return '--batch' in argv or os.environ.get('PLOT_BATCH') == '1'
+
+
+def force_from_env(argv=None):
+    """True con --force tra gli argomenti (default sys.argv) oppure con PLOT_FORCE=1."""
+    argv = sys.argv[1:] if argv is None else argv
+    return '--force' in argv or os.environ.get('PLOT_FORCE') == '1'
+
+
+def quality_from_env(argv=None):
+    """Qualità da --preview / --final tra gli argomenti, altrimenti PLOT_QUALITY (default final)."""
+    argv = sys.argv[1:] if argv is None else argv
+    for tier in QUALITY_TIERS:
+        if f'--{tier}' in argv:
+            return tier
+    value = os.environ.get('PLOT_QUALITY', '').strip().lower() or DEFAULT_QUALITY
+    if value not in QUALITY_TIERS:
+        print(f"ATTENZIONE: PLOT_QUALITY={value} non valida (attese: {', '.join(QUALITY_TIERS)}), uso {DEFAULT_QUALITY}")
+        return DEFAULT_QUALITY
+    return value
+
+
+def imposta_qualita(quality):
+    """Imposta la qualità usata da impagina e salva_figura nel processo corrente."""
+    global _QUALITY
+    if quality not in QUALITY_TIERS:
+        raise ValueError(f"Qualità non valida: {quality} (attese: {', '.join(QUALITY_TIERS)})")
+    _QUALITY = quality
+
+
+def plot_workers():
+    """Processi per le figure da PLOT_WORKERS, altrimenti il numero di core."""
+    env = os.environ.get('PLOT_WORKERS')
+    if env:
+        return max(1, int(env))
+    return os.cpu_count() or 1
+
+
+def usa_headless():
+    """Backend Agg (nessuna finestra): da chiamare prima di creare figure."""
+    global _HEADLESS
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+    _HEADLESS = True
+
+
+def impagina(**kwargs):
+    """
+    plt.tight_layout(**kwargs) in qualità final. In preview si salta solo per le figure
+    con un solo asse: con più pannelli impilati il layout di default sovrappone titoli
+    ed etichette.
+    """
+    import matplotlib.pyplot as plt
+    if _QUALITY != 'preview' or len(plt.gcf().axes) > 1:
+        plt.tight_layout(**kwargs)
+
+
+def salva_figura(out_file):
+    """
+    Salva la figura corrente secondo la qualità (PNG a PREVIEW_DPI, oppure PNG a FINAL_DPI
+    più FINAL_VECTOR_FORMATS con lo stesso nome); la mostra in modalità interattiva, la
+    chiude in batch.
+    """
+    import matplotlib.pyplot as plt
+    # fig.savefig e non plt.savefig, che dopo il salvataggio ridisegna la figura (draw_idle)
+    fig = plt.gcf()
+    outputs = [out_file]
+    if _QUALITY == 'preview':
+        fig.savefig(out_file, dpi=PREVIEW_DPI)
+    else:
+        fig.savefig(out_file, dpi=FINAL_DPI)
+        stem = os.path.splitext(out_file)[0]
+        for fmt in FINAL_VECTOR_FORMATS:
+            outputs.append(f"{stem}.{fmt}")
+            fig.savefig(outputs[-1])
+    _SAVED.extend(os.path.abspath(path) for path in outputs)
+    if _HEADLESS:
+        plt.close(fig)
+    else:
+        plt.show()
+
+# --------------------------------------------------------------------------------
+# 2) SCRIPT DI PLOT
+# --------------------------------------------------------------------------------
+
+def carica_script(path):
+    """
+    Importa uno script di plot dal path, registrato in sys.modules con un nome ricavato
+    dal path (es. plot_table_generator_single_core), così le sue funzioni sono picklable.
+    """
+    path = os.path.abspath(path)
+    parts = os.path.splitext(path)[0].split(os.sep)[-3:]
+    name = re.sub(r'\W', '_', '_'.join([parts[-1]] + parts[:-1]))
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    _SCRIPTS[name] = path
+    spec.loader.exec_module(module)
+    return module
+
+
+def _script_paths(tasks):
+    """Path degli script caricati con carica_script da cui vengono le funzioni dei task."""
+    return sorted({_SCRIPTS[task.func.__module__] for task in tasks if task.func.__module__ in _SCRIPTS})
+
+# --------------------------------------------------------------------------------
+# 3) IMPRONTE E MANIFEST
+# --------------------------------------------------------------------------------
+
+def _hash_value(h, value):
+    """Aggiunge a h il contenuto di un argomento di plot (array, sequenze, dict, sketch)."""
+    if isinstance(value, np.ndarray):
+        h.update(f"nd{value.dtype.str}{value.shape}".encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        h.update(f"seq{len(value)}".encode())
+        for item in value:
+            _hash_value(h, item)
+    elif isinstance(value, dict):
+        h.update(f"map{len(value)}".encode())
+        for key in sorted(value, key=repr):
+            h.update(repr(key).encode())
+            _hash_value(h, value[key])
+    elif hasattr(type(value), '__slots__') and not isinstance(value, (str, bytes)):
+        # Oggetti con __slots__ (sketch delle latenze): i loro campi pubblici
+        h.update(type(value).__name__.encode())
+        for name in type(value).__slots__:
+            if not name.startswith('_'):
+                _hash_value(h, getattr(value, name))
+    else:
+        h.update(repr(value).encode())
+
+
+def _code_sources(func, seen, shared):
+    """
+    Sorgenti di func e delle funzioni dello stesso modulo che chiama, ricorsivamente;
+    aggiunge a shared i moduli condivisi (_SHARED_DIR) da cui vengono gli altri nomi usati.
+    """
+    seen.add(func)
+    sources = [inspect.getsource(func)]
+    codes = [func.__code__]
+    while codes:
+        code = codes.pop()
+        codes.extend(const for const in code.co_consts if inspect.iscode(const))
+        for name in code.co_names:
+            obj = func.__globals__.get(name)
+            if inspect.isfunction(obj) and obj.__module__ == func.__module__:
+                if obj not in seen:
+                    sources.extend(_code_sources(obj, seen, shared))
+                continue
+            if isinstance(obj, tuple) and hasattr(obj, '_fields'):
+                # Costanti di modulo come i BarTemplate: conta il valore, non solo il nome
+                sources.append(f"{name} = {_repr_costante(obj)}")
+            module = _modulo_condiviso(obj)
+            if module is not None:
+                shared.add(module)
+    return sources
+
+
+def _modulo_condiviso(obj):
+    """Modulo di _SHARED_DIR da cui viene obj (modulo, funzione o classe), altrimenti None."""
+    if inspect.ismodule(obj):
+        module = obj
+    elif inspect.isfunction(obj) or inspect.isclass(obj):
+        module = sys.modules.get(obj.__module__)
+    else:
+        return None
+    path = getattr(module, '__file__', None)
+    if path and os.path.dirname(os.path.abspath(path)) == _SHARED_DIR:
+        return module
+    return None
+
+
+def _chiusura_moduli(modules):
+    """I moduli condivisi indicati più quelli che importano, ricorsivamente: {nome: modulo}."""
+    closure = {}
+    stack = list(modules)
+    while stack:
+        module = stack.pop()
+        if module.__name__ in closure:
+            continue
+        closure[module.__name__] = module
+        stack.extend(dep for dep in map(_modulo_condiviso, vars(module).values())
+                     if dep is not None and dep.__name__ not in closure)
+    return closure
+
+
+def _hash_file(path):
+    """sha256 del contenuto di un file, ricalcolato solo se mtime o dimensione cambiano."""
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    digest = _FILE_HASHES.get(key)
+    if digest is None:
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        _FILE_HASHES[key] = digest
+    return digest
+
+
+def _repr_costante(value):
+    """repr stabile di una namedtuple: le funzioni per nome (l'indirizzo cambia a ogni avvio)."""
+    fields = (getattr(v, '__qualname__', v) if callable(v) else v for v in value)
+    return repr(tuple(fields))
+
+
+def code_fingerprint(func):
+    """
+    Impronta del codice che disegna una figura: le funzioni del suo script e il contenuto
+    di tutti i moduli condivisi raggiunti (grouped_bars.py, figure_batch.py, ...).
+    """
+    import matplotlib
+    h = hashlib.sha256(f"{FIGURE_CODE_VERSION}:{matplotlib.__version__}".encode())
+    shared = set()
+    for source in sorted(_code_sources(func, set(), shared)):
+        h.update(source.encode())
+    for name, module in sorted(_chiusura_moduli(shared).items()):
+        h.update(f"{name}:{_hash_file(os.path.abspath(module.__file__))}".encode())
+    return h.hexdigest()
+
+
+def task_fingerprint(task, quality=DEFAULT_QUALITY):
+    """Impronta di una figura: versione del codice, qualità e contenuto degli argomenti."""
+    h = hashlib.sha256(f"{code_fingerprint(task.func)}:{quality}".encode())
+    _hash_value(h, task.args)
+    return h.hexdigest()
+
+
+def task_key(task):
+    """Chiave del manifest: script, nome della figura e argomenti testuali (directory di output)."""
+    strings = [arg for arg in task.args if isinstance(arg, str)]
+    return '|'.join([os.path.abspath(inspect.getsourcefile(task.func)), task.name] + strings)
+
+
+def manifest_path_from_env():
+    """Percorso del manifest da PLOT_MANIFEST (None se 'off'), default DEFAULT_MANIFEST_PATH."""
+    value = os.environ.get('PLOT_MANIFEST', '').strip()
+    if value.lower() == 'off':
+        return None
+    return value or DEFAULT_MANIFEST_PATH
+
+
+def carica_manifest(path):
+    """{chiave: {'fingerprint': ..., 'outputs': [...]}}; vuoto se il file manca o è illeggibile."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def salva_manifest(path, manifest):
+    """Scrive il manifest in modo atomico (file temporaneo + rename)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def figura_aggiornata(entry, fingerprint):
+    """True se la voce del manifest ha la stessa impronta e tutti i suoi file esistono."""
+    return (entry is not None and entry.get('fingerprint') == fingerprint and entry.get('outputs')
+            and all(os.path.exists(path) for path in entry['outputs']))
+
+# --------------------------------------------------------------------------------
+# 4) ESECUZIONE
+# --------------------------------------------------------------------------------
+
+def _init_worker(script_paths, quality):
+    """Eseguita in ogni processo del pool: Agg prima di tutto, qualità, poi gli script dei task."""
+    usa_headless()
+    imposta_qualita(quality)
+    for path in script_paths:
+        carica_script(path)
+
+
+def _render(task):
+    import matplotlib.pyplot as plt
+    del _SAVED[:]
+    start = time.perf_counter()
+    task.func(*task.args)
+    plt.close('all')
+    return task.name, time.perf_counter() - start, list(_SAVED)
+
+
+def render_figures(tasks, batch=False, workers=None, force=None, manifest_path=None, quality=None):
+    """
+    Genera le figure dei task con la qualità data (default quality_from_env()). In modalità
+    interattiva le esegue tutte in serie (con plt.show()) e ritorna None. In batch genera
+    solo quelle non aggiornate secondo il manifest (tutte con force, default
+    force_from_env()) e ritorna [(nome, secondi)] delle figure generate, nell'ordine dei task.
+    """
+    tasks = list(tasks)
+    quality = quality_from_env() if quality is None else quality
+    imposta_qualita(quality)
+    if not batch:
+        for task in tasks:
+            task.func(*task.args)
+        return None
+
+    usa_headless()
+    force = force_from_env() if force is None else force
+    manifest_path = manifest_path if manifest_path is not None else manifest_path_from_env()
+    manifest = carica_manifest(manifest_path) if manifest_path else {}
+
+    keys = [task_key(task) for task in tasks]
+    fingerprints = [task_fingerprint(task, quality) for task in tasks]
+    stale = [i for i, (key, fp) in enumerate(zip(keys, fingerprints))
+             if force or not manifest_path or not figura_aggiornata(manifest.get(key), fp)]
+    fresh = set(range(len(tasks))) - set(stale)
+    skipped = [task.name for i, task in enumerate(tasks) if i in fresh]
+    todo = [tasks[i] for i in stale]
+
+    workers = min(workers if workers is not None else plot_workers(), len(todo))
+    start = time.perf_counter()
+    if workers <= 1:
+        results = [_render(task) for task in todo]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(_script_paths(todo), quality)) as pool:
+            results = list(pool.map(_render, todo))
+
+    if manifest_path and results:
+        for i, (_, _, outputs) in zip(stale, results):
+            manifest[keys[i]] = {'fingerprint': fingerprints[i], 'outputs': outputs}
+        salva_manifest(manifest_path, manifest)
+
+    print(f"{len(results)} figure in {time.perf_counter() - start:.1f} s ({max(workers, 1)} processi, qualità {quality})")
+    if skipped:
+        print(f"{len(skipped)} figure già aggiornate, saltate: {', '.join(skipped)}")
+    return [(name, seconds) for name, seconds, _ in results]
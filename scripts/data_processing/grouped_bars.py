@@ -0,0 +1,227 @@
+"""
+Grafici a barre raggruppate (scenario x size [x livello]) disegnati in un solo passaggio.
+
+Invece di una chiamata ax.bar per scenario e livello (un Rectangle per barra, liste
+ricostruite a ogni giro), ogni subplot riceve una fetta contigua dell'array e disegna
+tutte le sue barre come un'unica PolyCollection, più due linee per le barre d'errore: il
+numero di artisti per subplot resta costante al crescere di scenari e size. Anche il
+resto è vettoriale: vertici già nella scala degli assi (nessuna trasformazione log2 barra
+per barra), limiti dei dati da un solo array e posizione della legenda calcolata su tutte
+le barre insieme (loc='best' di matplotlib prova ogni barra in Python).
+
+La forma della figura è un BarTemplate riutilizzabile (titoli e etichette dei pannelli,
+asse X, dimensioni, scala, formattatore), da cui si derivano le varianti con _replace:
+
+    LIVELLI = BarTemplate(titles=("L1", "L2", "L3"), ylabels=("L1", "L2", "L3"),
+                          xlabel="Matrix size (log2 scale)", figsize=(10, 14), scala='log2')
+    fig, axes, geom, handles = figura_barre(LIVELLI, data, sizes, scenario_labels, legend_map, err)
+    legenda(axes[0], handles)
+
+Geometrie delle barre (le stesse degli script di plot):
+    log2      asse X = size in scala log2, barre spostate e larghe in proporzione a x
+              (moltiplicazione matrici)
+    lineare   asse X = indice della size, barre affiancate di larghezza fissa
+              (generatore tabella)
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+BarTemplate = namedtuple('BarTemplate', ['titles', 'ylabels', 'xlabel', 'figsize', 'scala', 'formatter', 'ylog'])
+BarTemplate.__new__.__defaults__ = ('lineare', None, False)
+BarTemplate.__doc__ = ("Forma di una figura a barre: un pannello per titolo (con la sua etichetta Y), "
+                       "etichetta X, figsize, scala X ('log2' | 'lineare'), formattatore Y opzionale, "
+                       "asse Y in scala log.")
+
+BarGeometry = namedtuple('BarGeometry', ['ticks', 'positions', 'widths'])
+BarGeometry.__doc__ = "Tick dell'asse X e centri / larghezze delle barre, array (scenario x size)."
+
+SCALE = ('log2', 'lineare')
+
+# Label (ignorata dalla legenda) con cui si riconoscono le collezioni di barre di un asse
+_BAR_LABEL = '_barre_raggruppate'
+
+# Posizioni della legenda come in matplotlib (codice: (x, y) con 0 = sinistra / basso,
+# 0.5 = centro, 1 = destra / alto), nell'ordine in cui loc='best' le prova
+_LEGEND_LOCS = {1: (1, 1), 2: (0, 1), 3: (0, 0), 4: (1, 0), 5: (1, 0.5), 6: (0, 0.5), 7: (1, 0.5),
+                8: (0.5, 0), 9: (0.5, 1), 10: (0.5, 0.5)}
+
+# --------------------------------------------------------------------------------
+# 1) GEOMETRIA E COLORI
+# --------------------------------------------------------------------------------
+
+def geometria_barre(sizes, n_scenarios, scala='lineare'):
+    """Centri e larghezze di tutte le barre (scenario x size) in un colpo solo."""
+    if scala not in SCALE:
+        raise ValueError(f"Scala non valida: {scala} (attese: {', '.join(SCALE)})")
+    offsets = np.arange(n_scenarios, dtype=np.float64)[:, np.newaxis]
+    if scala == 'log2':
+        x = np.asarray(sizes, dtype=np.float64)
+        bar_offset = min(0.07, 0.5 / n_scenarios)
+        bar_width = min(0.06, 0.43 / n_scenarios)
+        positions = x * (1 + bar_offset * (offsets - (n_scenarios - 1) / 2))
+        widths = np.broadcast_to(bar_width * x, positions.shape)
+        return BarGeometry(list(sizes), positions, widths)
+    x = np.arange(len(sizes), dtype=np.float64)
+    bar_width = min(0.1, 0.8 / n_scenarios)
+    positions = x + (offsets - n_scenarios / 2) * bar_width + bar_width / 2
+    return BarGeometry(x, positions, np.full(positions.shape, bar_width))
+
+
+def colori_scenari(n_scenarios):
+    """Un colore per scenario dal ciclo di matplotlib, come le chiamate ax.bar successive."""
+    import matplotlib.pyplot as plt
+    cycle = plt.rcParams['axes.prop_cycle'].by_key()['color']
+    return [cycle[i % len(cycle)] for i in range(n_scenarios)]
+
+
+def maniglie_scenari(colors, scenario_labels, scenario_legend_map):
+    """Voci di legenda (una per scenario) per le barre disegnate come collezione."""
+    from matplotlib.patches import Patch
+    return [Patch(facecolor=color, label=scenario_legend_map[scenario])
+            for color, scenario in zip(colors, scenario_labels)]
+
+# --------------------------------------------------------------------------------
+# 2) DISEGNO
+# --------------------------------------------------------------------------------
+
+def barre_raggruppate(ax, values, geom, colors, err=None, capsize=2):
+    """
+    Disegna su ax tutte le barre di values (scenario x size) come una PolyCollection, più
+    le barre d'errore err (2 x scenario x size) come due linee (aste e cappelli). I NaN
+    danno barre vuote. La scala degli assi va impostata prima. Ritorna la collezione.
+    """
+    from matplotlib.collections import PolyCollection
+    from matplotlib.colors import to_rgba_array
+    values = np.asarray(values, dtype=np.float64)
+    heights = np.nan_to_num(values, nan=0.0).ravel()
+    left = (geom.positions - geom.widths / 2).ravel()
+    right = (geom.positions + geom.widths / 2).ravel()
+
+    # Rettangoli (barre x 4 vertici x 2), dal basso a sinistra in senso orario
+    verts = np.zeros((heights.size, 4, 2))
+    verts[:, :2, 0] = left[:, np.newaxis]
+    verts[:, 2:, 0] = right[:, np.newaxis]
+    verts[:, 1:3, 1] = heights[:, np.newaxis]
+    ax.update_datalim(verts.reshape(-1, 2))
+
+    # Vertici già nella scala degli assi (es. log2) e trasformazione solo affine: niente
+    # trasformazione barra per barra né al disegno né per i limiti dei dati
+    scaled = ax.transScale.transform(verts.reshape(-1, 2)).reshape(verts.shape)
+    n_sizes = values.shape[1]
+    bars = PolyCollection(scaled, facecolors=np.repeat(to_rgba_array(colors), n_sizes, axis=0),
+                          edgecolors='none', label=_BAR_LABEL, transform=ax.transLimits + ax.transAxes)
+    bars.sticky_edges.y.append(0)
+    ax.add_collection(bars, autolim=False)
+    if err is not None:
+        _barre_errore(ax, geom.positions.ravel(), values.ravel(), np.asarray(err).reshape(2, -1), capsize)
+    ax.autoscale_view()
+    return bars
+
+
+def _barre_errore(ax, x, y, yerr, capsize):
+    """Barre d'errore come errorbar(fmt='none', ecolor='k'), ma con due soli artisti."""
+    lo, hi = y - yerr[0], y + yerr[1]
+    # Aste: un solo percorso, i segmenti separati da NaN
+    stems = np.full((x.size, 3, 2), np.nan)
+    stems[:, :2, 0] = x[:, np.newaxis]
+    stems[:, 0, 1], stems[:, 1, 1] = lo, hi
+    ax.plot(stems[:, :, 0].ravel(), stems[:, :, 1].ravel(), color='k', label='_aste')
+    ax.plot(np.concatenate([x, x]), np.concatenate([lo, hi]), linestyle='none', marker='_',
+            markersize=2 * capsize, color='k', label='_cappelli')
+
+
+def figura_barre(template, data, sizes, scenario_labels, scenario_legend_map, err=None):
+    """
+    Figura del template da data (scenario x size x livello, oppure scenario x size per un
+    solo pannello) ed err opzionale (2 x ...): un pannello per titolo, ognuno disegnato da
+    una fetta contigua (livello-maggiore) dell'array. Asse X, tick e griglia impostati;
+    la legenda no, così il chiamante può aggiungere le sue voci prima di legenda().
+    Ritorna (fig, axes, geometria, voci di legenda degli scenari).
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib.ticker import FuncFormatter
+
+    data = np.asarray(data, dtype=np.float64)
+    if data.ndim == 2:
+        data = data[..., np.newaxis]
+        err = None if err is None else np.asarray(err)[..., np.newaxis]
+    n_panels = len(template.titles)
+    panels = np.ascontiguousarray(np.moveaxis(data[..., :n_panels], -1, 0))
+    errs = [None] * n_panels if err is None else np.ascontiguousarray(np.moveaxis(np.asarray(err)[..., :n_panels], -1, 0))
+
+    geom = geometria_barre(sizes, len(scenario_labels), template.scala)
+    colors = colori_scenari(len(scenario_labels))
+    fig, axes = plt.subplots(n_panels, 1, figsize=template.figsize, sharex=True, squeeze=False)
+    axes = axes[:, 0]
+
+    for ax, title, ylabel, values, panel_err in zip(axes, template.titles, template.ylabels, panels, errs):
+        if template.scala == 'log2':
+            ax.set_xscale('log', base=2)
+        if template.ylog:
+            ax.set_yscale('log')
+        barre_raggruppate(ax, values, geom, colors, panel_err)
+        ax.set_title(title)
+        ax.set_ylabel(ylabel)
+        ax.grid(True, which='both' if template.scala == 'log2' else 'major', axis='both',
+                linestyle='--', alpha=0.7)
+        if template.formatter is not None:
+            ax.yaxis.set_major_formatter(FuncFormatter(template.formatter))
+
+    axes[-1].set_xticks(geom.ticks)
+    axes[-1].set_xticklabels([str(s) for s in sizes], rotation=45)
+    axes[-1].set_xlabel(template.xlabel)
+    return fig, axes, geom, maniglie_scenari(colors, scenario_labels, scenario_legend_map)
+
+
+def _posizione_legenda(ax, legend):
+    """
+    Codice della posizione della legenda che copre meno barre, come loc='best' ma contando
+    le sovrapposizioni di tutti i rettangoli in un colpo solo (loc='best' su una
+    PolyCollection prova ogni barra in Python, con un costo che cresce con scenari e size).
+    None se non si può misurare la legenda.
+    """
+    from matplotlib.collections import PolyCollection
+    get_renderer = getattr(ax.figure.canvas, 'get_renderer', None)
+    bars = [coll for coll in ax.collections
+            if isinstance(coll, PolyCollection) and coll.get_label() == _BAR_LABEL]
+    paths = [path for coll in bars for path in coll.get_paths()]
+    if get_renderer is None or not paths:
+        return None
+
+    # Rettangoli delle barre in coordinate dell'asse (0..1); le collezioni hanno tutte la
+    # stessa trasformazione (scala degli assi già applicata ai vertici)
+    corners = np.array([path.vertices[[0, 2]] for path in paths]).reshape(-1, 2)
+    to_axes = bars[0].get_transform() + ax.transAxes.inverted()
+    corners = to_axes.transform(corners).reshape(-1, 2, 2)
+    x0, x1 = corners[:, :, 0].min(axis=1), corners[:, :, 0].max(axis=1)
+    y0, y1 = corners[:, :, 1].min(axis=1), corners[:, :, 1].max(axis=1)
+
+    box = legend.get_window_extent(get_renderer())
+    width, height = box.width / ax.bbox.width, box.height / ax.bbox.height
+    pad_px = legend.borderaxespad * legend.prop.get_size_in_points() * ax.figure.dpi / 72
+    pad_x, pad_y = pad_px / ax.bbox.width, pad_px / ax.bbox.height
+
+    badness = []
+    for fx, fy in _LEGEND_LOCS.values():
+        bx0 = pad_x + fx * (1 - width - 2 * pad_x)
+        by0 = pad_y + fy * (1 - height - 2 * pad_y)
+        overlap = (x0 < bx0 + width) & (x1 > bx0) & (y0 < by0 + height) & (y1 > by0)
+        badness.append(int(overlap.sum()))
+    return list(_LEGEND_LOCS)[int(np.argmin(badness))]
+
+
+def legenda(ax, handles, **kwargs):
+    """
+    Legenda con le voci degli scenari seguite da quelle degli artisti con label di ax.
+    Senza loc la posizione è quella che copre meno barre (_posizione_legenda).
+    """
+    extra, _ = ax.get_legend_handles_labels()
+    if 'loc' in kwargs:
+        return ax.legend(handles=list(handles) + extra, **kwargs)
+    # Misurata in una posizione fissa (con 'best' la misura farebbe già la ricerca lenta)
+    legend = ax.legend(handles=list(handles) + extra, loc='upper right', **kwargs)
+    loc = _posizione_legenda(ax, legend)
+    legend.set_loc(loc if loc is not None else 'best')
+    return legend
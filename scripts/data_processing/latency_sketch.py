@@ -0,0 +1,367 @@
+"""
+Sketch a memoria fissa per le latenze per richiesta: istogramma logaritmico stile HDR e
+sketch di quantili KLL.
+
+Nei run di soak lunghi tenere tutte le latenze in un array (request_log.load_request_log)
+non è possibile. I due sketch ricevono le latenze a blocchi, rispondono a query di
+percentile e si fondono (merge) tra processi e tra run diversi:
+
+    LatencyHistogram   contatori su bucket logaritmici: SUB_BUCKETS bucket per ottava,
+                       errore relativo <= 2**(1 / (2 * SUB_BUCKETS)) - 1 (~0.27% con 128),
+                       memoria fissa (N_BUCKETS contatori int64, ~40 KB) per qualsiasi
+                       numero di richieste. Il merge è una somma esatta.
+    KllSketch          sketch KLL (Karnin, Lang, Liberty 2016) con parametro k: errore di
+                       rango ~1.7 / k, memoria O(k) elementi; il merge unisce i livelli.
+                       L'errore è sul rango, non sul valore: per p99.9 e oltre è più
+                       preciso l'istogramma.
+
+Lo stesso istogramma è calcolato dal generatore di carico (send_request.cc), che a fine
+run stampa la riga
+
+    Latency histogram (sub_buckets 128): 0:3,1310:57,1311:102,...
+
+con i soli bucket non vuoti; feed_request_log la usa se c'è, altrimenti legge il log
+riga per riga senza costruire array. Gli sketch si salvano in .npz (save_sketch /
+load_sketch) per fonderli con quelli di altri run:
+
+    hist = load_latency_sketch(path)                 # dal log, in streaming
+    total = merge_sketches([hist, load_sketch('run_precedente.npz')])
+    total.quantile([0.5, 0.99, 0.999])
+"""
+
+import math
+import re
+
+import numpy as np
+
+from request_log import parse_request_lines
+from result_io import open_result
+
+# Layout dei bucket, identico a quello di send_request.cc: il bucket i contiene le latenze
+# (us) in [2**(i / SUB_BUCKETS), 2**((i + 1) / SUB_BUCKETS)), il bucket 0 anche quelle < 1 us;
+# oltre 2**MAX_OCTAVES us (~12 giorni) tutto finisce nell'ultimo bucket
+SUB_BUCKETS = 128
+MAX_OCTAVES = 40
+N_BUCKETS = SUB_BUCKETS * MAX_OCTAVES
+
+DEFAULT_K = 200
+SKETCH_KINDS = ('hdr', 'kll')
+
+# Latenze lette dal log e passate agli sketch per blocco
+_FEED_CHUNK = 65536
+
+_HIST_RE = re.compile(r'Latency histogram \(sub_buckets (?P<sub>\d+)\):\s*(?P<counts>.*)')
+
+# --------------------------------------------------------------------------------
+# 1) ISTOGRAMMA LOGARITMICO (HDR)
+# --------------------------------------------------------------------------------
+
+def bucket_index(latency_us):
+    """Indice del bucket di ogni latenza (array), con lo stesso calcolo del client C++."""
+    latency = np.asarray(latency_us, dtype=np.float64)
+    with np.errstate(divide='ignore'):
+        idx = np.floor(np.log2(np.maximum(latency, 1.0)) * SUB_BUCKETS)
+    return np.minimum(idx, N_BUCKETS - 1).astype(np.int64)
+
+
+class LatencyHistogram:
+    """
+    Istogramma delle latenze (us) su N_BUCKETS bucket logaritmici. Conteggio, somma,
+    minimo e massimo sono esatti; i quantili hanno l'errore relativo di un mezzo bucket.
+    """
+
+    __slots__ = ('counts', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts = np.zeros(N_BUCKETS, dtype=np.int64)
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __repr__(self):
+        return f"LatencyHistogram(count={self.count}, min={self.min}, max={self.max})"
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def update(self, latency_us):
+        """Aggiunge un blocco di latenze; i NaN (richieste fallite) sono ignorati."""
+        latency = np.asarray(latency_us, dtype=np.float64).ravel()
+        latency = latency[~np.isnan(latency)]
+        if not len(latency):
+            return self
+        self.counts += np.bincount(bucket_index(latency), minlength=N_BUCKETS)
+        self.total += float(latency.sum())
+        self.min = min(self.min, float(latency.min()))
+        self.max = max(self.max, float(latency.max()))
+        return self
+
+    def merge(self, other):
+        """Somma un altro LatencyHistogram in questo (stesso layout, merge esatto)."""
+        self.counts += other.counts
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def mean(self):
+        count = self.count
+        return self.total / count if count else math.nan
+
+    def _values(self):
+        """Valore rappresentativo di ogni bucket (centro geometrico), limitato a [min, max]."""
+        mid = 2.0 ** ((np.arange(N_BUCKETS) + 0.5) / SUB_BUCKETS)
+        mid[0] = 1.0
+        return np.clip(mid, self.min, self.max)
+
+    def quantile(self, q):
+        """Quantili q in [0, 1] (scalare o sequenza); NaN se l'istogramma è vuoto."""
+        q = np.asarray(q, dtype=np.float64)
+        cum = np.cumsum(self.counts)
+        if not cum[-1]:
+            return np.full(q.shape, np.nan) if q.ndim else math.nan
+        # Rango 1-based del quantile, come il metodo 'inverted_cdf' di np.percentile
+        rank = np.maximum(np.ceil(q * cum[-1]), 1)
+        values = self._values()[np.searchsorted(cum, rank, side='left')]
+        return values if q.ndim else float(values)
+
+    def cdf(self):
+        """(valori dei bucket non vuoti, frazione cumulativa) per il grafico della CDF."""
+        nonzero = np.flatnonzero(self.counts)
+        cum = np.cumsum(self.counts[nonzero])
+        return self._values()[nonzero], cum / max(cum[-1] if len(cum) else 0, 1)
+
+    def encode(self):
+        """Riga testuale dei bucket non vuoti, nel formato stampato da send_request.cc."""
+        nonzero = np.flatnonzero(self.counts)
+        pairs = ','.join(f"{i}:{c}" for i, c in zip(nonzero.tolist(), self.counts[nonzero].tolist()))
+        return f"Latency histogram (sub_buckets {SUB_BUCKETS}): {pairs}"
+
+
+def parse_histogram_line(line):
+    """
+    LatencyHistogram dalla riga 'Latency histogram (...)' di send_request.cc, None se la
+    riga non lo è. Min e max sono stimati dai bucket estremi; la somma dai loro centri.
+    """
+    m = _HIST_RE.match(line.strip())
+    if m is None:
+        return None
+    if int(m.group('sub')) != SUB_BUCKETS:
+        raise ValueError(f"istogramma con {m.group('sub')} bucket per ottava (atteso {SUB_BUCKETS})")
+    hist = LatencyHistogram()
+    pairs = [item.split(':') for item in m.group('counts').split(',') if item.strip()]
+    if not pairs:
+        return hist
+    idx = np.array([int(i) for i, _ in pairs], dtype=np.int64)
+    counts = np.array([int(c) for _, c in pairs], dtype=np.int64)
+    np.add.at(hist.counts, np.minimum(idx, N_BUCKETS - 1), counts)
+    nonzero = np.flatnonzero(hist.counts)
+    hist.min = 2.0 ** (nonzero[0] / SUB_BUCKETS) if nonzero[0] else 0.0
+    hist.max = 2.0 ** ((nonzero[-1] + 1) / SUB_BUCKETS)
+    hist.total = float((hist.counts[nonzero] * hist._values()[nonzero]).sum())
+    return hist
+
+# --------------------------------------------------------------------------------
+# 2) SKETCH DI QUANTILI KLL
+# --------------------------------------------------------------------------------
+
+class KllSketch:
+    """
+    Sketch KLL: compattatori impilati, il livello h tiene elementi di peso 2**h. Quando un
+    livello supera la sua capacità (k * c**profondità, minimo 2) lo si ordina e metà degli
+    elementi, scelti a offset casuale, salgono al livello successivo.
+    """
+
+    __slots__ = ('k', 'levels', 'n', 'min', 'max', '_rng')
+
+    _C = 2.0 / 3.0
+
+    def __init__(self, k=DEFAULT_K, seed=None):
+        self.k = int(k)
+        self.levels = [np.empty(0)]
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._rng = np.random.default_rng(seed)
+
+    def __repr__(self):
+        return f"KllSketch(k={self.k}, n={self.n}, retained={self.retained})"
+
+    @property
+    def count(self):
+        return self.n
+
+    @property
+    def retained(self):
+        """Elementi effettivamente tenuti in memoria."""
+        return sum(len(level) for level in self.levels)
+
+    def _capacity(self, h):
+        depth = len(self.levels) - h - 1
+        return max(2, int(math.ceil(self.k * self._C ** depth)))
+
+    def _compress(self):
+        while self.retained > sum(self._capacity(h) for h in range(len(self.levels))):
+            for h, level in enumerate(self.levels):
+                if len(level) < self._capacity(h):
+                    continue
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                level = np.sort(level)
+                # Con un numero dispari di elementi l'ultimo resta al suo livello
+                keep = level[len(level) - len(level) % 2:]
+                promoted = level[int(self._rng.integers(2)):len(level) - len(level) % 2:2]
+                self.levels[h] = keep
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                break
+
+    def update(self, latency_us):
+        """Aggiunge un blocco di latenze; i NaN (richieste fallite) sono ignorati."""
+        latency = np.asarray(latency_us, dtype=np.float64).ravel()
+        latency = latency[~np.isnan(latency)]
+        if not len(latency):
+            return self
+        self.n += len(latency)
+        self.min = min(self.min, float(latency.min()))
+        self.max = max(self.max, float(latency.max()))
+        # Blocchi grandi a pezzi di k: la memoria non supera mai la capacità di molto
+        for start in range(0, len(latency), self.k):
+            self.levels[0] = np.concatenate([self.levels[0], latency[start:start + self.k]])
+            self._compress()
+        return self
+
+    def merge(self, other):
+        """Unisce un altro KllSketch a questo, livello per livello."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _weighted(self):
+        """(elementi ordinati, pesi cumulativi)."""
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h, dtype=np.int64)
+                                  for h, level in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        return values[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """Quantili q in [0, 1] (scalare o sequenza); NaN se lo sketch è vuoto."""
+        q = np.asarray(q, dtype=np.float64)
+        if not self.n:
+            return np.full(q.shape, np.nan) if q.ndim else math.nan
+        values, cum = self._weighted()
+        rank = np.maximum(np.ceil(q * cum[-1]), 1)
+        out = values[np.minimum(np.searchsorted(cum, rank, side='left'), len(values) - 1)]
+        # Estremi esatti
+        out = np.where(q >= 1.0, self.max, np.where(q <= 0.0, self.min, out))
+        return out if q.ndim else float(out)
+
+    def cdf(self):
+        """(elementi tenuti ordinati, frazione cumulativa) per il grafico della CDF."""
+        if not self.n:
+            return np.empty(0), np.empty(0)
+        values, cum = self._weighted()
+        return values, cum / cum[-1]
+
+# --------------------------------------------------------------------------------
+# 3) CREAZIONE, MERGE E SALVATAGGIO
+# --------------------------------------------------------------------------------
+
+def make_sketch(kind='hdr'):
+    """Sketch vuoto: 'hdr' (LatencyHistogram) o 'kll' (KllSketch)."""
+    if kind == 'hdr':
+        return LatencyHistogram()
+    if kind == 'kll':
+        return KllSketch()
+    raise ValueError(f"sketch sconosciuto: {kind!r} (attesi {SKETCH_KINDS})")
+
+
+def merge_sketches(sketches):
+    """Fonde una sequenza di sketch dello stesso tipo in un nuovo sketch (None se vuota)."""
+    merged = None
+    for sketch in sketches:
+        if merged is None:
+            merged = make_sketch('hdr' if isinstance(sketch, LatencyHistogram) else 'kll')
+            if isinstance(sketch, KllSketch):
+                merged.k = sketch.k
+        merged.merge(sketch)
+    return merged
+
+
+def save_sketch(sketch, file_path):
+    """Salva uno sketch in .npz per fonderlo in seguito con quelli di altri run."""
+    extremes = np.array([sketch.min, sketch.max], dtype=np.float64)
+    if isinstance(sketch, LatencyHistogram):
+        np.savez_compressed(file_path, kind='hdr', sub_buckets=SUB_BUCKETS, counts=sketch.counts,
+                            total=sketch.total, extremes=extremes)
+    else:
+        levels = {f"level_{h}": level for h, level in enumerate(sketch.levels)}
+        np.savez_compressed(file_path, kind='kll', k=sketch.k, n=sketch.n, extremes=extremes, **levels)
+
+
+def load_sketch(file_path):
+    """Sketch salvato da save_sketch."""
+    with np.load(file_path) as data:
+        kind = str(data['kind'])
+        if kind == 'hdr':
+            if int(data['sub_buckets']) != SUB_BUCKETS:
+                raise ValueError(f"{file_path}: istogramma con {int(data['sub_buckets'])} bucket per ottava")
+            sketch = LatencyHistogram()
+            sketch.counts = data['counts'].astype(np.int64)
+            sketch.total = float(data['total'])
+        else:
+            sketch = KllSketch(int(data['k']))
+            sketch.n = int(data['n'])
+            n_levels = sum(1 for name in data.files if name.startswith('level_'))
+            sketch.levels = [data[f"level_{h}"] for h in range(n_levels)]
+        sketch.min, sketch.max = (float(v) for v in data['extremes'])
+    return sketch
+
+# --------------------------------------------------------------------------------
+# 4) LETTURA DAI LOG
+# --------------------------------------------------------------------------------
+
+def feed_request_log(file_path, sketch):
+    """
+    Aggiunge allo sketch le latenze di un log di `send_request`, riga per riga e a blocchi
+    di _FEED_CHUNK: la memoria non dipende dalla lunghezza del log. Un LatencyHistogram
+    prende direttamente la riga 'Latency histogram' del client, se presente e se questo log
+    non ha righe per richiesta (lo sketch può già contenere le latenze di altri log).
+    """
+    chunk = []
+    printed = None
+    saw_iter = False
+    with open_result(file_path) as f:
+        for line in f:
+            if line.startswith('Iter '):
+                saw_iter = True
+                chunk.append(line)
+                if len(chunk) >= _FEED_CHUNK:
+                    sketch.update(parse_request_lines(chunk).latency_us)
+                    chunk = []
+            elif line.startswith('Latency histogram'):
+                printed = parse_histogram_line(line)
+    if chunk:
+        sketch.update(parse_request_lines(chunk).latency_us)
+    if printed is not None and not saw_iter:
+        if isinstance(sketch, LatencyHistogram):
+            sketch.merge(printed)
+        else:
+            # Senza le singole latenze il KLL riceve il centro di ogni bucket, a blocchi
+            values = printed._values()
+            for i in np.flatnonzero(printed.counts):
+                for start in range(0, int(printed.counts[i]), _FEED_CHUNK):
+                    sketch.update(np.full(min(_FEED_CHUNK, int(printed.counts[i]) - start), values[i]))
+    return sketch
+
+
+def load_latency_sketch(file_path, kind='hdr'):
+    """Sketch nuovo con le latenze di un log (funzione di modulo: va bene per map_paths)."""
+    return feed_request_log(file_path, make_sketch(kind))
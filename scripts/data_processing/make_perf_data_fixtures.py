@@ -0,0 +1,169 @@
+"""
+Genera piccoli file perf.data sintetici in fixtures/ e li rilegge con perf_data.py,
+così il lettore si può verificare senza PMU e senza `perf record`.
+
+  fixtures/perf_single.data  un evento, sample IP|TID|TIME|CPU|PERIOD|CALLCHAIN,
+                             PERF_RECORD_SWITCH con sample_id_all e un COMM da saltare
+  fixtures/perf_multi.data   due eventi con IDENTIFIER, sample con READ/RAW/WEIGHT/DATA_SRC,
+                             PERF_RECORD_SWITCH_CPU_WIDE
+
+Uso:
+    python3 make_perf_data_fixtures.py
+"""
+
+import os
+import struct
+
+import perf_data as pd
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+PERF_RECORD_COMM = 3
+PERF_RECORD_FINISHED_ROUND = 12
+
+# --------------------------------------------------------------------------------
+# 1) SCRITTURA DEL FORMATO
+# --------------------------------------------------------------------------------
+
+def _attr(a_type, config, sample_type, read_format=0, flags=0):
+    """perf_event_attr da 104 byte (PERF_ATTR_SIZE_VER5)."""
+    return pd._ATTR.pack(a_type, pd._ATTR.size, config, 4000, sample_type, read_format, flags,
+                         0, 0, 0, 0, 0, 0, 0, 0, 0)
+
+
+def _record(rec_type, misc, payload):
+    return pd._EVENT_HEADER.pack(rec_type, misc, 8 + len(payload)) + payload
+
+
+def _sample_id(sample_type, pid, tid, time, ident, cpu):
+    """sample_id in coda ai record non-SAMPLE, nell'ordine del kernel."""
+    out = b''
+    if sample_type & pd.PERF_SAMPLE_TID:
+        out += struct.pack('<II', pid, tid)
+    if sample_type & pd.PERF_SAMPLE_TIME:
+        out += struct.pack('<Q', time)
+    if sample_type & pd.PERF_SAMPLE_ID:
+        out += struct.pack('<Q', ident)
+    if sample_type & pd.PERF_SAMPLE_CPU:
+        out += struct.pack('<II', cpu, 0)
+    if sample_type & pd.PERF_SAMPLE_IDENTIFIER:
+        out += struct.pack('<Q', ident)
+    return out
+
+
+def write_perf_data(path, attrs, records):
+    """
+    Scrive un perf.data: attrs è una lista di (attr_bytes, ids), records una lista di
+    record già serializzati. Layout: header | id | attr | data.
+    """
+    header_size = pd._FILE_HEADER.size
+    attr_size = pd._ATTR.size + pd._SECTION.size
+
+    ids_blob = b''
+    ids_sections = []
+    for _, ids in attrs:
+        ids_sections.append((header_size + len(ids_blob), 8 * len(ids)))
+        ids_blob += struct.pack(f'<{len(ids)}Q', *ids)
+
+    attrs_offset = header_size + len(ids_blob)
+    attrs_blob = b''.join(a + pd._SECTION.pack(*sec) for (a, _), sec in zip(attrs, ids_sections))
+    data_offset = attrs_offset + len(attrs_blob)
+    data_blob = b''.join(records)
+
+    header = pd._FILE_HEADER.pack(pd.PERF_MAGIC, header_size, attr_size,
+                                  attrs_offset, len(attrs_blob),
+                                  data_offset, len(data_blob),
+                                  0, 0, 0, 0, 0, 0)
+    with open(path, 'wb') as f:
+        f.write(header + ids_blob + attrs_blob + data_blob)
+
+# --------------------------------------------------------------------------------
+# 2) FIXTURE
+# --------------------------------------------------------------------------------
+
+def fixture_single(path):
+    st = (pd.PERF_SAMPLE_IP | pd.PERF_SAMPLE_TID | pd.PERF_SAMPLE_TIME |
+          pd.PERF_SAMPLE_CPU | pd.PERF_SAMPLE_PERIOD | pd.PERF_SAMPLE_CALLCHAIN)
+    attrs = [(_attr(4, 0x1d1, st, flags=pd._ATTR_FLAG_SAMPLE_ID_ALL), [101])]
+
+    records = [_record(PERF_RECORD_COMM, 0,
+                       struct.pack('<II', 1000, 1000) + b'send_request\0\0\0\0' +
+                       _sample_id(st, 1000, 1000, 5, 101, 0))]
+    for i in range(6):
+        chain = [0xffffffff81000000 + i, 0x401000 + i, 0x402000 + i][:1 + i % 3]
+        payload = struct.pack('<QIIQIIQ', 0x401000 + 16 * i, 1000, 1000 + i % 2, 1000 + 10 * i,
+                              i % 2, 0, 4000)
+        payload += struct.pack(f'<Q{len(chain)}Q', len(chain), *chain)
+        records.append(_record(pd.PERF_RECORD_SAMPLE, 0, payload))
+        misc = pd.PERF_RECORD_MISC_SWITCH_OUT if i % 2 == 0 else 0
+        records.append(_record(pd.PERF_RECORD_SWITCH, misc,
+                               _sample_id(st, 1000, 1000, 1005 + 10 * i, 101, i % 2)))
+    records.append(_record(PERF_RECORD_FINISHED_ROUND, 0, b''))
+    write_perf_data(path, attrs, records)
+    return {'samples': 6, 'switches': 6, 'switch_out': 3}
+
+
+def fixture_multi(path):
+    st = (pd.PERF_SAMPLE_IDENTIFIER | pd.PERF_SAMPLE_IP | pd.PERF_SAMPLE_TID |
+          pd.PERF_SAMPLE_TIME | pd.PERF_SAMPLE_CPU | pd.PERF_SAMPLE_PERIOD |
+          pd.PERF_SAMPLE_READ | pd.PERF_SAMPLE_RAW | pd.PERF_SAMPLE_WEIGHT |
+          pd.PERF_SAMPLE_DATA_SRC)
+    rf = pd.PERF_FORMAT_TOTAL_TIME_ENABLED | pd.PERF_FORMAT_TOTAL_TIME_RUNNING | pd.PERF_FORMAT_ID
+    flags = pd._ATTR_FLAG_SAMPLE_ID_ALL
+    attrs = [(_attr(4, 0x08d1, st, rf, flags), [201, 202]),   # mem_load_retired.l1_miss
+             (_attr(4, 0x20d1, st, rf, flags), [301, 302])]   # mem_load_retired.l3_miss
+
+    records = []
+    for i in range(8):
+        ident = (201, 301, 202, 302)[i % 4]
+        cpu = i % 2
+        payload = struct.pack('<QQIIQIIQ', ident, 0x7f0000 + i, 2000, 2000, 500 + i, cpu, 0, 100)
+        payload += struct.pack('<QQQQ', 10 * i, 1000, 900, ident)          # READ
+        payload += struct.pack('<I', 12) + b'rawdata\0\0\0\0\0'            # RAW (4 + 12)
+        payload += struct.pack('<QQ', 30 + i, 0x68100142)                  # WEIGHT, DATA_SRC
+        records.append(_record(pd.PERF_RECORD_SAMPLE, 0, payload))
+    for i in range(4):
+        ident = (201, 202, 301, 302)[i]
+        misc = pd.PERF_RECORD_MISC_SWITCH_OUT | pd.PERF_RECORD_MISC_SWITCH_OUT_PREEMPT if i < 2 else 0
+        records.append(_record(pd.PERF_RECORD_SWITCH_CPU_WIDE, misc,
+                               struct.pack('<II', 3000 + i, 3000 + i) +
+                               _sample_id(st, 2000, 2000, 600 + i, ident, i % 2)))
+    write_perf_data(path, attrs, records)
+    return {'samples': 8, 'switches': 4, 'switch_out': 2}
+
+# --------------------------------------------------------------------------------
+# 3) MAIN: scrive e verifica
+# --------------------------------------------------------------------------------
+
+def verifica(path, expected):
+    samples = list(pd.iter_samples(path))
+    switches = list(pd.iter_switches(path))
+    assert len(samples) == expected['samples'], (path, len(samples))
+    assert len(switches) == expected['switches'], (path, len(switches))
+    assert sum(s.out for s in switches) == expected['switch_out'], path
+    assert all(s.time is not None and s.cpu is not None for s in samples + switches), path
+    return samples, switches
+
+
+def main():
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+
+    path = os.path.join(FIXTURES_DIR, 'perf_single.data')
+    expected = fixture_single(path)
+    samples, switches = verifica(path, expected)
+    assert [len(s.callchain) for s in samples] == [1, 2, 3, 1, 2, 3]
+    assert samples[2].callchain[2] == 0x402002
+    assert switches[0].time == 1005 and switches[0].next_prev_pid is None
+    print(f"{path}: {len(samples)} sample, {len(switches)} switch OK")
+
+    path = os.path.join(FIXTURES_DIR, 'perf_multi.data')
+    expected = fixture_multi(path)
+    samples, switches = verifica(path, expected)
+    assert [s.id for s in samples[:4]] == [201, 301, 202, 302]
+    assert samples[3].weight == 33 and samples[3].data_src == 0x68100142
+    assert switches[0].preempt and switches[3].next_prev_pid == 3003
+    print(f"{path}: {len(samples)} sample, {len(switches)} switch OK")
+
+
+if __name__ == "__main__":
+    main()
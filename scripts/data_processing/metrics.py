@@ -0,0 +1,249 @@
+"""
+Metriche derivate calcolate su array interi (scenario x size [x livello]) con broadcasting.
+
+Sostituisce i cicli per cella di normalizza_* e calcola_missrate degli script di plot:
+    - normalizzazione rispetto a uno scenario di riferimento qualsiasi (default '1S')
+    - miss rate di tutti i livelli di cache in una sola operazione
+
+Un rapporto non definito (denominatore 0 o NaN) vale NaN e non 0: un valore mancante
+non deve comparire nei grafici come "nessun degrado".
+
+    norm = normalizza_baseline(data_cache, scenario_labels, baseline='2S_LOW')
+    rate = miss_rate(data_cache[..., :3], data_cache[..., 3:])
+
+MetricGraph mette le metriche in un piccolo grafo di dipendenze valutato in modo lazy:
+ogni metrica viene calcolata alla prima richiesta e conservata, così quelle non usate non
+costano nulla e gli intermedi condivisi (es. throughput per norm_throughput e degradation)
+vengono calcolati una volta sola. Si crea un grafo per ogni campagna caricata:
+
+    metrics = MetricGraph(cube.sel(scenario=scenario_labels, stat='value'), baseline='1S')
+    rate = metrics['miss_rate']          # scenario x size x livello
+    slowdown = metrics['degradation']    # calcola throughput e norm_throughput
+"""
+
+import numpy as np
+
+from data_cube import DataCube
+from request_log import LATENCY_EVENTS
+
+# --------------------------------------------------------------------------------
+# 1) OPERAZIONI SU ARRAY
+# --------------------------------------------------------------------------------
+
+def rapporto(num, den):
+    """
+    num / den con broadcasting NumPy, in float64.
+    NaN dove den è 0 o NaN (e dove num è NaN).
+    """
+    num = np.asarray(num, dtype=np.float64)
+    den = np.asarray(den, dtype=np.float64)
+    out = np.full(np.broadcast_shapes(num.shape, den.shape), np.nan)
+    np.divide(num, den, out=out, where=(den != 0) & ~np.isnan(den))
+    return out
+
+
+def normalizza_baseline(values, scenario_labels, baseline='1S', axis=0):
+    """
+    Divide ogni scenario per lo scenario di riferimento lungo l'asse degli scenari.
+    values: array con len(scenario_labels) posizioni su axis (es. scenario x size x livello).
+    """
+    try:
+        idx = list(scenario_labels).index(baseline)
+    except ValueError:
+        raise ValueError(f"scenario di riferimento {baseline!r} assente da {list(scenario_labels)}") from None
+    values = np.asarray(values, dtype=np.float64)
+    return rapporto(values, np.take(values, [idx], axis=axis))
+
+
+def miss_rate(misses, hits):
+    """
+    Miss rate in percentuale, 100 * miss / (miss + hit), per tutti i livelli insieme
+    (misses e hits con la stessa forma). NaN dove miss + hit è 0.
+    """
+    misses = np.asarray(misses, dtype=np.float64)
+    return 100.0 * rapporto(misses, misses + hits)
+
+# --------------------------------------------------------------------------------
+# 2) OPERAZIONI SU CUBI
+# --------------------------------------------------------------------------------
+
+def normalizza_cubo(cube, baseline='1S'):
+    """
+    Cubo con ogni scenario diviso per lo scenario di riferimento (stessi assi ed etichette).
+    Ha senso sui valori: selezionare prima stat='value'.
+    """
+    axis = cube.axes.index('scenario')
+    return DataCube(normalizza_baseline(cube.values, cube.labels('scenario'), baseline, axis),
+                    cube.axes, cube.coords)
+
+
+def miss_rate_cubo(cube, levels=('l1', 'l2', 'l3')):
+    """
+    Miss rate (%) dei livelli indicati da un cubo con gli eventi <livello>_miss e
+    <livello>_hit; l'asse event del risultato ha le etichette dei livelli.
+    """
+    misses = cube.sel(event=[f"{level}_miss" for level in levels])
+    hits = cube.sel(event=[f"{level}_hit" for level in levels])
+    coords = dict(misses.coords)
+    coords['event'] = np.asarray(levels)
+    return DataCube(miss_rate(misses.values, hits.values), misses.axes, coords)
+
+# --------------------------------------------------------------------------------
+# 3) GRAFO LAZY DELLE METRICHE DERIVATE
+# --------------------------------------------------------------------------------
+
+MISS_EVENTS = ('l1_miss', 'l2_miss', 'l3_miss')
+HIT_EVENTS = ('l1_hit', 'l2_hit', 'l3_hit')
+TLB_EVENTS = ('tlb_l1_miss', 'tlb_l2_miss')
+
+# {nome: (dipendenze, funzione(grafo, *valori delle dipendenze))}
+_METRICS = {}
+
+
+def metrica(name, *deps):
+    """Registra una metrica derivata calcolata dai valori delle dipendenze."""
+    def register(func):
+        _METRICS[name] = (deps, func)
+        return func
+    return register
+
+
+@metrica('misses')
+def _misses(graph):
+    return graph.events(MISS_EVENTS)
+
+
+@metrica('hits')
+def _hits(graph):
+    return graph.events(HIT_EVENTS)
+
+
+@metrica('tlb_misses')
+def _tlb_misses(graph):
+    return graph.events(TLB_EVENTS)
+
+
+@metrica('instructions')
+def _instructions(graph):
+    return graph.events('instructions')
+
+
+@metrica('time_us')
+def _time_us(graph):
+    # Media delle sole richieste riuscite (request_log.py), come il bootstrap degli sketch;
+    # 'Average Execution Time' conta le fallite come 0 e resta solo per i log senza righe 'Iter'
+    measured = graph.events('latency_mean_us')
+    reported = graph.events('avg_time_us')
+    missing = np.isnan(measured) & ~np.isnan(reported)
+    if missing.any():
+        print(f"ATTENZIONE: {np.count_nonzero(missing)} celle senza latenze per richiesta: "
+              "tempo medio dalla riga 'Average Execution Time'")
+    return np.where(np.isnan(measured), reported, measured)
+
+
+@metrica('requests')
+def _requests(graph):
+    return graph.events('n_requests')
+
+
+@metrica('latency_percentiles')
+def _latency_percentiles(graph):
+    # p50, p90, p99, p99.9 e massimo delle latenze per richiesta (request_log.py)
+    return graph.events(LATENCY_EVENTS)
+
+
+@metrica('miss_rate', 'misses', 'hits')
+def _miss_rate(graph, misses, hits):
+    return miss_rate(misses, hits)
+
+
+@metrica('mpki', 'misses', 'instructions')
+def _mpki(graph, misses, instructions):
+    # NaN per le campagne registrate senza il contatore instructions
+    return rapporto(misses, instructions[..., np.newaxis] / 1000.0)
+
+
+@metrica('throughput', 'requests', 'time_us')
+def _throughput(graph, requests, time_us):
+    # Richieste riuscite per secondo di tempo reale dai timestamp del client (request_log.py);
+    # per i log senza timestamp resta la stima richieste / tempo medio
+    measured = graph.events('throughput_rps')
+    estimated = rapporto(requests, time_us / 1e6)
+    missing = np.isnan(measured) & ~np.isnan(estimated)
+    if missing.any():
+        print(f"ATTENZIONE: {np.count_nonzero(missing)} celle senza timestamp per richiesta: "
+              "throughput stimato da richieste / tempo medio")
+    return np.where(np.isnan(measured), estimated, measured)
+
+
+@metrica('throughput_min')
+def _throughput_min(graph):
+    # Finestra scorrevole peggiore (THROUGHPUT_WINDOW_S), NaN senza timestamp
+    return graph.events('throughput_min_rps')
+
+
+@metrica('degradation', 'norm_throughput')
+def _degradation(graph, norm_throughput):
+    # Fattore di degrado: throughput di riferimento / throughput (> 1 = più lento)
+    return rapporto(1.0, norm_throughput)
+
+
+class MetricGraph:
+    """
+    Metriche derivate di una campagna, valutate alla prima richiesta e memorizzate.
+    cube: cubo con assi scenario x size x event (valori, senza l'asse stat).
+    'norm_<metrica>' è qualsiasi metrica divisa per lo scenario baseline.
+    """
+
+    __slots__ = ('cube', 'baseline', '_cache', '_pending')
+
+    def __init__(self, cube, baseline='1S'):
+        if cube.axes != ('scenario', 'size', 'event'):
+            raise ValueError(f"attesi gli assi ('scenario', 'size', 'event'), trovati {cube.axes}")
+        self.cube = cube
+        self.baseline = baseline
+        self._cache = {}
+        self._pending = set()
+
+    def __repr__(self):
+        return f"MetricGraph({self.cube!r}, calcolate={sorted(self._cache)})"
+
+    def __getitem__(self, name):
+        return self.get(name)
+
+    @property
+    def computed(self):
+        """Nomi delle metriche già calcolate."""
+        return sorted(self._cache)
+
+    def events(self, names):
+        """Valori degli eventi del cubo; gli eventi assenti valgono NaN."""
+        if isinstance(names, str):
+            return self.cube.reindex(event=[names]).values[..., 0]
+        return self.cube.reindex(event=list(names)).values
+
+    def _rule(self, name):
+        rule = _METRICS.get(name)
+        if rule is not None:
+            return rule
+        if name.startswith('norm_') and name[5:] in _METRICS:
+            return (name[5:],), lambda graph, values: normalizza_baseline(
+                values, graph.cube.labels('scenario'), graph.baseline)
+        raise KeyError(f"metrica sconosciuta: {name!r} (disponibili {sorted(_METRICS)} e norm_<metrica>)")
+
+    def get(self, name):
+        """Valore di una metrica: calcolato (con le dipendenze) solo alla prima richiesta."""
+        value = self._cache.get(name)
+        if value is not None:
+            return value
+        if name in self._pending:
+            raise ValueError(f"dipendenza circolare sulla metrica {name!r}")
+        deps, func = self._rule(name)
+        self._pending.add(name)
+        try:
+            value = func(self, *[self.get(dep) for dep in deps])
+        finally:
+            self._pending.discard(name)
+        value.flags.writeable = False
+        self._cache[name] = value
+        return value
@@ -0,0 +1,250 @@
+"""
+Cache persistente (SQLite) dei record già estratti dai file di risultato.
+
+Ogni voce è indicizzata da (percorso assoluto, tipo di parsing) e valida solo se
+dimensione, mtime e PARSER_VERSION coincidono con quelli del file su disco: un
+ri-plot "a caldo" fa solo una stat() e una SELECT per file, nessun parsing di testo.
+Le voci meno usate di recente vengono eliminate quando la cache supera il limite
+di dimensione (LRU).
+
+Variabili d'ambiente:
+    PERF_PARSE_CACHE      percorso del file SQLite ('off' per disabilitare la cache)
+    PERF_PARSE_CACHE_MB   dimensione massima dei dati in cache, in MB (default 64)
+
+La connessione è condivisa tra i thread (protetta da un lock, il parsing resta fuori dal
+lock) e viene riaperta nei processi figli creati con fork.
+"""
+
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from array import array
+
+from perf_parser import PARSER_VERSION, PerfStat, load_perf_stat, load_perf_variance, parse_execution_log
+from perf_record import PerfRecord, load_perf_record
+from request_log import request_stats
+from result_io import result_stat
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'transient_analysis',
+                                  'parse_cache.sqlite')
+DEFAULT_MAX_MB = 64
+
+# Dopo quante operazioni scrivere su disco gli aggiornamenti di last_used
+_FLUSH_EVERY = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS parsed (
+    path      TEXT    NOT NULL,
+    kind      TEXT    NOT NULL,
+    size      INTEGER NOT NULL,
+    mtime_ns  INTEGER NOT NULL,
+    version   INTEGER NOT NULL,
+    payload   BLOB    NOT NULL,
+    nbytes    INTEGER NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (path, kind)
+);
+CREATE INDEX IF NOT EXISTS parsed_lru ON parsed (last_used);
+"""
+
+_lock = threading.RLock()
+
+_state = {
+    'conn': None,       # connessione aperta alla prima richiesta
+    'pid': None,        # processo che ha aperto la connessione
+    'path': None,
+    'max_bytes': None,
+    'touched': {},      # (path, kind) -> last_used da scrivere al prossimo flush
+    'pending': 0,
+    'hits': 0,
+    'misses': 0,
+}
+
+# --------------------------------------------------------------------------------
+# 1) CONNESSIONE E MANUTENZIONE
+# --------------------------------------------------------------------------------
+
+def configure(cache_path=None, max_mb=None):
+    """
+    Imposta file e dimensione della cache (prima del primo utilizzo, oppure per
+    cambiarli: la connessione precedente viene chiusa). cache_path='off' disabilita.
+    """
+    close()
+    if cache_path is None:
+        cache_path = os.environ.get('PERF_PARSE_CACHE', DEFAULT_CACHE_PATH)
+    if max_mb is None:
+        max_mb = float(os.environ.get('PERF_PARSE_CACHE_MB', DEFAULT_MAX_MB))
+    _state['path'] = cache_path
+    _state['max_bytes'] = int(max_mb * 1024 * 1024)
+
+
+def _connection():
+    conn = _state['conn']
+    if conn is not None:
+        if _state['pid'] == os.getpid():
+            return conn
+        # Processo figlio (fork): la connessione del padre non va né usata né chiusa
+        _state['conn'] = None
+        _state['touched'] = {}
+        _state['pending'] = 0
+    if _state['path'] is None:
+        configure()
+    if _state['path'] == 'off':
+        return None
+    os.makedirs(os.path.dirname(os.path.abspath(_state['path'])), exist_ok=True)
+    conn = sqlite3.connect(_state['path'], timeout=30, check_same_thread=False)
+    # La cache è ricostruibile: niente fsync a ogni scrittura
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=OFF')
+    conn.executescript(_SCHEMA)
+    _state['conn'] = conn
+    _state['pid'] = os.getpid()
+    return conn
+
+
+def _evict(conn):
+    """Elimina le voci meno usate finché i dati non rientrano in max_bytes."""
+    total = conn.execute('SELECT COALESCE(SUM(nbytes), 0) FROM parsed').fetchone()[0]
+    excess = total - _state['max_bytes']
+    if excess <= 0:
+        return
+    victims = []
+    for rowid, nbytes in conn.execute('SELECT rowid, nbytes FROM parsed ORDER BY last_used'):
+        victims.append((rowid,))
+        excess -= nbytes
+        if excess <= 0:
+            break
+    conn.executemany('DELETE FROM parsed WHERE rowid = ?', victims)
+
+
+def flush():
+    """Scrive gli aggiornamenti LRU pendenti, applica il limite di dimensione e fa commit."""
+    with _lock:
+        conn = _state['conn']
+        if conn is None or _state['pid'] != os.getpid():
+            return
+        touched = _state['touched']
+        if touched:
+            conn.executemany('UPDATE parsed SET last_used = ? WHERE path = ? AND kind = ?',
+                             [(t, path, kind) for (path, kind), t in touched.items()])
+            touched.clear()
+        _evict(conn)
+        conn.commit()
+        _state['pending'] = 0
+
+
+def close():
+    """Flush e chiusura della connessione (registrata anche con atexit)."""
+    with _lock:
+        if _state['conn'] is not None and _state['pid'] == os.getpid():
+            flush()
+            _state['conn'].close()
+        _state['conn'] = None
+
+
+def clear():
+    """Svuota la cache."""
+    with _lock:
+        conn = _connection()
+        if conn is not None:
+            conn.execute('DELETE FROM parsed')
+            _state['touched'].clear()
+            conn.commit()
+
+
+def cache_stats():
+    """Ritorna (hit, miss) della sessione corrente."""
+    return _state['hits'], _state['misses']
+
+
+atexit.register(close)
+
+# --------------------------------------------------------------------------------
+# 2) LOOKUP GENERICO
+# --------------------------------------------------------------------------------
+
+def cached(kind, parse, encode, decode, file_path):
+    """
+    Ritorna decode(payload) se il file è in cache e non è cambiato, altrimenti
+    chiama parse(file_path), salva encode(risultato) e lo ritorna.
+    """
+    with _lock:
+        conn = _connection()
+    if conn is None:
+        return parse(file_path)
+
+    path = os.path.abspath(file_path)
+    size, mtime_ns = result_stat(path)
+    now = time.time_ns()
+    with _lock:
+        row = conn.execute('SELECT size, mtime_ns, version, payload FROM parsed WHERE path = ? AND kind = ?',
+                           (path, kind)).fetchone()
+        hit = (row is not None and row[0] == size and row[1] == mtime_ns
+               and row[2] == PARSER_VERSION)
+        if hit:
+            _state['hits'] += 1
+            _state['touched'][(path, kind)] = now
+        else:
+            _state['misses'] += 1
+
+    if hit:
+        result = decode(row[3])
+    else:
+        result = parse(file_path)
+        payload = encode(result)
+
+    with _lock:
+        if not hit:
+            conn.execute('INSERT OR REPLACE INTO parsed VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                         (path, kind, size, mtime_ns, PARSER_VERSION, payload,
+                          len(payload) + len(path), now))
+        _state['pending'] += 1
+        if _state['pending'] >= _FLUSH_EVERY:
+            flush()
+    return result
+
+# --------------------------------------------------------------------------------
+# 3) PARSER CON CACHE
+# --------------------------------------------------------------------------------
+
+def _encode_doubles(values):
+    return array('d', values).tobytes()
+
+
+def _decode_perf_stat(payload):
+    return PerfStat._make(array('d', payload))
+
+
+def _decode_execution_log(payload):
+    avg_time, n_requests = array('d', payload)
+    return avg_time, int(n_requests)
+
+
+def load_perf_stat_cached(file_path):
+    """Come perf_parser.load_perf_stat, passando dalla cache."""
+    return cached('perf_stat', load_perf_stat, _encode_doubles, _decode_perf_stat, file_path)
+
+
+def load_perf_record_cached(file_path):
+    """Come perf_record.load_perf_record, passando dalla cache."""
+    return cached('perf_record', load_perf_record, lambda record: _encode_doubles(record.astuple()),
+                  lambda payload: PerfRecord(*array('d', payload)), file_path)
+
+
+def load_perf_variance_cached(file_path):
+    """Come perf_parser.load_perf_variance, passando dalla cache."""
+    return cached('perf_variance', load_perf_variance, _encode_doubles, _decode_perf_stat, file_path)
+
+
+def parse_execution_log_cached(file_path):
+    """Come perf_parser.parse_execution_log, passando dalla cache."""
+    return cached('execution_log', parse_execution_log, _encode_doubles, _decode_execution_log,
+                  file_path)
+
+
+def request_stats_cached(file_path, window_s):
+    """Come request_log.request_stats, passando dalla cache (una voce per ampiezza di finestra)."""
+    return cached(f'request_stats_{window_s:g}', lambda path: request_stats(path, window_s),
+                  _encode_doubles, lambda payload: tuple(array('d', payload)), file_path)
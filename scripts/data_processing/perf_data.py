@@ -0,0 +1,394 @@
+"""
+Lettore nativo dei file `perf.data` prodotti da `perf record`, senza passare da
+`perf script`.
+
+Il file viene mappato in memoria (mmap) e le sezioni header / attr / data vengono
+percorse con `struct.unpack_from` su un unico memoryview: nessun record viene copiato,
+i callchain sono slice del memoryview. Vengono estratti i record PERF_RECORD_SAMPLE e
+PERF_RECORD_SWITCH / PERF_RECORD_SWITCH_CPU_WIDE (registrati con `perf record --switch-events`).
+
+Solo il formato su file ("PERFILE2", little-endian); il formato pipe (`perf record -o -`)
+non è supportato.
+
+Uso da riga di comando (riepilogo del file):
+    python3 perf_data.py perf.data
+"""
+
+import mmap
+import struct
+import sys
+from collections import Counter, namedtuple
+
+# --------------------------------------------------------------------------------
+# 1) COSTANTI DEL FORMATO (include/uapi/linux/perf_event.h, tools/perf/util/header.h)
+# --------------------------------------------------------------------------------
+
+PERF_MAGIC = b'PERFILE2'
+
+PERF_RECORD_SAMPLE = 9
+PERF_RECORD_SWITCH = 14
+PERF_RECORD_SWITCH_CPU_WIDE = 15
+
+PERF_RECORD_MISC_SWITCH_OUT = 1 << 13
+PERF_RECORD_MISC_SWITCH_OUT_PREEMPT = 1 << 14
+
+PERF_SAMPLE_IP = 1 << 0
+PERF_SAMPLE_TID = 1 << 1
+PERF_SAMPLE_TIME = 1 << 2
+PERF_SAMPLE_ADDR = 1 << 3
+PERF_SAMPLE_READ = 1 << 4
+PERF_SAMPLE_CALLCHAIN = 1 << 5
+PERF_SAMPLE_ID = 1 << 6
+PERF_SAMPLE_CPU = 1 << 7
+PERF_SAMPLE_PERIOD = 1 << 8
+PERF_SAMPLE_STREAM_ID = 1 << 9
+PERF_SAMPLE_RAW = 1 << 10
+PERF_SAMPLE_BRANCH_STACK = 1 << 11
+PERF_SAMPLE_REGS_USER = 1 << 12
+PERF_SAMPLE_STACK_USER = 1 << 13
+PERF_SAMPLE_WEIGHT = 1 << 14
+PERF_SAMPLE_DATA_SRC = 1 << 15
+PERF_SAMPLE_IDENTIFIER = 1 << 16
+PERF_SAMPLE_TRANSACTION = 1 << 17
+PERF_SAMPLE_REGS_INTR = 1 << 18
+PERF_SAMPLE_PHYS_ADDR = 1 << 19
+PERF_SAMPLE_AUX = 1 << 20
+PERF_SAMPLE_CGROUP = 1 << 21
+PERF_SAMPLE_DATA_PAGE_SIZE = 1 << 22
+PERF_SAMPLE_CODE_PAGE_SIZE = 1 << 23
+PERF_SAMPLE_WEIGHT_STRUCT = 1 << 24
+
+PERF_FORMAT_TOTAL_TIME_ENABLED = 1 << 0
+PERF_FORMAT_TOTAL_TIME_RUNNING = 1 << 1
+PERF_FORMAT_ID = 1 << 2
+PERF_FORMAT_GROUP = 1 << 3
+PERF_FORMAT_LOST = 1 << 4
+
+PERF_SAMPLE_BRANCH_HW_INDEX = 1 << 17
+
+# Bit di perf_event_attr.flags
+_ATTR_FLAG_SAMPLE_ID_ALL = 1 << 18
+
+# perf_file_header: magic, size, attr_size, attrs{off,size}, data{off,size},
+# event_types{off,size}, adds_features[4]
+_FILE_HEADER = struct.Struct('<8sQQQQQQQQ4Q')
+# perf_event_header: type, misc, size
+_EVENT_HEADER = struct.Struct('<IHH')
+# perf_event_attr fino a branch_sample_type/sample_regs_user/sample_stack_user/clockid/sample_regs_intr
+_ATTR = struct.Struct('<IIQQQQQIIQQQQIiQ')
+_SECTION = struct.Struct('<QQ')
+
+
+class PerfDataError(ValueError):
+    """File perf.data troncato, corrotto o in un formato non supportato."""
+
+
+PerfAttr = namedtuple('PerfAttr', ['type', 'config', 'sample_type', 'read_format', 'flags',
+                                   'branch_sample_type', 'sample_regs_user', 'sample_regs_intr',
+                                   'ids'])
+PerfAttr.__doc__ = "Configurazione di un evento registrato (perf_event_attr) e i suoi id."
+
+SampleRecord = namedtuple('SampleRecord', ['offset', 'misc', 'id', 'ip', 'pid', 'tid', 'time',
+                                           'addr', 'cpu', 'period', 'callchain', 'weight',
+                                           'data_src', 'phys_addr'])
+SampleRecord.__doc__ = """
+PERF_RECORD_SAMPLE. I campi non presenti nel sample_type valgono None; callchain è un
+memoryview di u64 sul file mappato (valido solo durante l'iterazione: usare tuple() per
+conservarlo).
+"""
+
+SwitchRecord = namedtuple('SwitchRecord', ['offset', 'misc', 'out', 'preempt', 'next_prev_pid',
+                                           'next_prev_tid', 'pid', 'tid', 'time', 'id', 'cpu'])
+SwitchRecord.__doc__ = """
+PERF_RECORD_SWITCH / PERF_RECORD_SWITCH_CPU_WIDE. out indica lo switch in uscita;
+next_prev_pid/tid sono presenti solo nella variante CPU_WIDE (altrimenti None).
+pid/tid/time/id/cpu vengono dal sample_id in coda al record (se sample_id_all).
+"""
+
+# --------------------------------------------------------------------------------
+# 2) HEADER E ATTR
+# --------------------------------------------------------------------------------
+
+def _read_header(buf):
+    if len(buf) < _FILE_HEADER.size:
+        raise PerfDataError("file troppo corto per un header perf.data")
+    fields = _FILE_HEADER.unpack_from(buf, 0)
+    magic = fields[0]
+    if magic != PERF_MAGIC:
+        if magic == PERF_MAGIC[::-1]:
+            raise PerfDataError("perf.data big-endian non supportato")
+        raise PerfDataError(f"magic non valido {magic!r}")
+    header_size, attr_size = fields[1], fields[2]
+    if header_size != _FILE_HEADER.size:
+        raise PerfDataError(f"header di {header_size} byte: formato pipe non supportato")
+    attrs = (fields[3], fields[4])
+    data = (fields[5], fields[6])
+    return attr_size, attrs, data
+
+
+def _read_attrs(buf, attr_size, attrs_offset, attrs_size):
+    """Legge la sezione attr: per ogni evento perf_event_attr seguito da {offset, size} degli id."""
+    attrs = []
+    if attr_size == 0:
+        return attrs
+    for pos in range(attrs_offset, attrs_offset + attrs_size, attr_size):
+        a_size = struct.unpack_from('<I', buf, pos + 4)[0]
+        raw = bytes(buf[pos:pos + min(a_size, _ATTR.size)]).ljust(_ATTR.size, b'\0')
+        (a_type, _, config, _, sample_type, read_format, flags, _, _,
+         _, _, branch_sample_type, regs_user, _, _, regs_intr) = _ATTR.unpack(raw)
+        ids_offset, ids_size = _SECTION.unpack_from(buf, pos + attr_size - _SECTION.size)
+        ids = struct.unpack_from(f'<{ids_size // 8}Q', buf, ids_offset) if ids_size else ()
+        attrs.append(PerfAttr(a_type, config, sample_type, read_format, flags,
+                              branch_sample_type, regs_user, regs_intr, ids))
+    return attrs
+
+
+def read_perf_attrs(file_path):
+    """
+    Ritorna la lista dei PerfAttr registrati in un file perf.data. Il file viene mappato
+    come in iter_perf_records: si toccano solo le pagine di header, attr e id, non la
+    sezione data.
+    """
+    with open(file_path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    buf = memoryview(mm)
+    try:
+        attr_size, (a_off, a_size), _ = _read_header(buf)
+        return _read_attrs(buf, attr_size, a_off, a_size)
+    finally:
+        buf.release()
+        mm.close()
+
+# --------------------------------------------------------------------------------
+# 3) DECODIFICA DEI RECORD
+# --------------------------------------------------------------------------------
+
+# Campi a lunghezza fissa all'inizio di un sample, nell'ordine del kernel
+_SAMPLE_PREFIX = (
+    (PERF_SAMPLE_IDENTIFIER, 'Q', ('id',)),
+    (PERF_SAMPLE_IP,         'Q', ('ip',)),
+    (PERF_SAMPLE_TID,        'II', ('pid', 'tid')),
+    (PERF_SAMPLE_TIME,       'Q', ('time',)),
+    (PERF_SAMPLE_ADDR,       'Q', ('addr',)),
+    (PERF_SAMPLE_ID,         'Q', ('id',)),
+    (PERF_SAMPLE_STREAM_ID,  'Q', (None,)),
+    (PERF_SAMPLE_CPU,        'II', ('cpu', None)),
+    (PERF_SAMPLE_PERIOD,     'Q', ('period',)),
+)
+
+# sample_id in coda ai record non-SAMPLE (sample_id_all)
+_SAMPLE_ID_TAIL = (
+    (PERF_SAMPLE_TID,        'II', ('pid', 'tid')),
+    (PERF_SAMPLE_TIME,       'Q', ('time',)),
+    (PERF_SAMPLE_ID,         'Q', ('id',)),
+    (PERF_SAMPLE_STREAM_ID,  'Q', (None,)),
+    (PERF_SAMPLE_CPU,        'II', ('cpu', None)),
+    (PERF_SAMPLE_IDENTIFIER, 'Q', ('id',)),
+)
+
+
+def _compile_layout(sample_type, table):
+    """Struct e nomi dei campi presenti nel sample_type, per un unico unpack_from."""
+    fmt = '<'
+    names = []
+    for bit, codes, fields in table:
+        if sample_type & bit:
+            fmt += codes
+            names.extend(fields)
+    return struct.Struct(fmt), names
+
+
+def _read_format_size(read_format, buf, pos):
+    """Byte occupati dal campo PERF_SAMPLE_READ a partire da pos."""
+    per_value = 8 + (8 if read_format & PERF_FORMAT_ID else 0) + (8 if read_format & PERF_FORMAT_LOST else 0)
+    extra = (8 if read_format & PERF_FORMAT_TOTAL_TIME_ENABLED else 0) + \
+            (8 if read_format & PERF_FORMAT_TOTAL_TIME_RUNNING else 0)
+    if read_format & PERF_FORMAT_GROUP:
+        nr = struct.unpack_from('<Q', buf, pos)[0]
+        return 8 + extra + nr * per_value
+    return extra + per_value
+
+
+class _SampleDecoder:
+    """Decodifica i sample di un attr: layout del prefisso precompilato una volta sola."""
+
+    __slots__ = ('attr', 'prefix', 'names', 'tail', 'tail_names', 'n_regs_user', 'n_regs_intr')
+
+    def __init__(self, attr):
+        self.attr = attr
+        self.prefix, self.names = _compile_layout(attr.sample_type, _SAMPLE_PREFIX)
+        self.tail, self.tail_names = _compile_layout(attr.sample_type, _SAMPLE_ID_TAIL)
+        self.n_regs_user = bin(attr.sample_regs_user).count('1')
+        self.n_regs_intr = bin(attr.sample_regs_intr).count('1')
+
+    def sample(self, buf, pos, end, misc):
+        attr = self.attr
+        st = attr.sample_type
+        fields = dict(zip(self.names, self.prefix.unpack_from(buf, pos + 8)))
+        p = pos + 8 + self.prefix.size
+
+        if st & PERF_SAMPLE_READ:
+            p += _read_format_size(attr.read_format, buf, p)
+        callchain = None
+        if st & PERF_SAMPLE_CALLCHAIN:
+            nr = struct.unpack_from('<Q', buf, p)[0]
+            callchain = buf[p + 8:p + 8 + 8 * nr].cast('Q')
+            p += 8 + 8 * nr
+        if st & PERF_SAMPLE_RAW:
+            # u32 size + dati, con padding ad allineamento 8 già incluso nella size
+            p += 4 + struct.unpack_from('<I', buf, p)[0]
+        if st & PERF_SAMPLE_BRANCH_STACK:
+            nr = struct.unpack_from('<Q', buf, p)[0]
+            p += 8 + (8 if attr.branch_sample_type & PERF_SAMPLE_BRANCH_HW_INDEX else 0) + 24 * nr
+        if st & PERF_SAMPLE_REGS_USER:
+            abi = struct.unpack_from('<Q', buf, p)[0]
+            p += 8 + (8 * self.n_regs_user if abi else 0)
+        if st & PERF_SAMPLE_STACK_USER:
+            size = struct.unpack_from('<Q', buf, p)[0]
+            p += 8 + size + (8 if size else 0)
+
+        weight = data_src = phys_addr = None
+        if st & (PERF_SAMPLE_WEIGHT | PERF_SAMPLE_WEIGHT_STRUCT):
+            weight = struct.unpack_from('<Q', buf, p)[0]
+            if st & PERF_SAMPLE_WEIGHT_STRUCT:
+                weight &= 0xffffffff
+            p += 8
+        if st & PERF_SAMPLE_DATA_SRC:
+            data_src = struct.unpack_from('<Q', buf, p)[0]
+            p += 8
+        if st & PERF_SAMPLE_TRANSACTION:
+            p += 8
+        if st & PERF_SAMPLE_REGS_INTR:
+            abi = struct.unpack_from('<Q', buf, p)[0]
+            p += 8 + (8 * self.n_regs_intr if abi else 0)
+        if st & PERF_SAMPLE_PHYS_ADDR:
+            phys_addr = struct.unpack_from('<Q', buf, p)[0]
+            p += 8
+        if p > end:
+            raise PerfDataError(f"offset {pos}: sample più lungo del record")
+
+        get = fields.get
+        return SampleRecord(pos, misc, get('id'), get('ip'), get('pid'), get('tid'), get('time'),
+                            get('addr'), get('cpu'), get('period'), callchain,
+                            weight, data_src, phys_addr)
+
+    def switch(self, buf, pos, end, rec_type, misc):
+        next_prev_pid = next_prev_tid = None
+        if rec_type == PERF_RECORD_SWITCH_CPU_WIDE:
+            next_prev_pid, next_prev_tid = struct.unpack_from('<II', buf, pos + 8)
+        get = {}.get
+        if self.attr.flags & _ATTR_FLAG_SAMPLE_ID_ALL:
+            get = dict(zip(self.tail_names, self.tail.unpack_from(buf, end - self.tail.size))).get
+        return SwitchRecord(pos, misc, bool(misc & PERF_RECORD_MISC_SWITCH_OUT),
+                            bool(misc & PERF_RECORD_MISC_SWITCH_OUT_PREEMPT),
+                            next_prev_pid, next_prev_tid,
+                            get('pid'), get('tid'), get('time'), get('id'), get('cpu'))
+
+
+def _id_locators(attrs):
+    """
+    Con più attr serve l'id del record per scegliere il decoder: come fa perf, si
+    richiede che la posizione dell'id sia la stessa per tutti gli attr.
+    Ritorna (posizione dell'id nei sample, posizione dall'ultimo byte negli altri record).
+    """
+    st = attrs[0].sample_type
+    if st & PERF_SAMPLE_IDENTIFIER:
+        return 8, 8
+    if not st & PERF_SAMPLE_ID:
+        raise PerfDataError("più eventi registrati ma sample_type senza ID/IDENTIFIER")
+    sample_pos = 8 + 8 * sum(1 for bit in (PERF_SAMPLE_IP, PERF_SAMPLE_TID, PERF_SAMPLE_TIME,
+                                          PERF_SAMPLE_ADDR) if st & bit)
+    tail_pos = 8 + 8 * sum(1 for bit in (PERF_SAMPLE_STREAM_ID, PERF_SAMPLE_CPU) if st & bit)
+    return sample_pos, tail_pos
+
+# --------------------------------------------------------------------------------
+# 4) ITERAZIONE SUL FILE MAPPATO
+# --------------------------------------------------------------------------------
+
+def iter_perf_records(file_path, types=(PERF_RECORD_SAMPLE, PERF_RECORD_SWITCH,
+                                        PERF_RECORD_SWITCH_CPU_WIDE)):
+    """
+    Generatore sui record della sezione data di un perf.data mappato in memoria.
+    Produce SampleRecord e SwitchRecord per i tipi richiesti; gli altri record
+    (MMAP, COMM, FINISHED_ROUND, ...) vengono saltati leggendo solo l'header.
+    """
+    wanted = frozenset(types)
+    with open(file_path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    buf = memoryview(mm)
+    try:
+        attr_size, (a_off, a_size), (d_off, d_size) = _read_header(buf)
+        attrs = _read_attrs(buf, attr_size, a_off, a_size)
+        if not attrs:
+            raise PerfDataError("nessun evento nella sezione attr")
+        decoders = [_SampleDecoder(a) for a in attrs]
+        by_id = {i: d for d in decoders for i in d.attr.ids}
+        single = decoders[0] if len(decoders) == 1 else None
+        if single is None:
+            sample_id_pos, tail_id_pos = _id_locators(attrs)
+
+        unpack_header = _EVENT_HEADER.unpack_from
+        unpack_u64 = struct.Struct('<Q').unpack_from
+        pos = d_off
+        data_end = min(d_off + d_size, len(buf))
+        while pos + 8 <= data_end:
+            rec_type, misc, size = unpack_header(buf, pos)
+            if size < 8 or pos + size > data_end:
+                raise PerfDataError(f"offset {pos}: record di dimensione {size} non valida")
+            end = pos + size
+            if rec_type in wanted:
+                if rec_type == PERF_RECORD_SAMPLE:
+                    dec = single or by_id[unpack_u64(buf, pos + sample_id_pos)[0]]
+                    yield dec.sample(buf, pos, end, misc)
+                elif rec_type in (PERF_RECORD_SWITCH, PERF_RECORD_SWITCH_CPU_WIDE):
+                    dec = single or by_id[unpack_u64(buf, end - tail_id_pos)[0]]
+                    yield dec.switch(buf, pos, end, rec_type, misc)
+            pos = end
+    finally:
+        buf.release()
+        try:
+            mm.close()
+        except BufferError:
+            # Un chiamante tiene ancora un callchain: la mappa si chiude col garbage collector
+            pass
+
+
+def iter_samples(file_path):
+    """Solo i PERF_RECORD_SAMPLE."""
+    return iter_perf_records(file_path, (PERF_RECORD_SAMPLE,))
+
+
+def iter_switches(file_path):
+    """Solo i PERF_RECORD_SWITCH / PERF_RECORD_SWITCH_CPU_WIDE."""
+    return iter_perf_records(file_path, (PERF_RECORD_SWITCH, PERF_RECORD_SWITCH_CPU_WIDE))
+
+# --------------------------------------------------------------------------------
+# 5) MAIN
+# --------------------------------------------------------------------------------
+
+def main():
+    if len(sys.argv) < 2:
+        print("Uso: python3 perf_data.py <perf.data>")
+        sys.exit(1)
+    file_path = sys.argv[1]
+
+    samples_per_cpu = Counter()
+    switches_out = switches_in = 0
+    for rec in iter_perf_records(file_path):
+        if isinstance(rec, SampleRecord):
+            samples_per_cpu[rec.cpu] += 1
+        elif rec.out:
+            switches_out += 1
+        else:
+            switches_in += 1
+
+    for attr in read_perf_attrs(file_path):
+        print(f"attr type={attr.type} config={attr.config:#x} sample_type={attr.sample_type:#x} ids={len(attr.ids)}")
+    print(f"Sample totali: {sum(samples_per_cpu.values())}")
+    for cpu, n in sorted(samples_per_cpu.items(), key=lambda kv: (kv[0] is None, kv[0])):
+        print(f"  CPU {cpu}: {n}")
+    print(f"Context switch: {switches_out} out, {switches_in} in")
+
+
+if __name__ == "__main__":
+    main()
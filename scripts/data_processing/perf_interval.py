@@ -0,0 +1,179 @@
+"""
+Loader per le serie temporali registrate con `perf stat -I <ms> -x,` (INTERVAL_MS negli
+script di campagna).
+
+I file a intervalli possono avere milioni di righe: vengono letti a blocchi con un
+generatore e copiati direttamente in array NumPy preallocati (tempo x evento), senza
+mai tenere in memoria l'intero testo.
+
+Formato di una riga (senza -A, quindi senza colonna CPU):
+    timestamp,valore,unità,evento,run-time,%running,metrica,unità-metrica
+
+I file possono essere compressi (.gz/.xz/.zst) oppure già convertiti in .npz da
+compact_campaign.py --binary.
+"""
+
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from perf_parser import EVENT_FIELDS, PerfFormatError
+from result_io import open_result, result_stat, split_compression
+
+IntervalSeries = namedtuple('IntervalSeries', ['timestamps', 'values', 'events'])
+IntervalSeries.__doc__ = """
+Serie temporale di un file a intervalli:
+  timestamps: array (n_intervalli,) in secondi dall'avvio di perf
+  values:     array (n_intervalli, n_eventi), NaN per '<not counted>'
+  events:     nomi dei campi PerfStat delle colonne (es. 'l1_miss')
+"""
+
+# Byte minimi per riga: serve per stimare la capacità iniziale degli array
+_MIN_LINE_BYTES = 24
+
+# --------------------------------------------------------------------------------
+# 1) LETTURA A BLOCCHI
+# --------------------------------------------------------------------------------
+
+def _split_row(line, file_path, line_no):
+    fields = line.split(',')
+    if len(fields) < 4:
+        raise PerfFormatError(f"{file_path}:{line_no}: attesi almeno 4 campi, trovati {len(fields)}")
+    try:
+        ts = float(fields[0])
+    except ValueError:
+        raise PerfFormatError(f"{file_path}:{line_no}: timestamp non valido {fields[0]!r}") from None
+    raw = fields[1]
+    if raw.startswith('<'):
+        value = math.nan
+    else:
+        try:
+            value = float(raw)
+        except ValueError:
+            raise PerfFormatError(f"{file_path}:{line_no}: valore non numerico {raw!r}") from None
+    return ts, value, fields[3].lower()
+
+
+def iter_interval_chunks(file_path, columns, chunk_intervals=65536):
+    """
+    Generatore: legge il file a intervalli e produce blocchi (timestamps, values) con al
+    più chunk_intervals righe temporali ciascuno. columns è la lista degli eventi perf
+    (in minuscolo) da mettere in colonna; gli altri eventi vengono ignorati.
+    """
+    col_index = {event: i for i, event in enumerate(columns)}
+    n_cols = len(columns)
+
+    ts_buf = np.empty(chunk_intervals, dtype=np.float64)
+    val_buf = np.full((chunk_intervals, n_cols), np.nan, dtype=np.float64)
+    row = -1
+    current_ts = None
+
+    with open_result(file_path) as f:
+        for line_no, line in enumerate(f, 1):
+            if not line or line[0] == '#' or line.isspace():
+                continue
+            ts, value, event = _split_row(line.strip(), file_path, line_no)
+            if ts != current_ts:
+                current_ts = ts
+                row += 1
+                if row == chunk_intervals:
+                    yield ts_buf, val_buf
+                    ts_buf = np.empty(chunk_intervals, dtype=np.float64)
+                    val_buf = np.full((chunk_intervals, n_cols), np.nan, dtype=np.float64)
+                    row = 0
+                ts_buf[row] = ts
+            col = col_index.get(event)
+            if col is not None:
+                val_buf[row, col] = value
+
+    if row >= 0:
+        yield ts_buf[:row + 1], val_buf[:row + 1]
+
+
+def _detect_columns(file_path):
+    """Eventi presenti nel primo intervallo del file, nell'ordine di comparsa."""
+    columns = []
+    first_ts = None
+    with open_result(file_path) as f:
+        for line_no, line in enumerate(f, 1):
+            if not line or line[0] == '#' or line.isspace():
+                continue
+            ts, _, event = _split_row(line.strip(), file_path, line_no)
+            if first_ts is None:
+                first_ts = ts
+            elif ts != first_ts:
+                break
+            if event in EVENT_FIELDS and event not in columns:
+                columns.append(event)
+    return columns
+
+# --------------------------------------------------------------------------------
+# 2) CARICAMENTO IN ARRAY PREALLOCATI
+# --------------------------------------------------------------------------------
+
+def _check_events(events, file_path):
+    """Eventi perf richiesti in minuscolo; PerfFormatError prima di leggere il file se uno è sconosciuto."""
+    columns = [e.lower() for e in events]
+    unknown = [e for e, col in zip(events, columns) if col not in EVENT_FIELDS]
+    if unknown:
+        raise PerfFormatError(f"{file_path}: eventi sconosciuti {unknown} (attesi {sorted(EVENT_FIELDS)})")
+    return columns
+
+
+def load_interval_series(file_path, events=None, chunk_intervals=65536):
+    """
+    Carica un file `perf stat -I -x,` in un IntervalSeries. Gli array vengono
+    preallocati con una stima dalla dimensione del file e ingranditi solo se serve.
+    events: lista di eventi perf da caricare (default: quelli del primo intervallo).
+    """
+    if file_path.endswith('.npz'):
+        return load_interval_npz(file_path, events)
+    columns = _check_events(events, file_path) if events else _detect_columns(file_path)
+    n_cols = len(columns)
+
+    # Per i file compressi la dimensione su disco sottostima le righe: si ingrandisce dopo
+    est_rows = result_stat(file_path)[0] // (_MIN_LINE_BYTES * max(n_cols, 1)) + 1
+    if split_compression(file_path)[1]:
+        est_rows *= 8
+    timestamps = np.empty(est_rows, dtype=np.float64)
+    values = np.empty((est_rows, n_cols), dtype=np.float64)
+    n = 0
+
+    for ts_chunk, val_chunk in iter_interval_chunks(file_path, columns, chunk_intervals):
+        k = len(ts_chunk)
+        if n + k > len(timestamps):
+            capacity = max(2 * len(timestamps), n + k)
+            timestamps = np.resize(timestamps, capacity)
+            values = np.resize(values, (capacity, n_cols))
+        timestamps[n:n + k] = ts_chunk
+        values[n:n + k] = val_chunk
+        n += k
+
+    return IntervalSeries(timestamps[:n].copy(), values[:n].copy(),
+                          [EVENT_FIELDS[e] for e in columns])
+
+
+def save_interval_npz(file, series):
+    """Salva un IntervalSeries in formato .npz compresso (file: path o file binario aperto)."""
+    np.savez_compressed(file, timestamps=series.timestamps, values=series.values,
+                        events=np.array(series.events))
+
+
+def load_interval_npz(file_path, events=None):
+    """Legge un IntervalSeries salvato con save_interval_npz (events: eventi perf da tenere)."""
+    with open_result(file_path, 'rb') as f, np.load(f) as npz:
+        series = IntervalSeries(npz['timestamps'], npz['values'], [str(e) for e in npz['events']])
+    if not events:
+        return series
+    fields = [EVENT_FIELDS[e] for e in _check_events(events, file_path)]
+    absent = [e for e, field in zip(events, fields) if field not in series.events]
+    if absent:
+        raise PerfFormatError(f"{file_path}: eventi assenti dalla serie {absent} (presenti {series.events})")
+    cols = [series.events.index(field) for field in fields]
+    return IntervalSeries(series.timestamps, series.values[:, cols], [series.events[c] for c in cols])
+
+
+def series_column(series, field):
+    """Ritorna la colonna di un IntervalSeries dato il nome del campo (es. 'l1_miss')."""
+    return series.values[:, series.events.index(field)]
@@ -0,0 +1,525 @@
+"""
+Parser condiviso per l'output di `perf stat` e per i log del client `send_request`.
+
+Sostituisce le varie copie di `parse_number_from_line` / `parse_cache_misses_and_hits` /
+`parse_tlb_misses` / `read_misses` sparse negli script di plot: ogni file viene letto
+una sola volta, con un unico pattern precompilato, e tutti gli eventi monitorati
+(`mem_load_retired.*`, `instructions`, `dTLB_*`, `context-switches`) finiscono in un solo record.
+
+Oltre al testo "umano" di perf sono supportati i formati macchina prodotti dagli
+script di campagna con FORMAT=csv (`perf stat -x,`) e FORMAT=json (`perf stat -j`):
+questi vengono letti senza regex, separando direttamente i campi.
+
+Tutti i file possono essere anche compressi (.gz, .xz, .zst, vedi result_io) oppure
+convertiti nel formato binario compatto .pstat da compact_campaign.py.
+"""
+
+import json
+import math
+import os
+import re
+import struct
+from collections import namedtuple
+
+from result_io import COMPRESSED_EXTENSIONS, open_result, read_result_bytes, result_exists, split_compression
+
+# --------------------------------------------------------------------------------
+# 1) EVENTI E RECORD
+# --------------------------------------------------------------------------------
+
+# Ordine fisso dei campi del record (gli eventi perf sono confrontati in minuscolo)
+EVENT_FIELDS = {
+    'mem_load_retired.l1_miss':             'l1_miss',
+    'mem_load_retired.l2_miss':             'l2_miss',
+    'mem_load_retired.l3_miss':             'l3_miss',
+    'mem_load_retired.l1_hit':              'l1_hit',
+    'mem_load_retired.l2_hit':              'l2_hit',
+    'mem_load_retired.l3_hit':              'l3_hit',
+    'instructions':                         'instructions',
+    'dtlb_load_misses.stlb_hit':            'dtlb_load_stlb_hit',
+    'dtlb_load_misses.miss_causes_a_walk':  'dtlb_load_walk',
+    'dtlb_store_misses.stlb_hit':           'dtlb_store_stlb_hit',
+    'dtlb_store_misses.miss_causes_a_walk': 'dtlb_store_walk',
+    'context-switches':                     'context_switches',
+    'time elapsed':                         'elapsed',
+}
+
+PerfStat = namedtuple('PerfStat', list(EVENT_FIELDS.values()))
+PerfStat.__doc__ = "Contatori di un file `perf stat` (0.0 per gli eventi assenti, NaN per '<not counted>')."
+
+_EVENT_INDEX = {event: i for i, event in enumerate(EVENT_FIELDS)}
+_N_FIELDS = len(EVENT_FIELDS)
+
+# Da incrementare a ogni modifica che cambia i valori estratti (invalida parse_cache)
+PARSER_VERSION = 5
+
+# Estensioni dei file di risultato, nell'ordine in cui vengono cercate
+PERF_EXTENSIONS = ('.txt', '.csv', '.json', '.pstat')
+# Tutte le varianti accettate, anche compresse (es. '.csv.gz')
+PERF_SUFFIXES = tuple(ext + comp for ext in PERF_EXTENSIONS for comp in ('',) + COMPRESSED_EXTENSIONS)
+
+
+class PerfFormatError(ValueError):
+    """Riga di output perf (CSV/JSON) che non rispetta il formato atteso."""
+
+# Un'unica regex per le righe dei contatori:
+#   "      1.234.567      mem_load_retired.l1_miss      ( +-  1,23% )"
+#   "           2,00123 +- 0,00012 seconds time elapsed  ( +-  0,01% )"
+#   "      <not counted>      mem_load_retired.l2_miss      (0,00%)"
+_COUNTER_RE = re.compile(
+    r'\s*(?P<value>\d[\d.,]*|<not (?:counted|supported)>)\s+'
+    r'(?:\+-\s+[\d.,]+\s+)?'
+    r'(?:(?P<unit>msec|seconds)\s+)?'
+    r'(?P<event>time elapsed|[A-Za-z][\w.\-:/]*)'
+)
+
+# --------------------------------------------------------------------------------
+# 2) CONVERSIONE NUMERI (locale italiano e inglese)
+# --------------------------------------------------------------------------------
+
+def parse_count(token):
+    """
+    Converte il valore di un contatore in float. I contatori sono interi, quindi
+    sia '.' (locale italiano) sia ',' (locale inglese) sono separatori di migliaia,
+    a meno che compaiano entrambi: in quel caso l'ultimo è il separatore decimale.
+    """
+    if token.isdigit():
+        return float(token)
+    if '.' in token and ',' in token:
+        return parse_decimal(token)
+    return float(token.replace('.', '').replace(',', ''))
+
+
+def parse_decimal(token):
+    """
+    Converte un valore decimale (secondi, msec, percentuali). Con un solo tipo di
+    separatore: la virgola è sempre decimale (italiano), il punto lo è solo se
+    compare una volta (inglese), altrimenti separa le migliaia.
+    """
+    if token.isdigit():
+        return float(token)
+    comma = token.rfind(',')
+    dot = token.rfind('.')
+    if comma > dot:
+        # italiano: "1.234,56" oppure "2,001"
+        return float(token.replace('.', '').replace(',', '.'))
+    if ',' in token:
+        # inglese con migliaia: "1,234.56"
+        return float(token.replace(',', ''))
+    if token.count('.') > 1:
+        return float(token.replace('.', ''))
+    return float(token)
+
+# --------------------------------------------------------------------------------
+# 3) PARSING DEI FILE
+# --------------------------------------------------------------------------------
+
+def parse_perf_lines(lines):
+    """Estrae un PerfStat da un iterabile di righe di output `perf stat`."""
+    values = [0.0] * _N_FIELDS
+    match = _COUNTER_RE.match
+    index = _EVENT_INDEX
+    for line in lines:
+        m = match(line)
+        if m is None:
+            continue
+        # Un solo groups() invece di tre group(): è la riga più eseguita del parser
+        value, unit, event = m.groups()
+        i = index.get(event)
+        if i is None:
+            i = index.get(event.lower())
+            if i is None:
+                continue
+        if value[0] == '<':
+            # Come nei formati CSV / JSON: un contatore non misurato è NaN, non 0
+            values[i] = math.nan
+        elif unit is None and event != 'time elapsed':
+            values[i] = parse_count(value)
+        else:
+            values[i] = parse_decimal(value)
+    return PerfStat._make(values)
+
+
+def parse_perf_stat(file_path):
+    """Legge un file di output `perf stat` in un solo passaggio e ritorna un PerfStat."""
+    # Lettura unica in binario: per file di poche righe costa meno di un TextIOWrapper
+    data = read_result_bytes(file_path)
+    return parse_perf_lines(data.decode('utf-8', 'replace').splitlines())
+
+
+def tlb_levels(stat):
+    """
+    Ritorna (l1_miss, l2_miss) dei dTLB: le miss L2 sono i page walk (load + store),
+    le miss L1 sono le stlb_hit più i page walk.
+    """
+    l2_miss = stat.dtlb_load_walk + stat.dtlb_store_walk
+    l1_miss = stat.dtlb_load_stlb_hit + stat.dtlb_store_stlb_hit + l2_miss
+    return (l1_miss, l2_miss)
+
+
+def _varianza_somma(stat, variance, fields):
+    """Varianza (%) della somma di contatori indipendenti: le deviazioni assolute in quadratura."""
+    total = sum(getattr(stat, field) for field in fields)
+    sigma = math.sqrt(sum((getattr(stat, field) * getattr(variance, field) / 100.0) ** 2
+                          for field in fields))
+    return 100.0 * sigma / total if total else math.nan
+
+
+def tlb_levels_variance(stat, variance):
+    """
+    Varianze (%) dei livelli di tlb_levels da quelle dei contatori dTLB (PerfStat delle
+    varianze, come PerfRecord.variances): NaN se manca quella di un contatore sommato.
+    """
+    walks = ('dtlb_load_walk', 'dtlb_store_walk')
+    return (_varianza_somma(stat, variance, ('dtlb_load_stlb_hit', 'dtlb_store_stlb_hit') + walks),
+            _varianza_somma(stat, variance, walks))
+
+
+def parse_execution_log(file_path):
+    """
+    Legge il log di `send_request` (execution_time) in un solo passaggio.
+    Ritorna (tempo medio in microsecondi, numero di righe 'Iter ').
+    """
+    avg_time = 0.0
+    n_requests = 0
+    with open_result(file_path) as f:
+        for line in f:
+            if line.startswith('Iter '):
+                n_requests += 1
+            elif line.startswith('Average Execution Time:'):
+                avg_time = float(line.split()[3])
+    return avg_time, n_requests
+
+# --------------------------------------------------------------------------------
+# 4) FORMATI MACCHINA: `perf stat -x,` (CSV) e `perf stat -j` (JSON)
+# --------------------------------------------------------------------------------
+
+def _counter_value(raw, file_path, line_no):
+    """Valore numerico del contatore; '<not counted>' / '<not supported>' diventano NaN."""
+    if raw.startswith('<'):
+        return math.nan
+    try:
+        return float(raw)
+    except ValueError:
+        raise PerfFormatError(f"{file_path}:{line_no}: valore non numerico {raw!r}") from None
+
+
+def parse_perf_csv_lines(lines, file_path='<csv>', sep=','):
+    """
+    Estrae un PerfStat dalle righe di `perf stat -x<sep>`:
+      valore,unità,evento,varianza,run-time,%running,metrica,unità-metrica
+    Le righe di commento ('#') e vuote vengono saltate, quelle malformate sollevano
+    PerfFormatError invece di diventare silenziosamente 0.
+    """
+    values = [0.0] * _N_FIELDS
+    index = _EVENT_INDEX
+    for line_no, line in enumerate(lines, 1):
+        if not line or line[0] == '#' or line.isspace():
+            continue
+        fields = line.rstrip('\r\n').split(sep)
+        if len(fields) < 3:
+            raise PerfFormatError(f"{file_path}:{line_no}: attesi almeno 3 campi, trovati {len(fields)}")
+        i = index.get(fields[2].lower())
+        if i is not None:
+            values[i] = _counter_value(fields[0], file_path, line_no)
+    return PerfStat._make(values)
+
+
+def parse_perf_json_lines(lines, file_path='<json>'):
+    """Estrae un PerfStat dalle righe di `perf stat -j` (un oggetto JSON per riga)."""
+    values = [0.0] * _N_FIELDS
+    index = _EVENT_INDEX
+    for line_no, line in enumerate(lines, 1):
+        if not line or line.isspace():
+            continue
+        try:
+            obj = json.loads(line)
+            event = obj['event']
+            raw = obj['counter-value']
+        except (ValueError, KeyError, TypeError):
+            raise PerfFormatError(f"{file_path}:{line_no}: riga JSON non valida") from None
+        i = index.get(event.lower())
+        if i is not None:
+            values[i] = _counter_value(str(raw), file_path, line_no)
+    return PerfStat._make(values)
+
+
+def parse_perf_csv(file_path, sep=','):
+    """Legge un file prodotto da `perf stat -x<sep>`."""
+    data = read_result_bytes(file_path)
+    return parse_perf_csv_lines(data.decode('utf-8', 'replace').splitlines(), file_path, sep)
+
+
+def parse_perf_json(file_path):
+    """Legge un file prodotto da `perf stat -j`."""
+    data = read_result_bytes(file_path)
+    return parse_perf_json_lines(data.decode('utf-8', 'replace').splitlines(), file_path)
+
+
+# --------------------------------------------------------------------------------
+# 5) FORMATO BINARIO COMPATTO (.pstat)
+# --------------------------------------------------------------------------------
+
+# magic, versione del formato, lunghezza dei nomi dei campi; poi i nomi separati da
+# virgola e un float64 per campo. I nomi rendono il file leggibile anche se PerfStat
+# cambia: i campi sconosciuti vengono ignorati, quelli mancanti valgono 0.
+# Versione 2: oltre ai contatori, varianza e multiplexing come var_<campo> / mux_<campo>
+# (gli stessi nomi di PerfRecord); i file di versione 1 hanno solo i contatori.
+_PSTAT_MAGIC = b'PERFSTAT'
+_PSTAT_HEADER = struct.Struct('<8sII')
+_PSTAT_VERSION = 2
+_PSTAT_VERSIONS = (1, 2)
+
+
+def write_perf_binary(file_path, stat, variance=None, multiplex=None):
+    """Salva un PerfStat nel formato binario .pstat, con varianza e multiplexing se dati."""
+    names = list(PerfStat._fields)
+    values = list(stat)
+    for prefix, extra in (('var_', variance), ('mux_', multiplex)):
+        if extra is not None:
+            names += [prefix + field for field in PerfStat._fields]
+            values += list(extra)
+    names = ','.join(names).encode('ascii')
+    with open(file_path, 'wb') as f:
+        f.write(_PSTAT_HEADER.pack(_PSTAT_MAGIC, _PSTAT_VERSION, len(names)))
+        f.write(names)
+        f.write(struct.pack(f'<{len(values)}d', *values))
+
+
+def _read_perf_binary(file_path):
+    """{nome del campo: valore} di un file .pstat (versione 1 o 2)."""
+    data = read_result_bytes(file_path)
+    try:
+        magic, version, names_len = _PSTAT_HEADER.unpack_from(data, 0)
+    except struct.error:
+        raise PerfFormatError(f"{file_path}: file .pstat troncato") from None
+    if magic != _PSTAT_MAGIC or version not in _PSTAT_VERSIONS:
+        raise PerfFormatError(f"{file_path}: non è un file .pstat (versioni {_PSTAT_VERSIONS})")
+    start = _PSTAT_HEADER.size
+    names = data[start:start + names_len].decode('ascii').split(',')
+    try:
+        values = struct.unpack_from(f'<{len(names)}d', data, start + names_len)
+    except struct.error:
+        raise PerfFormatError(f"{file_path}: file .pstat troncato") from None
+    return dict(zip(names, values))
+
+
+def parse_perf_binary(file_path):
+    """Contatori (PerfStat) di un file .pstat scritto da write_perf_binary."""
+    stored = _read_perf_binary(file_path)
+    return PerfStat._make(stored.get(field, 0.0) for field in PerfStat._fields)
+
+
+def parse_perf_binary_stats(file_path):
+    """
+    (contatori, varianza, multiplexing) di un file .pstat come tre PerfStat. Varianza e
+    multiplexing valgono NaN se il file non li ha (versione 1, o scritti senza).
+    """
+    stored = _read_perf_binary(file_path)
+    stat = PerfStat._make(stored.get(field, 0.0) for field in PerfStat._fields)
+    variance = PerfStat._make(stored.get('var_' + field, math.nan) for field in PerfStat._fields)
+    multiplex = PerfStat._make(stored.get('mux_' + field, math.nan) for field in PerfStat._fields)
+    return stat, variance, multiplex
+
+# --------------------------------------------------------------------------------
+# 6) SCELTA DEL PARSER
+# --------------------------------------------------------------------------------
+
+def load_perf_stat(file_path):
+    """
+    Legge un file di risultati perf scegliendo il parser in base all'estensione
+    (anche sotto un'estensione di compressione, es. misses_64.csv.gz).
+    """
+    ext = os.path.splitext(split_compression(file_path)[0])[1]
+    if ext == '.csv':
+        return parse_perf_csv(file_path)
+    if ext == '.json':
+        return parse_perf_json(file_path)
+    if ext == '.pstat':
+        return parse_perf_binary(file_path)
+    return parse_perf_stat(file_path)
+
+
+def find_perf_file(file_path):
+    """
+    Dato il nome atteso di un file di risultati (es. misses_64.txt), ritorna la prima
+    variante esistente tra .txt / .csv / .json / .pstat, anche compressa, oppure None
+    se non esiste nessuna.
+    """
+    if result_exists(file_path):
+        return file_path
+    stem, ext = os.path.splitext(file_path)
+    if ext not in PERF_EXTENSIONS:
+        return None
+    for suffix in PERF_SUFFIXES:
+        candidate = stem + suffix
+        if result_exists(candidate):
+            return candidate
+    return None
+
+# --------------------------------------------------------------------------------
+# 7) VARIANZA TRA LE RIPETIZIONI (`perf stat -r`)
+# --------------------------------------------------------------------------------
+
+# "( +-  1,23% )" in fondo alle righe del formato testo
+_VARIANCE_RE = re.compile(r'\(\s*\+-\s*(?P<pct>[\d.,]+)%\s*\)')
+
+
+def parse_perf_variance_lines(lines):
+    """
+    Varianza (deviazione standard in % della media, come la stampa perf con -r) per
+    ogni contatore delle righe di testo. NaN per gli eventi senza varianza.
+    """
+    values = [math.nan] * _N_FIELDS
+    match = _COUNTER_RE.match
+    index = _EVENT_INDEX
+    for line in lines:
+        m = match(line)
+        if m is None:
+            continue
+        i = index.get(m.group('event').lower())
+        if i is None:
+            continue
+        v = _VARIANCE_RE.search(line, m.end())
+        if v is not None:
+            values[i] = parse_decimal(v.group('pct'))
+    return PerfStat._make(values)
+
+
+def parse_perf_variance_csv_lines(lines, sep=','):
+    """Come parse_perf_variance_lines per `perf stat -x<sep>` (quarto campo, es. '1.23%')."""
+    values = [math.nan] * _N_FIELDS
+    index = _EVENT_INDEX
+    for line in lines:
+        if not line or line[0] == '#' or line.isspace():
+            continue
+        fields = line.rstrip('\r\n').split(sep)
+        if len(fields) < 4:
+            continue
+        i = index.get(fields[2].lower())
+        pct = fields[3].rstrip('%')
+        if i is not None and pct:
+            try:
+                values[i] = float(pct)
+            except ValueError:
+                pass
+    return PerfStat._make(values)
+
+
+def parse_perf_variance_json_lines(lines):
+    """Come parse_perf_variance_lines per `perf stat -j` (chiave 'variance')."""
+    values = [math.nan] * _N_FIELDS
+    index = _EVENT_INDEX
+    for line in lines:
+        if not line or line.isspace():
+            continue
+        try:
+            obj = json.loads(line)
+            i = index.get(obj['event'].lower())
+            pct = obj.get('variance')
+        except (ValueError, KeyError, TypeError, AttributeError):
+            continue
+        if i is not None and pct is not None:
+            values[i] = float(pct)
+    return PerfStat._make(values)
+
+
+def load_perf_variance(file_path):
+    """
+    Varianza tra le ripetizioni di ogni contatore di un file di risultati perf.
+    I file .pstat di versione 1 non la conservano: tutti i campi valgono NaN.
+    """
+    ext = os.path.splitext(split_compression(file_path)[0])[1]
+    if ext == '.pstat':
+        return parse_perf_binary_stats(file_path)[1]
+    lines = read_result_bytes(file_path).decode('utf-8', 'replace').splitlines()
+    if ext == '.csv':
+        return parse_perf_variance_csv_lines(lines)
+    if ext == '.json':
+        return parse_perf_variance_json_lines(lines)
+    return parse_perf_variance_lines(lines)
+
+# --------------------------------------------------------------------------------
+# 8) MULTIPLEXING DEI CONTATORI
+# --------------------------------------------------------------------------------
+
+# "(66,67%)" in fondo alle righe del formato testo: frazione del tempo in cui il
+# contatore era davvero sul PMU (perf la stampa solo se è sotto il 100%)
+_RUNNING_RE = re.compile(r'\(\s*(?P<pct>\d[\d.,]*)%\s*\)')
+
+
+def parse_perf_multiplex_lines(lines):
+    """
+    Rapporto di multiplexing (tempo in esecuzione / tempo abilitato, tra 0 e 1) per ogni
+    contatore delle righe di testo: 1.0 se perf non riporta la percentuale, NaN per gli
+    eventi assenti e per 'time elapsed'.
+    """
+    values = [math.nan] * _N_FIELDS
+    match = _COUNTER_RE.match
+    index = _EVENT_INDEX
+    for line in lines:
+        m = match(line)
+        if m is None or m.group('event') == 'time elapsed':
+            continue
+        i = index.get(m.group('event').lower())
+        if i is None:
+            continue
+        r = _RUNNING_RE.search(line, m.end())
+        values[i] = parse_decimal(r.group('pct')) / 100.0 if r is not None else 1.0
+    return PerfStat._make(values)
+
+
+def parse_perf_multiplex_csv_lines(lines, sep=','):
+    """Come parse_perf_multiplex_lines per `perf stat -x<sep>` (sesto campo, %running)."""
+    values = [math.nan] * _N_FIELDS
+    index = _EVENT_INDEX
+    for line in lines:
+        if not line or line[0] == '#' or line.isspace():
+            continue
+        fields = line.rstrip('\r\n').split(sep)
+        if len(fields) < 3:
+            continue
+        i = index.get(fields[2].lower())
+        if i is None:
+            continue
+        values[i] = 1.0
+        if len(fields) > 5 and fields[5]:
+            try:
+                values[i] = float(fields[5]) / 100.0
+            except ValueError:
+                pass
+    return PerfStat._make(values)
+
+
+def parse_perf_multiplex_json_lines(lines):
+    """Come parse_perf_multiplex_lines per `perf stat -j` (chiave 'pcnt-running')."""
+    values = [math.nan] * _N_FIELDS
+    index = _EVENT_INDEX
+    for line in lines:
+        if not line or line.isspace():
+            continue
+        try:
+            obj = json.loads(line)
+            i = index.get(obj['event'].lower())
+            pct = obj.get('pcnt-running')
+        except (ValueError, KeyError, TypeError, AttributeError):
+            continue
+        if i is not None:
+            values[i] = float(pct) / 100.0 if pct is not None else 1.0
+    return PerfStat._make(values)
+
+
+def load_perf_multiplex(file_path):
+    """
+    Rapporto di multiplexing di ogni contatore di un file di risultati perf.
+    I file .pstat di versione 1 non lo conservano: tutti i campi valgono NaN.
+    """
+    ext = os.path.splitext(split_compression(file_path)[0])[1]
+    if ext == '.pstat':
+        return parse_perf_binary_stats(file_path)[2]
+    lines = read_result_bytes(file_path).decode('utf-8', 'replace').splitlines()
+    if ext == '.csv':
+        return parse_perf_multiplex_csv_lines(lines)
+    if ext == '.json':
+        return parse_perf_multiplex_json_lines(lines)
+    return parse_perf_multiplex_lines(lines)
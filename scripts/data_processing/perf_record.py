@@ -0,0 +1,146 @@
+"""
+Record compatto di una misura perf: contatori, varianza, multiplexing e durata del run.
+
+PerfStat porta solo i contatori; varianza (load_perf_variance) e multiplexing
+(load_perf_multiplex) sono altri PerfStat letti a parte. PerfRecord li raccoglie in un
+unico oggetto con __slots__ e un nome fisso per ogni campo, nello stesso ordine del dtype
+strutturato PERF_RECORD_DTYPE:
+
+    <contatore>       valore di ogni campo di PerfStat (elapsed = durata del run, s)
+    var_<contatore>   deviazione standard tra le ripetizioni, in % della media
+    mux_<contatore>   tempo in esecuzione / tempo abilitato (1.0 = nessun multiplexing)
+
+La memoria per cella è fissa: PERF_RECORD_DTYPE.itemsize byte in un array (un float64 per
+campo), un oggetto senza __dict__ con len(RECORD_FIELDS) attributi float come PerfRecord.
+Molti record diventano un array con una sola costruzione:
+
+    table = load_perf_records(paths)             # ndarray strutturato, un elemento per file
+    table['l1_miss'], table['var_l1_miss'], table['mux_l1_miss']
+"""
+
+import math
+import os
+
+import numpy as np
+
+from campaign_loader import map_paths
+from perf_parser import (PerfStat, parse_perf_binary_stats, parse_perf_csv_lines, parse_perf_json_lines,
+                         parse_perf_lines, parse_perf_multiplex_csv_lines, parse_perf_multiplex_json_lines,
+                         parse_perf_multiplex_lines, parse_perf_variance_csv_lines,
+                         parse_perf_variance_json_lines, parse_perf_variance_lines)
+from result_io import read_result_bytes, split_compression
+
+# --------------------------------------------------------------------------------
+# 1) CAMPI E DTYPE
+# --------------------------------------------------------------------------------
+
+# Il multiplexing non ha senso per il tempo trascorso
+_MUX_FIELDS = tuple(field for field in PerfStat._fields if field != 'elapsed')
+
+RECORD_FIELDS = (PerfStat._fields
+                 + tuple(f"var_{field}" for field in PerfStat._fields)
+                 + tuple(f"mux_{field}" for field in _MUX_FIELDS))
+
+PERF_RECORD_DTYPE = np.dtype([(name, '<f8') for name in RECORD_FIELDS])
+
+_N_STAT = len(PerfStat._fields)
+
+# --------------------------------------------------------------------------------
+# 2) RECORD
+# --------------------------------------------------------------------------------
+
+class PerfRecord:
+    """
+    Misura perf di un file con un attributo float per ogni nome di RECORD_FIELDS.
+    Si costruisce con i valori in quell'ordine oppure con from_stats.
+    """
+
+    __slots__ = RECORD_FIELDS
+
+    def __init__(self, *values):
+        if len(values) != len(RECORD_FIELDS):
+            raise TypeError(f"PerfRecord richiede {len(RECORD_FIELDS)} valori, ricevuti {len(values)}")
+        for name, value in zip(RECORD_FIELDS, values):
+            setattr(self, name, float(value))
+
+    @classmethod
+    def from_stats(cls, stat, variance=None, multiplex=None):
+        """Record da tre PerfStat (contatori, varianza, multiplexing); i mancanti valgono NaN."""
+        variance = variance if variance is not None else [math.nan] * _N_STAT
+        multiplex = multiplex if multiplex is not None else PerfStat._make([math.nan] * _N_STAT)
+        return cls(*stat, *variance, *(getattr(multiplex, field) for field in _MUX_FIELDS))
+
+    def __repr__(self):
+        return f"PerfRecord({', '.join(f'{name}={getattr(self, name)!r}' for name in PerfStat._fields)}, ...)"
+
+    def __eq__(self, other):
+        if not isinstance(other, PerfRecord):
+            return NotImplemented
+        # NaN == NaN: due record letti dallo stesso file sono uguali
+        return all(a == b or (a != a and b != b) for a, b in zip(self.astuple(), other.astuple()))
+
+    __hash__ = None
+
+    def astuple(self):
+        """Valori nell'ordine di RECORD_FIELDS (e dei campi di PERF_RECORD_DTYPE)."""
+        return tuple(getattr(self, name) for name in RECORD_FIELDS)
+
+    def counters(self):
+        """Contatori come PerfStat."""
+        return PerfStat._make(getattr(self, field) for field in PerfStat._fields)
+
+    def variances(self):
+        """Varianze (%) come PerfStat."""
+        return PerfStat._make(getattr(self, f"var_{field}") for field in PerfStat._fields)
+
+    def multiplex(self):
+        """Rapporti di multiplexing come PerfStat (elapsed vale NaN)."""
+        return PerfStat._make(getattr(self, f"mux_{field}") if field != 'elapsed' else math.nan
+                              for field in PerfStat._fields)
+
+# --------------------------------------------------------------------------------
+# 3) LETTURA
+# --------------------------------------------------------------------------------
+
+def parse_perf_record_lines(lines, ext='.txt', file_path='<perf>'):
+    """PerfRecord dalle righe di un file perf nel formato indicato dall'estensione."""
+    if ext == '.csv':
+        return PerfRecord.from_stats(parse_perf_csv_lines(lines, file_path),
+                                     parse_perf_variance_csv_lines(lines),
+                                     parse_perf_multiplex_csv_lines(lines))
+    if ext == '.json':
+        return PerfRecord.from_stats(parse_perf_json_lines(lines, file_path),
+                                     parse_perf_variance_json_lines(lines),
+                                     parse_perf_multiplex_json_lines(lines))
+    return PerfRecord.from_stats(parse_perf_lines(lines), parse_perf_variance_lines(lines),
+                                 parse_perf_multiplex_lines(lines))
+
+
+def load_perf_record(file_path):
+    """
+    Legge una volta sola un file di risultati perf (.txt / .csv / .json, anche compressi)
+    e ritorna il PerfRecord completo. I file .pstat di versione 1 hanno solo i contatori.
+    """
+    ext = os.path.splitext(split_compression(file_path)[0])[1]
+    if ext == '.pstat':
+        return PerfRecord.from_stats(*parse_perf_binary_stats(file_path))
+    lines = read_result_bytes(file_path).decode('utf-8', 'replace').splitlines()
+    return parse_perf_record_lines(lines, ext, file_path)
+
+# --------------------------------------------------------------------------------
+# 4) CONVERSIONE IN BLOCCO
+# --------------------------------------------------------------------------------
+
+def records_to_array(records):
+    """Array strutturato PERF_RECORD_DTYPE da una sequenza di PerfRecord, in una sola costruzione."""
+    return np.array([record.astuple() for record in records], dtype=PERF_RECORD_DTYPE)
+
+
+def records_from_array(table):
+    """Lista di PerfRecord da un array strutturato PERF_RECORD_DTYPE."""
+    return [PerfRecord(*row) for row in table.tolist()]
+
+
+def load_perf_records(paths, workers=None, processes=None):
+    """Legge i file (anche in un pool, vedi campaign_loader.map_paths) in un array strutturato."""
+    return records_to_array(map_paths(load_perf_record, paths, workers, processes))
@@ -0,0 +1,166 @@
+"""
+Log per richiesta del client `send_request` (execution_time): throughput sul tempo reale e
+distribuzione delle latenze.
+
+Il client stampa una riga per ogni richiesta, con l'istante di inizio e di fine in
+microsecondi dall'inizio del run:
+
+    Iter 12: Execution time: 1834 microseconds (start 20512 us, end 22361 us)
+    Failed 13: (start 22371 us, end 22410 us)
+
+Il vecchio throughput (numero di righe 'Iter ' / tempo medio) ignora le pause tra le
+richieste e quelle fallite. Qui il throughput è il numero di richieste completate con
+successo per secondo di tempo reale, anche su finestre scorrevoli: tutte le finestre
+si contano insieme con due np.searchsorted sugli istanti di fine ordinati.
+
+I log senza timestamp (campagne precedenti) hanno start / end NaN e throughput NaN.
+
+La media nasconde la coda, dove l'interferenza si vede: di ogni log si tengono tutte le
+latenze in un array, da cui media, percentili (p50 / p90 / p99 / p99.9, massimo) e CDF.
+La media è quella delle sole richieste riuscite, la stessa del bootstrap sugli sketch
+(bootstrap.py); la riga 'Average Execution Time' del client conta le fallite come 0.
+
+Variabili d'ambiente:
+    THROUGHPUT_WINDOW_S   ampiezza delle finestre scorrevoli in secondi (default 1)
+"""
+
+import os
+import re
+from collections import namedtuple
+
+import numpy as np
+
+from result_io import read_result_bytes
+
+RequestLog = namedtuple('RequestLog', ['latency_us', 'start_us', 'end_us', 'ok'])
+RequestLog.__doc__ = "Array per richiesta (nell'ordine del log): latenza, inizio, fine (us), esito."
+
+DEFAULT_WINDOW_S = 1.0
+
+# Percentili delle latenze per richiesta e nomi dei valori di request_stats
+LATENCY_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+LATENCY_EVENTS = ('latency_p50_us', 'latency_p90_us', 'latency_p99_us', 'latency_p999_us', 'latency_max_us')
+REQUEST_EVENTS = ('throughput_rps', 'throughput_min_rps', 'latency_mean_us') + LATENCY_EVENTS
+
+_ITER_RE = re.compile(
+    r'Iter \d+: Execution time: (?P<latency>[\d.eE+\-]+) microseconds'
+    r'(?: \(start (?P<start>\d+) us, end (?P<end>\d+) us\))?'
+)
+_FAILED_RE = re.compile(r'Failed \d+: \(start (?P<start>\d+) us, end (?P<end>\d+) us\)')
+
+# --------------------------------------------------------------------------------
+# 1) LETTURA DEL LOG
+# --------------------------------------------------------------------------------
+
+def parse_request_lines(lines):
+    """RequestLog dalle righe del client; le righe senza timestamp hanno start / end NaN."""
+    latency, start, end, ok = [], [], [], []
+    nan = float('nan')
+    for line in lines:
+        if line.startswith('Iter '):
+            m = _ITER_RE.match(line)
+            if m is None:
+                continue
+            latency.append(float(m.group('latency')))
+            ok.append(True)
+        elif line.startswith('Failed '):
+            m = _FAILED_RE.match(line)
+            if m is None:
+                continue
+            latency.append(nan)
+            ok.append(False)
+        else:
+            continue
+        start.append(float(m.group('start')) if m.group('start') is not None else nan)
+        end.append(float(m.group('end')) if m.group('end') is not None else nan)
+    return RequestLog(np.array(latency, dtype=np.float64), np.array(start, dtype=np.float64),
+                      np.array(end, dtype=np.float64), np.array(ok, dtype=bool))
+
+
+def load_request_log(file_path):
+    """Legge un log di `send_request` (anche compresso) in un solo passaggio."""
+    data = read_result_bytes(file_path)
+    return parse_request_lines(data.decode('utf-8', 'replace').splitlines())
+
+# --------------------------------------------------------------------------------
+# 2) THROUGHPUT SU FINESTRE SCORREVOLI
+# --------------------------------------------------------------------------------
+
+def window_from_env():
+    """Ampiezza delle finestre (s) da THROUGHPUT_WINDOW_S, default DEFAULT_WINDOW_S."""
+    value = os.environ.get('THROUGHPUT_WINDOW_S', '').strip()
+    return float(value) if value else DEFAULT_WINDOW_S
+
+
+def throughput_finestre(log, window_s=DEFAULT_WINDOW_S, step_s=None):
+    """
+    Throughput (richieste riuscite / s) su finestre [t, t + window_s) che avanzano di step_s
+    (default window_s / 4) dall'inizio della prima richiesta alla fine dell'ultima.
+    Ritorna (inizio delle finestre in s, richieste/s); un run più corto di una finestra
+    dà una sola finestra lunga quanto il run. Array vuoti se mancano i timestamp.
+    """
+    timed = ~np.isnan(log.start_us) & ~np.isnan(log.end_us)
+    if not timed.any():
+        return np.empty(0), np.empty(0)
+    t0 = log.start_us[timed].min()
+    t1 = log.end_us[timed].max()
+    ends = np.sort(log.end_us[timed & log.ok])
+
+    width = window_s * 1e6
+    if t1 - t0 <= width:
+        span = max(t1 - t0, 1.0)
+        return np.array([0.0]), np.array([len(ends) / span * 1e6])
+
+    step = (step_s if step_s is not None else window_s / 4) * 1e6
+    starts = np.arange(t0, t1 - width + step / 2, step)
+    counts = np.searchsorted(ends, starts + width, side='left') - np.searchsorted(ends, starts, side='left')
+    return (starts - t0) / 1e6, counts / window_s
+
+
+def throughput_run(log):
+    """Richieste riuscite / s sull'intero run (dal primo start all'ultimo end); NaN senza timestamp."""
+    timed = ~np.isnan(log.start_us) & ~np.isnan(log.end_us)
+    if not timed.any():
+        return np.nan
+    span = max(log.end_us[timed].max() - log.start_us[timed].min(), 1.0)
+    return float(np.count_nonzero(timed & log.ok) / span * 1e6)
+
+# --------------------------------------------------------------------------------
+# 3) DISTRIBUZIONE DELLE LATENZE
+# --------------------------------------------------------------------------------
+
+def media_latenza(latency_us):
+    """Media delle latenze delle richieste riuscite (i NaN delle fallite esclusi), NaN senza campioni."""
+    latency = latency_us[~np.isnan(latency_us)]
+    return float(latency.mean()) if len(latency) else np.nan
+
+
+def percentili_latenza(latency_us, percentiles=LATENCY_PERCENTILES):
+    """
+    Percentili (es. p50 / p90 / p99 / p99.9) e massimo delle latenze, ignorando i NaN
+    delle richieste fallite: array di len(percentiles) + 1 valori, NaN senza campioni.
+    """
+    latency = latency_us[~np.isnan(latency_us)]
+    if not len(latency):
+        return np.full(len(percentiles) + 1, np.nan)
+    return np.append(np.percentile(latency, percentiles), latency.max())
+
+
+def cdf_latenza(latency_us):
+    """(latenze ordinate, frazione cumulativa) per il grafico della CDF empirica."""
+    latency = np.sort(latency_us[~np.isnan(latency_us)])
+    return latency, np.arange(1, len(latency) + 1) / max(len(latency), 1)
+
+# --------------------------------------------------------------------------------
+# 4) RIEPILOGO DI UNA CELLA
+# --------------------------------------------------------------------------------
+
+def request_stats(file_path, window_s=DEFAULT_WINDOW_S):
+    """
+    Una sola lettura del log: (throughput del run, throughput della finestra peggiore,
+    latenza media, latenze p50, p90, p99, p99.9, max), nell'ordine di REQUEST_EVENTS.
+    """
+    log = load_request_log(file_path)
+    _, rates = throughput_finestre(log, window_s)
+    return ((throughput_run(log), float(rates.min()) if len(rates) else np.nan, media_latenza(log.latency_us))
+            + tuple(percentili_latenza(log.latency_us).tolist()))
@@ -0,0 +1,141 @@
+"""
+Lettura dei risultati direttamente da archivi tar / zip, senza estrarli.
+
+Un percorso che attraversa un archivio viene trattato come una directory:
+    /data/campagna_single_core.tar/1 Active Server/perf_results_matrix_cache_misses/misses_64.txt
+All'apertura dell'archivio si costruisce una sola volta l'indice dei membri
+(nome -> TarInfo/ZipInfo e directory -> nomi dei file); poi ogni lettura va diretta
+all'offset del membro. Gli archivi aperti restano in cache per tutto il processo.
+
+Per l'accesso casuale conviene un .tar non compresso o uno .zip: in un .tar.gz / .tar.xz
+ogni salto all'indietro costringe a decomprimere di nuovo dall'inizio.
+"""
+
+import io
+import os
+import tarfile
+import threading
+import zipfile
+
+ARCHIVE_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.xz', '.tar.bz2', '.zip')
+
+_lock = threading.Lock()
+
+# archivio (path assoluto) -> dict con handle, indice e pid del processo che l'ha aperto
+_archives = {}
+
+# --------------------------------------------------------------------------------
+# 1) RICONOSCIMENTO DEI PERCORSI
+# --------------------------------------------------------------------------------
+
+def split_archive_path(path):
+    """
+    Se path passa attraverso un archivio ritorna (archivio, membro), dove membro è il
+    percorso interno con '/' come separatore ('' per la radice). Altrimenti None.
+    Si fa una stat solo sui componenti che hanno un'estensione da archivio.
+    """
+    path = os.path.abspath(path)
+    for archive in _archives:
+        if path == archive or path.startswith(archive + os.sep):
+            return archive, path[len(archive) + 1:].replace(os.sep, '/')
+
+    parts = path.split(os.sep)
+    for i in range(1, len(parts) + 1):
+        if parts[i - 1].lower().endswith(ARCHIVE_SUFFIXES):
+            candidate = os.sep.join(parts[:i]) or os.sep
+            if os.path.isfile(candidate):
+                return candidate, '/'.join(parts[i:])
+    return None
+
+# --------------------------------------------------------------------------------
+# 2) INDICE DEI MEMBRI
+# --------------------------------------------------------------------------------
+
+def _normalize(name):
+    while name.startswith('./'):
+        name = name[2:]
+    return name.strip('/')
+
+
+def _build_entry(archive):
+    if archive.lower().endswith('.zip'):
+        handle = zipfile.ZipFile(archive)
+        infos = [(info.filename, info) for info in handle.infolist() if not info.is_dir()]
+        kind = 'zip'
+    else:
+        handle = tarfile.open(archive)
+        infos = [(m.name, m) for m in handle.getmembers() if m.isfile()]
+        kind = 'tar'
+
+    files = {}
+    dirs = {}
+    for name, info in infos:
+        name = _normalize(name)
+        files[name] = info
+        parent, _, base = name.rpartition('/')
+        dirs.setdefault(parent, []).append(base)
+
+    return {'kind': kind, 'handle': handle, 'files': files, 'dirs': dirs,
+            'mtime_ns': os.stat(archive).st_mtime_ns, 'pid': os.getpid()}
+
+
+def _entry(archive):
+    entry = _archives.get(archive)
+    if entry is None or entry['pid'] != os.getpid():
+        # Prima apertura, oppure processo figlio: l'handle del padre non va condiviso
+        with _lock:
+            entry = _archives.get(archive)
+            if entry is None or entry['pid'] != os.getpid():
+                entry = _archives[archive] = _build_entry(archive)
+    return entry
+
+
+def archive_listdir(archive, member_dir):
+    """Nomi dei file direttamente contenuti in member_dir (le sottodirectory sono escluse)."""
+    return list(_entry(archive)['dirs'].get(member_dir.strip('/'), []))
+
+
+def archive_member_info(archive, member):
+    """TarInfo / ZipInfo del membro, oppure None se non esiste."""
+    return _entry(archive)['files'].get(member.strip('/'))
+
+# --------------------------------------------------------------------------------
+# 3) LETTURA
+# --------------------------------------------------------------------------------
+
+def open_member(archive, member):
+    """
+    File binario in lettura per un membro. Da uno zip si legge in streaming;
+    tarfile non è thread-safe, quindi il membro viene letto sotto lock in memoria.
+    """
+    entry = _entry(archive)
+    info = entry['files'].get(member.strip('/'))
+    if info is None:
+        raise FileNotFoundError(f"{member} non è presente in {archive}")
+    if entry['kind'] == 'zip':
+        return entry['handle'].open(info)
+    with _lock:
+        data = entry['handle'].extractfile(info).read()
+    return io.BytesIO(data)
+
+
+def member_stat(archive, member):
+    """
+    (size, mtime_ns) di un membro per la cache di parsing: la size è quella del membro,
+    il mtime quello dell'archivio, così sostituire l'archivio invalida tutte le voci.
+    """
+    entry = _entry(archive)
+    info = entry['files'].get(member.strip('/'))
+    if info is None:
+        raise FileNotFoundError(f"{member} non è presente in {archive}")
+    size = info.file_size if entry['kind'] == 'zip' else info.size
+    return size, entry['mtime_ns']
+
+
+def close_archives():
+    """Chiude tutti gli archivi aperti da questo processo."""
+    with _lock:
+        for entry in _archives.values():
+            if entry['pid'] == os.getpid():
+                entry['handle'].close()
+        _archives.clear()
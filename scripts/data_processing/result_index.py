@@ -0,0 +1,117 @@
+"""
+Indice in memoria dei file di risultato di una directory di campagna.
+
+Una sola passata di os.scandir per directory (o dell'indice dei membri, se la
+directory è dentro un archivio): ogni nome che rispetta la grammatica
+dei file di risultato viene scomposto in (tipo, size, frequenza) e i loader
+rispondono alle richieste con un lookup nel dict, senza un os.path.exists per cella.
+
+Grammatica dei nomi:
+    <tipo>_<size>[_<FREQ>Hz].<ext>[.gz|.xz|.zst]     FREQ: LOW / MEDIUM / HIGH o una frequenza (500Hz)
+    tipo: misses | tlb_misses | interval_misses | execution_time_matrix | execution_time_table
+    ext:  txt | csv | json | pstat | npz
+A parità di cella vale l'ordine di PERF_SUFFIXES: prima il testo non compresso.
+"""
+
+import os
+import re
+
+from perf_parser import PERF_SUFFIXES
+from result_io import result_exists, result_listdir
+
+_NAME_RE = re.compile(
+    r'^(?P<kind>misses|tlb_misses|interval_misses|execution_time_matrix|execution_time_table)'
+    r'_(?P<size>\d+)'
+    r'(?:_(?P<freq>[A-Za-z0-9]+)Hz)?'
+    r'(?P<ext>\.[a-z]+(?:\.gz|\.xz|\.zst)?)$'
+)
+
+# Le serie a intervalli convertite da compact_campaign.py sono .npz
+_EXT_RANK = {ext: i for i, ext in enumerate(PERF_SUFFIXES + ('.npz',))}
+
+# Indici già costruiti in questo processo: dir assoluta -> {chiave: path}
+_indexes = {}
+
+# --------------------------------------------------------------------------------
+# 1) GRAMMATICA
+# --------------------------------------------------------------------------------
+
+def parse_result_name(file_name):
+    """
+    Scompone il nome di un file di risultato in ((tipo, size, FREQ o None), ext).
+    Ritorna None se il nome non rispetta la grammatica.
+    """
+    m = _NAME_RE.match(file_name)
+    if m is None or m.group('ext') not in _EXT_RANK:
+        return None
+    freq = m.group('freq')
+    return (m.group('kind'), int(m.group('size')), freq.upper() if freq else None), m.group('ext')
+
+# --------------------------------------------------------------------------------
+# 2) INDICE
+# --------------------------------------------------------------------------------
+
+def build_index(dir_path):
+    """
+    Scandisce dir_path una volta (anche dentro un archivio tar / zip) e ritorna
+    {(tipo, size, FREQ): path}. Una directory inesistente dà un indice vuoto
+    (tutte le celle risultano mancanti).
+    """
+    index = {}
+    ranks = {}
+    for name, path in result_listdir(dir_path):
+        parsed = parse_result_name(name)
+        if parsed is None:
+            continue
+        key, ext = parsed
+        rank = _EXT_RANK[ext]
+        if key not in ranks or rank < ranks[key]:
+            ranks[key] = rank
+            index[key] = path
+    return index
+
+
+def get_index(dir_path):
+    """Indice di dir_path, costruito alla prima richiesta e poi riusato."""
+    key = os.path.abspath(dir_path)
+    index = _indexes.get(key)
+    if index is None:
+        index = _indexes[key] = build_index(dir_path)
+    return index
+
+
+def clear_index_cache():
+    """Dimentica gli indici costruiti (ad es. dopo aver aggiunto file a una campagna)."""
+    _indexes.clear()
+
+
+def lookup(dir_path, file_name):
+    """
+    Path del file di risultato corrispondente a file_name in dir_path (anche se su disco
+    ha un'altra estensione o è compresso), oppure None se la cella manca.
+    """
+    parsed = parse_result_name(file_name)
+    if parsed is None:
+        path = os.path.join(dir_path, file_name)
+        return path if result_exists(path) else None
+    return get_index(dir_path).get(parsed[0])
+
+# --------------------------------------------------------------------------------
+# 3) REPORT DELLE CELLE MANCANTI
+# --------------------------------------------------------------------------------
+
+def format_missing(missing, max_items=20):
+    """
+    Testo di avviso per una lista di celle mancanti [(scenario, size, path atteso)],
+    raggruppate per directory.
+    """
+    by_dir = {}
+    for label, sz, path in missing:
+        by_dir.setdefault(os.path.dirname(path), []).append(f"{label}/{sz}")
+    lines = [f"ATTENZIONE: {len(missing)} celle senza file di risultato "
+             "(valgono NaN e non vengono disegnate)"]
+    for dir_path, cells in by_dir.items():
+        shown = ", ".join(cells[:max_items])
+        more = f" ... (+{len(cells) - max_items})" if len(cells) > max_items else ""
+        lines.append(f"  {dir_path}: {shown}{more}")
+    return "\n".join(lines)
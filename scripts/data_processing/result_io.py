@@ -0,0 +1,144 @@
+"""
+Apertura dei file di risultato, compressi o no, con la stessa interfaccia di open().
+
+Le campagne archiviate hanno i file compressi (.gz, .xz, .zst): open_result sceglie
+il decompressore dall'estensione e restituisce un oggetto file in streaming, quindi
+i parser possono iterare le righe senza decomprimere tutto in memoria.
+
+Il supporto a .zst richiede il pacchetto opzionale `zstandard`.
+
+Un percorso può anche attraversare un archivio tar / zip (vedi result_archive): se il
+file non esiste su disco, open_result / result_exists / result_stat / result_listdir
+lo cercano nell'indice dei membri dell'archivio.
+"""
+
+import gzip
+import io
+import lzma
+import os
+
+from result_archive import archive_listdir, member_stat, open_member, split_archive_path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Estensioni di compressione riconosciute, nell'ordine in cui vengono cercate
+COMPRESSED_EXTENSIONS = ('.gz', '.xz', '.zst')
+
+
+def split_compression(file_path):
+    """Ritorna (path senza estensione di compressione, estensione di compressione o '')."""
+    stem, ext = os.path.splitext(file_path)
+    if ext in COMPRESSED_EXTENSIONS:
+        return stem, ext
+    return file_path, ''
+
+
+def open_result(file_path, mode='r'):
+    """
+    Apre un file di risultato in lettura ('r' testo, 'rb' binario), decomprimendo
+    in streaming .gz / .xz / .zst. Il testo è decodificato UTF-8 con 'replace'.
+    """
+    if mode not in ('r', 'rb'):
+        raise ValueError(f"modo non supportato: {mode!r}")
+    comp = split_compression(file_path)[1]
+    if comp == '.zst' and zstandard is None:
+        raise ImportError(f"{file_path}: per leggere i file .zst serve il pacchetto 'zstandard'")
+
+    # Dal disco si passa il path (i decompressori chiudono il proprio file), da un
+    # archivio il file del membro
+    source = file_path
+    if not os.path.exists(file_path):
+        split = split_archive_path(file_path)
+        if split is not None:
+            source = open_member(*split)
+
+    if comp == '.gz':
+        f = gzip.open(source, 'rb')
+    elif comp == '.xz':
+        f = lzma.open(source, 'rb')
+    elif comp == '.zst':
+        raw = open(source, 'rb') if source is file_path else source
+        f = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+    else:
+        f = open(source, 'rb') if source is file_path else source
+
+    if mode == 'rb':
+        return f
+    return io.TextIOWrapper(f, encoding='utf-8', errors='replace')
+
+
+def result_exists(file_path):
+    """Come os.path.exists, ma vede anche i membri degli archivi."""
+    if os.path.exists(file_path):
+        return True
+    split = split_archive_path(file_path)
+    if split is None:
+        return False
+    try:
+        member_stat(*split)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def result_stat(file_path):
+    """(size, mtime_ns) di un file di risultato, anche dentro un archivio."""
+    try:
+        st = os.stat(file_path)
+    except (FileNotFoundError, NotADirectoryError):
+        split = split_archive_path(file_path)
+        if split is None:
+            raise
+        return member_stat(*split)
+    return st.st_size, st.st_mtime_ns
+
+
+def result_listdir(dir_path):
+    """
+    Lista di (nome, path) dei file di una directory, su disco o dentro un archivio.
+    Una directory inesistente dà una lista vuota.
+    """
+    try:
+        with os.scandir(dir_path) as entries:
+            return [(e.name, e.path) for e in entries]
+    except (FileNotFoundError, NotADirectoryError):
+        split = split_archive_path(dir_path)
+        if split is None:
+            return []
+        return [(name, os.path.join(dir_path, name)) for name in archive_listdir(*split)]
+
+
+def read_result_bytes(file_path):
+    """Contenuto completo (decompresso) di un file di risultato."""
+    # Caso più frequente, un file non compresso su disco: un solo open, senza stat
+    if not file_path.endswith(COMPRESSED_EXTENSIONS):
+        try:
+            with open(file_path, 'rb') as f:
+                return f.read()
+        except (FileNotFoundError, NotADirectoryError):
+            pass
+    with open_result(file_path, 'rb') as f:
+        return f.read()
+
+
+def compress_file(src, dst, codec):
+    """Comprime src in dst con codec 'gz', 'xz' o 'zst'."""
+    if codec == 'gz':
+        out = gzip.open(dst, 'wb', compresslevel=9)
+    elif codec == 'xz':
+        out = lzma.open(dst, 'wb', preset=6)
+    elif codec == 'zst':
+        if zstandard is None:
+            raise ImportError("per comprimere in .zst serve il pacchetto 'zstandard'")
+        out = zstandard.ZstdCompressor(level=19).stream_writer(open(dst, 'wb'), closefd=True)
+    else:
+        raise ValueError(f"codec sconosciuto: {codec!r}")
+    with open(src, 'rb') as f_in, out:
+        while True:
+            block = f_in.read(1 << 20)
+            if not block:
+                break
+            out.write(block)
@@ -0,0 +1,241 @@
+"""
+Database SQLite dei risultati, con un'API di interrogazione che restituisce array NumPy.
+
+Schema:
+    runs          una riga per cella misurata: campagna, server, core_mode, n_servers,
+                  disturbance_freq ('' per 1S), size, sorgente (cache / tlb / time)
+    events        nomi degli eventi (l1_miss, tlb_l2_miss, avg_time_us, ...)
+    measurements  (run, evento) -> valore e varianza tra le ripetizioni
+
+La chiave (server, core_mode, n_servers, disturbance_freq, size, event) è coperta da due
+indici: uno su runs per la cella e uno su measurements per (evento, run), così una
+domanda come "L3 miss di 3S_HIGH rispetto a 1S per tutte le size, entrambi i server"
+è una sola query indicizzata (vedi query_ratio).
+
+Il database si riempie dalle stesse celle di campaign_store (directory, archivi tar / zip
+o un archivio colonnare già costruito).
+
+Uso:
+    python3 results_db.py import <db> <root> [<root> ...] [--name NOME ...]
+    python3 results_db.py import <db> --store <archivio.npz|.parquet>
+    python3 results_db.py ratio <db> <evento> <scenario> [--baseline 1S]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+
+import numpy as np
+
+from campaign_store import build_store, load_store
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id               INTEGER PRIMARY KEY,
+    campaign         TEXT NOT NULL,
+    server           TEXT NOT NULL,
+    core_mode        TEXT NOT NULL,
+    n_servers        INTEGER NOT NULL,
+    disturbance_freq TEXT NOT NULL,
+    size             INTEGER NOT NULL,
+    source           TEXT NOT NULL,
+    UNIQUE (campaign, server, core_mode, n_servers, disturbance_freq, size, source)
+);
+CREATE TABLE IF NOT EXISTS events (
+    id   INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS measurements (
+    run_id   INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    event_id INTEGER NOT NULL REFERENCES events(id),
+    value    REAL,
+    variance REAL,
+    PRIMARY KEY (run_id, event_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_runs_cell
+    ON runs (server, core_mode, n_servers, disturbance_freq, size);
+CREATE INDEX IF NOT EXISTS idx_measurements_event
+    ON measurements (event_id, run_id);
+"""
+
+# Colonne restituite da query(), nell'ordine del SELECT
+_RESULT_DTYPE = np.dtype([
+    ('campaign', 'U64'), ('server', 'U16'), ('core_mode', 'U16'), ('n_servers', np.int8),
+    ('disturbance_freq', 'U16'), ('size', np.int64), ('value', np.float64), ('variance', np.float64),
+])
+
+_RATIO_DTYPE = np.dtype([
+    ('campaign', 'U64'), ('server', 'U16'), ('core_mode', 'U16'), ('size', np.int64),
+    ('value', np.float64), ('baseline', np.float64), ('ratio', np.float64),
+])
+
+# --------------------------------------------------------------------------------
+# 1) CONNESSIONE E IMPORT
+# --------------------------------------------------------------------------------
+
+def connect(db_path):
+    """Apre (creandolo se serve) il database dei risultati."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def parse_scenario(scenario):
+    """'1S' -> (1, ''), '3S_HIGH' -> (3, 'HIGH')."""
+    n, _, freq = scenario.partition('S')
+    return int(n), freq.lstrip('_').upper()
+
+
+def import_store(conn, store):
+    """
+    Inserisce (o sostituisce) nel database tutte le righe di un CampaignStore.
+    Ritorna il numero di misure scritte.
+    """
+    cols = store.columns
+    with conn:
+        event_ids = {}
+        for name in np.unique(cols['event']):
+            conn.execute("INSERT OR IGNORE INTO events (name) VALUES (?)", (str(name),))
+        for event_id, name in conn.execute("SELECT id, name FROM events"):
+            event_ids[name] = event_id
+
+        run_ids = {}
+        measurements = []
+        for campaign, server, core_mode, n_servers, freq, size, source, event, value, variance in zip(
+                cols['campaign'], cols['server'], cols['core_mode'], cols['n_servers'], cols['freq'],
+                cols['size'], cols['source'], cols['event'], cols['value'], cols['variance']):
+            key = (str(campaign), str(server), str(core_mode), int(n_servers), str(freq), int(size),
+                   str(source))
+            run_id = run_ids.get(key)
+            if run_id is None:
+                # Reimportare una cella ne sostituisce le misure
+                conn.execute("DELETE FROM runs WHERE campaign=? AND server=? AND core_mode=? AND "
+                             "n_servers=? AND disturbance_freq=? AND size=? AND source=?", key)
+                run_id = run_ids[key] = conn.execute(
+                    "INSERT INTO runs (campaign, server, core_mode, n_servers, disturbance_freq, size, "
+                    "source) VALUES (?, ?, ?, ?, ?, ?, ?)", key).lastrowid
+            measurements.append((run_id, event_ids[str(event)], float(value),
+                                 None if np.isnan(variance) else float(variance)))
+        conn.executemany("INSERT INTO measurements (run_id, event_id, value, variance) VALUES (?, ?, ?, ?)",
+                         measurements)
+    return len(measurements)
+
+# --------------------------------------------------------------------------------
+# 2) INTERROGAZIONE
+# --------------------------------------------------------------------------------
+
+def _where(filters):
+    """Clausola WHERE e parametri per filtri colonna=valore o colonna=[valori]."""
+    clauses, params = [], []
+    for column, wanted in filters.items():
+        if wanted is None:
+            continue
+        if isinstance(wanted, (list, tuple, set, np.ndarray)):
+            wanted = list(wanted)
+            clauses.append(f"{column} IN ({', '.join('?' * len(wanted))})")
+            params.extend(wanted)
+        else:
+            clauses.append(f"{column} = ?")
+            params.append(wanted)
+    return " AND ".join(clauses) or "1", params
+
+
+def query(conn, event, server=None, core_mode=None, scenario=None, size=None, campaign=None):
+    """
+    Valori di un evento come array strutturato (campaign, server, core_mode, n_servers,
+    disturbance_freq, size, value, variance), ordinato per cella. Ogni filtro accetta
+    un valore o una lista; scenario è un'etichetta come '1S' o '3S_HIGH'.
+    """
+    n_servers = freq = None
+    if scenario is not None:
+        n_servers, freq = parse_scenario(scenario)
+    where, params = _where({'e.name': event, 'r.server': server, 'r.core_mode': core_mode,
+                            'r.n_servers': n_servers, 'r.disturbance_freq': freq,
+                            'r.size': size, 'r.campaign': campaign})
+    rows = conn.execute(f"""
+        SELECT r.campaign, r.server, r.core_mode, r.n_servers, r.disturbance_freq, r.size,
+               m.value, IFNULL(m.variance, 'nan')
+        FROM measurements m
+        JOIN events e ON e.id = m.event_id
+        JOIN runs r ON r.id = m.run_id
+        WHERE {where}
+        ORDER BY r.campaign, r.server, r.core_mode, r.n_servers, r.disturbance_freq, r.size
+    """, params).fetchall()
+    return np.array(rows, dtype=_RESULT_DTYPE)
+
+
+def query_ratio(conn, event, scenario, baseline='1S', server=None, core_mode=None, size=None,
+                campaign=None):
+    """
+    Rapporto evento(scenario) / evento(baseline) per ogni (campagna, server, core, size)
+    presente in entrambi, con una sola query. Ritorna un array strutturato con
+    value, baseline e ratio (NaN dove la baseline è 0).
+    """
+    n_s, freq_s = parse_scenario(scenario)
+    n_b, freq_b = parse_scenario(baseline)
+    where, params = _where({'r.server': server, 'r.core_mode': core_mode, 'r.size': size,
+                            'r.campaign': campaign})
+    rows = conn.execute(f"""
+        SELECT r.campaign, r.server, r.core_mode, r.size, m.value, mb.value,
+               IFNULL(m.value / NULLIF(mb.value, 0), 'nan')
+        FROM events e
+        JOIN measurements m ON m.event_id = e.id
+        JOIN runs r ON r.id = m.run_id
+        JOIN runs rb ON rb.campaign = r.campaign AND rb.server = r.server
+                    AND rb.core_mode = r.core_mode AND rb.n_servers = ? AND rb.disturbance_freq = ?
+                    AND rb.size = r.size AND rb.source = r.source
+        JOIN measurements mb ON mb.run_id = rb.id AND mb.event_id = e.id
+        WHERE e.name = ? AND r.n_servers = ? AND r.disturbance_freq = ? AND {where}
+        ORDER BY r.campaign, r.server, r.core_mode, r.size
+    """, [n_b, freq_b, event, n_s, freq_s] + params).fetchall()
+    return np.array(rows, dtype=_RATIO_DTYPE)
+
+# --------------------------------------------------------------------------------
+# 3) MAIN
+# --------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Database SQLite dei risultati delle campagne.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_import = sub.add_parser('import', help="importa campagne (directory / archivi) o un archivio colonnare")
+    p_import.add_argument('db')
+    p_import.add_argument('roots', nargs='*')
+    p_import.add_argument('--name', action='append', help="nome della campagna (uno per radice)")
+    p_import.add_argument('--store', help="archivio .npz / .parquet scritto da campaign_store.py")
+    p_ratio = sub.add_parser('ratio', help="rapporto di un evento tra uno scenario e la baseline")
+    p_ratio.add_argument('db')
+    p_ratio.add_argument('event')
+    p_ratio.add_argument('scenario')
+    p_ratio.add_argument('--baseline', default='1S')
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        if args.store:
+            store = load_store(args.store)
+        elif args.roots:
+            if args.name and len(args.name) != len(args.roots):
+                print("Serve un --name per ogni radice.")
+                sys.exit(1)
+            store = build_store(args.roots, args.name)
+        else:
+            print("Indicare almeno una radice oppure --store.")
+            sys.exit(1)
+        conn = connect(args.db)
+        n = import_store(conn, store)
+        print(f"{n} misure importate in {args.db}")
+        return
+
+    if not os.path.exists(args.db):
+        print(f"Database non trovato: {args.db}")
+        sys.exit(1)
+    result = query_ratio(connect(args.db), args.event, args.scenario, args.baseline)
+    for row in result:
+        print(f"{row['campaign']:>12s} {row['server']:>6s} {row['core_mode']:>6s} {row['size']:>8d} "
+              f"{row['ratio']:8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Griglia dichiarativa degli scenari di una campagna.
+
+Una ScenarioGrid descrive con pochi valori tutto ciò che gli script di plot scrivevano a
+mano in ogni main(): server (matrix / table), modalità core (single / multi), numeri di
+server co-locati, frequenze di disturbo e size. Da lì derivano etichette degli scenari,
+legende, directory da leggere e il cubo dei dati:
+
+    grid = make_grid('matrix', 'single', sizes=[1, 2, 4, 8], n_servers=(1, 2, 3, 4),
+                     freqs=('LOW', 'HIGH', '500'))
+    scenario_labels = grid_scenario_labels(grid)     # 1S, 2S_LOW, 2S_HIGH, 2S_500, 3S_LOW, ...
+    cube = carica_griglia(grid, root)
+
+Con n server (n > 1) e f frequenze gli scenari sono 1 + (n - 1) * f; le etichette sono
+generate una volta e le posizioni si cercano in un dict.
+
+Le variabili d'ambiente SCENARIO_SERVERS, SCENARIO_FREQS e SCENARIO_SIZES (liste separate
+da virgole) sostituiscono i valori della griglia senza modificare lo script (grid_from_env).
+"""
+
+import os
+from collections import namedtuple
+from functools import partial
+
+from campaign_loader import map_paths
+from campaign_store import CORE_MODES, N_SERVERS, SERVERS, SOURCE_DIRS
+from data_cube import carica_cubo, scenario_labels_for
+from latency_sketch import load_latency_sketch
+from perf_interval import load_interval_series
+from request_log import load_request_log
+from result_index import get_index
+
+ScenarioGrid = namedtuple('ScenarioGrid', ['server', 'core_mode', 'n_servers', 'freqs', 'sizes'])
+ScenarioGrid.__doc__ = "Assi della campagna: server, modalità core, numeri di server, frequenze, size."
+
+FREQS = ('LOW', 'MEDIUM', 'HIGH')
+SOURCES = ('cache', 'time', 'tlb')
+
+# Nomi delle frequenze simboliche nelle legende
+_FREQ_NAMES = {
+    'it': {'LOW': 'basso', 'MEDIUM': 'medio', 'HIGH': 'alto'},
+    'en': {'LOW': 'low', 'MEDIUM': 'medium', 'HIGH': 'high'},
+}
+
+# --------------------------------------------------------------------------------
+# 1) GRIGLIA
+# --------------------------------------------------------------------------------
+
+def make_grid(server, core_mode, sizes, n_servers=N_SERVERS, freqs=FREQS):
+    """ScenarioGrid normalizzata: tuple, numeri di server ordinati, frequenze in maiuscolo."""
+    if server not in SERVERS:
+        raise ValueError(f"server sconosciuto: {server!r} (attesi {sorted(SERVERS)})")
+    if core_mode not in CORE_MODES:
+        raise ValueError(f"modalità core sconosciuta: {core_mode!r} (attese {sorted(CORE_MODES)})")
+    return ScenarioGrid(server, core_mode, tuple(sorted(set(int(n) for n in n_servers))),
+                        tuple(str(f).upper() for f in freqs), tuple(int(sz) for sz in sizes))
+
+
+def _env_list(name):
+    value = os.environ.get(name, '').strip()
+    return [item.strip() for item in value.split(',') if item.strip()] if value else None
+
+
+def grid_from_env(grid):
+    """Griglia con i valori di SCENARIO_SERVERS / SCENARIO_FREQS / SCENARIO_SIZES, se definite."""
+    n_servers = _env_list('SCENARIO_SERVERS')
+    freqs = _env_list('SCENARIO_FREQS')
+    sizes = _env_list('SCENARIO_SIZES')
+    return make_grid(grid.server, grid.core_mode,
+                     sizes if sizes is not None else grid.sizes,
+                     n_servers if n_servers is not None else grid.n_servers,
+                     freqs if freqs is not None else grid.freqs)
+
+# --------------------------------------------------------------------------------
+# 2) ETICHETTE E LEGENDE
+# --------------------------------------------------------------------------------
+
+def grid_scenario_labels(grid):
+    """Etichette degli scenari nell'ordine dei grafici (1S, 2S_<FREQ>..., 3S_<FREQ>..., ...)."""
+    return scenario_labels_for(grid.freqs, grid.n_servers)
+
+
+def scenario_index(scenario_labels):
+    """{etichetta: posizione} per cercare uno scenario senza list.index."""
+    return {label: i for i, label in enumerate(scenario_labels)}
+
+
+def scenario_legend(scenario_labels, lingua='it'):
+    """
+    Testo di legenda per ogni scenario, es. '2 Servers (alto disturbo)' oppure, con una
+    frequenza numerica, '2 Servers (disturbo 500 Hz)'. lingua: 'it' o 'en'.
+    """
+    names = _FREQ_NAMES[lingua]
+    legend = {}
+    for label in scenario_labels:
+        n, _, freq = label.partition('S')
+        freq = freq.lstrip('_')
+        servers = f"{n} Server" if n == '1' else f"{n} Servers"
+        if not freq:
+            legend[label] = f"{servers} (no disturbo)" if lingua == 'it' else f"{servers} (no disturbance)"
+            continue
+        rate = names.get(freq, f"{freq} Hz" if freq.isdigit() else freq)
+        if lingua == 'it':
+            legend[label] = f"{servers} ({rate} disturbo)" if freq in names else f"{servers} (disturbo {rate})"
+        else:
+            legend[label] = f"{servers} ({rate} disturbance)"
+    return legend
+
+# --------------------------------------------------------------------------------
+# 3) DIRECTORY E CARICAMENTO
+# --------------------------------------------------------------------------------
+
+def standard_layout(root, grid):
+    """
+    Modelli di directory del layout di laboratorio (vedi campaign_store.py) per la griglia:
+    {sorgente: path con il segnaposto {n} per il numero di server}.
+    """
+    base = os.path.join(root, SERVERS[grid.server], CORE_MODES[grid.core_mode], "{n} Active Server")
+    return {source: os.path.join(base, SOURCE_DIRS[source].format(server=grid.server))
+            for source in SOURCES}
+
+
+def grid_dirs(grid, layout, sources=SOURCES):
+    """{sorgente: (directory per ogni numero di server della griglia)} da un layout."""
+    return {source: tuple(layout[source].format(n=n) for n in grid.n_servers) for source in sources}
+
+
+def carica_griglia(grid, root=None, layout=None, sources=SOURCES, store=None, campaign=None,
+                   workers=None, processes=None):
+    """
+    Cubo (scenario x size x event x stat) di tutta la griglia. Le directory vengono dal
+    layout standard sotto root oppure da layout ({sorgente: modello con {n}}) per alberi
+    organizzati diversamente; con store non vengono lette.
+    """
+    if layout is None:
+        if root is None:
+            raise ValueError("indicare root oppure layout")
+        layout = standard_layout(root, grid)
+    return carica_cubo(grid.server, grid.core_mode, grid_dirs(grid, layout, sources), list(grid.sizes),
+                       grid.freqs, n_servers=grid.n_servers, store=store, campaign=campaign,
+                       workers=workers, processes=processes)
+
+
+def _celle_sorgente(grid, root, layout, source, accept_kind):
+    """[((scenario, size), path)] dei file di una sorgente il cui tipo soddisfa accept_kind."""
+    if layout is None:
+        if root is None:
+            raise ValueError("indicare root oppure layout")
+        layout = standard_layout(root, grid)
+    wanted = set(grid_scenario_labels(grid))
+    sizes = set(grid.sizes)
+    cells = []
+    for n, dir_path in zip(grid.n_servers, grid_dirs(grid, layout, (source,))[source]):
+        for (kind, size, freq), path in sorted(get_index(dir_path).items(), key=lambda kv: kv[0][1:]):
+            label = '1S' if n == 1 else f"{n}S_{freq}"
+            if accept_kind(kind) and size in sizes and label in wanted and (n == 1) == (freq is None):
+                cells.append(((label, size), path))
+    return cells
+
+
+def _celle_latenze(grid, root, layout):
+    """[((scenario, size), path del log execution_time)] della griglia."""
+    return _celle_sorgente(grid, root, layout, 'time', lambda kind: kind.startswith('execution_time_'))
+
+
+def celle_intervalli(grid, root=None, layout=None, sources=('cache', 'tlb')):
+    """
+    Serie `perf stat -I` (interval_misses_*, vedi perf_interval.py) registrate nella
+    griglia: [((sorgente, scenario, size), path)], senza leggerle.
+    """
+    return [((source,) + key, path) for source in sources
+            for key, path in _celle_sorgente(grid, root, layout, source, lambda kind: kind == 'interval_misses')]
+
+
+def carica_intervalli(grid, root=None, layout=None, sources=('cache', 'tlb'), events=None, workers=None,
+                      processes=None):
+    """
+    Legge le serie a intervalli della griglia (vedi celle_intervalli):
+    {(sorgente, scenario, size): IntervalSeries}. Le celle senza file non compaiono.
+    """
+    cells = celle_intervalli(grid, root, layout, sources)
+    series = map_paths(partial(load_interval_series, events=events), [path for _, path in cells],
+                       workers, processes)
+    return {key: s for (key, _), s in zip(cells, series)}
+
+
+def carica_latenze(grid, root=None, layout=None, workers=None, processes=None):
+    """
+    Latenze per richiesta (array in us, NaN per le fallite) dei log execution_time della
+    griglia: {(scenario, size): array}. Le celle senza log non compaiono.
+    """
+    cells = _celle_latenze(grid, root, layout)
+    logs = map_paths(load_request_log, [path for _, path in cells], workers, processes)
+    return {key: log.latency_us for (key, _), log in zip(cells, logs)}
+
+
+def carica_sketch_latenze(grid, root=None, layout=None, kind='hdr', workers=None, processes=None):
+    """
+    Come carica_latenze, ma ogni log è letto in streaming in uno sketch a memoria fissa
+    ('hdr' o 'kll', vedi latency_sketch.py): {(scenario, size): sketch}.
+    """
+    cells = _celle_latenze(grid, root, layout)
+    sketches = map_paths(partial(load_latency_sketch, kind=kind), [path for _, path in cells],
+                         workers, processes)
+    return {key: sketch for (key, _), sketch in zip(cells, sketches)}
@@ -0,0 +1,83 @@
+"""
+I moduli di scripts/data_processing si importano per nome semplice (come negli script di
+plot, che aggiungono la directory a sys.path): qui si fa lo stesso per i test.
+"""
+
+import os
+import sys
+
+DATA_PROCESSING = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(DATA_PROCESSING, 'fixtures')
+
+if DATA_PROCESSING not in sys.path:
+    sys.path.insert(0, DATA_PROCESSING)
+
+# Nessuna scrittura nella cache dei parser dell'utente durante i test
+os.environ.setdefault('PERF_PARSE_CACHE', 'off')
+
+# --------------------------------------------------------------------------------
+# Campagna sintetica (layout standard di scenario_grid)
+# --------------------------------------------------------------------------------
+
+CACHE_EVENTS = ('mem_load_retired.l1_miss', 'mem_load_retired.l2_miss', 'mem_load_retired.l3_miss',
+                'mem_load_retired.l1_hit', 'mem_load_retired.l2_hit', 'mem_load_retired.l3_hit')
+TLB_EVENTS = ('dTLB_load_misses.stlb_hit', 'dTLB_load_misses.miss_causes_a_walk',
+              'dTLB_store_misses.stlb_hit', 'dTLB_store_misses.miss_causes_a_walk')
+
+
+def _testo_perf(events, values, variance_pct):
+    lines = ["", " Performance counter stats for 'CPU(s) 0' (50 runs):", ""]
+    pct = f"{variance_pct:.2f}".replace('.', ',')
+    for event, value in zip(events, values):
+        count = f"{int(value):,}".replace(',', '.')
+        lines.append(f"       {count}      {event}      ( +-  {pct}% )")
+    lines += ["", "           2,00123 +- 0,00012 seconds time elapsed  ( +-  0,01% )", ""]
+    return "\n".join(lines)
+
+
+def _log_client(latency_us, failed_every=0):
+    lines, start = [], 0
+    for i, lat in enumerate(latency_us):
+        if failed_every and i % failed_every == failed_every - 1:
+            lines.append(f"Failed {i}: (start {start} us, end {start + 40} us)")
+            start += 50
+            continue
+        lines.append(f"Iter {i}: Execution time: {int(lat)} microseconds (start {start} us, end {start + int(lat)} us)")
+        start += int(lat) + 10
+    # Come il client: totale delle riuscite diviso per tutte le iterazioni
+    ok = [int(lat) for i, lat in enumerate(latency_us)
+          if not failed_every or i % failed_every != failed_every - 1]
+    lines.append(f"Average Execution Time: {sum(ok) / len(latency_us):.2f} microseconds")
+    return "\n".join(lines) + "\n"
+
+
+def scrivi_campagna(root, grid, variance_pct=2.0, n_requests=200, failed_every=0, seed=0):
+    """
+    Scrive sotto root una campagna completa per la griglia (cache, tlb, time) nel layout
+    standard: contatori che crescono con il numero di server, varianza perf fissa.
+    """
+    import numpy as np
+
+    from scenario_grid import grid_dirs, standard_layout
+    rng = np.random.default_rng(seed)
+    dirs = grid_dirs(grid, standard_layout(str(root), grid))
+    for k, n in enumerate(grid.n_servers):
+        freqs = [None] if n == 1 else list(grid.freqs)
+        for freq in freqs:
+            suffix = "" if freq is None else f"_{freq}Hz"
+            for size in grid.sizes:
+                scale = (1 + k) * size
+                files = {
+                    'cache': (f"misses_{size}{suffix}.txt",
+                              _testo_perf(CACHE_EVENTS, [1000 * scale * (j + 1) for j in range(6)], variance_pct)),
+                    'tlb': (f"tlb_misses_{size}{suffix}.txt",
+                            _testo_perf(TLB_EVENTS, [500 * scale * (j + 1) for j in range(4)], variance_pct)),
+                    'time': (f"execution_time_{grid.server}_{size}{suffix}.txt",
+                             _log_client(rng.lognormal(6.0 + 0.3 * k, 0.2, n_requests), failed_every)),
+                }
+                for source, (name, text) in files.items():
+                    dir_path = dirs[source][k]
+                    os.makedirs(dir_path, exist_ok=True)
+                    with open(os.path.join(dir_path, name), 'w') as f:
+                        f.write(text)
+    return dirs
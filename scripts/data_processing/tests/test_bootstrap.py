@@ -0,0 +1,110 @@
+"""Intervalli bootstrap dei rapporti normalizzati: forme, NaN e copertura."""
+
+import numpy as np
+import pytest
+
+from bootstrap import (barre_errore, bootstrap_perf, bootstrap_sketch, intervallo_rapporti,
+                       intervalli_campagna)
+from data_cube import DataCube
+from latency_sketch import LatencyHistogram
+from metrics import MISS_EVENTS, TLB_EVENTS, MetricGraph
+from scenario_grid import carica_griglia, carica_sketch_latenze, grid_scenario_labels, make_grid
+
+from conftest import scrivi_campagna
+
+SCENARI = ['1S', '2S_LOW', '3S_LOW']
+SIZES = [4, 8]
+
+
+def _cubo(variance_pct=2.0):
+    events = list(MISS_EVENTS + TLB_EVENTS)
+    values = np.empty((len(SCENARI), len(SIZES), len(events), 2))
+    values[..., 0] = 1000.0 * np.arange(1, len(SCENARI) + 1)[:, None, None]
+    values[..., 1] = variance_pct
+    values[1, 0, :, 1] = np.nan          # una cella senza varianza
+    return DataCube(values, ('scenario', 'size', 'event', 'stat'),
+                    {'scenario': SCENARI, 'size': SIZES, 'event': events, 'stat': ['value', 'variance']})
+
+
+def _sketches(rng):
+    return {(scenario, size): LatencyHistogram().update(rng.lognormal(6.0 + 0.2 * k, 0.3, 2000))
+            for k, scenario in enumerate(SCENARI) for size in SIZES if (scenario, size) != ('3S_LOW', 8)}
+
+
+def test_forme_dei_ricampionamenti():
+    rng = np.random.default_rng(0)
+    boot = bootstrap_perf(np.full((3, 2, 3), 100.0), np.full((3, 2, 3), 5.0), 50, rng)
+    assert boot.shape == (50, 3, 2, 3) and (boot >= 0).all()
+    sketches = list(_sketches(rng).values())[:2] + [None, LatencyHistogram()]
+    boot = bootstrap_sketch(sketches, 40, rng)
+    assert boot.shape == (40, 4)
+    assert np.isfinite(boot[:, :2]).all() and np.isnan(boot[:, 2:]).all()
+
+
+def test_intervallo_rapporti_e_barre_errore():
+    rng = np.random.default_rng(1)
+    values = np.array([[100.0, 100.0], [200.0, 300.0]])
+    variance = np.array([[1.0, 1.0], [1.0, np.nan]])
+    boot = bootstrap_perf(values, variance, 2000, rng)
+    lo, hi = intervallo_rapporti(boot, ['1S', '2S_LOW'])
+    assert lo.shape == hi.shape == (2, 2)
+    assert lo[1, 0] < 2.0 < hi[1, 0]
+    assert np.isnan(lo[1, 1]) and np.isnan(hi[1, 1])
+    point = values / values[:1]
+    yerr = barre_errore(point, (lo, hi))
+    assert yerr.shape == (2, 2, 2)
+    assert (yerr >= 0).all() and yerr[:, 1, 1].tolist() == [0.0, 0.0]
+
+
+def test_copertura_e_ampiezza():
+    rng = np.random.default_rng(2)
+    values = np.full(400, 1000.0)
+    boot = bootstrap_perf(np.stack([values, values]), np.full((2, 400), 3.0), 500, rng)
+    lo, hi = intervallo_rapporti(boot, ['1S', '2S_LOW'], confidence=0.9)
+    assert np.mean((lo[1] <= 1.0) & (1.0 <= hi[1])) == 1.0
+    assert (hi[1] - lo[1]).mean() == pytest.approx(2 * 1.645 * 0.03 * np.sqrt(2), rel=0.1)
+
+
+def test_intervalli_campagna():
+    rng = np.random.default_rng(3)
+    cube, sketches = _cubo(), _sketches(rng)
+    ci = intervalli_campagna(cube, sketches, SCENARI, SIZES, resamples=200)
+    assert ci['norm_misses'][0].shape == (3, 2, 3)
+    assert ci['norm_tlb_misses'][1].shape == (3, 2, 2)
+    tlb_lo, tlb_hi = ci['norm_tlb_misses']
+    assert np.isfinite(tlb_lo[[0, 2]]).all() and np.isfinite(tlb_hi[[0, 2]]).all()
+    assert np.isfinite(tlb_lo[1, 1]).all() and np.isnan(tlb_lo[1, 0]).all()
+    assert ci['norm_time_us'][0].shape == (3, 2)
+    lo, hi = ci['norm_misses']
+    assert np.isnan(lo[1, 0]).all() and (lo[2] < 3.0).all() and (hi[2] > 3.0).all()
+    assert np.isnan(ci['norm_time_us'][0][2, 1])
+    again = intervalli_campagna(cube, sketches, SCENARI, SIZES, resamples=200)
+    np.testing.assert_array_equal(again['norm_misses'][1], ci['norm_misses'][1])
+
+
+def test_intervalli_di_una_campagna_letta_dai_file(tmp_path):
+    """Dai file perf ogni metrica normalizzata ha un intervallo, TLB compresi (livelli sommati)."""
+    grid = make_grid('matrix', 'single', sizes=[4, 8], n_servers=(1, 2, 3), freqs=('LOW', 'HIGH'))
+    scrivi_campagna(tmp_path, grid)
+    labels = grid_scenario_labels(grid)
+    cube = carica_griglia(grid, str(tmp_path), workers=1)
+    sketches = carica_sketch_latenze(grid, str(tmp_path), workers=1)
+    ci = intervalli_campagna(cube, sketches, labels, list(grid.sizes), resamples=200)
+    for name in ('norm_misses', 'norm_tlb_misses', 'norm_time_us'):
+        lo, hi = ci[name]
+        assert np.isfinite(lo).all() and np.isfinite(hi).all(), name
+        assert (lo <= hi).all(), name
+
+
+def test_tempo_medio_dentro_il_suo_intervallo(tmp_path):
+    """Stessa media (sole richieste riuscite) per il valore puntuale e per il bootstrap."""
+    grid = make_grid('matrix', 'single', sizes=[4, 8], n_servers=(1, 2), freqs=('LOW',))
+    scrivi_campagna(tmp_path, grid, failed_every=3)
+    # Baseline senza richieste fallite: con la media del client i rapporti scenderebbero a ~2/3
+    scrivi_campagna(tmp_path, make_grid('matrix', 'single', sizes=[4, 8], n_servers=(1,)))
+    labels = grid_scenario_labels(grid)
+    cube = carica_griglia(grid, str(tmp_path), workers=1)
+    sketches = carica_sketch_latenze(grid, str(tmp_path), workers=1)
+    point = MetricGraph(cube.sel(stat='value')).get('norm_time_us')
+    lo, hi = intervalli_campagna(cube, sketches, labels, list(grid.sizes), resamples=400)['norm_time_us']
+    assert ((lo <= point) & (point <= hi)).all()
@@ -0,0 +1,28 @@
+"""Archivio colonnare: lettura delle celle dal layout standard."""
+
+import os
+
+from campaign_store import CampaignStore, campaign_dirs, ingest_dirs, select
+from result_index import clear_index_cache
+from scenario_grid import grid_dirs, make_grid, standard_layout
+
+from conftest import TLB_EVENTS, _testo_perf, scrivi_campagna
+
+GRID = make_grid('matrix', 'single', sizes=[4, 8], n_servers=(1, 2), freqs=('LOW',))
+
+
+def test_cella_tlb_con_entrambi_i_tipi(tmp_path):
+    """Con tlb_misses_* e misses_* nella stessa cella si legge solo tlb_misses_*."""
+    scrivi_campagna(tmp_path, GRID)
+    tlb_dir = grid_dirs(GRID, standard_layout(str(tmp_path), GRID), ('tlb',))['tlb'][0]
+    for name, scale in (("misses_4.txt", 1000), ("misses_16.txt", 7)):
+        with open(os.path.join(tlb_dir, name), 'w') as f:
+            f.write(_testo_perf(TLB_EVENTS, [scale * (j + 1) for j in range(4)], 2.0))
+    clear_index_cache()
+
+    dirs = [d for d in campaign_dirs(str(tmp_path), n_servers=(1, 2)) if d[:2] == ('matrix', 'single')]
+    store = CampaignStore(ingest_dirs(dirs, 'c', workers=1), {})
+    rows = select(store, source='tlb', scenario='1S', event='dtlb_load_stlb_hit')
+    values = dict(zip(rows['size'].tolist(), rows['value'].tolist()))
+    # scrivi_campagna: 500 * size per il primo evento TLB di 1S
+    assert values == {4: 2000.0, 8: 4000.0, 16: 7.0}
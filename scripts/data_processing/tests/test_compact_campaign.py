@@ -0,0 +1,105 @@
+"""Compattazione sul posto di una campagna: i valori riletti non cambiano."""
+
+import numpy as np
+import pytest
+
+import compact_campaign
+from compact_campaign import compatta_campagna, compatta_compresso, compatta_perf_binary
+from perf_interval import load_interval_series
+from perf_parser import load_perf_stat, load_perf_variance
+from result_index import clear_index_cache
+from result_io import compress_file, read_result_bytes, zstandard
+from scenario_grid import carica_griglia, make_grid
+
+from conftest import CACHE_EVENTS, _testo_perf, scrivi_campagna
+
+INTERVAL_CSV = """# started on Mon Jan  1 00:00:00 2024
+
+0.100000,10,,mem_load_retired.l1_miss,100000,100.00,,
+0.100000,<not counted>,,mem_load_retired.l3_miss,100000,100.00,,
+0.200000,20,,mem_load_retired.l1_miss,100000,100.00,,
+0.200000,3,,mem_load_retired.l3_miss,100000,100.00,,
+"""
+
+GRID = make_grid('matrix', 'single', sizes=[4, 8], n_servers=(1, 2), freqs=('LOW',))
+
+
+def _cubo(root):
+    # Gli indici delle directory sono in cache per processo: dopo la compattazione vanno rifatti
+    clear_index_cache()
+    return carica_griglia(GRID, str(root), workers=1)
+
+
+def test_binario_conserva_varianze(tmp_path):
+    scrivi_campagna(tmp_path, GRID)
+    before = _cubo(tmp_path)
+    compatta_campagna(str(tmp_path), binary=True)
+    after = _cubo(tmp_path)
+    names = {p.name for p in tmp_path.rglob('*') if p.is_file()}
+    assert "misses_4.pstat" in names and "misses_4.txt" not in names
+    assert np.isfinite(before.sel(stat='variance', event='l1_miss').values).all()
+    np.testing.assert_array_equal(after.values, before.values)
+
+
+def _albero(root):
+    """Un file perf e una serie a intervalli; ritorna (path perf, path serie)."""
+    perf = root / "misses_4.txt"
+    perf.write_text(_testo_perf(CACHE_EVENTS, [1000 * (j + 1) for j in range(6)], 2.0))
+    interval = root / "interval_misses_4.csv"
+    interval.write_text(INTERVAL_CSV)
+    return str(perf), str(interval)
+
+
+def _unico(root, prefix):
+    paths = [p for p in root.iterdir() if p.name.startswith(prefix)]
+    assert len(paths) == 1, paths
+    return str(paths[0])
+
+
+@pytest.mark.parametrize('codec', ['gz', 'xz', 'zst'])
+def test_lettura_compressa(tmp_path, codec):
+    if codec == 'zst' and zstandard is None:
+        pytest.skip("zstandard non installato")
+    perf, _ = _albero(tmp_path)
+    compress_file(perf, f"{perf}.{codec}", codec)
+    assert read_result_bytes(f"{perf}.{codec}") == read_result_bytes(perf)
+    assert load_perf_stat(f"{perf}.{codec}") == load_perf_stat(perf)
+
+
+@pytest.mark.parametrize('binary, perf_ext, interval_ext', [
+    (False, '.txt.gz', '.csv.gz'),
+    (True, '.pstat', '.npz'),
+])
+def test_compattazione_conserva_i_valori(tmp_path, binary, perf_ext, interval_ext):
+    perf, interval = _albero(tmp_path)
+    stat, variance = load_perf_stat(perf), load_perf_variance(perf)
+    series = load_interval_series(interval)
+
+    n_files, before, after = compatta_campagna(str(tmp_path), binary=binary)
+    assert n_files == 2 and after > 0
+
+    perf_new = _unico(tmp_path, "misses_4")
+    interval_new = _unico(tmp_path, "interval_misses_4")
+    assert perf_new.endswith(perf_ext) and interval_new.endswith(interval_ext)
+    assert load_perf_stat(perf_new) == stat
+    np.testing.assert_array_equal(load_perf_variance(perf_new), variance)     # NaN degli eventi assenti
+    loaded = load_interval_series(interval_new)
+    assert loaded.events == series.events
+    np.testing.assert_array_equal(loaded.timestamps, series.timestamps)
+    np.testing.assert_array_equal(loaded.values, series.values)
+
+
+def test_verifica_fallita_lascia_l_originale(tmp_path, monkeypatch):
+    perf, _ = _albero(tmp_path)
+    original = read_result_bytes(perf)
+
+    monkeypatch.setattr(compact_campaign, 'read_result_bytes', lambda path: b'')
+    with pytest.raises(ValueError, match="verifica gz"):
+        compatta_compresso(perf, 'gz')
+
+    monkeypatch.setattr(compact_campaign, 'parse_perf_binary_stats', lambda path: ((), (), ()))
+    with pytest.raises(ValueError, match="verifica .pstat"):
+        compatta_perf_binary(perf, perf[:-len('.txt')])
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["interval_misses_4.csv", "misses_4.txt"]
+    assert read_result_bytes(perf) == original
@@ -0,0 +1,100 @@
+"""Riduzione delle serie a intervalli per la dashboard: min-max, LTTB e piramide di tile."""
+
+import numpy as np
+import pytest
+
+from dashboard import indici_lttb, indici_minmax, piramide, riduci, segmenti
+from perf_interval import IntervalSeries
+
+
+def _minmax_ingenuo(y, n_out):
+    n_buckets = n_out // 2
+    out = []
+    for j in range(n_buckets):
+        lo, hi = j * len(y) // n_buckets, (j + 1) * len(y) // n_buckets
+        pair = lo + np.argmin(y[lo:hi]), lo + np.argmax(y[lo:hi])
+        out.extend(sorted(pair))
+    return out
+
+
+def _lttb_ingenuo(x, y, n_out):
+    n, n_buckets = len(x), n_out - 2
+    edges = [1 + j * (n - 2) // n_buckets for j in range(n_buckets + 1)]
+    out = [0]
+    for j in range(n_buckets):
+        lo, hi = edges[j], edges[j + 1]
+        if j + 1 < n_buckets:
+            cx, cy = x[hi:edges[j + 2]].mean(), y[hi:edges[j + 2]].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        ax, ay = x[out[-1]], y[out[-1]]
+        area = [abs((ax - cx) * (y[i] - ay) - (ax - x[i]) * (cy - ay)) for i in range(lo, hi)]
+        out.append(lo + int(np.argmax(area)))
+    out.append(n - 1)
+    return out
+
+
+@pytest.fixture
+def serie():
+    rng = np.random.default_rng(0)
+    x = np.cumsum(rng.uniform(0.05, 0.15, 5000))
+    y = np.stack([np.sin(x) + rng.normal(0, 0.1, len(x)), rng.lognormal(0, 1, len(x))], axis=1)
+    y[1234, 1] = 1e6                                    # picco isolato
+    return x, y
+
+
+def test_segmenti_contigui():
+    starts, stops = segmenti(10, 3)
+    assert starts.tolist() == [0, 3, 6] and stops.tolist() == [3, 6, 10]
+
+
+def test_minmax_come_il_riferimento_e_tiene_i_picchi(serie):
+    x, y = serie
+    starts, stops = segmenti(len(x), 4)
+    idx = indici_minmax(y, starts, stops, 100)
+    assert idx.shape == (4, 100, 2)
+    for s, (start, stop) in enumerate(zip(starts, stops)):
+        for e in range(y.shape[1]):
+            expected = _minmax_ingenuo(y[start:stop, e], 100)
+            assert (idx[s, :, e] - start).tolist() == expected
+    assert 1234 in idx[..., 1]
+
+
+def test_minmax_ignora_i_nan():
+    y = np.array([[np.nan], [3.0], [np.nan], [1.0], [np.nan], [np.nan], [np.nan], [np.nan]])
+    idx = indici_minmax(y, np.array([0]), np.array([8]), 4)
+    assert idx[0, :, 0].tolist() == [1, 3, 4, 4]
+
+
+def test_lttb_come_il_riferimento(serie):
+    x, y = serie
+    starts, stops = segmenti(len(x), 3)
+    idx = indici_lttb(x, y, starts, stops, 60)
+    assert idx.shape == (3, 60, 2)
+    for s, (start, stop) in enumerate(zip(starts, stops)):
+        for e in range(y.shape[1]):
+            expected = _lttb_ingenuo(x[start:stop], y[start:stop, e], 60)
+            assert (idx[s, :, e] - start).tolist() == expected
+    assert (np.diff(idx, axis=1) > 0).all()
+
+
+def test_riduci(serie):
+    x, y = serie
+    starts, stops = segmenti(len(x), 2)
+    assert riduci(x, y, starts, stops, 5000) is None
+    assert riduci(x, y, starts, stops, 100, 'lttb').shape == (2, 100, 2)
+    with pytest.raises(ValueError):
+        riduci(x, y, starts, stops, 100, 'media')
+
+
+def test_piramide(tmp_path, serie):
+    x, y = serie
+    meta = piramide(IntervalSeries(x, y, ['l1_miss', 'l3_miss']), 's0', str(tmp_path),
+                    punti=1000, fanout=4, livelli=3)
+    # 5000 campioni: panoramica ridotta, poi 4 tile ridotti, poi 16 tile grezzi e stop
+    assert len(meta['confini']) == 3
+    assert len(meta['panoramica']['t'][0]) == 1000
+    tiles = sorted(p.name for p in tmp_path.iterdir())
+    assert len(tiles) == 4 + 16 and "s0_2_15.js" in tiles
+    assert '"tc":' in (tmp_path / "s0_2_0.js").read_text()
+    assert meta['confini'][1][0] == round(x[0], 6) and meta['confini'][1][-1] == round(x[-1], 6)
@@ -0,0 +1,68 @@
+"""DataCube: selezione per etichetta, reindex con NaN e cubo costruito dalle colonne."""
+
+import numpy as np
+import pytest
+
+from data_cube import DataCube, cube_from_columns
+
+SCENARI = ['1S', '2S_LOW', '3S_LOW']
+SIZES = [4, 8]
+EVENTS = ['l1_miss', 'l2_miss', 'l3_miss']
+
+
+def _cubo():
+    values = np.arange(len(SCENARI) * len(SIZES) * len(EVENTS), dtype=np.float64)
+    return DataCube(values.reshape(len(SCENARI), len(SIZES), len(EVENTS)), ('scenario', 'size', 'event'),
+                    {'scenario': SCENARI, 'size': SIZES, 'event': EVENTS})
+
+
+def test_sel_scalari_e_liste_nell_ordine_richiesto():
+    cube = _cubo()
+    sub = cube.sel(scenario=['3S_LOW', '1S'], event='l2_miss')
+    assert sub.axes == ('scenario', 'size')
+    assert sub.labels('scenario') == ['3S_LOW', '1S']
+    np.testing.assert_array_equal(sub.values, cube.values[[2, 0], :, 1])
+    assert sub.values.flags['C_CONTIGUOUS']
+
+    assert cube.sel(scenario='2S_LOW', size=8, event='l3_miss').values == cube.values[1, 1, 2]
+    assert cube.sel(event=['l3_miss', 'l1_miss']).labels('event') == ['l3_miss', 'l1_miss']
+
+
+def test_sel_errori():
+    cube = _cubo()
+    with pytest.raises(ValueError, match="assente"):
+        cube.sel(scenario=['4S_LOW'])
+    with pytest.raises(ValueError, match="assi sconosciuti"):
+        cube.sel(server='matrix')
+    with pytest.raises(ValueError, match="incompatibile"):
+        DataCube(np.zeros((2, 2)), ('scenario', 'size'), {'scenario': SCENARI, 'size': SIZES})
+
+
+def test_reindex_nan_per_le_celle_mancanti():
+    cube = _cubo()
+    out = cube.reindex(scenario=['1S', '4S_LOW', '3S_LOW'], size=[8, 16])
+    assert out.shape == (3, 2, 3)
+    assert out.labels('scenario') == ['1S', '4S_LOW', '3S_LOW'] and out.labels('size') == [8, 16]
+    np.testing.assert_array_equal(out.values[0, 0], cube.values[0, 1])
+    np.testing.assert_array_equal(out.values[2, 0], cube.values[2, 1])
+    assert np.isnan(out.values[1]).all() and np.isnan(out.values[:, 1]).all()
+
+
+def test_cubo_dalle_colonne():
+    columns = {
+        'campaign': np.array(['c', 'c', 'c']),
+        'server': np.array(['matrix'] * 3),
+        'core_mode': np.array(['single'] * 3),
+        'scenario': np.array(['1S', '2S_LOW', '1S']),
+        'size': np.array([4, 4, 8]),
+        'source': np.array(['cache', 'cache', 'tlb']),
+        'event': np.array(['l1_miss', 'l1_miss', 'elapsed']),
+        'value': np.array([10.0, 20.0, 2.0]),
+        'variance': np.array([1.0, np.nan, 0.5]),
+    }
+    cube = cube_from_columns(columns).sel(server='matrix', core_mode='single')
+    assert cube.labels('event') == ['l1_miss', 'tlb_elapsed']
+    assert cube.sel(scenario='2S_LOW', size=4, event='l1_miss', stat='value').values == 20.0
+    assert cube.sel(scenario='1S', size=8, event='tlb_elapsed', stat='variance').values == 0.5
+    # (2S_LOW, 8) non è mai stata misurata
+    assert np.isnan(cube.sel(scenario='2S_LOW', size=8).values).all()
@@ -0,0 +1,120 @@
+"""Impronte e manifest di figure_batch: quali figure si rigenerano e quali si saltano."""
+
+import os
+import sys
+import textwrap
+
+import numpy as np
+import pytest
+
+import figure_batch
+from figure_batch import (FigureTask, _chiusura_moduli, _code_sources, carica_script, code_fingerprint,
+                          impagina, render_figures, task_fingerprint)
+
+RENDERER = textwrap.dedent('''
+    import matplotlib.pyplot as plt
+
+    from figure_batch import salva_figura
+
+    LARGHEZZA = 0.8
+
+    def disegna(values, out_file):
+        fig, ax = plt.subplots()
+        ax.bar(range(len(values)), values, width=LARGHEZZA)
+        salva_figura(out_file)
+''')
+
+SCRIPT = textwrap.dedent('''
+    import os
+
+    from renderer_prova import disegna
+
+    def plot_prova(values, output_dir):
+        disegna(values, os.path.join(output_dir, "prova.png"))
+''')
+
+
+@pytest.fixture
+def campagna(tmp_path, monkeypatch):
+    """Un modulo condiviso (renderer_prova.py) in una _SHARED_DIR temporanea e uno script che lo usa."""
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    (shared / "renderer_prova.py").write_text(RENDERER)
+    script = tmp_path / "script" / "plot_prova.py"
+    script.parent.mkdir()
+    script.write_text(SCRIPT)
+    out = tmp_path / "out"
+    out.mkdir()
+
+    monkeypatch.setattr(figure_batch, '_SHARED_DIR', str(shared))
+    monkeypatch.syspath_prepend(str(shared))
+    module = carica_script(str(script))
+    yield module, shared / "renderer_prova.py", str(out), str(tmp_path / "manifest.json")
+    for name in ('renderer_prova', module.__name__):
+        sys.modules.pop(name, None)
+
+
+def _render(tasks, manifest, quality='preview'):
+    return render_figures(tasks, batch=True, workers=1, force=False, manifest_path=manifest, quality=quality)
+
+
+def test_figura_aggiornata_saltata(campagna):
+    module, _, out, manifest = campagna
+    tasks = [FigureTask('prova', module.plot_prova, (np.arange(3.0), out))]
+    assert [name for name, _ in _render(tasks, manifest)] == ['prova']
+    assert _render(tasks, manifest) == []
+
+
+def test_modifica_del_renderer_condiviso_rigenera(campagna):
+    module, renderer, out, manifest = campagna
+    tasks = [FigureTask('prova', module.plot_prova, (np.arange(3.0), out))]
+    _render(tasks, manifest)
+    renderer.write_text(RENDERER.replace("LARGHEZZA = 0.8", "LARGHEZZA = 0.5"))
+    assert [name for name, _ in _render(tasks, manifest)] == ['prova']
+    assert _render(tasks, manifest) == []
+
+
+def test_dati_qualita_e_file_mancanti_rigenerano(campagna):
+    module, _, out, manifest = campagna
+    tasks = [FigureTask('prova', module.plot_prova, (np.arange(3.0), out))]
+    _render(tasks, manifest)
+    changed = [FigureTask('prova', module.plot_prova, (np.arange(4.0), out))]
+    assert len(_render(changed, manifest)) == 1
+    assert len(_render(changed, manifest, quality='final')) == 1
+    os.remove(os.path.join(out, "prova.svg"))
+    assert len(_render(changed, manifest, quality='final')) == 1
+
+
+def test_impronta_stabile_e_dipendente_dagli_argomenti(campagna):
+    module, _, out, _ = campagna
+    task = FigureTask('prova', module.plot_prova, (np.arange(3.0), out))
+    assert code_fingerprint(module.plot_prova) == code_fingerprint(module.plot_prova)
+    assert task_fingerprint(task, 'preview') != task_fingerprint(task, 'final')
+    other = FigureTask('prova', module.plot_prova, (np.arange(3.0) + 1, out))
+    assert task_fingerprint(task) != task_fingerprint(other)
+
+
+def test_script_reali_dipendono_dai_moduli_condivisi():
+    path = os.path.join(os.path.dirname(figure_batch.__file__), '..', '..',
+                        'webserver_analysis', 'matrix_server', 'plot_all.py')
+    module = carica_script(path)
+    shared = set()
+    _code_sources(module.plot_cache_misses, set(), shared)
+    assert {'grouped_bars', 'figure_batch'} <= set(_chiusura_moduli(shared))
+
+
+@pytest.mark.parametrize('quality, n_axes, ricalcolato', [
+    ('final', 1, True),
+    ('preview', 1, False),
+    ('preview', 3, True),
+])
+def test_impagina_in_preview_solo_a_piu_pannelli(monkeypatch, quality, n_axes, ricalcolato):
+    import matplotlib.pyplot as plt
+    monkeypatch.setattr(figure_batch, '_QUALITY', quality)
+    fig, axes = plt.subplots(n_axes, 1, squeeze=False)
+    for ax in axes[:, 0]:
+        ax.set_title("titolo")
+    before = (fig.subplotpars.top, fig.subplotpars.hspace)
+    impagina()
+    assert ((fig.subplotpars.top, fig.subplotpars.hspace) != before) == ricalcolato
+    plt.close(fig)
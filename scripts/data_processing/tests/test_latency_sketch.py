@@ -0,0 +1,104 @@
+"""Sketch delle latenze: quantili, merge, salvataggio e lettura dai log di send_request."""
+
+import numpy as np
+import pytest
+
+from latency_sketch import (KllSketch, LatencyHistogram, feed_request_log, load_latency_sketch, load_sketch,
+                            make_sketch, merge_sketches, parse_histogram_line, save_sketch)
+
+QS = [0.5, 0.9, 0.99, 0.999]
+
+
+@pytest.fixture
+def latenze():
+    return np.random.default_rng(0).lognormal(mean=7.0, sigma=0.6, size=20000)
+
+
+def _log_richieste(path, latency_us):
+    lines = []
+    start = 0.0
+    for i, lat in enumerate(latency_us):
+        lines.append(f"Iter {i}: Execution time: {lat:.0f} microseconds "
+                     f"(start {start:.0f} us, end {start + lat:.0f} us)\n")
+        start += lat
+    path.write_text(''.join(lines))
+    return path
+
+
+def test_istogramma_errore_relativo(latenze):
+    hist = LatencyHistogram().update(latenze)
+    exact = np.quantile(latenze, QS, method='inverted_cdf')
+    assert hist.count == len(latenze)
+    np.testing.assert_allclose(hist.quantile(QS), exact, rtol=0.003)
+    assert hist.mean() == pytest.approx(latenze.mean())
+
+
+def test_istogramma_ignora_nan_e_vuoto():
+    hist = LatencyHistogram()
+    assert np.isnan(hist.quantile(0.5))
+    hist.update([np.nan, 100.0, np.nan])
+    assert hist.count == 1
+
+
+def test_kll_errore_di_rango(latenze):
+    sketch = KllSketch(seed=1).update(latenze)
+    assert sketch.count == len(latenze)
+    ranks = np.searchsorted(np.sort(latenze), sketch.quantile(QS)) / len(latenze)
+    np.testing.assert_allclose(ranks, QS, atol=0.02)
+    assert sketch.quantile(0.0) == latenze.min()
+    assert sketch.quantile(1.0) == latenze.max()
+
+
+@pytest.mark.parametrize('kind', ['hdr', 'kll'])
+def test_merge_equivale_a_un_solo_sketch(latenze, kind):
+    parts = [make_sketch(kind).update(block) for block in np.array_split(latenze, 4)]
+    merged = merge_sketches(parts)
+    assert merged.count == len(latenze)
+    whole = make_sketch(kind).update(latenze)
+    if kind == 'hdr':
+        np.testing.assert_array_equal(merged.counts, whole.counts)
+    else:
+        ranks = np.searchsorted(np.sort(latenze), merged.quantile(QS)) / len(latenze)
+        np.testing.assert_allclose(ranks, QS, atol=0.02)
+
+
+@pytest.mark.parametrize('kind', ['hdr', 'kll'])
+def test_salvataggio(tmp_path, latenze, kind):
+    sketch = make_sketch(kind).update(latenze)
+    save_sketch(sketch, tmp_path / "sketch.npz")
+    loaded = load_sketch(tmp_path / "sketch.npz")
+    assert loaded.count == sketch.count
+    np.testing.assert_array_equal(loaded.quantile(QS), sketch.quantile(QS))
+
+
+def test_riga_histogram_del_client(latenze):
+    hist = LatencyHistogram().update(latenze)
+    parsed = parse_histogram_line(hist.encode())
+    np.testing.assert_array_equal(parsed.counts, hist.counts)
+    assert parse_histogram_line("Iter 1: Execution time: 5 microseconds") is None
+
+
+def test_log_per_richiesta(tmp_path, latenze):
+    path = _log_richieste(tmp_path / "execution_time_matrix_1.txt", latenze[:500])
+    hist = load_latency_sketch(str(path))
+    assert hist.count == 500
+
+
+def test_merge_ripetuti_di_log_solo_istogramma(tmp_path, latenze):
+    """Ogni log con la sola riga 'Latency histogram' va sommato, anche in uno sketch già pieno."""
+    path = tmp_path / "execution_time_matrix_1.txt"
+    path.write_text("Starting\n" + LatencyHistogram().update(latenze[:1000]).encode() + "\n")
+    for kind in ('hdr', 'kll'):
+        sketch = make_sketch(kind)
+        feed_request_log(str(path), sketch)
+        feed_request_log(str(path), sketch)
+        assert sketch.count == 2000
+
+
+def test_righe_per_richiesta_prevalgono_sull_istogramma(tmp_path, latenze):
+    path = _log_richieste(tmp_path / "execution_time_matrix_1.txt", latenze[:300])
+    with open(path, 'a') as f:
+        f.write(LatencyHistogram().update(latenze[:300]).encode() + "\n")
+    sketch = feed_request_log(str(path), LatencyHistogram())
+    feed_request_log(str(path), sketch)
+    assert sketch.count == 600
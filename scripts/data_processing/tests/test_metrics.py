@@ -0,0 +1,87 @@
+"""Normalizzazione, miss rate e grafo lazy delle metriche derivate."""
+
+import numpy as np
+import pytest
+
+from data_cube import DataCube
+from metrics import MetricGraph, miss_rate, miss_rate_cubo, normalizza_baseline, normalizza_cubo, rapporto
+
+SCENARI = ['1S', '2S_LOW', '3S_LOW']
+SIZES = [4, 8]
+
+
+def test_rapporto_nan_per_denominatori_nulli():
+    out = rapporto([[1.0, 2.0, np.nan]], [2.0, 0.0, 1.0])
+    assert out.shape == (1, 3) and out[0, 0] == 0.5
+    assert np.isnan(out[0, 1]) and np.isnan(out[0, 2])
+    assert np.isnan(rapporto(1.0, np.nan))
+
+
+def test_normalizza_baseline_su_un_asse_qualsiasi():
+    values = np.array([[2.0, 4.0], [3.0, 8.0], [0.0, 2.0]])     # scenario x size
+    np.testing.assert_array_equal(normalizza_baseline(values, SCENARI), [[1, 1], [1.5, 2], [0, 0.5]])
+    np.testing.assert_array_equal(normalizza_baseline(values.T, SCENARI, axis=1), [[1, 1.5, 0], [1, 2, 0.5]])
+    out = normalizza_baseline(values, SCENARI, baseline='3S_LOW')
+    assert np.isnan(out[:, 0]).all() and out[1, 1] == 4.0
+    with pytest.raises(ValueError, match="4S_LOW"):
+        normalizza_baseline(values, SCENARI, baseline='4S_LOW')
+
+
+def test_miss_rate():
+    np.testing.assert_array_equal(miss_rate([1.0, 3.0], [3.0, 1.0]), [25.0, 75.0])
+    assert np.isnan(miss_rate(0.0, 0.0))
+
+
+def test_operazioni_sui_cubi():
+    events = ['l1_miss', 'l2_miss', 'l1_hit', 'l2_hit']
+    values = np.empty((len(SCENARI), len(SIZES), len(events)))
+    values[..., :2] = np.arange(1, len(SCENARI) + 1)[:, None, None]    # miss: 1, 2, 3
+    values[..., 2:] = 3.0                                               # hit
+    cube = DataCube(values, ('scenario', 'size', 'event'), {'scenario': SCENARI, 'size': SIZES, 'event': events})
+
+    norm = normalizza_cubo(cube)
+    assert norm.axes == cube.axes and norm.labels('scenario') == SCENARI
+    np.testing.assert_array_equal(norm.sel(event='l1_miss').values, [[1, 1], [2, 2], [3, 3]])
+
+    rate = miss_rate_cubo(cube, levels=('l1', 'l2'))
+    assert rate.labels('event') == ['l1', 'l2']
+    np.testing.assert_array_equal(rate.sel(scenario='1S').values, np.full((2, 2), 25.0))
+    np.testing.assert_array_equal(rate.sel(scenario='3S_LOW').values, np.full((2, 2), 50.0))
+
+
+def _grafo(throughput_rps):
+    events = ['l1_miss', 'l2_miss', 'l3_miss', 'l1_hit', 'l2_hit', 'l3_hit', 'avg_time_us', 'latency_mean_us',
+              'n_requests', 'throughput_rps']
+    values = np.ones((len(SCENARI), len(SIZES), len(events)))
+    values[..., :3] = np.arange(1, len(SCENARI) + 1)[:, None, None]
+    values[..., 7] = 1000.0 * np.arange(1, len(SCENARI) + 1)[:, None]     # 1, 2, 3 ms
+    values[..., 8] = 100.0
+    values[..., 9] = throughput_rps
+    cube = DataCube(values, ('scenario', 'size', 'event'), {'scenario': SCENARI, 'size': SIZES, 'event': events})
+    return MetricGraph(cube)
+
+
+def test_grafo_lazy_e_memorizzato():
+    graph = _grafo(throughput_rps=500.0)
+    assert graph.computed == []
+    norm = graph['norm_miss_rate']
+    assert graph.computed == ['hits', 'miss_rate', 'misses', 'norm_miss_rate']
+    assert graph.get('norm_miss_rate') is norm and graph.get('misses') is graph['misses']
+    assert not norm.flags.writeable
+    np.testing.assert_allclose(norm[:, 0, 0], [1.0, 100 * 2 / 3 / 50, 75 / 50])
+    with pytest.raises(KeyError, match="sconosciuta"):
+        graph.get('norm_pippo')
+    with pytest.raises(ValueError, match="assi"):
+        MetricGraph(DataCube(np.zeros((1, 1)), ('scenario', 'size'), {'scenario': ['1S'], 'size': [4]}))
+
+
+def test_throughput_misurato_o_stimato(capsys):
+    measured = _grafo(throughput_rps=500.0)
+    assert (measured['throughput'] == 500.0).all()
+    assert "ATTENZIONE" not in capsys.readouterr().out
+
+    # Log senza timestamp: richieste / tempo medio, con un avviso
+    estimated = _grafo(throughput_rps=np.nan)
+    np.testing.assert_allclose(estimated['throughput'][:, 0], [1e5, 5e4, 1e5 / 3])
+    assert "6 celle senza timestamp" in capsys.readouterr().out
+    np.testing.assert_allclose(estimated['degradation'][:, 0], [1.0, 2.0, 3.0])
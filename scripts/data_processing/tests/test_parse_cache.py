@@ -0,0 +1,110 @@
+"""Cache SQLite dei parsing: hit, invalidazione per mtime / dimensione / PARSER_VERSION, LRU."""
+
+import os
+
+import pytest
+
+import parse_cache
+from parse_cache import cache_stats, cached, load_perf_stat_cached
+
+CSV = "1000003,,mem_load_retired.l1_miss,,,,,\n"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    parse_cache.configure(str(tmp_path / "cache.sqlite"), max_mb=64)
+    yield tmp_path
+    parse_cache.configure('off')
+
+
+@pytest.fixture
+def contatore():
+    """parse che conta le chiamate: un hit della cache non lo chiama."""
+    calls = []
+
+    def parse(path):
+        calls.append(path)
+        with open(path, 'rb') as f:
+            return f.read()
+    return parse, calls
+
+
+def _cached(parse, path, kind='raw'):
+    return cached(kind, parse, lambda data: data, bytes, str(path))
+
+
+def test_hit_e_invalidazione_per_mtime(cache, contatore):
+    parse, calls = contatore
+    path = cache / "misses_4.csv"
+    path.write_text(CSV)
+    assert _cached(parse, path) == _cached(parse, path) == CSV.encode()
+    assert len(calls) == 1
+
+    # Stessa dimensione, mtime diverso: si rilegge
+    path.write_text(CSV.replace("1000003", "2000003"))
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert _cached(parse, path).startswith(b"2000003")
+    assert len(calls) == 2
+
+
+def test_invalidazione_per_dimensione(cache, contatore):
+    parse, calls = contatore
+    path = cache / "misses_4.csv"
+    path.write_text(CSV)
+    _cached(parse, path)
+    st = os.stat(path)
+    path.write_text(CSV + CSV)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert _cached(parse, path) == (CSV + CSV).encode()
+    assert len(calls) == 2
+
+
+def test_invalidazione_per_versione_del_parser(cache, contatore, monkeypatch):
+    parse, calls = contatore
+    path = cache / "misses_4.csv"
+    path.write_text(CSV)
+    _cached(parse, path)
+    monkeypatch.setattr(parse_cache, 'PARSER_VERSION', parse_cache.PARSER_VERSION + 1)
+    _cached(parse, path)
+    _cached(parse, path)
+    assert len(calls) == 2
+
+
+def test_voci_separate_per_tipo_e_sopravvivono_alla_chiusura(cache, contatore):
+    parse, calls = contatore
+    path = cache / "misses_4.csv"
+    path.write_text(CSV)
+    _cached(parse, path, 'a')
+    _cached(parse, path, 'b')
+    parse_cache.close()
+    _cached(parse, path, 'a')
+    assert len(calls) == 2
+    hits_before = cache_stats()[0]
+    assert load_perf_stat_cached(str(path)).l1_miss == load_perf_stat_cached(str(path)).l1_miss == 1000003
+    assert cache_stats()[0] == hits_before + 1
+
+
+def test_lru_elimina_le_voci_meno_recenti(cache, contatore):
+    parse, calls = contatore
+    parse_cache.configure(str(cache / "cache.sqlite"), max_mb=2500 / 2**20)
+    paths = []
+    for i in range(3):
+        paths.append(cache / f"misses_{i}.csv")
+        paths[-1].write_bytes(b"x" * 1000)
+        _cached(parse, paths[-1])
+        parse_cache.flush()
+    # Entrano due voci da ~1000 byte: la prima è stata eliminata
+    _cached(parse, paths[2])
+    _cached(parse, paths[0])
+    assert len(calls) == 4
+
+
+def test_disabilitata(tmp_path, contatore):
+    parse, calls = contatore
+    parse_cache.configure('off')
+    path = tmp_path / "misses_4.csv"
+    path.write_text(CSV)
+    _cached(parse, path)
+    _cached(parse, path)
+    assert len(calls) == 2
@@ -0,0 +1,65 @@
+"""Lettore nativo di perf.data sui file di esempio in fixtures/ (generati da make_perf_data_fixtures.py)."""
+
+import os
+
+import pytest
+
+from conftest import FIXTURES
+from perf_data import (PERF_SAMPLE_CALLCHAIN, PERF_SAMPLE_IDENTIFIER, PerfDataError, SampleRecord,
+                       iter_perf_records, iter_samples, iter_switches, read_perf_attrs)
+
+SINGLE = os.path.join(FIXTURES, 'perf_single.data')
+MULTI = os.path.join(FIXTURES, 'perf_multi.data')
+
+
+@pytest.mark.parametrize('path, samples, switches, switch_out', [
+    (SINGLE, 6, 6, 3),
+    (MULTI, 8, 4, 2),
+])
+def test_conteggi_sample_e_context_switch(path, samples, switches, switch_out):
+    sample_list = list(iter_samples(path))
+    switch_list = list(iter_switches(path))
+    assert len(sample_list) == samples
+    assert len(switch_list) == switches
+    assert sum(s.out for s in switch_list) == switch_out
+    assert all(r.time is not None and r.cpu is not None for r in sample_list + switch_list)
+    records = list(iter_perf_records(path))
+    assert sum(isinstance(r, SampleRecord) for r in records) == samples
+    assert len(records) == samples + switches
+
+
+def test_evento_singolo_con_callchain():
+    samples = list(iter_samples(SINGLE))
+    assert [len(s.callchain) for s in samples] == [1, 2, 3, 1, 2, 3]
+    assert tuple(samples[2].callchain) == (0xffffffff81000002, 0x401002, 0x402002)
+    switches = list(iter_switches(SINGLE))
+    assert switches[0].time == 1005 and switches[0].next_prev_pid is None
+    assert [s.cpu for s in switches] == [0, 1, 0, 1, 0, 1]
+
+
+def test_piu_eventi_con_identifier():
+    samples = list(iter_samples(MULTI))
+    assert [s.id for s in samples[:4]] == [201, 301, 202, 302]
+    assert samples[3].weight == 33 and samples[3].data_src == 0x68100142
+    switches = list(iter_switches(MULTI))
+    assert switches[0].preempt and not switches[2].out
+    assert switches[3].next_prev_pid == 3003
+
+
+def test_attr():
+    (single,) = read_perf_attrs(SINGLE)
+    assert single.config == 0x1d1 and single.ids == (101,)
+    assert single.sample_type & PERF_SAMPLE_CALLCHAIN
+    multi = read_perf_attrs(MULTI)
+    assert [a.config for a in multi] == [0x08d1, 0x20d1]
+    assert [a.ids for a in multi] == [(201, 202), (301, 302)]
+    assert all(a.sample_type & PERF_SAMPLE_IDENTIFIER for a in multi)
+
+
+def test_file_non_perf(tmp_path):
+    path = tmp_path / "perf.data"
+    path.write_bytes(b'NOTPERF!' + bytes(200))
+    with pytest.raises(PerfDataError):
+        read_perf_attrs(str(path))
+    with pytest.raises(PerfDataError):
+        list(iter_samples(str(path)))
@@ -0,0 +1,80 @@
+"""Serie `perf stat -I`: lettura a blocchi, .npz ed elenco per griglia (carica_intervalli)."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import perf_interval
+from perf_interval import load_interval_series, save_interval_npz, series_column
+from perf_parser import PerfFormatError
+from scenario_grid import carica_intervalli, make_grid, standard_layout
+
+EVENTS = ('mem_load_retired.l1_miss', 'mem_load_retired.l3_miss')
+
+
+def _scrivi_serie(path, n, scale=1.0):
+    lines = ["# started on Mon Jan  1 00:00:00 2024\n", "\n"]
+    for i in range(n):
+        ts = 0.1 * (i + 1)
+        lines.append(f"{ts:.6f},{scale * 10 * i:.0f},,{EVENTS[0]},100000,100.00,,\n")
+        value = "<not counted>" if i == 2 else f"{scale * i:.0f}"
+        lines.append(f"{ts:.6f},{value},,{EVENTS[1]},100000,100.00,,\n")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(''.join(lines))
+    return path
+
+
+def test_blocchi_e_not_counted(tmp_path):
+    path = _scrivi_serie(tmp_path / "interval_misses_4.csv", 10)
+    series = load_interval_series(str(path), chunk_intervals=3)
+    assert series.events == ['l1_miss', 'l3_miss']
+    np.testing.assert_allclose(series.timestamps, 0.1 * np.arange(1, 11))
+    np.testing.assert_array_equal(series_column(series, 'l1_miss'), 10.0 * np.arange(10))
+    l3 = series_column(series, 'l3_miss')
+    assert np.isnan(l3[2]) and l3[3] == 3.0
+
+
+def test_eventi_richiesti_e_npz(tmp_path):
+    path = _scrivi_serie(tmp_path / "interval_misses_4.csv", 5)
+    series = load_interval_series(str(path), events=[EVENTS[1]])
+    assert series.values.shape == (5, 1) and series.events == ['l3_miss']
+    npz = tmp_path / "interval_misses_4.npz"
+    save_interval_npz(str(npz), load_interval_series(str(path)))
+    loaded = load_interval_series(str(npz), events=[EVENTS[1]])
+    np.testing.assert_array_equal(loaded.values, series.values)
+
+
+def test_eventi_sconosciuti_prima_della_lettura(tmp_path, monkeypatch):
+    path = _scrivi_serie(tmp_path / "interval_misses_4.csv", 3)
+    npz = tmp_path / "interval_misses_4.npz"
+    save_interval_npz(str(npz), load_interval_series(str(path), events=[EVENTS[0]]))
+
+    monkeypatch.setattr(perf_interval, 'iter_interval_chunks', None)     # il file non va letto
+    with pytest.raises(PerfFormatError, match="mem_load_retired.l4_miss"):
+        load_interval_series(str(path), events=[EVENTS[0], 'mem_load_retired.l4_miss'])
+    with pytest.raises(PerfFormatError, match="mem_load_retired.l4_miss"):
+        load_interval_series(str(npz), events=['mem_load_retired.l4_miss'])
+    with pytest.raises(PerfFormatError, match="assenti"):
+        load_interval_series(str(npz), events=[EVENTS[1]])
+
+
+def test_riga_non_valida(tmp_path):
+    path = tmp_path / "interval_misses_4.csv"
+    path.write_text(f"0.1,abc,,{EVENTS[0]},1,100.00,,\n")
+    with pytest.raises(PerfFormatError):
+        load_interval_series(str(path))
+
+
+def test_carica_intervalli_dalla_griglia(tmp_path):
+    grid = make_grid('matrix', 'single', sizes=[4, 8], n_servers=(1, 2), freqs=('LOW',))
+    layout = standard_layout(str(tmp_path), grid)
+    one = Path(layout['cache'].format(n=1))
+    two = Path(layout['cache'].format(n=2))
+    _scrivi_serie(one / "interval_misses_4.csv", 3)
+    _scrivi_serie(two / "interval_misses_4_LOWHz.csv", 6, scale=2.0)
+    _scrivi_serie(two / "interval_misses_16_LOWHz.csv", 2)    # size fuori griglia
+    data = carica_intervalli(grid, str(tmp_path), workers=1)
+    assert sorted(data) == [('cache', '1S', 4), ('cache', '2S_LOW', 4)]
+    assert len(data['cache', '2S_LOW', 4].timestamps) == 6
+    assert series_column(data['cache', '2S_LOW', 4], 'l1_miss')[1] == 20.0
@@ -0,0 +1,195 @@
+"""Parser condiviso di `perf stat`: formato testo, CSV / JSON e lettura dei file."""
+
+import gzip
+import json
+import math
+import struct
+import tarfile
+
+import numpy as np
+import pytest
+
+from perf_parser import (PerfFormatError, PerfStat, load_perf_multiplex, load_perf_stat, load_perf_variance,
+                         parse_count, parse_decimal, parse_perf_binary, parse_perf_binary_stats, parse_perf_csv_lines,
+                         parse_perf_json_lines, parse_perf_lines, parse_perf_multiplex_lines, parse_perf_stat,
+                         tlb_levels, tlb_levels_variance, write_perf_binary)
+
+CSV = """# started on Mon Jan  1 00:00:00 2024
+
+1000003,,mem_load_retired.l1_miss,1.23%,2000123456,100.00,,
+<not counted>,,mem_load_retired.l2_miss,,0,0.00,,
+2500,,MEM_LOAD_RETIRED.L3_MISS,4.02%,2000123456,100.00,,
+7,,context-switches,3.00%,2000123456,100.00,,
+"""
+
+
+def _json_lines():
+    rows = [{'counter-value': '1000003.000000', 'event': 'mem_load_retired.l1_miss'},
+            {'counter-value': '<not counted>', 'event': 'mem_load_retired.l2_miss'},
+            {'counter-value': '2500', 'event': 'MEM_LOAD_RETIRED.L3_MISS'}]
+    return [json.dumps(row) for row in rows]
+
+
+@pytest.mark.parametrize('token, value', [
+    ("1234567", 1234567.0),
+    ("1.234.567", 1234567.0),      # italiano
+    ("1,234,567", 1234567.0),      # inglese
+    ("1.234", 1234.0),             # un contatore è intero: il separatore è di migliaia
+    ("1,234", 1234.0),
+    ("1.234.567,0", 1234567.0),    # entrambi: l'ultimo è decimale
+    ("1,234,567.0", 1234567.0),
+])
+def test_parse_count_separatori(token, value):
+    assert parse_count(token) == value
+
+
+@pytest.mark.parametrize('token, value', [
+    ("2,00123", 2.00123),          # italiano: la virgola è decimale
+    ("2.00123", 2.00123),          # inglese
+    ("1.234,56", 1234.56),
+    ("1,234.56", 1234.56),
+    ("1.234.567", 1234567.0),
+    ("42", 42.0),
+])
+def test_parse_decimal_separatori(token, value):
+    assert parse_decimal(token) == pytest.approx(value)
+
+
+def test_righe_di_testo_nei_due_locale():
+    italiano = ["       1.234.567      mem_load_retired.l1_miss      ( +-  1,23% )",
+                "           2,00123 +- 0,00012 seconds time elapsed  ( +-  0,01% )"]
+    inglese = ["       1,234,567      mem_load_retired.l1_miss      ( +-  1.23% )",
+               "           2.00123 +- 0.00012 seconds time elapsed  ( +-  0.01% )"]
+    for lines in (italiano, inglese):
+        stat = parse_perf_lines(lines)
+        assert stat.l1_miss == 1234567.0
+        assert stat.elapsed == pytest.approx(2.00123)
+
+
+def test_not_counted_nan_in_tutti_i_formati():
+    text = ["       1.000.003      mem_load_retired.l1_miss      ( +-  1,23% )",
+            "     <not counted>      mem_load_retired.l2_miss                                (0,00%)",
+            "   <not supported>      mem_load_retired.l3_miss"]
+    stat = parse_perf_lines(text)
+    assert stat.l1_miss == 1000003.0
+    assert math.isnan(stat.l2_miss) and math.isnan(stat.l3_miss)
+    assert stat.l1_hit == 0.0                      # assente, non '<not counted>'
+    assert parse_perf_multiplex_lines(text).l2_miss == 0.0
+    csv = parse_perf_csv_lines(CSV.splitlines())
+    json_stat = parse_perf_json_lines(_json_lines())
+    assert math.isnan(csv.l2_miss) and math.isnan(json_stat.l2_miss)
+
+
+def test_csv():
+    stat = parse_perf_csv_lines(CSV.splitlines())
+    assert stat.l1_miss == 1000003 and stat.l3_miss == 2500 and stat.context_switches == 7
+    assert math.isnan(stat.l2_miss)
+    assert stat.l1_hit == 0.0
+
+
+def test_csv_separatore_e_fine_riga_windows():
+    text = CSV.replace(',', ';').replace('\n', '\r\n')
+    stat = parse_perf_csv_lines(text.splitlines(keepends=True), sep=';')
+    assert stat.l3_miss == 2500
+
+
+@pytest.mark.parametrize('line, message', [
+    ("1000003,", "attesi almeno 3 campi"),
+    ("12a,,mem_load_retired.l1_miss,,", "valore non numerico"),
+])
+def test_csv_malformato(line, message):
+    with pytest.raises(PerfFormatError, match=rf"misses_4.csv:3: {message}"):
+        parse_perf_csv_lines(["# commento", "", line], "misses_4.csv")
+
+
+def test_json():
+    stat = parse_perf_json_lines([""] + _json_lines())
+    assert stat.l1_miss == 1000003 and stat.l3_miss == 2500
+    assert math.isnan(stat.l2_miss)
+
+
+@pytest.mark.parametrize('line', ["{non json", '{"event": "mem_load_retired.l1_miss"}', "[1, 2]",
+                                  '{"event": "mem_load_retired.l1_miss", "counter-value": "x"}'])
+def test_json_malformato(line):
+    with pytest.raises(PerfFormatError, match="misses_4.json:2"):
+        parse_perf_json_lines(_json_lines()[:1] + [line], "misses_4.json")
+
+
+def test_formati_equivalenti_e_compressione(tmp_path):
+    csv_path = tmp_path / "misses_4.csv"
+    csv_path.write_text(CSV)
+    gz_path = tmp_path / "misses_4.csv.gz"
+    gz_path.write_bytes(gzip.compress(CSV.encode()))
+    json_path = tmp_path / "misses_4.json"
+    json_path.write_text("\n".join(_json_lines()) + "\n")
+    plain, packed, from_json = (load_perf_stat(str(p)) for p in (csv_path, gz_path, json_path))
+    assert plain.l3_miss == packed.l3_miss == from_json.l3_miss == 2500
+
+
+def test_lettura_da_archivio(tmp_path):
+    src = tmp_path / "misses_4.csv"
+    src.write_text(CSV)
+    archive = tmp_path / "campagna.tar"
+    with tarfile.open(archive, 'w') as tar:
+        tar.add(src, arcname="misses_4.csv")
+    assert load_perf_stat(str(archive / "misses_4.csv")).l1_miss == 1000003
+    with pytest.raises(FileNotFoundError):
+        load_perf_stat(str(tmp_path / "mancante.csv"))
+
+
+def test_testo_e_livelli_tlb(tmp_path):
+    path = tmp_path / "tlb_misses_4.txt"
+    path.write_text("""
+ Performance counter stats for 'CPU(s) 0' (50 runs):
+
+       1.000      dTLB_load_misses.stlb_hit                                     ( +-  1,23% )
+       200      dTLB_load_misses.miss_causes_a_walk                           ( +-  2,10% )
+       30      dTLB_store_misses.stlb_hit                                    ( +-  4,02% )
+       4      dTLB_store_misses.miss_causes_a_walk                          ( +-  0,12% )
+
+           2,00123 +- 0,00012 seconds time elapsed  ( +-  0,01% )
+""")
+    stat = parse_perf_stat(str(path))
+    assert tlb_levels(stat) == (1234.0, 204.0)
+    variance = stat._replace(dtlb_load_stlb_hit=1.23, dtlb_load_walk=2.10, dtlb_store_stlb_hit=4.02,
+                             dtlb_store_walk=0.12)
+    l1, l2 = tlb_levels_variance(stat, variance)
+    sigma_walk = np.hypot(200 * 0.0210, 4 * 0.0012)
+    assert l2 == pytest.approx(100 * sigma_walk / 204)
+    assert l1 == pytest.approx(100 * np.hypot(np.hypot(1000 * 0.0123, 30 * 0.0402), sigma_walk) / 1234)
+    assert np.isnan(tlb_levels_variance(stat, variance._replace(dtlb_store_walk=np.nan))[1])
+    assert stat.elapsed == pytest.approx(2.00123)
+
+
+def test_pstat_conserva_varianza_e_multiplexing(tmp_path):
+    stat = PerfStat._make(float(i + 1) for i in range(len(PerfStat._fields)))
+    variance = stat._replace(l1_miss=1.5, l2_miss=math.nan)
+    multiplex = stat._replace(l1_miss=0.5)
+    path = str(tmp_path / "misses_4.pstat")
+    write_perf_binary(path, stat, variance, multiplex)
+    read = parse_perf_binary_stats(path)
+    assert read[0] == stat and read[2] == multiplex
+    assert read[1].l1_miss == 1.5 and math.isnan(read[1].l2_miss)
+    assert load_perf_variance(path).l1_miss == 1.5
+    assert load_perf_multiplex(path).l1_miss == 0.5
+    assert load_perf_stat(path) == stat
+
+
+def test_pstat_versione_1(tmp_path):
+    """I file scritti prima della versione 2: solo i contatori, varianza e multiplexing NaN."""
+    names = b"l1_miss,campo_sconosciuto"
+    path = tmp_path / "misses_4.pstat"
+    path.write_bytes(struct.pack('<8sII', b'PERFSTAT', 1, len(names)) + names + struct.pack('<2d', 7.0, 9.0))
+    stat, variance, multiplex = parse_perf_binary_stats(str(path))
+    assert stat.l1_miss == 7.0 and stat.l2_miss == 0.0
+    assert all(math.isnan(v) for v in variance + multiplex)
+    assert parse_perf_binary(str(path)) == stat
+
+
+@pytest.mark.parametrize('data', [b'PERFSTAT', struct.pack('<8sII', b'PERFSTAT', 9, 0),
+                                  struct.pack('<8sII', b'PERFSTAT', 2, 7) + b'l1_miss' + b'\0' * 4])
+def test_pstat_non_valido(tmp_path, data):
+    path = tmp_path / "misses_4.pstat"
+    path.write_bytes(data)
+    with pytest.raises(PerfFormatError):
+        parse_perf_binary(str(path))
@@ -0,0 +1,76 @@
+"""PerfRecord e conversione in blocco: ordine dei campi, uguaglianza con NaN, array strutturati."""
+
+import math
+
+import numpy as np
+import pytest
+
+from perf_parser import PerfStat, load_perf_multiplex, load_perf_stat, load_perf_variance
+from perf_record import (PERF_RECORD_DTYPE, RECORD_FIELDS, PerfRecord, load_perf_record, load_perf_records,
+                         records_from_array, records_to_array)
+
+CSV = """# started on Mon Jan  1 00:00:00 2024
+
+1000003,,mem_load_retired.l1_miss,1.23%,2000123456,100.00,,
+2500,,mem_load_retired.l3_miss,4.02%,1000061728,50.00,,
+7,,context-switches,,2000123456,100.00,,
+"""
+
+
+def _record(scale=1.0):
+    stat = PerfStat._make(scale * (i + 1) for i in range(len(PerfStat._fields)))
+    variance = stat._replace(l1_miss=1.5, l2_miss=math.nan)
+    multiplex = PerfStat._make([1.0] * len(PerfStat._fields))._replace(l3_miss=0.5, elapsed=math.nan)
+    return PerfRecord.from_stats(stat, variance, multiplex)
+
+
+def test_ordine_dei_campi_come_perfstat():
+    n = len(PerfStat._fields)
+    assert RECORD_FIELDS[:n] == PerfStat._fields
+    assert RECORD_FIELDS[n:2 * n] == tuple(f"var_{field}" for field in PerfStat._fields)
+    assert RECORD_FIELDS[2 * n:] == tuple(f"mux_{field}" for field in PerfStat._fields if field != 'elapsed')
+    assert PERF_RECORD_DTYPE.names == RECORD_FIELDS
+
+    record = _record()
+    assert record.counters() == PerfStat._make(i + 1.0 for i in range(n))
+    assert record.variances().l1_miss == 1.5 and math.isnan(record.variances().l2_miss)
+    assert record.multiplex().l3_miss == 0.5 and math.isnan(record.multiplex().elapsed)
+
+
+def test_uguaglianza_con_nan():
+    assert _record() == _record()
+    assert _record() != _record(scale=2.0)
+    assert PerfRecord.from_stats(_record().counters()) == PerfRecord.from_stats(_record().counters())
+    assert all(math.isnan(v) for v in PerfRecord.from_stats(_record().counters()).astuple()[len(PerfStat._fields):])
+    with pytest.raises(TypeError):
+        hash(_record())
+    with pytest.raises(TypeError):
+        PerfRecord(1.0, 2.0)
+
+
+def test_array_strutturato_andata_e_ritorno():
+    records = [_record(), _record(scale=3.0)]
+    table = records_to_array(records)
+    assert table.dtype == PERF_RECORD_DTYPE and table.shape == (2,)
+    assert table['l1_miss'].tolist() == [1.0, 3.0]
+    assert table['var_l1_miss'].tolist() == [1.5, 1.5]
+    assert np.isnan(table['var_l2_miss']).all()
+    assert table['mux_l3_miss'].tolist() == [0.5, 0.5]
+    assert records_from_array(table) == records
+    assert records_to_array([]).shape == (0,)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_load_perf_records_come_i_lettori_singoli(tmp_path, workers):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"misses_{i}.csv"
+        path.write_text(CSV.replace('1000003', str(1000003 + i)))
+        paths.append(str(path))
+    table = load_perf_records(paths, workers=workers, processes=False)
+    assert records_from_array(table) == [load_perf_record(p) for p in paths]
+
+    assert table['l1_miss'].tolist() == [load_perf_stat(p).l1_miss for p in paths]
+    assert table['var_l1_miss'][0] == pytest.approx(load_perf_variance(paths[0]).l1_miss)
+    assert table['mux_l3_miss'][0] == pytest.approx(load_perf_multiplex(paths[0]).l3_miss)
+    assert table['mux_l3_miss'][0] == pytest.approx(0.5)
@@ -0,0 +1,79 @@
+"""Log per richiesta di send_request: throughput su tempo reale, finestre scorrevoli e latenze."""
+
+import numpy as np
+import pytest
+
+from request_log import (REQUEST_EVENTS, parse_request_lines, request_stats, throughput_finestre,
+                         throughput_run)
+
+
+def _righe(n=10, duration_us=100000, failed=(3,)):
+    """n richieste consecutive di duration_us; quelle in failed falliscono."""
+    lines = []
+    for i in range(n):
+        start, end = i * duration_us, (i + 1) * duration_us
+        if i in failed:
+            lines.append(f"Failed {i}: (start {start} us, end {end} us)")
+        else:
+            lines.append(f"Iter {i}: Execution time: {duration_us} microseconds (start {start} us, end {end} us)")
+    return lines
+
+
+def test_parse_request_lines():
+    log = parse_request_lines(["Average Execution Time: 1.0 microseconds"] + _righe(n=4)
+                              + ["Iter 9: Execution time: 55 microseconds"])
+    assert log.ok.tolist() == [True, True, True, False, True]
+    assert np.isnan(log.latency_us[3]) and log.latency_us[4] == 55.0
+    assert log.start_us[:4].tolist() == [0.0, 1e5, 2e5, 3e5]
+    assert np.isnan(log.start_us[4]) and np.isnan(log.end_us[4])
+
+
+def test_finestre_contate_a_mano():
+    log = parse_request_lines(_righe())
+    # Run 0-1 s, finestre di 0,5 s ogni 0,2 s: fine delle riuscite a 0,1 ... 1,0 s tranne 0,4 s
+    starts, rates = throughput_finestre(log, window_s=0.5, step_s=0.2)
+    np.testing.assert_allclose(starts, [0.0, 0.2, 0.4])
+    # [0, 0,5): 0,1 0,2 0,3   [0,2, 0,7): 0,2 0,3 0,5 0,6   [0,4, 0,9): 0,5 0,6 0,7 0,8
+    np.testing.assert_allclose(rates, [3 / 0.5, 4 / 0.5, 4 / 0.5])
+    assert throughput_run(log) == pytest.approx(9.0)
+
+
+def test_finestre_come_il_conteggio_diretto():
+    rng = np.random.default_rng(0)
+    n = 500
+    start = np.sort(rng.uniform(0, 5e6, n)).round()
+    latency = rng.uniform(1e3, 2e5, n).round()
+    failed = set(rng.choice(n, 50, replace=False).tolist())
+    lines = [f"Failed {i}: (start {int(s)} us, end {int(s + lat)} us)" if i in failed else
+             f"Iter {i}: Execution time: {int(lat)} microseconds (start {int(s)} us, end {int(s + lat)} us)"
+             for i, (s, lat) in enumerate(zip(start, latency))]
+    log = parse_request_lines(lines)
+    starts, rates = throughput_finestre(log, window_s=1.0, step_s=0.25)
+
+    t0 = log.start_us.min()
+    ok_ends = log.end_us[log.ok]
+    expected = [np.count_nonzero((ok_ends >= t0 + s * 1e6) & (ok_ends < t0 + (s + 1.0) * 1e6)) / 1.0
+                for s in starts]
+    np.testing.assert_array_equal(rates, expected)
+
+
+def test_run_corto_e_log_senza_timestamp():
+    log = parse_request_lines(_righe(n=3, failed=()))
+    starts, rates = throughput_finestre(log, window_s=1.0)
+    assert starts.tolist() == [0.0] and rates.tolist() == [pytest.approx(10.0)]
+
+    old = parse_request_lines(["Iter 0: Execution time: 10 microseconds",
+                               "Iter 1: Execution time: 30 microseconds"])
+    starts, rates = throughput_finestre(old)
+    assert len(starts) == len(rates) == 0
+    assert np.isnan(throughput_run(old))
+
+
+def test_request_stats(tmp_path):
+    path = tmp_path / "execution_time_matrix_4.txt"
+    path.write_text("\n".join(_righe()) + "\nAverage Execution Time: 90000.00 microseconds\n")
+    stats = dict(zip(REQUEST_EVENTS, request_stats(str(path), window_s=0.5)))
+    assert stats['throughput_rps'] == pytest.approx(9.0)
+    # La media esclude la richiesta fallita (la riga del client la conta come 0)
+    assert stats['latency_mean_us'] == 100000.0
+    assert stats['latency_p50_us'] == stats['latency_max_us'] == 100000.0
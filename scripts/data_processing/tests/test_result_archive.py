@@ -0,0 +1,104 @@
+"""Risultati letti direttamente da archivi tar / zip: indice dei membri, stat e handle per processo."""
+
+import gzip
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+import result_archive
+from perf_parser import load_perf_stat
+from result_archive import archive_listdir, close_archives, member_stat, split_archive_path
+from result_index import build_index, clear_index_cache
+from result_io import open_result, read_result_bytes, result_exists
+
+from conftest import CACHE_EVENTS, _testo_perf
+
+CELL_DIR = "1 Active Server/perf_results_matrix_cache_misses"
+
+
+@pytest.fixture(autouse=True)
+def _pulizia():
+    yield
+    close_archives()
+    clear_index_cache()
+
+
+@pytest.fixture(params=['tar', 'zip'])
+def archivio(request, tmp_path):
+    """Campagna minima in un .tar (nomi con './') o in uno .zip; ritorna (archivio, file originali)."""
+    text = _testo_perf(CACHE_EVENTS, [1000 * (j + 1) for j in range(6)], 2.0).encode()
+    members = {
+        f"{CELL_DIR}/misses_4.txt": text,
+        f"{CELL_DIR}/misses_8_LOWHz.txt.gz": gzip.compress(text.replace(b"1.000", b"2.000")),
+        "README": b"non un risultato\n",
+    }
+    source = tmp_path / "src"
+    for name, data in members.items():
+        (source / name).parent.mkdir(parents=True, exist_ok=True)
+        (source / name).write_bytes(data)
+
+    archive = str(tmp_path / f"campagna.{request.param}")
+    if request.param == 'tar':
+        with tarfile.open(archive, 'w') as tar:
+            for name in members:
+                tar.add(str(source / name), arcname=f"./{name}")
+    else:
+        with zipfile.ZipFile(archive, 'w') as zf:
+            for name in members:
+                zf.write(str(source / name), arcname=name)
+    return archive, source
+
+
+def test_split_archive_path(archivio):
+    archive, _ = archivio
+    inner = os.path.join(archive, *CELL_DIR.split('/'), "misses_4.txt")
+    assert split_archive_path(inner) == (archive, f"{CELL_DIR}/misses_4.txt")
+    assert split_archive_path(archive) == (archive, '')
+    assert split_archive_path(os.path.dirname(archive)) is None
+
+
+def test_indice_e_lettura_dei_membri(archivio):
+    archive, source = archivio
+    cell_dir = os.path.join(archive, *CELL_DIR.split('/'))
+    assert sorted(archive_listdir(archive, CELL_DIR)) == ["misses_4.txt", "misses_8_LOWHz.txt.gz"]
+    assert archive_listdir(archive, '') == ["README"]
+
+    index = build_index(cell_dir)
+    assert set(index) == {('misses', 4, None), ('misses', 8, 'LOW')}
+    for path in index.values():
+        original = os.path.join(source, *CELL_DIR.split('/'), os.path.basename(path))
+        assert result_exists(path)
+        assert read_result_bytes(path) == read_result_bytes(original)
+        assert load_perf_stat(path) == load_perf_stat(original)
+    with open_result(index[('misses', 4, None)]) as f:
+        assert "mem_load_retired.l1_miss" in f.read()
+    assert not result_exists(os.path.join(cell_dir, "misses_16.txt"))
+
+
+def test_member_stat_usa_il_mtime_dell_archivio(archivio):
+    archive, source = archivio
+    member = f"{CELL_DIR}/misses_4.txt"
+    size, mtime_ns = member_stat(archive, member)
+    assert size == os.path.getsize(os.path.join(source, *member.split('/')))
+    assert mtime_ns == os.stat(archive).st_mtime_ns
+    with pytest.raises(FileNotFoundError):
+        member_stat(archive, f"{CELL_DIR}/misses_16.txt")
+
+
+def test_handle_riaperto_in_un_altro_processo(archivio, monkeypatch):
+    archive, _ = archivio
+    member = f"{CELL_DIR}/misses_4.txt"
+    expected = read_result_bytes(os.path.join(archive, *member.split('/')))
+    parent = result_archive._archives[archive]
+
+    # Un figlio (pid diverso) non deve riusare l'handle del padre
+    monkeypatch.setattr(result_archive.os, 'getpid', lambda: parent['pid'] + 1)
+    with result_archive.open_member(archive, member) as f:
+        assert f.read() == expected
+    child = result_archive._archives[archive]
+    assert child is not parent and child['handle'] is not parent['handle']
+    assert child['pid'] == parent['pid'] + 1
+    parent['handle'].close()
+    child['handle'].close()
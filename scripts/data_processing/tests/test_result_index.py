@@ -0,0 +1,29 @@
+"""Grammatica dei nomi dei file di risultato, indice per directory e avviso delle celle mancanti."""
+
+from result_index import build_index, format_missing, parse_result_name
+
+
+def test_grammatica_dei_nomi():
+    assert parse_result_name("misses_4.txt") == (('misses', 4, None), '.txt')
+    assert parse_result_name("tlb_misses_8_lowHz.csv.gz") == (('tlb_misses', 8, 'LOW'), '.csv.gz')
+    assert parse_result_name("interval_misses_2_500Hz.npz") == (('interval_misses', 2, '500'), '.npz')
+    assert parse_result_name("misses_4.log") is None
+    assert parse_result_name("note.txt") is None
+
+
+def test_indice_preferisce_il_testo_non_compresso(tmp_path):
+    for name in ("misses_4.txt.gz", "misses_4.txt", "misses_8_HIGHHz.json", "README.md"):
+        (tmp_path / name).write_text("")
+    index = build_index(str(tmp_path))
+    assert sorted(index) == [('misses', 4, None), ('misses', 8, 'HIGH')]
+    assert index['misses', 4, None].endswith("misses_4.txt")
+
+
+def test_avviso_celle_mancanti():
+    missing = [('1S', size, f"/campagna/1/misses_{size}.txt") for size in range(25)]
+    missing.append(('2S_LOW', 4, "/campagna/2/misses_4_LOWHz.txt"))
+    text = format_missing(missing)
+    assert text.startswith("ATTENZIONE: 26 celle")
+    assert "NaN" in text and "valgono 0" not in text
+    assert "/campagna/1: 1S/0, 1S/1" in text and "(+5)" in text
+    assert "/campagna/2: 2S_LOW/4" in text
@@ -0,0 +1,69 @@
+"""Database SQLite dei risultati: import idempotente e rapporti con la baseline."""
+
+import numpy as np
+import pytest
+
+from campaign_store import CampaignStore, build_store, select
+from results_db import connect, import_store, query, query_ratio
+from scenario_grid import make_grid
+
+from conftest import scrivi_campagna
+
+GRID = make_grid('matrix', 'single', sizes=[4, 8], n_servers=(1, 2), freqs=('LOW',))
+
+
+@pytest.fixture
+def store(tmp_path):
+    root = tmp_path / "campagna"
+    scrivi_campagna(root, GRID)
+    return build_store([str(root)], workers=1, n_servers=(1, 2))
+
+
+def _n_misure(conn):
+    return conn.execute("SELECT COUNT(*) FROM measurements").fetchone()[0]
+
+
+def test_import_idempotente(tmp_path, store):
+    conn = connect(str(tmp_path / "results.db"))
+    written = import_store(conn, store)
+    assert written == len(store.columns['value']) == _n_misure(conn)
+    n_runs = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    assert import_store(conn, store) == written
+    assert _n_misure(conn) == written
+    assert conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0] == n_runs
+    rows = query(conn, 'l1_miss', scenario='2S_LOW')
+    assert rows['size'].tolist() == [4, 8] and (rows['variance'] == 2.0).all()
+    conn.close()
+
+
+def test_query_ratio_come_a_mano(tmp_path, store):
+    conn = connect(str(tmp_path / "results.db"))
+    import_store(conn, store)
+    ratios = query_ratio(conn, 'l3_miss', '2S_LOW')
+
+    def valori(scenario):
+        rows = select(store, event='l3_miss', scenario=scenario)
+        return dict(zip(rows['size'].tolist(), rows['value'].tolist()))
+
+    value, baseline = valori('2S_LOW'), valori('1S')
+    assert ratios['size'].tolist() == sorted(value)
+    for row in ratios:
+        size = int(row['size'])
+        assert row['value'] == value[size] and row['baseline'] == baseline[size]
+        assert row['ratio'] == pytest.approx(value[size] / baseline[size])
+    conn.close()
+
+
+def test_baseline_zero_da_nan(tmp_path, store):
+    columns = {name: col.copy() for name, col in store.columns.items()}
+    zero = (columns['scenario'] == '1S') & (columns['event'] == 'l3_miss') & (columns['size'] == 4)
+    columns['value'][zero] = 0.0
+    conn = connect(str(tmp_path / "results.db"))
+    import_store(conn, CampaignStore(columns, store.metadata))
+
+    ratios = query_ratio(conn, 'l3_miss', '2S_LOW')
+    by_size = {int(row['size']): row for row in ratios}
+    assert by_size[4]['baseline'] == 0.0 and np.isnan(by_size[4]['ratio'])
+    assert np.isfinite(by_size[8]['ratio'])
+    conn.close()
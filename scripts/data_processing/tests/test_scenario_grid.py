@@ -0,0 +1,66 @@
+"""Griglia degli scenari: numero di scenari, override da ambiente, legende e directory."""
+
+import os
+
+import pytest
+
+from scenario_grid import (grid_dirs, grid_from_env, grid_scenario_labels, make_grid, scenario_index,
+                           scenario_legend, standard_layout)
+
+
+@pytest.mark.parametrize('n_servers, freqs', [
+    ((1, 2, 3), ('LOW', 'MEDIUM', 'HIGH')),
+    ((1, 2, 3, 4), ('LOW', 'HIGH', '500')),
+    ((1, 2), ('LOW',)),
+    ((1,), ('LOW', 'HIGH')),
+])
+def test_numero_di_scenari(n_servers, freqs):
+    grid = make_grid('matrix', 'single', sizes=[4], n_servers=n_servers, freqs=freqs)
+    labels = grid_scenario_labels(grid)
+    assert len(labels) == 1 + (max(n_servers) - 1) * len(freqs)
+    assert labels[0] == '1S' and len(set(labels)) == len(labels)
+    assert scenario_index(labels) == {label: i for i, label in enumerate(labels)}
+
+
+def test_make_grid_normalizza_e_valida():
+    grid = make_grid('table', 'multi', sizes=['8', 4], n_servers=[3, 1, 2, 2], freqs=['low', 500])
+    assert grid.n_servers == (1, 2, 3) and grid.freqs == ('LOW', '500') and grid.sizes == (8, 4)
+    assert grid_scenario_labels(grid) == ['1S', '2S_LOW', '2S_500', '3S_LOW', '3S_500']
+    with pytest.raises(ValueError, match="server"):
+        make_grid('graph', 'single', sizes=[4])
+    with pytest.raises(ValueError, match="core"):
+        make_grid('matrix', 'dual', sizes=[4])
+
+
+def test_grid_from_env(monkeypatch):
+    grid = make_grid('matrix', 'single', sizes=[4, 8])
+    for name in ('SCENARIO_SERVERS', 'SCENARIO_FREQS', 'SCENARIO_SIZES'):
+        monkeypatch.delenv(name, raising=False)
+    assert grid_from_env(grid) == grid
+
+    monkeypatch.setenv('SCENARIO_SERVERS', '1, 2,4')
+    monkeypatch.setenv('SCENARIO_FREQS', 'high,500')
+    env_grid = grid_from_env(grid)
+    assert env_grid.n_servers == (1, 2, 4) and env_grid.freqs == ('HIGH', '500')
+    assert env_grid.sizes == grid.sizes
+    assert len(grid_scenario_labels(env_grid)) == 1 + 2 * 2
+
+    monkeypatch.setenv('SCENARIO_SIZES', '16')
+    assert grid_from_env(grid).sizes == (16,)
+
+
+def test_scenario_legend():
+    labels = ['1S', '2S_HIGH', '3S_500']
+    assert scenario_legend(labels) == {'1S': "1 Server (no disturbo)", '2S_HIGH': "2 Servers (alto disturbo)",
+                                       '3S_500': "3 Servers (disturbo 500 Hz)"}
+    assert scenario_legend(labels, lingua='en') == {'1S': "1 Server (no disturbance)",
+                                                    '2S_HIGH': "2 Servers (high disturbance)",
+                                                    '3S_500': "3 Servers (500 Hz disturbance)"}
+
+
+def test_directory_del_layout_standard(tmp_path):
+    grid = make_grid('matrix', 'single', sizes=[4], n_servers=(1, 3))
+    dirs = grid_dirs(grid, standard_layout(str(tmp_path), grid), sources=('cache',))
+    base = os.path.join(str(tmp_path), "Analysis Matrix Multiplication", "Single Core")
+    assert dirs == {'cache': (os.path.join(base, "1 Active Server", "perf_results_matrix_cache_misses"),
+                              os.path.join(base, "3 Active Server", "perf_results_matrix_cache_misses"))}
@@ -1,8 +1,13 @@
 import os
+import sys
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 
+# Parser condiviso (scripts/data_processing/perf_parser.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scripts', 'data_processing'))
+from perf_parser import EVENT_FIELDS, parse_perf_stat
+
 def format_size(exp):
     size = 2 ** int(exp)
     if size >= 1024 * 1024:
@@ -20,17 +25,11 @@ def format_misses(value):
     return f'{value:.0f}'
 
 def read_misses(output_dir, output_files, event_type):
+    field = EVENT_FIELDS[event_type.lower()]
     results = {}
     for size, output_file in output_files.items():
         file_path = os.path.join(output_dir, output_file)
-        with open(file_path, 'r') as f:
-            for line in f:
-                line_split = line.split()
-                if len(line_split) < 3:
-                    continue
-                if line_split[1] == event_type:
-                    misses = float(line_split[0].replace('.', ''))
-                    results[size] = misses
+        results[size] = getattr(parse_perf_stat(file_path), field)
     return results
 
 if __name__ == '__main__':
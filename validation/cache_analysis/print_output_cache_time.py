@@ -1,8 +1,13 @@
 import os
+import sys
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 
+# Lettura dei risultati anche compressi (scripts/data_processing/result_io.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scripts', 'data_processing'))
+from result_io import open_result
+
 def format_size(exp):
     size = 2 ** int(exp)
     if size >= 1024 * 1024:
@@ -14,7 +19,7 @@ def format_size(exp):
 
 def read_time_from_file(file_path):
     time_value = 0
-    with open(file_path, 'r') as f:
+    with open_result(file_path) as f:
         for line in f:
             line_split = line.split()
             if len(line_split) < 3:
@@ -1,8 +1,13 @@
 import os
+import sys
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 
+# Parser condiviso (scripts/data_processing/perf_parser.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scripts', 'data_processing'))
+from perf_parser import parse_perf_stat, tlb_levels
+
 def format_size(pages):
     """Format page numbers for better readability"""
     if pages >= 1024:
@@ -18,28 +23,8 @@ def format_misses(value):
     return f'{value:.0f}'
 
 def read_misses(file_path):
-    l1_misses = 0
-    l2_misses = 0
-    stlb_hit_load = stlb_hit_store = l2_misses_load = l2_misses_store = 0
-    
-    with open(file_path, 'r') as f:
-        for line in f:
-            line_split = line.split()
-            if len(line_split) < 3:
-                continue
-            if 'dTLB_load_misses.stlb_hit' in line:
-                stlb_hit_load = float(line_split[0].replace('.', '').replace(',', '.'))
-            elif 'dTLB_store_misses.stlb_hit'  in line:
-                stlb_hit_store = float(line_split[0].replace('.', '').replace(',', '.'))
-            elif 'dTLB_load_misses.miss_causes_a_walk' in line:
-                l2_misses_load = float(line_split[0].replace('.', '').replace(',', '.'))
-            elif 'dTLB_store_misses.miss_causes_a_walk' in line:
-                l2_misses_store = float(line_split[0].replace('.', '').replace(',', '.'))
-    
-    stlb_hit = stlb_hit_load + stlb_hit_store
-    l2_misses = l2_misses_load + l2_misses_store
-    l1_misses = stlb_hit + l2_misses
-    return l1_misses, l2_misses
+    # L1 = stlb_hit + page walk, L2 = page walk (load + store)
+    return tlb_levels(parse_perf_stat(file_path))
 
 if __name__ == '__main__':
     OUTPUT_DIR = '/Users/lorenzofaraoni/Desktop/Tesi/Laboratorio/Progetti/Random access array/random_access_array_TLB/output_TLB_miss_analysis'